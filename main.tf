@@ -650,6 +650,13 @@ module "reporting" {
   crawler_schedule            = var.reporting.crawler_schedule
   enable_partition_projection = var.reporting.enable_partition_projection
 
+  # Compaction of per-document Parquet files
+  enable_compaction              = var.reporting.enable_compaction
+  compaction_schedule_expression = var.reporting.compaction_schedule
+
+  # Buffered writes through an SQS queue
+  enable_buffered_writes = var.reporting.enable_buffered_writes
+
   # VPC configuration
   vpc_subnet_ids         = var.vpc_subnet_ids
   vpc_security_group_ids = var.vpc_security_group_ids
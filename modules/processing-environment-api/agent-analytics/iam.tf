@@ -216,6 +216,7 @@ resource "aws_iam_policy" "agent_processor_policy" {
             "athena:StartQueryExecution",
             "athena:GetQueryExecution",
             "athena:GetQueryResults",
+            "athena:GetQueryRuntimeStatistics",
             "athena:StopQueryExecution",
             "athena:GetWorkGroup",
             "athena:GetDataCatalog",
@@ -52,6 +52,7 @@ resource "aws_iam_role_policy" "agentcore_analytics_processor" {
           "athena:StartQueryExecution",
           "athena:GetQueryExecution",
           "athena:GetQueryResults",
+          "athena:GetQueryRuntimeStatistics",
           "athena:StopQueryExecution",
           "athena:ListQueryExecutions"
         ]
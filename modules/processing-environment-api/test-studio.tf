@@ -110,7 +110,8 @@ resource "aws_iam_role_policy" "test_studio_lambdas" {
         Effect = "Allow"
         Action = [
           "dynamodb:GetItem", "dynamodb:PutItem", "dynamodb:UpdateItem",
-          "dynamodb:DeleteItem", "dynamodb:Query", "dynamodb:Scan"
+          "dynamodb:DeleteItem", "dynamodb:Query", "dynamodb:Scan",
+          "dynamodb:BatchGetItem", "dynamodb:BatchWriteItem"
         ]
         Resource = [
           aws_dynamodb_table.test_sets[0].arn,
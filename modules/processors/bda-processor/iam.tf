@@ -928,6 +928,16 @@ resource "aws_iam_policy" "hitl_status_update_policy" {
         ]
         Resource = "*"
       },
+      {
+        Effect = "Allow"
+        Action = [
+          "s3:GetObject",
+          "s3:PutObject"
+        ]
+        Resource = [
+          "${var.working_bucket_arn}/*"
+        ]
+      },
 
     ]
   })
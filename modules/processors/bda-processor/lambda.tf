@@ -184,6 +184,7 @@ resource "aws_lambda_function" "process_results" {
       CONFIGURATION_TABLE_NAME = local.configuration_table_name
       DOCUMENT_TRACKING_MODE   = var.api_id != null ? "appsync" : "dynamodb"
       BDA_PROJECT_ARN          = var.data_automation_project_arn
+      MAX_TRANSFER_WORKERS     = var.max_transfer_workers
     }
   }
 
@@ -374,6 +375,7 @@ resource "aws_lambda_function" "hitl_status_update" {
       LOG_LEVEL                = var.log_level
       METRIC_NAMESPACE         = var.metric_namespace
       TRACKING_TABLE           = local.tracking_table_name
+      WORKING_BUCKET           = local.working_bucket_name
       CONFIGURATION_TABLE_NAME = local.configuration_table_name
       DOCUMENT_TRACKING_MODE   = var.api_id != null ? "appsync" : "dynamodb"
       APPSYNC_API_URL          = var.api_id != null ? var.api_graphql_url : ""
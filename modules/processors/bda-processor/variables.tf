@@ -146,6 +146,12 @@ variable "max_processing_concurrency" {
   default     = 100
 }
 
+variable "max_transfer_workers" {
+  description = "Number of concurrent S3 copies, uploads and reads of the process results function"
+  type        = number
+  default     = 32
+}
+
 variable "config" {
   description = "Configuration values from config_library YAML files"
   type        = any
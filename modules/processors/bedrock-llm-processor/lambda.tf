@@ -65,15 +65,17 @@ resource "aws_lambda_function" "classification" {
 
   environment {
     variables = {
-      METRIC_NAMESPACE         = local.metric_namespace
-      MAX_WORKERS              = var.classification_max_workers
-      TRACKING_TABLE           = local.tracking_table_name
-      CONFIGURATION_TABLE_NAME = local.configuration_table_name
-      LOG_LEVEL                = local.log_level
-      WORKING_BUCKET           = local.working_bucket_name
-      GUARDRAIL_ID_AND_VERSION = var.classification_guardrail != null ? var.classification_guardrail.guardrail_id : ""
-      DOCUMENT_TRACKING_MODE   = local.api_id != null ? "appsync" : "dynamodb"
-      APPSYNC_API_URL          = local.api_graphql_url != null ? local.api_graphql_url : ""
+      METRIC_NAMESPACE               = local.metric_namespace
+      MAX_WORKERS                    = var.classification_max_workers
+      TRACKING_TABLE                 = local.tracking_table_name
+      CONFIGURATION_TABLE_NAME       = local.configuration_table_name
+      LOG_LEVEL                      = local.log_level
+      WORKING_BUCKET                 = local.working_bucket_name
+      GUARDRAIL_ID_AND_VERSION       = var.classification_guardrail != null ? var.classification_guardrail.guardrail_id : ""
+      DOCUMENT_TRACKING_MODE         = local.api_id != null ? "appsync" : "dynamodb"
+      APPSYNC_API_URL                = local.api_graphql_url != null ? local.api_graphql_url : ""
+      BEDROCK_RESPONSE_CACHE_ENABLED = var.enable_bedrock_response_cache ? "true" : "false"
+      BEDROCK_RESPONSE_CACHE_TABLE   = var.enable_bedrock_response_cache ? local.tracking_table_name : ""
     }
   }
 
@@ -102,14 +104,16 @@ resource "aws_lambda_function" "extraction" {
 
   environment {
     variables = {
-      METRIC_NAMESPACE         = local.metric_namespace
-      CONFIGURATION_TABLE_NAME = local.configuration_table_name
-      WORKING_BUCKET           = local.working_bucket_name
-      GUARDRAIL_ID_AND_VERSION = var.extraction_guardrail != null ? var.extraction_guardrail.guardrail_id : ""
-      LOG_LEVEL                = local.log_level
-      TRACKING_TABLE           = local.tracking_table_name
-      DOCUMENT_TRACKING_MODE   = local.api_id != null ? "appsync" : "dynamodb"
-      APPSYNC_API_URL          = local.api_graphql_url != null ? local.api_graphql_url : ""
+      METRIC_NAMESPACE               = local.metric_namespace
+      CONFIGURATION_TABLE_NAME       = local.configuration_table_name
+      WORKING_BUCKET                 = local.working_bucket_name
+      GUARDRAIL_ID_AND_VERSION       = var.extraction_guardrail != null ? var.extraction_guardrail.guardrail_id : ""
+      LOG_LEVEL                      = local.log_level
+      TRACKING_TABLE                 = local.tracking_table_name
+      DOCUMENT_TRACKING_MODE         = local.api_id != null ? "appsync" : "dynamodb"
+      APPSYNC_API_URL                = local.api_graphql_url != null ? local.api_graphql_url : ""
+      BEDROCK_RESPONSE_CACHE_ENABLED = var.enable_bedrock_response_cache ? "true" : "false"
+      BEDROCK_RESPONSE_CACHE_TABLE   = var.enable_bedrock_response_cache ? local.tracking_table_name : ""
     }
   }
 
@@ -176,14 +180,16 @@ resource "aws_lambda_function" "summarization" {
 
   environment {
     variables = {
-      METRIC_NAMESPACE         = local.metric_namespace
-      CONFIGURATION_TABLE_NAME = local.configuration_table_name
-      WORKING_BUCKET           = local.working_bucket_name
-      LOG_LEVEL                = local.log_level
-      GUARDRAIL_ID_AND_VERSION = var.summarization_guardrail != null ? var.summarization_guardrail.guardrail_id : ""
-      TRACKING_TABLE           = local.tracking_table_name
-      DOCUMENT_TRACKING_MODE   = local.api_id != null ? "appsync" : "dynamodb"
-      APPSYNC_API_URL          = local.api_graphql_url != null ? local.api_graphql_url : ""
+      METRIC_NAMESPACE               = local.metric_namespace
+      CONFIGURATION_TABLE_NAME       = local.configuration_table_name
+      WORKING_BUCKET                 = local.working_bucket_name
+      LOG_LEVEL                      = local.log_level
+      GUARDRAIL_ID_AND_VERSION       = var.summarization_guardrail != null ? var.summarization_guardrail.guardrail_id : ""
+      TRACKING_TABLE                 = local.tracking_table_name
+      DOCUMENT_TRACKING_MODE         = local.api_id != null ? "appsync" : "dynamodb"
+      APPSYNC_API_URL                = local.api_graphql_url != null ? local.api_graphql_url : ""
+      BEDROCK_RESPONSE_CACHE_ENABLED = var.enable_bedrock_response_cache ? "true" : "false"
+      BEDROCK_RESPONSE_CACHE_TABLE   = var.enable_bedrock_response_cache ? local.tracking_table_name : ""
     }
   }
 
@@ -255,13 +261,15 @@ resource "aws_lambda_function" "assessment" {
 
   environment {
     variables = {
-      METRIC_NAMESPACE         = local.metric_namespace
-      CONFIGURATION_TABLE_NAME = local.configuration_table_name
-      LOG_LEVEL                = local.log_level
-      WORKING_BUCKET           = local.working_bucket_name
-      TRACKING_TABLE           = local.tracking_table_name
-      DOCUMENT_TRACKING_MODE   = local.api_id != null ? "appsync" : "dynamodb"
-      APPSYNC_API_URL          = local.api_graphql_url != null ? local.api_graphql_url : ""
+      METRIC_NAMESPACE               = local.metric_namespace
+      CONFIGURATION_TABLE_NAME       = local.configuration_table_name
+      LOG_LEVEL                      = local.log_level
+      WORKING_BUCKET                 = local.working_bucket_name
+      TRACKING_TABLE                 = local.tracking_table_name
+      DOCUMENT_TRACKING_MODE         = local.api_id != null ? "appsync" : "dynamodb"
+      APPSYNC_API_URL                = local.api_graphql_url != null ? local.api_graphql_url : ""
+      BEDROCK_RESPONSE_CACHE_ENABLED = var.enable_bedrock_response_cache ? "true" : "false"
+      BEDROCK_RESPONSE_CACHE_TABLE   = var.enable_bedrock_response_cache ? local.tracking_table_name : ""
     }
   }
 
@@ -346,8 +354,17 @@ resource "aws_lambda_function" "hitl_status_update" {
   filename         = data.archive_file.hitl_status_update_lambda.output_path
   source_code_hash = data.archive_file.hitl_status_update_lambda.output_base64sha256
 
+  layers = [var.idp_common_layer_arn]
+
   kms_key_arn = var.encryption_key_arn
 
+  environment {
+    variables = {
+      LOG_LEVEL      = local.log_level
+      WORKING_BUCKET = local.working_bucket_name
+    }
+  }
+
   dynamic "vpc_config" {
     for_each = length(local.vpc_subnet_ids) > 0 ? [1] : []
     content {
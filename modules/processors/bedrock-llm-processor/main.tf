@@ -226,7 +226,7 @@ locals {
         "Result.$"         = "$.Result"
         "HITLWaitResult.$" = "$.HITLWaitResult"
       }
-      ResultPath = "$.HITLStatusResult"
+      ResultPath = "$.Result"
       Retry      = local.standard_retry
       Next       = local.post_hitl_next
     }
@@ -246,6 +246,12 @@ variable "enable_agentic_extraction" {
   default     = false
 }
 
+variable "enable_bedrock_response_cache" {
+  description = "Whether to cache deterministic Bedrock responses in the tracking table so that reprocessing with an unchanged configuration reuses earlier inferences"
+  type        = bool
+  default     = false
+}
+
 variable "review_agent_model" {
   description = "Bedrock model ID for the review agent. If empty, uses the extraction model."
   type        = string
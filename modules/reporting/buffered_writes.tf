@@ -0,0 +1,230 @@
+# Copyright Amazon.com, Inc. or its affiliates. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Buffered reporting writes. With enable_buffered_writes, save_reporting_data sends the
+# records of each document to an SQS queue instead of writing one Parquet file per
+# document and table. The reporting batch writer consumes the queue and writes one file
+# per table partition for every batch; the event source mapping's batch size and batching
+# window are the size and time thresholds of a flush.
+
+locals {
+  reporting_batch_writer_timeout = 300
+}
+
+resource "aws_sqs_queue" "reporting_records_dlq" {
+  count                     = var.enable_buffered_writes ? 1 : 0
+  name                      = "${var.name_prefix}-reporting-records-dlq-${random_string.suffix.result}"
+  message_retention_seconds = 1209600 # 14 days
+  kms_master_key_id         = var.encryption_key_arn
+
+  tags = var.tags
+}
+
+resource "aws_sqs_queue" "reporting_records_queue" {
+  count = var.enable_buffered_writes ? 1 : 0
+  name  = "${var.name_prefix}-reporting-records-${random_string.suffix.result}"
+  # Messages stay invisible while they wait in the batching window and while the batch is written
+  visibility_timeout_seconds = 6 * local.reporting_batch_writer_timeout + var.buffered_write_batching_window_seconds
+  message_retention_seconds  = 345600 # 4 days
+  kms_master_key_id          = var.encryption_key_arn
+  redrive_policy = jsonencode({
+    deadLetterTargetArn = aws_sqs_queue.reporting_records_dlq[0].arn
+    maxReceiveCount     = 3
+  })
+
+  tags = var.tags
+}
+
+resource "aws_lambda_function" "reporting_batch_writer" {
+  count         = var.enable_buffered_writes ? 1 : 0
+  function_name = "${var.name_prefix}-reporting-batch-writer-${random_string.suffix.result}"
+
+  filename         = data.archive_file.reporting_batch_writer_code[0].output_path
+  source_code_hash = data.archive_file.reporting_batch_writer_code[0].output_base64sha256
+
+  layers = [var.idp_common_layer_arn]
+
+  handler     = "index.handler"
+  runtime     = "python3.12"
+  timeout     = local.reporting_batch_writer_timeout
+  memory_size = 2048
+  role        = aws_iam_role.reporting_batch_writer_role[0].arn
+  description = "Lambda function that writes buffered reporting records as one Parquet file per partition and batch"
+
+  kms_key_arn = var.encryption_key_arn
+
+  environment {
+    variables = {
+      LOG_LEVEL             = var.log_level
+      STACK_NAME            = var.name_prefix
+      REPORTING_BUCKET      = local.reporting_bucket_name
+      SCHEMA_REGISTRY_TABLE = aws_dynamodb_table.reporting_schema_registry.name
+    }
+  }
+
+  dynamic "vpc_config" {
+    for_each = length(var.vpc_subnet_ids) > 0 ? [local.vpc_config] : []
+    content {
+      subnet_ids         = vpc_config.value.subnet_ids
+      security_group_ids = vpc_config.value.security_group_ids
+    }
+  }
+
+  tracing_config {
+    mode = var.lambda_tracing_mode
+  }
+
+  tags = var.tags
+}
+
+# Source code archive
+data "archive_file" "reporting_batch_writer_code" {
+  count       = var.enable_buffered_writes ? 1 : 0
+  type        = "zip"
+  source_dir  = "${path.module}/../../sources/src/lambda/reporting_batch_writer"
+  output_path = "${local.module_build_dir}/reporting-batch-writer.zip"
+
+  depends_on = [null_resource.create_module_build_dir]
+}
+
+resource "aws_lambda_event_source_mapping" "reporting_batch_writer" {
+  count                              = var.enable_buffered_writes ? 1 : 0
+  event_source_arn                   = aws_sqs_queue.reporting_records_queue[0].arn
+  function_name                      = aws_lambda_function.reporting_batch_writer[0].arn
+  batch_size                         = var.buffered_write_batch_size
+  maximum_batching_window_in_seconds = var.buffered_write_batching_window_seconds
+  function_response_types            = ["ReportBatchItemFailures"]
+}
+
+# IAM role for reporting batch writer function
+resource "aws_iam_role" "reporting_batch_writer_role" {
+  count = var.enable_buffered_writes ? 1 : 0
+  name  = "${var.name_prefix}-reporting-batch-writer-role-${random_string.suffix.result}"
+
+  assume_role_policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Action = "sts:AssumeRole"
+        Effect = "Allow"
+        Principal = {
+          Service = "lambda.amazonaws.com"
+        }
+      }
+    ]
+  })
+
+  tags = var.tags
+}
+
+# IAM policy for reporting batch writer function
+resource "aws_iam_policy" "reporting_batch_writer_policy" {
+  count = var.enable_buffered_writes ? 1 : 0
+  name  = "${var.name_prefix}-reporting-batch-writer-policy-${random_string.suffix.result}"
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect = "Allow"
+        Action = [
+          "logs:CreateLogGroup",
+          "logs:CreateLogStream",
+          "logs:PutLogEvents"
+        ]
+        Resource = "arn:${data.aws_partition.current.partition}:logs:*:*:*"
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "sqs:ReceiveMessage",
+          "sqs:DeleteMessage",
+          "sqs:GetQueueAttributes"
+        ]
+        Resource = aws_sqs_queue.reporting_records_queue[0].arn
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "s3:PutObject"
+        ]
+        Resource = [
+          "${var.reporting_bucket_arn}/metering/*",
+          "${var.reporting_bucket_arn}/evaluation_metrics/*",
+          "${var.reporting_bucket_arn}/document_sections/*"
+        ]
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "glue:CreateTable",
+          "glue:GetTable",
+          "glue:UpdateTable",
+          "glue:GetDatabase"
+        ]
+        Resource = [
+          "arn:${data.aws_partition.current.partition}:glue:${data.aws_region.current.id}:${data.aws_caller_identity.current.account_id}:catalog",
+          "arn:${data.aws_partition.current.partition}:glue:${data.aws_region.current.id}:${data.aws_caller_identity.current.account_id}:database/${local.database_name}",
+          "arn:${data.aws_partition.current.partition}:glue:${data.aws_region.current.id}:${data.aws_caller_identity.current.account_id}:table/${local.database_name}/document_sections_*"
+        ]
+      }
+    ]
+  })
+
+  tags = var.tags
+}
+
+resource "aws_iam_role_policy_attachment" "reporting_batch_writer_policy_attachment" {
+  count      = var.enable_buffered_writes ? 1 : 0
+  role       = aws_iam_role.reporting_batch_writer_role[0].name
+  policy_arn = aws_iam_policy.reporting_batch_writer_policy[0].arn
+}
+
+resource "aws_iam_role_policy_attachment" "reporting_batch_writer_kms_attachment" {
+  count      = var.enable_buffered_writes ? 1 : 0
+  role       = aws_iam_role.reporting_batch_writer_role[0].name
+  policy_arn = aws_iam_policy.kms_policy["enabled"].arn
+}
+
+resource "aws_iam_role_policy_attachment" "reporting_batch_writer_vpc_attachment" {
+  count      = var.enable_buffered_writes && length(var.vpc_subnet_ids) > 0 ? 1 : 0
+  role       = aws_iam_role.reporting_batch_writer_role[0].name
+  policy_arn = aws_iam_policy.vpc_policy[0].arn
+}
+
+# save_reporting_data sends records to the queue
+resource "aws_iam_policy" "save_reporting_data_queue_policy" {
+  count = var.enable_buffered_writes ? 1 : 0
+  name  = "${var.name_prefix}-save-reporting-data-queue-policy-${random_string.suffix.result}"
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect = "Allow"
+        Action = [
+          "sqs:SendMessage"
+        ]
+        Resource = aws_sqs_queue.reporting_records_queue[0].arn
+      }
+    ]
+  })
+
+  tags = var.tags
+}
+
+resource "aws_iam_role_policy_attachment" "save_reporting_data_queue_attachment" {
+  count      = var.enable_buffered_writes ? 1 : 0
+  role       = aws_iam_role.save_reporting_data_role.name
+  policy_arn = aws_iam_policy.save_reporting_data_queue_policy[0].arn
+}
+
+# CloudWatch Log Group
+resource "aws_cloudwatch_log_group" "reporting_batch_writer_logs" {
+  count             = var.enable_buffered_writes ? 1 : 0
+  name              = "/aws/lambda/${aws_lambda_function.reporting_batch_writer[0].function_name}"
+  retention_in_days = var.log_retention_days
+  kms_key_id        = var.encryption_key_arn
+
+  tags = var.tags
+}
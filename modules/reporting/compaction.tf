@@ -0,0 +1,178 @@
+# Copyright Amazon.com, Inc. or its affiliates. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Scheduled compaction of the per-document Parquet files written by save_reporting_data.
+# Each run merges the date partitions of the last compaction_lookback_days days into
+# files sorted by document_id; compacted files stay in the partition locations of the
+# Glue tables, so no catalog changes are needed.
+
+resource "aws_lambda_function" "reporting_compaction" {
+  count         = var.enable_compaction ? 1 : 0
+  function_name = "${var.name_prefix}-reporting-compaction-${random_string.suffix.result}"
+
+  filename         = data.archive_file.reporting_compaction_code[0].output_path
+  source_code_hash = data.archive_file.reporting_compaction_code[0].output_base64sha256
+
+  layers = [var.idp_common_layer_arn]
+
+  handler     = "index.handler"
+  runtime     = "python3.12"
+  timeout     = 900
+  memory_size = 3008
+  role        = aws_iam_role.reporting_compaction_role[0].arn
+  description = "Lambda function that compacts reporting Parquet files into per-partition files sorted by document_id"
+
+  kms_key_arn = var.encryption_key_arn
+
+  environment {
+    variables = {
+      LOG_LEVEL                       = var.log_level
+      REPORTING_BUCKET                = local.reporting_bucket_name
+      COMPACTION_LOOKBACK_DAYS        = tostring(var.compaction_lookback_days)
+      COMPACTION_MIN_FILE_AGE_SECONDS = "3600"
+    }
+  }
+
+  dynamic "vpc_config" {
+    for_each = length(var.vpc_subnet_ids) > 0 ? [local.vpc_config] : []
+    content {
+      subnet_ids         = vpc_config.value.subnet_ids
+      security_group_ids = vpc_config.value.security_group_ids
+    }
+  }
+
+  tracing_config {
+    mode = var.lambda_tracing_mode
+  }
+
+  tags = var.tags
+}
+
+# Source code archive
+data "archive_file" "reporting_compaction_code" {
+  count       = var.enable_compaction ? 1 : 0
+  type        = "zip"
+  source_dir  = "${path.module}/../../sources/src/lambda/reporting_compaction"
+  output_path = "${local.module_build_dir}/reporting-compaction.zip"
+
+  depends_on = [null_resource.create_module_build_dir]
+}
+
+# IAM role for reporting compaction function
+resource "aws_iam_role" "reporting_compaction_role" {
+  count = var.enable_compaction ? 1 : 0
+  name  = "${var.name_prefix}-reporting-compaction-role-${random_string.suffix.result}"
+
+  assume_role_policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Action = "sts:AssumeRole"
+        Effect = "Allow"
+        Principal = {
+          Service = "lambda.amazonaws.com"
+        }
+      }
+    ]
+  })
+
+  tags = var.tags
+}
+
+# IAM policy for reporting compaction function
+resource "aws_iam_policy" "reporting_compaction_policy" {
+  count = var.enable_compaction ? 1 : 0
+  name  = "${var.name_prefix}-reporting-compaction-policy-${random_string.suffix.result}"
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect = "Allow"
+        Action = [
+          "logs:CreateLogGroup",
+          "logs:CreateLogStream",
+          "logs:PutLogEvents"
+        ]
+        Resource = "arn:${data.aws_partition.current.partition}:logs:*:*:*"
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "s3:ListBucket"
+        ]
+        Resource = var.reporting_bucket_arn
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "s3:GetObject",
+          "s3:PutObject",
+          "s3:DeleteObject"
+        ]
+        Resource = [
+          "${var.reporting_bucket_arn}/metering/*",
+          "${var.reporting_bucket_arn}/evaluation_metrics/*",
+          "${var.reporting_bucket_arn}/document_sections/*",
+          "${var.reporting_bucket_arn}/_compaction/*"
+        ]
+      }
+    ]
+  })
+
+  tags = var.tags
+}
+
+resource "aws_iam_role_policy_attachment" "reporting_compaction_policy_attachment" {
+  count      = var.enable_compaction ? 1 : 0
+  role       = aws_iam_role.reporting_compaction_role[0].name
+  policy_arn = aws_iam_policy.reporting_compaction_policy[0].arn
+}
+
+resource "aws_iam_role_policy_attachment" "reporting_compaction_kms_attachment" {
+  count      = var.enable_compaction ? 1 : 0
+  role       = aws_iam_role.reporting_compaction_role[0].name
+  policy_arn = aws_iam_policy.kms_policy["enabled"].arn
+}
+
+resource "aws_iam_role_policy_attachment" "reporting_compaction_vpc_attachment" {
+  count      = var.enable_compaction && length(var.vpc_subnet_ids) > 0 ? 1 : 0
+  role       = aws_iam_role.reporting_compaction_role[0].name
+  policy_arn = aws_iam_policy.vpc_policy[0].arn
+}
+
+# CloudWatch Log Group
+resource "aws_cloudwatch_log_group" "reporting_compaction_logs" {
+  count             = var.enable_compaction ? 1 : 0
+  name              = "/aws/lambda/${aws_lambda_function.reporting_compaction[0].function_name}"
+  retention_in_days = var.log_retention_days
+  kms_key_id        = var.encryption_key_arn
+
+  tags = var.tags
+}
+
+# EventBridge schedule for the compaction function
+resource "aws_cloudwatch_event_rule" "reporting_compaction_schedule" {
+  count               = var.enable_compaction ? 1 : 0
+  name                = "${var.name_prefix}-reporting-compaction-${random_string.suffix.result}"
+  description         = "Schedule for compacting reporting Parquet files"
+  schedule_expression = var.compaction_schedule_expression
+
+  tags = var.tags
+}
+
+resource "aws_cloudwatch_event_target" "reporting_compaction_target" {
+  count     = var.enable_compaction ? 1 : 0
+  rule      = aws_cloudwatch_event_rule.reporting_compaction_schedule[0].name
+  target_id = "SendToReportingCompactionFunction"
+  arn       = aws_lambda_function.reporting_compaction[0].arn
+}
+
+resource "aws_lambda_permission" "allow_eventbridge_to_invoke_reporting_compaction" {
+  count         = var.enable_compaction ? 1 : 0
+  statement_id  = "AllowExecutionFromEventBridge"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.reporting_compaction[0].function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.reporting_compaction_schedule[0].arn
+}
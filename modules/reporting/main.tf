@@ -682,14 +682,20 @@ resource "aws_lambda_function" "save_reporting_data" {
   kms_key_arn = var.encryption_key_arn
 
   environment {
-    variables = {
-      LOG_LEVEL                = var.log_level
-      METRIC_NAMESPACE         = var.metric_namespace
-      STACK_NAME               = var.name_prefix
-      REPORTING_BUCKET         = local.reporting_bucket_name
-      OUTPUT_BUCKET            = var.output_bucket_name
-      CONFIGURATION_TABLE_NAME = var.configuration_table_name
-    }
+    variables = merge(
+      {
+        LOG_LEVEL                = var.log_level
+        METRIC_NAMESPACE         = var.metric_namespace
+        STACK_NAME               = var.name_prefix
+        REPORTING_BUCKET         = local.reporting_bucket_name
+        OUTPUT_BUCKET            = var.output_bucket_name
+        CONFIGURATION_TABLE_NAME = var.configuration_table_name
+        SCHEMA_REGISTRY_TABLE    = aws_dynamodb_table.reporting_schema_registry.name
+      },
+      var.enable_buffered_writes ? {
+        REPORTING_QUEUE_URL = aws_sqs_queue.reporting_records_queue[0].url
+      } : {}
+    )
   }
 
   dynamic "vpc_config" {
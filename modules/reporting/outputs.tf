@@ -40,3 +40,18 @@ output "document_sections_crawler_arn" {
   description = "ARN of the document sections Glue crawler"
   value       = aws_glue_crawler.document_sections_crawler.arn
 }
+
+output "reporting_compaction_function_name" {
+  description = "Name of the reporting compaction Lambda function"
+  value       = var.enable_compaction ? aws_lambda_function.reporting_compaction[0].function_name : null
+}
+
+output "reporting_records_queue_url" {
+  description = "URL of the queue buffering reporting records (null when buffered writes are disabled)"
+  value       = var.enable_buffered_writes ? aws_sqs_queue.reporting_records_queue[0].url : null
+}
+
+output "schema_registry_table_name" {
+  description = "Name of the DynamoDB table caching the columns of the reporting Glue tables"
+  value       = aws_dynamodb_table.reporting_schema_registry.name
+}
@@ -0,0 +1,66 @@
+# Copyright Amazon.com, Inc. or its affiliates. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+
+# Registry of the columns known to be in the reporting Glue tables. The reporting
+# functions consult it before calling Glue, so Glue is only called when a document
+# brings new columns. Items expire after a day so changes made to the tables outside
+# the reporting functions are picked up.
+
+resource "aws_dynamodb_table" "reporting_schema_registry" {
+  name         = "${var.name_prefix}-reporting-schema-registry-${random_string.suffix.result}"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "TableKey"
+
+  attribute {
+    name = "TableKey"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "ExpiresAt"
+    enabled        = true
+  }
+
+  point_in_time_recovery {
+    enabled = true
+  }
+
+  server_side_encryption {
+    enabled     = true
+    kms_key_arn = var.encryption_key_arn
+  }
+
+  tags = var.tags
+}
+
+resource "aws_iam_policy" "reporting_schema_registry_policy" {
+  name        = "${var.name_prefix}-reporting-schema-registry-policy-${random_string.suffix.result}"
+  description = "Access to the reporting schema registry table"
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect = "Allow"
+        Action = [
+          "dynamodb:GetItem",
+          "dynamodb:PutItem"
+        ]
+        Resource = aws_dynamodb_table.reporting_schema_registry.arn
+      }
+    ]
+  })
+
+  tags = var.tags
+}
+
+resource "aws_iam_role_policy_attachment" "save_reporting_data_schema_registry_attachment" {
+  role       = aws_iam_role.save_reporting_data_role.name
+  policy_arn = aws_iam_policy.reporting_schema_registry_policy.arn
+}
+
+resource "aws_iam_role_policy_attachment" "reporting_batch_writer_schema_registry_attachment" {
+  count      = var.enable_buffered_writes ? 1 : 0
+  role       = aws_iam_role.reporting_batch_writer_role[0].name
+  policy_arn = aws_iam_policy.reporting_schema_registry_policy.arn
+}
@@ -125,3 +125,49 @@ variable "enable_partition_projection" {
   type        = bool
   default     = true
 }
+
+variable "enable_compaction" {
+  description = "Enable the scheduled compaction of per-document reporting Parquet files"
+  type        = bool
+  default     = true
+}
+
+variable "compaction_schedule_expression" {
+  description = "EventBridge schedule expression for reporting compaction"
+  type        = string
+  default     = "cron(0 3 * * ? *)"
+}
+
+variable "compaction_lookback_days" {
+  description = "Number of past date partitions (excluding today) compacted by each run"
+  type        = number
+  default     = 7
+}
+
+variable "enable_buffered_writes" {
+  description = "Send reporting records to an SQS queue and write them in batches instead of one Parquet file per document"
+  type        = bool
+  default     = false
+}
+
+variable "buffered_write_batch_size" {
+  description = "Maximum number of queued documents written together by the reporting batch writer"
+  type        = number
+  default     = 1000
+
+  validation {
+    condition     = var.buffered_write_batch_size >= 1 && var.buffered_write_batch_size <= 10000
+    error_message = "buffered_write_batch_size must be between 1 and 10000."
+  }
+}
+
+variable "buffered_write_batching_window_seconds" {
+  description = "Maximum time in seconds queued reporting records wait before they are written"
+  type        = number
+  default     = 300
+
+  validation {
+    condition     = var.buffered_write_batching_window_seconds >= 1 && var.buffered_write_batching_window_seconds <= 300
+    error_message = "buffered_write_batching_window_seconds must be between 1 and 300."
+  }
+}
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Benchmark adaptive binarization on synthetic 300-DPI pages.
+
+Compares idp_common.image.apply_adaptive_binarization with the previous
+per-pixel implementation (getdata / Python loop / putdata) and checks that
+both produce byte-identical JPEG output.
+
+Usage:
+    python benchmarks/benchmark_binarization.py --pages 3 --dpi 300
+"""
+
+import argparse
+import io
+import random
+import statistics
+import time
+
+from idp_common.image import apply_adaptive_binarization
+from PIL import Image, ImageDraw, ImageFilter
+
+LETTER_INCHES = (8.5, 11)
+
+
+def legacy_binarization(image_data: bytes, block_size: int = 15, c: int = 10) -> bytes:
+    """Previous implementation: threshold every pixel in a Python loop."""
+    pil_image = Image.open(io.BytesIO(image_data))
+    if pil_image.mode != "L":
+        pil_image = pil_image.convert("L")
+    blurred = pil_image.filter(ImageFilter.BoxBlur(block_size // 2))
+    binary_pixels = [
+        255 if orig > blur - c else 0
+        for orig, blur in zip(pil_image.getdata(), blurred.getdata())
+    ]
+    binary_image = Image.new("L", pil_image.size)
+    binary_image.putdata(binary_pixels)
+    output = io.BytesIO()
+    binary_image.save(output, format="JPEG")
+    return output.getvalue()
+
+
+def synthetic_page(dpi: int, seed: int) -> bytes:
+    """Render a letter-size page with uneven lighting and lines of 'text'."""
+    rng = random.Random(seed)
+    width, height = int(LETTER_INCHES[0] * dpi), int(LETTER_INCHES[1] * dpi)
+
+    # Horizontal/vertical lighting gradient built at low resolution then upscaled
+    gradient = (
+        Image.linear_gradient("L").resize((width, height)).point(lambda v: 150 + v // 3)
+    )
+    page = Image.merge("RGB", (gradient, gradient, gradient))
+    draw = ImageDraw.Draw(page)
+    line_height = max(8, dpi // 8)
+    for y in range(line_height * 2, height - line_height * 2, line_height):
+        x = dpi // 2
+        while x < width - dpi // 2:
+            word = rng.randint(dpi // 10, dpi // 3)
+            shade = rng.randint(0, 80)
+            draw.rectangle(
+                (x, y, min(x + word, width), y + line_height // 2),
+                fill=(shade, shade, shade),
+            )
+            x += word + dpi // 20
+
+    output = io.BytesIO()
+    page.save(output, format="JPEG", quality=90)
+    return output.getvalue()
+
+
+def time_call(func, image_data: bytes, repeat: int) -> list:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(image_data)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=3, help="Synthetic pages")
+    parser.add_argument("--dpi", type=int, default=300, help="Page resolution")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per page")
+    args = parser.parse_args()
+
+    legacy_times, current_times = [], []
+    for page_number in range(args.pages):
+        image_data = synthetic_page(args.dpi, seed=page_number)
+        if legacy_binarization(image_data) != apply_adaptive_binarization(image_data):
+            raise SystemExit(f"Output mismatch on page {page_number + 1}")
+        legacy_times.extend(time_call(legacy_binarization, image_data, args.repeat))
+        current_times.extend(
+            time_call(apply_adaptive_binarization, image_data, args.repeat)
+        )
+
+    width, height = int(LETTER_INCHES[0] * args.dpi), int(LETTER_INCHES[1] * args.dpi)
+    print(f"Pages: {args.pages} x {width}x{height} ({args.dpi} DPI), output identical")
+    for label, timings in (("legacy", legacy_times), ("current", current_times)):
+        print(
+            f"{label:>8}: median {statistics.median(timings) * 1000:8.1f} ms/page, "
+            f"min {min(timings) * 1000:8.1f} ms/page"
+        )
+    print(
+        f" speedup: {statistics.median(legacy_times) / statistics.median(current_times):.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
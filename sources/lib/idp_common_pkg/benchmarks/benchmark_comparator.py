@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Benchmark fuzzy list matching on synthetic invoice line items.
+
+Compares idp_common.evaluation.comparator.compare_hungarian with the previous
+implementation (full list-of-lists Levenshtein matrix per pair, per-pair
+normalization and Munkres) and checks that both report the same result.
+
+Usage:
+    python benchmarks/benchmark_comparator.py --sizes 10 50 100 200 --repeat 3
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from idp_common.evaluation.comparator import (
+    FuzzyComparator,
+    compare_hungarian,
+    convert_to_list,
+    strip_punctuation_space,
+)
+from munkres import Munkres, make_cost_matrix
+
+PRODUCTS = [
+    "Stainless steel hex bolt M8 x 40mm",
+    "Industrial grade nitrile gloves, box of 100",
+    "Printer paper A4 80gsm, 5 reams",
+    "Professional services - consulting hours",
+    "Shipping and handling surcharge",
+    "LED panel light 600x600 40W neutral white",
+    "Annual software maintenance subscription",
+    "Hydraulic hose assembly 1/2 inch, 2 meters",
+    "Ergonomic office chair with lumbar support",
+    "Cat6 ethernet patch cable 3m blue",
+]
+
+
+def legacy_fuzz_score(s1: str, s2: str) -> float:
+    """Previous implementation: full O(n*m) DP matrix as nested lists."""
+    s1 = strip_punctuation_space(s1)
+    s2 = strip_punctuation_space(s2)
+    if s1 == s2:
+        return 1.0
+    if not s1 or not s2:
+        return 0.0
+    len_s1, len_s2 = len(s1), len(s2)
+    d = [[0 for _ in range(len_s2 + 1)] for _ in range(len_s1 + 1)]
+    for i in range(len_s1 + 1):
+        d[i][0] = i
+    for j in range(len_s2 + 1):
+        d[0][j] = j
+    for i in range(1, len_s1 + 1):
+        for j in range(1, len_s2 + 1):
+            cost = 0 if s1[i - 1] == s2[j - 1] else 1
+            d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1, d[i - 1][j - 1] + cost)
+    max_len = max(len_s1, len_s2)
+    return 1.0 - (d[len_s1][len_s2] / max_len if max_len > 0 else 0.0)
+
+
+def legacy_compare_hungarian(expected, actual, threshold: float = 0.8):
+    """Previous implementation: pairwise scores into a list matrix, then Munkres."""
+    expected_list = convert_to_list(expected)
+    actual_list = convert_to_list(actual)
+    matrix = [[legacy_fuzz_score(e, a) for a in actual_list] for e in expected_list]
+    cost_matrix = make_cost_matrix(matrix, lambda x: 1 - x)
+    indexes = Munkres().compute(cost_matrix)
+    matches = [(i, j, matrix[i][j]) for i, j in indexes]
+    true_positives = sum(1 for _, _, score in matches if score >= threshold)
+    false_positives = len(actual_list) - true_positives
+    avg_score = sum(score for _, _, score in matches) / len(matches) if matches else 0.0
+    return true_positives, false_positives, avg_score
+
+
+def line_items(count: int, rng: random.Random):
+    """Build expected line items and a shuffled, OCR-noisy extracted copy."""
+    expected = [
+        f"{rng.choice(PRODUCTS)} - qty {rng.randint(1, 500)} @ ${rng.uniform(1, 900):.2f}"
+        for _ in range(count)
+    ]
+    actual = []
+    for item in expected:
+        chars = list(item)
+        for _ in range(rng.randint(0, 3)):
+            position = rng.randrange(len(chars))
+            chars[position] = rng.choice("abcdefghijklmnopqrstuvwxyz0123456789 ")
+        actual.append("".join(chars))
+    rng.shuffle(actual)
+    return expected, actual
+
+
+def time_call(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 100, 200])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    comparator = FuzzyComparator()
+    print(f"{'items':>6} {'legacy (s)':>12} {'current (s)':>12} {'speedup':>9}  result")
+    for size in args.sizes:
+        expected, actual = line_items(size, random.Random(args.seed + size))
+
+        legacy_result = legacy_compare_hungarian(expected, actual)
+        current_result = compare_hungarian(expected, actual, comparator)
+        assert legacy_result[:2] == current_result[:2], (legacy_result, current_result)
+        assert abs(legacy_result[2] - current_result[2]) < 1e-9
+
+        legacy = time_call(
+            lambda: legacy_compare_hungarian(expected, actual), args.repeat
+        )
+        current = time_call(
+            lambda: compare_hungarian(expected, actual, comparator), args.repeat
+        )
+        print(
+            f"{size:>6} {legacy:>12.3f} {current:>12.3f} {legacy / current:>8.1f}x"
+            f"  tp={current_result[0]} fp={current_result[1]} score={current_result[2]:.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
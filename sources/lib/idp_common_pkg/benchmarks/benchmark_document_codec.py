@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Benchmark document state codecs on synthetic documents.
+
+Encodes a synthetic Document (one section per five pages, OCR tables and
+forms on every page) with each codec of idp_common.document_codec and reports
+the payload size, the time to serialize (to_dict + encode) and the time to
+parse (decode + Document.from_dict), and checks that every codec restores the
+same document.
+
+Usage:
+    python benchmarks/benchmark_document_codec.py --pages 10 100 1000 --repeat 5
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from idp_common.document_codec import JSON_CODEC, MSGPACK_ZSTD_CODEC, get_codec
+from idp_common.models import Document, Page, Section, Status
+
+WORDS = ["invoice", "total", "amount", "due", "date", "vendor", "qty", "price"]
+
+
+def synthetic_document(num_pages: int, seed: int = 0) -> Document:
+    rng = random.Random(seed)
+    document = Document(
+        id="batch/invoice-000123.pdf",
+        input_key="batch/invoice-000123.pdf",
+        input_bucket="input-bucket",
+        output_bucket="output-bucket",
+        status=Status.EXTRACTING,
+        num_pages=num_pages,
+        metering={
+            "OCR/textract/analyze_document-Layout": {"pages": num_pages},
+            "Classification/bedrock/us.amazon.nova-pro-v1:0": {
+                "inputTokens": 1200 * num_pages,
+                "outputTokens": 40 * num_pages,
+            },
+        },
+    )
+    for i in range(1, num_pages + 1):
+        prefix = f"s3://output-bucket/{document.id}/pages/{i}"
+        document.pages[str(i)] = Page(
+            page_id=str(i),
+            image_uri=f"{prefix}/image.jpg",
+            raw_text_uri=f"{prefix}/rawText.json",
+            parsed_text_uri=f"{prefix}/result.json",
+            text_confidence_uri=f"{prefix}/textConfidence.json",
+            classification="invoice",
+            confidence=rng.random(),
+            tables=[
+                {
+                    "rows": [
+                        [rng.choice(WORDS), f"{rng.uniform(1, 500):.2f}"]
+                        for _ in range(rng.randint(2, 12))
+                    ]
+                }
+            ],
+            forms={
+                f"{rng.choice(WORDS)}_{j}": f"{rng.uniform(1, 500):.2f}"
+                for j in range(rng.randint(2, 10))
+            },
+            image_renditions={"extraction": f"{prefix}/image_extraction.jpg"},
+        )
+    for s, start in enumerate(range(1, num_pages + 1, 5), start=1):
+        page_ids = [str(p) for p in range(start, min(start + 5, num_pages + 1))]
+        document.sections.append(
+            Section(
+                section_id=str(s),
+                classification="invoice",
+                page_ids=page_ids,
+                extraction_result_uri=f"s3://output-bucket/{document.id}/sections/{s}/result.json",
+            )
+        )
+    return document
+
+
+def median_time(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    codecs = [get_codec(JSON_CODEC)]
+    try:
+        codecs.append(get_codec(MSGPACK_ZSTD_CODEC))
+    except ImportError as e:
+        print(f"Skipping {MSGPACK_ZSTD_CODEC}: {e}")
+
+    print(
+        f"{'pages':>6} {'codec':>13} {'KB':>9} {'serialize (ms)':>15} {'parse (ms)':>11}"
+    )
+    for num_pages in args.pages:
+        document = synthetic_document(num_pages)
+        expected = document.to_dict()
+        for codec in codecs:
+            encoded = codec.encode(document.to_dict())
+            assert Document.from_dict(codec.decode(encoded)).to_dict() == expected
+
+            serialize = median_time(
+                lambda: codec.encode(document.to_dict()), args.repeat
+            )
+            parse = median_time(
+                lambda: Document.from_dict(codec.decode(encoded)), args.repeat
+            )
+            print(
+                f"{num_pages:>6} {codec.name:>13} {len(encoded) / 1024:>9.1f} "
+                f"{serialize * 1000:>15.2f} {parse * 1000:>11.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
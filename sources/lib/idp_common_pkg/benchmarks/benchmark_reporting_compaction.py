@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Benchmark reporting query latency before and after partition compaction.
+
+Local mode (default) writes one synthetic metering Parquet file per document,
+the way SaveReportingData does, compacts the partition with ParquetCompactor
+(against an in-memory S3 from moto) and times two queries with pyarrow.dataset
+on both layouts: a partition-wide cost aggregation (the analytics agent's
+typical query) and a single-document cost lookup (what the test results
+resolver does per document).
+
+Athena mode runs the same queries against a deployed reporting database and
+reports engine time and bytes scanned. With --compact-bucket the partition is
+compacted between the "before" and "after" runs:
+
+Usage:
+    python benchmarks/benchmark_reporting_compaction.py --documents 1000 5000 --repeat 3
+    python benchmarks/benchmark_reporting_compaction.py --athena \\
+        --database my-stack-reporting-db --workgroup primary --date 2025-01-31 \\
+        --document-id batch/invoice-000123.pdf --compact-bucket my-reporting-bucket
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+import boto3
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from idp_common.reporting import ParquetCompactor
+
+DATE = "2025-01-31"
+PARTITION = f"metering/date={DATE}/"
+SERVICES = [
+    ("Classification", "bedrock/us.amazon.nova-pro-v1:0", "inputTokens", 8e-7),
+    ("Classification", "bedrock/us.amazon.nova-pro-v1:0", "outputTokens", 3.2e-6),
+    ("Extraction", "bedrock/us.amazon.nova-pro-v1:0", "inputTokens", 8e-7),
+    ("Extraction", "bedrock/us.amazon.nova-pro-v1:0", "outputTokens", 3.2e-6),
+    ("OCR", "textract/analyze_document-Layout", "pages", 4e-3),
+    ("Assessment", "bedrock/us.amazon.nova-lite-v1:0", "inputTokens", 6e-8),
+]
+
+METERING_SCHEMA = pa.schema(
+    [
+        ("document_id", pa.string()),
+        ("context", pa.string()),
+        ("service_api", pa.string()),
+        ("unit", pa.string()),
+        ("value", pa.float64()),
+        ("number_of_pages", pa.int32()),
+        ("unit_cost", pa.float64()),
+        ("estimated_cost", pa.float64()),
+        ("timestamp", pa.timestamp("ms")),
+    ]
+)
+
+ATHENA_QUERIES = {
+    "aggregate": (
+        'SELECT service_api, unit, sum(estimated_cost) FROM "{database}".metering '
+        "WHERE date = '{date}' GROUP BY service_api, unit"
+    ),
+    "lookup": (
+        'SELECT context, service_api, unit, sum(value), sum(estimated_cost) FROM "{database}".metering '
+        "WHERE date = '{date}' AND document_id = '{document_id}' GROUP BY context, service_api, unit"
+    ),
+}
+
+
+def document_table(document_id: str, rng: random.Random) -> pa.Table:
+    pages = rng.randint(1, 40)
+    rows = []
+    for context, service_api, unit, unit_cost in SERVICES:
+        value = float(pages if unit == "pages" else rng.randint(500, 20000) * pages)
+        rows.append(
+            {
+                "document_id": document_id,
+                "context": context,
+                "service_api": service_api,
+                "unit": unit,
+                "value": value,
+                "number_of_pages": pages,
+                "unit_cost": unit_cost,
+                "estimated_cost": value * unit_cost,
+                "timestamp": None,
+            }
+        )
+    return pa.Table.from_pylist(rows, schema=METERING_SCHEMA)
+
+
+def write_partition(s3, bucket: str, directory: str, documents: int, seed: int):
+    """Write one file per document to S3 and to a local copy of the partition."""
+    rng = random.Random(seed)
+    document_ids = [f"batch-{seed}/invoice-{i:06d}.pdf" for i in range(documents)]
+    rng.shuffle(document_ids)
+    for i, document_id in enumerate(document_ids):
+        name = (
+            f"{document_id.replace('/', '_')}_20250131_120000_{i:03d}_results.parquet"
+        )
+        path = os.path.join(directory, name)
+        pq.write_table(document_table(document_id, rng), path, compression="snappy")
+        with open(path, "rb") as f:
+            s3.put_object(Bucket=bucket, Key=f"{PARTITION}{name}", Body=f.read())
+    return document_ids
+
+
+def download_partition(s3, bucket: str, directory: str) -> None:
+    response = s3.list_objects_v2(Bucket=bucket, Prefix=PARTITION)
+    for obj in response.get("Contents", []):
+        body = s3.get_object(Bucket=bucket, Key=obj["Key"])["Body"].read()
+        with open(os.path.join(directory, obj["Key"].rsplit("/", 1)[-1]), "wb") as f:
+            f.write(body)
+
+
+def aggregate_query(directory: str) -> pa.Table:
+    table = ds.dataset(directory, format="parquet").to_table(
+        columns=["service_api", "unit", "estimated_cost"]
+    )
+    return table.group_by(["service_api", "unit"]).aggregate(
+        [("estimated_cost", "sum")]
+    )
+
+
+def lookup_query(directory: str, document_id: str) -> float:
+    table = ds.dataset(directory, format="parquet").to_table(
+        columns=["estimated_cost"], filter=ds.field("document_id") == document_id
+    )
+    return pc.sum(table["estimated_cost"]).as_py()
+
+
+def directory_stats(directory: str):
+    files = os.listdir(directory)
+    size = sum(os.path.getsize(os.path.join(directory, name)) for name in files)
+    row_groups = sum(
+        pq.ParquetFile(os.path.join(directory, name)).metadata.num_row_groups
+        for name in files
+    )
+    return len(files), size, row_groups
+
+
+def time_call(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def run_local(args) -> None:
+    from moto import mock_aws
+
+    print(
+        f"{'documents':>9} {'layout':>9} {'files':>7} {'MB':>7} {'row groups':>10} "
+        f"{'aggregate (s)':>14} {'lookup (s)':>11}"
+    )
+    for documents in args.documents:
+        with mock_aws(), tempfile.TemporaryDirectory() as workdir:
+            s3 = boto3.client("s3", region_name="us-east-1")
+            s3.create_bucket(Bucket="reporting")
+            before_dir = os.path.join(workdir, "before")
+            after_dir = os.path.join(workdir, "after")
+            os.makedirs(before_dir)
+            os.makedirs(after_dir)
+            document_ids = write_partition(
+                s3, "reporting", before_dir, documents, documents
+            )
+
+            start = time.perf_counter()
+            result = ParquetCompactor(
+                "reporting", min_file_age_seconds=0, s3_client=s3
+            ).compact_partition(PARTITION)
+            compaction_time = time.perf_counter() - start
+            assert result.compacted, result
+            download_partition(s3, "reporting", after_dir)
+
+            probe = random.Random(documents).choice(document_ids)
+            before_total = aggregate_query(before_dir).sort_by("service_api")
+            after_total = aggregate_query(after_dir).sort_by("service_api")
+            assert before_total.equals(after_total)
+            assert lookup_query(before_dir, probe) == lookup_query(after_dir, probe)
+
+            for layout, directory in [("before", before_dir), ("after", after_dir)]:
+                files, size, row_groups = directory_stats(directory)
+                aggregate = time_call(lambda: aggregate_query(directory), args.repeat)
+                lookup = time_call(lambda: lookup_query(directory, probe), args.repeat)
+                print(
+                    f"{documents:>9} {layout:>9} {files:>7} {size / 1e6:>7.2f} {row_groups:>10} "
+                    f"{aggregate:>14.3f} {lookup:>11.3f}"
+                )
+            print(f"{'':>9} compacted in {compaction_time:.2f}s")
+
+
+def run_athena_query(athena, sql: str, args):
+    """Run a query to completion and return its engine time (ms) and bytes scanned."""
+    request = {"QueryString": sql, "WorkGroup": args.workgroup}
+    if args.output_location:
+        request["ResultConfiguration"] = {"OutputLocation": args.output_location}
+    query_id = athena.start_query_execution(**request)["QueryExecutionId"]
+    while True:
+        execution = athena.get_query_execution(QueryExecutionId=query_id)[
+            "QueryExecution"
+        ]
+        state = execution["Status"]["State"]
+        if state in ("SUCCEEDED", "FAILED", "CANCELLED"):
+            break
+        time.sleep(0.5)
+    if state != "SUCCEEDED":
+        raise RuntimeError(
+            f"Query {query_id} {state}: {execution['Status'].get('StateChangeReason')}"
+        )
+    statistics_ = execution["Statistics"]
+    return statistics_["EngineExecutionTimeInMillis"], statistics_["DataScannedInBytes"]
+
+
+def run_athena(args) -> None:
+    athena = boto3.client("athena")
+    document_id = args.document_id
+
+    def measure(layout: str) -> None:
+        for name, template in ATHENA_QUERIES.items():
+            sql = template.format(
+                database=args.database, date=args.date, document_id=document_id
+            )
+            runs = [run_athena_query(athena, sql, args) for _ in range(args.repeat)]
+            engine_ms = statistics.median(run[0] for run in runs)
+            print(
+                f"{layout:>7} {name:>10} {engine_ms:>10.0f} ms {runs[0][1] / 1e6:>10.2f} MB scanned"
+            )
+
+    measure("before")
+    if args.compact_bucket:
+        ParquetCompactor(args.compact_bucket, min_file_age_seconds=0).compact_partition(
+            f"metering/date={args.date}/"
+        )
+        measure("after")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--documents", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--athena", action="store_true", help="Query a deployed reporting database"
+    )
+    parser.add_argument("--database", help="Glue reporting database (Athena mode)")
+    parser.add_argument("--workgroup", default="primary", help="Athena workgroup")
+    parser.add_argument(
+        "--output-location", help="Athena query result location (s3://...)"
+    )
+    parser.add_argument("--date", default=DATE, help="Partition date (Athena mode)")
+    parser.add_argument(
+        "--document-id", help="Document for the lookup query (Athena mode)"
+    )
+    parser.add_argument(
+        "--compact-bucket", help="Reporting bucket to compact between runs"
+    )
+    args = parser.parse_args()
+
+    if args.athena:
+        if not args.database or not args.document_id:
+            parser.error("--database and --document-id are required with --athena")
+        run_athena(args)
+    else:
+        run_local(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -37,6 +37,8 @@ def get_analytics_config() -> Dict[str, Any]:
         "max_polling_attempts", 30
     )  # 2 seconds per attempt, Athena queries can take a while
     config.setdefault("query_timeout_seconds", 300)  # 5 minutes
+    # Successful query results are reused for identical queries within this time
+    config.setdefault("query_result_cache_ttl_seconds", 300)
 
     # Configure logging based on the configuration
     configure_logging(
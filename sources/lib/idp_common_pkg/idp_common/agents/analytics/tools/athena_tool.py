@@ -3,11 +3,22 @@
 
 """
 Athena Query Tool for executing SQL queries using Strands framework.
+
+Agents often run the same SQL several times in one conversation, so successful
+results are cached in process, keyed by a fingerprint of the normalized query
+and the Athena settings, for query_result_cache_ttl_seconds (default 300).
+Queries that miss the in-process cache ask Athena to reuse the results of an
+identical SELECT query run within the same time (ResultReuseConfiguration).
 """
 
+import hashlib
 import logging
+import re
+import threading
 import time
-from typing import Any, Dict
+from collections import OrderedDict
+from copy import deepcopy
+from typing import Any, Dict, Iterator, Optional, Tuple
 
 import boto3
 from strands import tool
@@ -17,80 +28,274 @@ logger = logging.getLogger(__name__)
 # Maximum number of rows that can be returned directly when return_full_query_results=True
 MAX_ROWS_TO_RETURN_DIRECTLY = 100
 
+# Polling delays: sub-second at first, backing off to the previous fixed 2 seconds
+INITIAL_POLL_DELAY_SECONDS = 0.2
+MAX_POLL_DELAY_SECONDS = 2.0
+POLL_BACKOFF_FACTOR = 1.5
 
-@tool
-def run_athena_query(
-    query: str, config: Dict[str, Any], return_full_query_results: bool = False
-) -> Dict[str, Any]:
+DEFAULT_CACHE_TTL_SECONDS = 300
+DEFAULT_CACHE_SIZE = 64
+
+# Athena reuses the results of SELECT queries only
+REUSABLE_QUERY_PATTERN = re.compile(r"\s*(\(\s*)*(SELECT|WITH)\b", re.IGNORECASE)
+
+
+class QueryResultCache:
+    """LRU cache of successful query results with a time to live."""
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, fingerprint: str, ttl_seconds: float) -> Optional[Dict[str, Any]]:
+        """Get a copy of the cached result, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is None:
+                return None
+            stored_at, result = entry
+            if time.monotonic() - stored_at >= ttl_seconds:
+                del self._entries[fingerprint]
+                return None
+            self._entries.move_to_end(fingerprint)
+            return deepcopy(result)
+
+    def put(self, fingerprint: str, result: Dict[str, Any]) -> None:
+        """Store a copy of a result, evicting the least recently used ones."""
+        with self._lock:
+            self._entries[fingerprint] = (time.monotonic(), deepcopy(result))
+            self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached results."""
+        with self._lock:
+            self._entries.clear()
+
+
+# Query results kept across agent turns in the same process
+_query_cache = QueryResultCache()
+
+
+def query_fingerprint(query: str, config: Dict[str, Any]) -> str:
     """
-    Execute a SQL query on Amazon Athena.
+    Fingerprint of a query and the Athena settings it runs with.
 
-    Uses boto3 to execute the query on Athena. Query results are stored in s3.
-    Successful execution will return a dict with result_column_metadata,
-        result_csv_s3_uri, number of rows_returned, and original_query.
+    Whitespace and a trailing semicolon do not change the fingerprint.
 
     Args:
-        query: SQL query string to execute
+        query: SQL query string
         config: Configuration dictionary containing Athena settings
-        return_full_query_results: If True, includes the full query results as CSV string in the response.
-            WARNING: This can return very large strings and should only be used for small exploratory
-            queries like DESCRIBE, SHOW TABLES, or queries with LIMIT clauses. Default is False.
 
     Returns:
-        Dict containing either s3 URI pointer to query results or error information
-        Query results for a successful query include:
-            result_column_metadata (information about the columns in the result)
-            result_csv_s3_uri (s3 location where results are stored as a csv)
-            rows_returned (number of rows returned by the query)
-            original_query (the original query the user entered, for posterity)
-            full_results (optional, only if return_full_query_results=True): CSV string of query results
+        Hex digest identifying the query
+    """
+    normalized = " ".join(query.split()).rstrip(";").strip()
+    key = "\n".join(
+        [
+            str(config.get("aws_region")),
+            config["athena_database"],
+            config["athena_output_location"],
+            normalized,
+        ]
+    )
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def wait_for_query(
+    athena_client, query_execution_id: str, timeout_seconds: float
+) -> Tuple[Dict[str, Any], str, int]:
+    """
+    Poll a query until it reaches a final state or the timeout passes.
+
+    Polls sub-second at first and backs off to every 2 seconds, so short
+    queries return quickly without polling long ones too often.
+
+    Args:
+        athena_client: Athena client
+        query_execution_id: ID of the query execution
+        timeout_seconds: Longest time to wait
+
+    Returns:
+        Tuple of the last get_query_execution response, the query state and
+        the number of polls
+    """
+    deadline = time.monotonic() + timeout_seconds
+    delay = INITIAL_POLL_DELAY_SECONDS
+    attempts = 0
+    while True:
+        response = athena_client.get_query_execution(
+            QueryExecutionId=query_execution_id
+        )
+        attempts += 1
+        state = response["QueryExecution"]["Status"]["State"]
+        if state in ("SUCCEEDED", "FAILED", "CANCELLED"):
+            return response, state, attempts
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return response, state, attempts
+        logger.debug(
+            f"Query state: {state}, sleeping for {delay:.1f} seconds (attempt {attempts})"
+        )
+        time.sleep(  # semgrep-ignore: arbitrary-sleep - Intentional delay. Duration is bounded and not user-controlled.
+            min(delay, remaining)
+        )
+        delay = min(delay * POLL_BACKOFF_FACTOR, MAX_POLL_DELAY_SECONDS)
+
+
+def iter_query_result_pages(
+    athena_client, query_execution_id: str, page_size: int = 1000
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the result pages of a query, for callers that need every row.
+
+    Args:
+        athena_client: Athena client
+        query_execution_id: ID of a succeeded query execution
+        page_size: Rows per get_query_results call (at most 1000)
+
+    Yields:
+        ResultSet of each page; only the first includes the header row of
+        SELECT queries
+    """
+    paginator = athena_client.get_paginator("get_query_results")
+    for page in paginator.paginate(
+        QueryExecutionId=query_execution_id,
+        PaginationConfig={"PageSize": page_size},
+    ):
+        yield page["ResultSet"]
+
+
+def count_result_rows(
+    athena_client, query_execution_id: str, first_page: Dict[str, Any]
+) -> int:
+    """
+    Count the rows of a query result without reading every result page.
+
+    Use iter_query_result_pages() to read the rows themselves.
+
+    A result that fits in its first get_query_results page is counted from
+    that page. Larger results are counted from the query's runtime statistics
+    (Rows.OutputRows) in a single call, plus the header row included in the
+    first page. If the statistics are unavailable, the rows of the first page
+    are returned.
+
+    Args:
+        athena_client: Athena client
+        query_execution_id: ID of a succeeded query execution
+        first_page: Response of the first get_query_results call
+
+    Returns:
+        Number of result rows, including the header row of SELECT queries
+    """
+    result_set = first_page["ResultSet"]
+    page_rows = len(result_set["Rows"])
+    if not first_page.get("NextToken"):
+        return page_rows
+    try:
+        statistics = athena_client.get_query_runtime_statistics(
+            QueryExecutionId=query_execution_id
+        )
+        output_rows = statistics["QueryRuntimeStatistics"]["Rows"]["OutputRows"]
+    except Exception as e:
+        logger.warning(
+            f"Could not get runtime statistics of query {query_execution_id}, "
+            f"counting the first result page only: {e}"
+        )
+        return page_rows
+    return output_rows + (1 if _has_header_row(result_set) else 0)
+
+
+def _has_header_row(result_set: Dict[str, Any]) -> bool:
+    """Whether the first row of a result page repeats the column names."""
+    rows = result_set["Rows"]
+    columns = result_set["ResultSetMetadata"]["ColumnInfo"]
+    if not rows or not columns:
+        return False
+    values = [datum.get("VarCharValue") for datum in rows[0].get("Data", [])]
+    return values == [column["Name"] for column in columns]
+
+
+def execute_athena_query(
+    query: str, config: Dict[str, Any], return_full_query_results: bool = False
+) -> Dict[str, Any]:
+    """
+    Execute a SQL query on Amazon Athena, reusing recent results of the same query.
+
+    See run_athena_query for the arguments and the returned dict. Results
+    served from the in-process cache include "cached": True.
     """
     try:
+        ttl_seconds = config.get(
+            "query_result_cache_ttl_seconds", DEFAULT_CACHE_TTL_SECONDS
+        )
+        fingerprint = query_fingerprint(query, config)
+        if ttl_seconds > 0:
+            cached = _query_cache.get(fingerprint, ttl_seconds)
+            if cached is not None:
+                logger.info(f"Using cached results for Athena query: {query}")
+                cached["query"] = query
+                cached["cached"] = True
+                if not return_full_query_results:
+                    cached.pop("full_results", None)
+                if return_full_query_results and "full_results" not in cached:
+                    cached = _add_full_results(cached, config)
+                    if cached.get("success"):
+                        _query_cache.put(fingerprint, _cacheable(cached))
+                return cached
+
         # Create Athena client
         athena_client = boto3.client("athena", region_name=config.get("aws_region"))
 
         # Start query execution
         logger.info(f"Executing Athena query: {query}")
-        response = athena_client.start_query_execution(
-            QueryString=query,
-            QueryExecutionContext={"Database": config["athena_database"]},
-            ResultConfiguration={"OutputLocation": config["athena_output_location"]},
-        )
+        request = {
+            "QueryString": query,
+            "QueryExecutionContext": {"Database": config["athena_database"]},
+            "ResultConfiguration": {"OutputLocation": config["athena_output_location"]},
+        }
+        if ttl_seconds > 0 and REUSABLE_QUERY_PATTERN.match(query):
+            # Let Athena reuse results of an identical query within the cache TTL
+            request["ResultReuseConfiguration"] = {
+                "ResultReuseByAgeConfiguration": {
+                    "Enabled": True,
+                    "MaxAgeInMinutes": max(1, int(ttl_seconds // 60)),
+                }
+            }
+        response = athena_client.start_query_execution(**request)
 
         query_execution_id = response["QueryExecutionId"]
         logger.info(f"Query execution ID: {query_execution_id}")
 
-        # Wait for query to complete by polling its status
-        max_polling_attempts = config.get("max_polling_attempts", 20)
-        attempts = 0
-        state = "RUNNING"  # Initialize state
-
-        while attempts < max_polling_attempts:
-            response = athena_client.get_query_execution(
-                QueryExecutionId=query_execution_id
-            )
-            state = response["QueryExecution"]["Status"]["State"]
-            if state == "SUCCEEDED":
-                logger.info("Query succeeded!")
-                query_output_s3_uri = response["QueryExecution"]["ResultConfiguration"][
-                    "OutputLocation"
-                ]
-                break
-            elif state in ["FAILED", "CANCELLED"]:
-                logger.error(f"Query {state.lower()}.")
-                break
-            else:
-                logger.debug(
-                    f"Query state: {state}, sleeping for 2 seconds (attempt {attempts + 1}/{max_polling_attempts})"
-                )
-                time.sleep(  # semgrep-ignore: arbitrary-sleep - Intentional delay. Duration is hardcoded and not user-controlled.
-                    2
-                )  # semgrep-ignore: arbitrary-sleep - Intentional delay. Duration is hardcoded and not user-controlled.
-                attempts += 1
+        # Wait for query to complete; max_polling_attempts keeps its meaning of
+        # 2 seconds per attempt, bounded by query_timeout_seconds
+        timeout_seconds = config.get("max_polling_attempts", 20) * 2
+        if "query_timeout_seconds" in config:
+            timeout_seconds = min(timeout_seconds, config["query_timeout_seconds"])
+        response, state, attempts = wait_for_query(
+            athena_client, query_execution_id, timeout_seconds
+        )
 
         # Check final state
         if state == "SUCCEEDED":
-            # Get query results
+            logger.info(f"Query succeeded after {attempts} polling attempts")
+            query_output_s3_uri = response["QueryExecution"]["ResultConfiguration"][
+                "OutputLocation"
+            ]
+            reused = (
+                response["QueryExecution"]
+                .get("Statistics", {})
+                .get("ResultReuseInformation", {})
+                .get("ReusedPreviousResult", False)
+            )
+            if reused:
+                logger.info("Athena reused the results of a previous query")
+
+            # Get query results; one page holds the column metadata and,
+            # for results up to 1000 rows, every row
             results = athena_client.get_query_results(
                 QueryExecutionId=query_execution_id
             )
@@ -102,27 +307,9 @@ def run_athena_query(
             ]
 
             # Count the number of rows returned
-            # Note: For most queries, all rows in the ResultSet are data rows
-            # For queries with headers (like SELECT), Athena typically includes headers in the first row
-            total_rows = len(results["ResultSet"]["Rows"])
-
-            # Check if return_full_query_results is True and we have too many rows
-            if return_full_query_results and total_rows > MAX_ROWS_TO_RETURN_DIRECTLY:
-                logger.warning(
-                    f"Query returned {total_rows} rows, which exceeds the limit of {MAX_ROWS_TO_RETURN_DIRECTLY} "
-                    f"for return_full_query_results=True"
-                )
-                return {
-                    "success": False,
-                    "error": (
-                        f"More than {MAX_ROWS_TO_RETURN_DIRECTLY} rows were retrieved when the tool was called with "
-                        "`return_full_query_results` set to True. This flag should only be used for small queries "
-                        "returning a few rows. Please try again with `return_full_query_results` set to False, "
-                        "in which case the query results will be saved rather than returned directly."
-                    ),
-                    "query": query,
-                    "rows_returned": total_rows,
-                }
+            # Note: For queries with headers (like SELECT), Athena includes
+            # the headers in the first row
+            total_rows = count_result_rows(athena_client, query_execution_id, results)
 
             result_dict = {
                 "success": True,
@@ -134,55 +321,15 @@ def run_athena_query(
 
             # Optionally include full query results
             if return_full_query_results:
-                try:
-                    # Parse S3 URI to get bucket and key
-                    import re
-
-                    s3_match = re.match(r"s3://([^/]+)/(.+)", query_output_s3_uri)
-                    if s3_match:
-                        bucket_name = s3_match.group(1)
-                        object_key = s3_match.group(2)
-
-                        # Create S3 client and read the CSV file
-                        s3_client = boto3.client(
-                            "s3", region_name=config.get("aws_region")
-                        )
-                        response = s3_client.get_object(
-                            Bucket=bucket_name, Key=object_key
-                        )
-                        csv_content = response["Body"].read().decode("utf-8")
-
-                        result_dict["full_results"] = csv_content
-                        logger.info(
-                            f"Included full query results ({len(csv_content)} characters)"
-                        )
-                    else:
-                        logger.warning(f"Could not parse S3 URI: {query_output_s3_uri}")
-                        result_dict["full_results_error"] = (
-                            f"Could not parse S3 URI: {query_output_s3_uri}"
-                        )
-
-                except Exception as e:
-                    logger.error(f"Error reading full query results from S3: {e}")
-                    result_dict["full_results_error"] = (
-                        f"Error reading results from S3: {str(e)}"
-                    )
+                result_dict = _add_full_results(result_dict, config)
+                if not result_dict["success"]:
+                    return result_dict
 
+            if ttl_seconds > 0:
+                _query_cache.put(fingerprint, _cacheable(result_dict))
             return result_dict
 
-        elif state == "RUNNING":
-            # Query is still running after max polling attempts
-            logger.warning(
-                f"Query still running after {max_polling_attempts} polling attempts. Query execution ID: {query_execution_id}"
-            )
-            return {
-                "success": False,
-                "error": f"Query timed out after {max_polling_attempts} polling attempts. The query is still running in Athena and may complete later.",
-                "query": query,
-                "query_execution_id": query_execution_id,
-                "state": "RUNNING",
-            }
-        else:
+        elif state in ("FAILED", "CANCELLED"):
             # Query failed
             error_message = response["QueryExecution"]["Status"].get(
                 "StateChangeReason", "Query failed with an Unknown error"
@@ -197,7 +344,109 @@ def run_athena_query(
                 "athena_error_details": error_details,
                 "query": query,
             }
+        else:
+            # Query is still queued or running after the timeout
+            logger.warning(
+                f"Query still {state.lower()} after {timeout_seconds} seconds ({attempts} polling attempts). "
+                f"Query execution ID: {query_execution_id}"
+            )
+            return {
+                "success": False,
+                "error": f"Query timed out after {timeout_seconds} seconds. The query is still running in Athena and may complete later.",
+                "query": query,
+                "query_execution_id": query_execution_id,
+                "state": state,
+            }
 
     except Exception as e:
         logger.exception("Error executing Athena query")
         return {"success": False, "error": str(e), "query": query}
+
+
+def _cacheable(result_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """Result without the fields that describe a single call."""
+    return {
+        key: value
+        for key, value in result_dict.items()
+        if key not in ("cached", "full_results_error")
+    }
+
+
+def _add_full_results(
+    result_dict: Dict[str, Any], config: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Add the CSV results to a successful result, or return an error if too large."""
+    total_rows = result_dict["rows_returned"]
+    if total_rows > MAX_ROWS_TO_RETURN_DIRECTLY:
+        logger.warning(
+            f"Query returned {total_rows} rows, which exceeds the limit of {MAX_ROWS_TO_RETURN_DIRECTLY} "
+            f"for return_full_query_results=True"
+        )
+        return {
+            "success": False,
+            "error": (
+                f"More than {MAX_ROWS_TO_RETURN_DIRECTLY} rows were retrieved when the tool was called with "
+                "`return_full_query_results` set to True. This flag should only be used for small queries "
+                "returning a few rows. Please try again with `return_full_query_results` set to False, "
+                "in which case the query results will be saved rather than returned directly."
+            ),
+            "query": result_dict["query"],
+            "rows_returned": total_rows,
+        }
+
+    query_output_s3_uri = result_dict["result_csv_s3_uri"]
+    try:
+        # Parse S3 URI to get bucket and key
+        s3_match = re.match(r"s3://([^/]+)/(.+)", query_output_s3_uri)
+        if s3_match:
+            bucket_name = s3_match.group(1)
+            object_key = s3_match.group(2)
+
+            # Create S3 client and read the CSV file
+            s3_client = boto3.client("s3", region_name=config.get("aws_region"))
+            response = s3_client.get_object(Bucket=bucket_name, Key=object_key)
+            csv_content = response["Body"].read().decode("utf-8")
+
+            result_dict["full_results"] = csv_content
+            logger.info(f"Included full query results ({len(csv_content)} characters)")
+        else:
+            logger.warning(f"Could not parse S3 URI: {query_output_s3_uri}")
+            result_dict["full_results_error"] = (
+                f"Could not parse S3 URI: {query_output_s3_uri}"
+            )
+
+    except Exception as e:
+        logger.error(f"Error reading full query results from S3: {e}")
+        result_dict["full_results_error"] = f"Error reading results from S3: {str(e)}"
+
+    return result_dict
+
+
+@tool
+def run_athena_query(
+    query: str, config: Dict[str, Any], return_full_query_results: bool = False
+) -> Dict[str, Any]:
+    """
+    Execute a SQL query on Amazon Athena.
+
+    Uses boto3 to execute the query on Athena. Query results are stored in s3.
+    Successful execution will return a dict with result_column_metadata,
+        result_csv_s3_uri, number of rows_returned, and original_query.
+
+    Args:
+        query: SQL query string to execute
+        config: Configuration dictionary containing Athena settings
+        return_full_query_results: If True, includes the full query results as CSV string in the response.
+            WARNING: This can return very large strings and should only be used for small exploratory
+            queries like DESCRIBE, SHOW TABLES, or queries with LIMIT clauses. Default is False.
+
+    Returns:
+        Dict containing either s3 URI pointer to query results or error information
+        Query results for a successful query include:
+            result_column_metadata (information about the columns in the result)
+            result_csv_s3_uri (s3 location where results are stored as a csv)
+            rows_returned (number of rows returned by the query)
+            original_query (the original query the user entered, for posterity)
+            full_results (optional, only if return_full_query_results=True): CSV string of query results
+    """
+    return execute_athena_query(query, config, return_full_query_results)
@@ -11,13 +11,13 @@ This module provides a more scalable approach to assessment by:
 4. Adapting batch sizes based on attribute complexity
 """
 
+import asyncio
 import json
 import logging
 import os
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
-from typing import Any, Dict, Generator, List, Optional, Tuple
+from typing import Any, Dict, Generator, List, Optional, Tuple, Union
 
 from idp_common import bedrock, image, metrics, s3, utils
 from idp_common.config.models import IDPConfig
@@ -745,6 +745,7 @@ class GranularAssessmentService:
         top_k: float,
         top_p: float,
         max_tokens: Optional[int],
+        labels: Optional[Dict[str, str]] = None,
     ) -> AssessmentResult:
         """
         Process a single assessment task.
@@ -759,6 +760,7 @@ class GranularAssessmentService:
             top_k: Top-k parameter
             top_p: Top-p parameter
             max_tokens: Max tokens parameter
+            labels: Document and section IDs to label batch inference records with
 
         Returns:
             Assessment result
@@ -776,106 +778,227 @@ class GranularAssessmentService:
             )
 
             # Invoke Bedrock
-            response_with_metering = bedrock.invoke_model(
-                model_id=model_id,
-                system_prompt=system_prompt,
-                content=content,
-                temperature=temperature,
-                top_k=top_k,
-                top_p=top_p,
-                max_tokens=max_tokens,
-                context="GranularAssessment",
+            with bedrock.batch_labels(task_id=task.task_id, **(labels or {})):
+                response_with_metering = bedrock.invoke_model(
+                    model_id=model_id,
+                    system_prompt=system_prompt,
+                    content=content,
+                    temperature=temperature,
+                    top_k=top_k,
+                    top_p=top_p,
+                    max_tokens=max_tokens,
+                    context="GranularAssessment",
+                )
+
+            return self._build_assessment_result(
+                task, response_with_metering, start_time
             )
 
-            # Extract text from response
-            assessment_text = bedrock.extract_text_from_response(response_with_metering)
-            metering = response_with_metering.get("metering", {})
+        except Exception as e:
+            return self._failed_assessment_result(task, e, start_time)
 
-            # Parse response into JSON
-            assessment_data = {}
-            task_failed = False
-            error_messages = []
-            try:
-                assessment_data = json.loads(extract_json_from_text(assessment_text))
-            except Exception as e:
-                logger.error(
-                    f"Error parsing assessment LLM output for task {task.task_id}: {e}"
-                )
-                task_failed = True
-                error_messages.append(
-                    f"Error parsing assessment LLM output for task {task.task_id}"
-                )
-                # Create default assessments
-                for attr_name in task.attributes:
-                    if task.task_type == "list_item":
-                        # For list items, create assessments for each sub-attribute
-                        assessment_data = {}
-                        for (
-                            sub_attr_name,
-                            threshold,
-                        ) in task.confidence_thresholds.items():
-                            assessment_data[sub_attr_name] = {
-                                "confidence": 0.5,
-                                "confidence_reason": f"Unable to parse assessment response for {sub_attr_name} - default score assigned",
-                            }
-                    else:
-                        assessment_data[attr_name] = {
-                            "confidence": 0.5,
-                            "confidence_reason": f"Unable to parse assessment response for {attr_name} - default score assigned",
-                        }
+    async def _process_assessment_task_async(
+        self,
+        task: AssessmentTask,
+        base_content: List[Dict[str, Any]],
+        properties: Dict[str, Any],
+        model_id: str,
+        system_prompt: str,
+        temperature: float,
+        top_k: float,
+        top_p: float,
+        max_tokens: Optional[int],
+        labels: Optional[Dict[str, str]] = None,
+    ) -> AssessmentResult:
+        """
+        Awaitable variant of _process_assessment_task using bedrock.invoke_model_async.
 
-            # Process bounding boxes automatically if bbox data is present
-            try:
-                logger.debug(
-                    f"Checking for bounding box data in granular assessment task {task.task_id}"
-                )
-                assessment_data = self._extract_geometry_from_assessment(
-                    assessment_data
-                )
-            except Exception as e:
-                logger.warning(
-                    f"Failed to extract geometry data for task {task.task_id}: {str(e)}"
-                )
-                # Continue with assessment even if geometry extraction fails
+        Arguments and return value are the same as _process_assessment_task.
+
+        Returns:
+            Assessment result
+        """
+        start_time = time.time()
 
-            # Check for confidence threshold alerts
-            confidence_alerts = []
-            self._check_confidence_alerts_for_task(
-                task, assessment_data, confidence_alerts
+        try:
+            # Build the complete prompt
+            content = self._build_specific_assessment_prompt(
+                task, base_content, properties
             )
 
-            processing_time = time.time() - start_time
-            if task_failed:
-                return AssessmentResult(
-                    task_id=task.task_id,
-                    success=False,
-                    assessment_data=assessment_data,
-                    confidence_alerts=confidence_alerts,
-                    error_message=self._convert_error_list_to_string(error_messages),
-                    processing_time=processing_time,
+            logger.debug(
+                f"Processing assessment task {task.task_id} with {len(task.attributes)} attributes"
+            )
+
+            # Invoke Bedrock
+            with bedrock.batch_labels(task_id=task.task_id, **(labels or {})):
+                response_with_metering = await bedrock.invoke_model_async(
+                    model_id=model_id,
+                    system_prompt=system_prompt,
+                    content=content,
+                    temperature=temperature,
+                    top_k=top_k,
+                    top_p=top_p,
+                    max_tokens=max_tokens,
+                    context="GranularAssessment",
                 )
-            else:
-                return AssessmentResult(
-                    task_id=task.task_id,
-                    success=True,
-                    assessment_data=assessment_data,
-                    confidence_alerts=confidence_alerts,
-                    processing_time=processing_time,
-                    metering=metering,
+
+            return self._build_assessment_result(
+                task, response_with_metering, start_time
+            )
+
+        except Exception as e:
+            return self._failed_assessment_result(task, e, start_time)
+
+    async def _process_assessment_tasks_async(
+        self,
+        tasks: List[AssessmentTask],
+        base_content: List[Dict[str, Any]],
+        properties: Dict[str, Any],
+        model_id: str,
+        system_prompt: str,
+        temperature: float,
+        top_k: float,
+        top_p: float,
+        max_tokens: Optional[int],
+        labels: Optional[Dict[str, str]] = None,
+    ) -> List[Union[AssessmentResult, BaseException]]:
+        """
+        Process assessment tasks concurrently, at most max_workers tasks at a time.
+
+        Args:
+            tasks: The assessment tasks to process
+            (remaining arguments as for _process_assessment_task)
+
+        Returns:
+            Assessment result, or the exception raised, for each task in order
+        """
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def process(task: AssessmentTask) -> AssessmentResult:
+            async with semaphore:
+                return await self._process_assessment_task_async(
+                    task,
+                    base_content,
+                    properties,
+                    model_id,
+                    system_prompt,
+                    temperature,
+                    top_k,
+                    top_p,
+                    max_tokens,
+                    labels,
                 )
 
+        return await asyncio.gather(
+            *(process(task) for task in tasks), return_exceptions=True
+        )
+
+    def _build_assessment_result(
+        self,
+        task: AssessmentTask,
+        response_with_metering: Dict[str, Any],
+        start_time: float,
+    ) -> AssessmentResult:
+        """
+        Build the result of an assessment task from the model response.
+
+        Args:
+            task: The assessment task
+            response_with_metering: Bedrock response with metering data
+            start_time: Time the task started processing
+
+        Returns:
+            Assessment result
+        """
+        # Extract text from response
+        assessment_text = bedrock.extract_text_from_response(response_with_metering)
+        metering = response_with_metering.get("metering", {})
+
+        # Parse response into JSON
+        assessment_data = {}
+        task_failed = False
+        error_messages = []
+        try:
+            assessment_data = json.loads(extract_json_from_text(assessment_text))
         except Exception as e:
-            processing_time = time.time() - start_time
-            logger.error(f"Error processing assessment task {task.task_id}: {str(e)}")
+            logger.error(
+                f"Error parsing assessment LLM output for task {task.task_id}: {e}"
+            )
+            task_failed = True
+            error_messages.append(
+                f"Error parsing assessment LLM output for task {task.task_id}"
+            )
+            # Create default assessments
+            for attr_name in task.attributes:
+                if task.task_type == "list_item":
+                    # For list items, create assessments for each sub-attribute
+                    assessment_data = {}
+                    for (
+                        sub_attr_name,
+                        threshold,
+                    ) in task.confidence_thresholds.items():
+                        assessment_data[sub_attr_name] = {
+                            "confidence": 0.5,
+                            "confidence_reason": f"Unable to parse assessment response for {sub_attr_name} - default score assigned",
+                        }
+                else:
+                    assessment_data[attr_name] = {
+                        "confidence": 0.5,
+                        "confidence_reason": f"Unable to parse assessment response for {attr_name} - default score assigned",
+                    }
+
+        # Process bounding boxes automatically if bbox data is present
+        try:
+            logger.debug(
+                f"Checking for bounding box data in granular assessment task {task.task_id}"
+            )
+            assessment_data = self._extract_geometry_from_assessment(assessment_data)
+        except Exception as e:
+            logger.warning(
+                f"Failed to extract geometry data for task {task.task_id}: {str(e)}"
+            )
+            # Continue with assessment even if geometry extraction fails
 
+        # Check for confidence threshold alerts
+        confidence_alerts = []
+        self._check_confidence_alerts_for_task(task, assessment_data, confidence_alerts)
+
+        processing_time = time.time() - start_time
+        if task_failed:
             return AssessmentResult(
                 task_id=task.task_id,
                 success=False,
-                assessment_data={},
-                confidence_alerts=[],
-                error_message=str(e),
+                assessment_data=assessment_data,
+                confidence_alerts=confidence_alerts,
+                error_message=self._convert_error_list_to_string(error_messages),
                 processing_time=processing_time,
             )
+        else:
+            return AssessmentResult(
+                task_id=task.task_id,
+                success=True,
+                assessment_data=assessment_data,
+                confidence_alerts=confidence_alerts,
+                processing_time=processing_time,
+                metering=metering,
+            )
+
+    def _failed_assessment_result(
+        self, task: AssessmentTask, error: Exception, start_time: float
+    ) -> AssessmentResult:
+        """Build the result of an assessment task that raised an error."""
+        processing_time = time.time() - start_time
+        logger.error(f"Error processing assessment task {task.task_id}: {str(error)}")
+
+        return AssessmentResult(
+            task_id=task.task_id,
+            success=False,
+            assessment_data={},
+            confidence_alerts=[],
+            error_message=str(error),
+            processing_time=processing_time,
+        )
 
     def _check_confidence_alerts_for_task(
         self,
@@ -1550,9 +1673,9 @@ class GranularAssessmentService:
 
                 page = document.pages[page_id]
                 image_uri = page.image_uri
-                # Just pass the values directly - prepare_image handles empty strings/None
-                image_content = image.prepare_image(
-                    image_uri, target_width, target_height
+                # Just pass the values directly - prepare_page_image handles empty strings/None
+                image_content = image.prepare_page_image(
+                    image_uri, target_width, target_height, page.image_renditions
                 )
                 page_images.append(image_content)
 
@@ -1622,10 +1745,6 @@ class GranularAssessmentService:
             all_task_results = list(cached_task_results.values())
             combined_metering = {}
 
-            # Use thread-safe error collection (similar to classification service)
-            import threading
-
-            errors_lock = threading.Lock()
             failed_task_exceptions = {}  # Store original exceptions for failed tasks
 
             # Determine which tasks need processing
@@ -1645,6 +1764,7 @@ class GranularAssessmentService:
                 logger.info(
                     f"Found {len(cached_task_results)} cached assessment task results, processing {len(tasks_to_process)} remaining tasks"
                 )
+                task_labels = {"document_id": document.id, "section_id": section_id}
 
                 # Time the model invocations
                 request_start_time = time.time()
@@ -1652,57 +1772,49 @@ class GranularAssessmentService:
                 # Process tasks (parallel or sequential based on configuration)
                 if self.enable_parallel and len(tasks_to_process) > 1:
                     logger.info(
-                        f"Processing {len(tasks_to_process)} assessment tasks in parallel with {self.max_workers} workers"
+                        f"Processing {len(tasks_to_process)} assessment tasks concurrently, at most {self.max_workers} at a time"
                     )
 
-                    with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                        # Submit all uncached tasks
-                        future_to_task = {
-                            executor.submit(
-                                self._process_assessment_task,
-                                task,
-                                base_content,
-                                properties,
-                                model_id,
-                                system_prompt,
-                                temperature,
-                                top_k,
-                                top_p,
-                                max_tokens,
-                            ): task
-                            for task in tasks_to_process
-                        }
+                    task_outcomes = bedrock.run_coroutine(
+                        self._process_assessment_tasks_async(
+                            tasks_to_process,
+                            base_content,
+                            properties,
+                            model_id,
+                            system_prompt,
+                            temperature,
+                            top_k,
+                            top_p,
+                            max_tokens,
+                            task_labels,
+                        )
+                    )
 
-                        # Collect results with enhanced error handling
-                        for future in as_completed(future_to_task):
-                            task = future_to_task[future]
-                            try:
-                                result = future.result()
-                                all_task_results.append(result)
-
-                                # Merge metering data
-                                if result.metering:
-                                    combined_metering = utils.merge_metering_data(
-                                        combined_metering, result.metering
-                                    )
-                            except Exception as e:
-                                # Capture exception details for later use
-                                error_msg = f"Error processing assessment task {task.task_id}: {str(e)}"
-                                logger.error(error_msg)
-                                with errors_lock:
-                                    document.errors.append(error_msg)
-                                    # Store the original exception for later analysis
-                                    failed_task_exceptions[task.task_id] = e
-
-                                # Create failed result
-                                failed_result = AssessmentResult(
-                                    task_id=task.task_id,
-                                    success=False,
-                                    assessment_data={},
-                                    confidence_alerts=[],
-                                    error_message=str(e),
-                                )
-                                all_task_results.append(failed_result)
+                    # Collect results with enhanced error handling
+                    for task, result in zip(tasks_to_process, task_outcomes):
+                        if isinstance(result, BaseException):
+                            # Capture exception details for later use
+                            error_msg = f"Error processing assessment task {task.task_id}: {str(result)}"
+                            logger.error(error_msg)
+                            document.errors.append(error_msg)
+                            # Store the original exception for later analysis
+                            failed_task_exceptions[task.task_id] = result
+
+                            # Create failed result
+                            result = AssessmentResult(
+                                task_id=task.task_id,
+                                success=False,
+                                assessment_data={},
+                                confidence_alerts=[],
+                                error_message=str(result),
+                            )
+                        all_task_results.append(result)
+
+                        # Merge metering data
+                        if result.metering:
+                            combined_metering = utils.merge_metering_data(
+                                combined_metering, result.metering
+                            )
                 else:
                     logger.info(
                         f"Processing {len(tasks_to_process)} assessment tasks sequentially"
@@ -1721,6 +1833,7 @@ class GranularAssessmentService:
                                 top_k,
                                 top_p,
                                 max_tokens,
+                                task_labels,
                             )
                             all_task_results.append(result)
 
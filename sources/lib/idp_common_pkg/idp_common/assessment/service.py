@@ -778,9 +778,9 @@ class AssessmentService:
 
                 page = document.pages[page_id]
                 image_uri = page.image_uri
-                # Just pass the values directly - prepare_image handles empty strings/None
-                image_content = image.prepare_image(
-                    image_uri, target_width, target_height
+                # Just pass the values directly - prepare_page_image handles empty strings/None
+                image_content = image.prepare_page_image(
+                    image_uri, target_width, target_height, page.image_renditions
                 )
                 page_images.append(image_content)
 
@@ -853,16 +853,17 @@ class AssessmentService:
             request_start_time = time.time()
 
             # Invoke Bedrock with the common library
-            response_with_metering = bedrock.invoke_model(
-                model_id=model_id,
-                system_prompt=system_prompt,
-                content=content,
-                temperature=temperature,
-                top_k=top_k,
-                top_p=top_p,
-                max_tokens=max_tokens,
-                context="Assessment",
-            )
+            with bedrock.batch_labels(document_id=document.id, section_id=section_id):
+                response_with_metering = bedrock.invoke_model(
+                    model_id=model_id,
+                    system_prompt=system_prompt,
+                    content=content,
+                    temperature=temperature,
+                    top_k=top_k,
+                    top_p=top_p,
+                    max_tokens=max_tokens,
+                    context="Assessment",
+                )
 
             total_duration = time.time() - request_start_time
             logger.info(f"Time taken for assessment: {total_duration:.2f} seconds")
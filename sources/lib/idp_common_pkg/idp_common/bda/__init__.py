@@ -9,5 +9,18 @@ Provides a service for calling Bedrock Data Automation.
 
 from idp_common.bda.bda_invocation import BdaInvocation
 from idp_common.bda.bda_service import BdaService
+from idp_common.bda.completion import (
+    AdaptivePoller,
+    EventCompletionSource,
+    S3JobMetadataCompletionSource,
+    SqsEventCompletionSource,
+)
 
-__all__ = ["BdaInvocation", "BdaService"]
+__all__ = [
+    "AdaptivePoller",
+    "BdaInvocation",
+    "BdaService",
+    "EventCompletionSource",
+    "S3JobMetadataCompletionSource",
+    "SqsEventCompletionSource",
+]
@@ -9,6 +9,12 @@ from typing import Optional
 
 import boto3
 
+from idp_common.bda.completion import (
+    TERMINAL_STATUSES,
+    AdaptivePoller,
+    CompletionSource,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -80,7 +86,7 @@ class BdaService:
             status = status_response["status"]
             logger.debug(f"Current job status: {status}")
 
-            if status in ["Success", "ServiceError", "ClientError"]:
+            if status in TERMINAL_STATUSES:
                 break
 
             # Wait before checking again
@@ -130,4 +136,107 @@ class BdaService:
         )
         return self.get_data_automation_invocation(invocationArn=invocationArn)
 
+    def wait_data_automation_completion(
+        self,
+        invocationArn: str,
+        completion_source: Optional[CompletionSource] = None,
+        poller: Optional[AdaptivePoller] = None,
+        timeout: Optional[float] = None,
+        status_check_interval: float = 60.0,
+    ) -> str:
+        """
+        Wait for an invocation to finish without a fixed polling interval.
+
+        With a completion source, the status API is called once the source
+        reports completion, and every status_check_interval seconds in case an
+        event is lost. Without one, the status API is polled with the delays of
+        the poller, which start short and grow to a cap.
+
+        Args:
+            invocationArn: ARN of the invocation
+            completion_source: Optional source of completion signals, such as
+                an SqsEventCompletionSource or S3JobMetadataCompletionSource
+            poller: Delays between status checks (default: AdaptivePoller())
+            timeout: Optional maximum number of seconds to wait
+            status_check_interval: Longest time between status checks while
+                waiting on a completion source
+
+        Returns:
+            The final status: Success, ServiceError or ClientError
+
+        Raises:
+            TimeoutError: If the invocation did not finish within timeout
+        """
+        delays = (poller or AdaptivePoller()).delays()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        last_check = time.monotonic()
+        # A source that reported completion before the status changed is not asked again
+        use_source = completion_source is not None
+
+        while True:
+            wait_seconds = (
+                status_check_interval - (time.monotonic() - last_check)
+                if use_source
+                else next(delays)
+            )
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(
+                        f"Data automation invocation {invocationArn} did not finish within {timeout} seconds"
+                    )
+                wait_seconds = min(wait_seconds, remaining)
+
+            if use_source:
+                finished = completion_source.wait(invocationArn, max(0.0, wait_seconds))
+                if (
+                    not finished
+                    and time.monotonic() - last_check < status_check_interval
+                ):
+                    # Only the deadline ended the wait
+                    continue
+                use_source = not finished
+            else:
+                time.sleep(wait_seconds)
+
+            last_check = time.monotonic()
+            status = self._bda_client.get_data_automation_status(
+                invocationArn=invocationArn
+            )["status"]
+            logger.debug(f"Current job status: {status}")
+            if status in TERMINAL_STATUSES:
+                return status
+
+    def invoke_data_automation_with_completion(
+        self,
+        input_s3_uri: str,
+        blueprintArn: Optional[str] = None,
+        completion_source: Optional[CompletionSource] = None,
+        poller: Optional[AdaptivePoller] = None,
+        timeout: Optional[float] = None,
+    ):
+        """
+        Drop-in alternative to invoke_data_automation that waits with
+        wait_data_automation_completion instead of a fixed polling interval.
+
+        Returns:
+            Same result dict as invoke_data_automation
+        """
+        invocation_response = self.invoke_data_automation_async(
+            input_s3_uri=input_s3_uri, blueprintArn=blueprintArn
+        )
+        invocationArn = invocation_response["invocationArn"]
+        try:
+            self.wait_data_automation_completion(
+                invocationArn=invocationArn,
+                completion_source=completion_source,
+                poller=poller,
+                timeout=timeout,
+            )
+        finally:
+            discard = getattr(completion_source, "discard", None)
+            if discard is not None:
+                discard(invocationArn)
+        return self.get_data_automation_invocation(invocationArn=invocationArn)
+
     # TODO: Add utilities to fetch the BDA results
@@ -0,0 +1,345 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Completion detection for Bedrock Data Automation invocations.
+
+Waiting for a BDA job by calling GetDataAutomationStatus at a fixed interval
+keeps the caller idle for the whole job and adds up to one interval of latency
+after the job finishes. A completion source tells the waiter when a job has
+finished instead:
+
+- EventCompletionSource: BDA status change events delivered in process
+  (for example by a handler, or by a test stub)
+- SqsEventCompletionSource: BDA status change events routed by an EventBridge
+  rule to an SQS queue, read with long polling
+- S3JobMetadataCompletionSource: arrival of the job_metadata.json file BDA
+  writes to the output location
+
+BdaService.wait_data_automation_completion confirms the final status with a
+single GetDataAutomationStatus call once a source reports completion, and falls
+back to AdaptivePoller (short delays first, growing to a cap) when no source is
+available or no event arrives.
+"""
+
+import json
+import logging
+import math
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional, Protocol, Union
+
+import boto3
+from botocore.exceptions import ClientError
+
+from idp_common.utils.s3util import S3Util
+
+logger = logging.getLogger(__name__)
+
+# Statuses of GetDataAutomationStatus after which a job does not change anymore
+TERMINAL_STATUSES = {"Success", "ServiceError", "ClientError"}
+
+# Longest SQS long poll
+MAX_SQS_WAIT_SECONDS = 20
+# Events of jobs no waiter of this process awaits are hidden from the queue for
+# this long, doubling with every receive, before another process may claim them
+UNCLAIMED_VISIBILITY_SECONDS = 10
+MAX_UNCLAIMED_VISIBILITY_SECONDS = 300
+# Events received this often without a waiter claiming them are deleted; the
+# waiter of such a job has stopped waiting and confirms its status by polling
+MAX_UNCLAIMED_RECEIVES = 5
+
+
+def job_id_from_invocation_arn(invocation_arn: str) -> str:
+    """
+    Return the job ID of an invocation ARN.
+
+    Args:
+        invocation_arn: ARN such as arn:aws:bedrock:us-east-1:123456789012:data-automation-invocation/<job_id>
+
+    Returns:
+        The job ID used in BDA events and output locations
+    """
+    return invocation_arn.rsplit("/", 1)[-1]
+
+
+def parse_completion_event(
+    event: Union[str, Dict[str, Any]],
+) -> Optional[Dict[str, Any]]:
+    """
+    Extract the job ID and status of a BDA job status change event.
+
+    Args:
+        event: EventBridge event, as a dict or JSON string
+
+    Returns:
+        Dict with job_id and job_status, or None if the event is not a BDA job event
+    """
+    if isinstance(event, str):
+        try:
+            event = json.loads(event)
+        except json.JSONDecodeError:
+            return None
+    if not isinstance(event, dict):
+        return None
+    detail = event.get("detail", event)
+    if not isinstance(detail, dict):
+        return None
+    job_id = detail.get("job_id")
+    job_status = detail.get("job_status")
+    if not job_id or not job_status:
+        return None
+    return {"job_id": job_id, "job_status": job_status}
+
+
+class CompletionSource(Protocol):
+    """Signals that a BDA invocation has finished."""
+
+    def wait(self, invocation_arn: str, timeout: float) -> bool:
+        """
+        Wait up to timeout seconds for the invocation to finish.
+
+        Returns:
+            True as soon as the invocation is known to have finished
+        """
+        ...
+
+
+class AdaptivePoller:
+    """
+    Delays between status checks that start short and grow to a cap.
+
+    Most jobs are either quick, where the first short delays catch the
+    completion early, or long, where the capped delay keeps the number of
+    status calls low.
+    """
+
+    def __init__(
+        self,
+        initial_delay: float = 1.0,
+        max_delay: float = 10.0,
+        multiplier: float = 1.5,
+    ):
+        """
+        Initialize the poller.
+
+        Args:
+            initial_delay: Delay before the first status check, in seconds
+            max_delay: Longest delay between status checks, in seconds
+            multiplier: Growth factor of the delay after each check
+        """
+        if initial_delay <= 0 or max_delay < initial_delay or multiplier < 1:
+            raise ValueError(
+                "AdaptivePoller requires 0 < initial_delay <= max_delay and multiplier >= 1"
+            )
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+
+    def delays(self) -> Iterator[float]:
+        """Yield the delays of one wait, without end."""
+        delay = self.initial_delay
+        while True:
+            yield delay
+            delay = min(self.max_delay, delay * self.multiplier)
+
+
+class EventCompletionSource:
+    """
+    Completion source fed with BDA status change events in process.
+
+    Events may arrive before or after the waiter starts, so the statuses of
+    finished jobs are kept until discard() is called for them.
+    """
+
+    def __init__(self):
+        self._statuses: Dict[str, str] = {}
+        self._condition = threading.Condition()
+
+    def notify(self, event: Union[str, Dict[str, Any]]) -> bool:
+        """
+        Record a BDA job status change event.
+
+        Args:
+            event: EventBridge event, as a dict or JSON string
+
+        Returns:
+            True if the event was a BDA job event
+        """
+        parsed = parse_completion_event(event)
+        if parsed is None:
+            return False
+        with self._condition:
+            self._statuses[parsed["job_id"]] = parsed["job_status"]
+            self._condition.notify_all()
+        return True
+
+    def status(self, invocation_arn: str) -> Optional[str]:
+        """Event status of a finished invocation, if its event has arrived."""
+        with self._condition:
+            return self._statuses.get(job_id_from_invocation_arn(invocation_arn))
+
+    def discard(self, invocation_arn: str) -> None:
+        """Forget the event of an invocation that is no longer awaited."""
+        with self._condition:
+            self._statuses.pop(job_id_from_invocation_arn(invocation_arn), None)
+
+    def wait(self, invocation_arn: str, timeout: float) -> bool:
+        job_id = job_id_from_invocation_arn(invocation_arn)
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: job_id in self._statuses, timeout=timeout
+            )
+
+
+class SqsEventCompletionSource(EventCompletionSource):
+    """
+    Completion source reading BDA status change events from an SQS queue.
+
+    The queue is the target of an EventBridge rule for the "Bedrock Data
+    Automation Job Succeeded", "... Failed With Client Error" and "... Failed
+    With Service Error" events.
+
+    Within a process, one waiter at a time receives from the queue on behalf of
+    all waiters and hands each event to the waiter of its job, so concurrent
+    waiters do not compete for messages. Events of awaited jobs are deleted.
+    Events of other jobs are hidden for a growing visibility timeout so that
+    waiters in other processes can claim them without the queue cycling them
+    back immediately, and are deleted once received MAX_UNCLAIMED_RECEIVES
+    times.
+    """
+
+    def __init__(self, queue_url: str, sqs_client: Optional[Any] = None):
+        """
+        Initialize the source.
+
+        Args:
+            queue_url: URL of the queue receiving the BDA events
+            sqs_client: Optional SQS client
+        """
+        super().__init__()
+        self.queue_url = queue_url
+        self.sqs_client = sqs_client or boto3.client("sqs")
+        # Number of waiters per awaited job ID
+        self._waiting: Dict[str, int] = {}
+        self._receiving = threading.Lock()
+
+    def wait(self, invocation_arn: str, timeout: float) -> bool:
+        job_id = job_id_from_invocation_arn(invocation_arn)
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            self._waiting[job_id] = self._waiting.get(job_id, 0) + 1
+        try:
+            while True:
+                if self.status(invocation_arn) is not None:
+                    return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                if self._receiving.acquire(blocking=False):
+                    try:
+                        self._receive(min(MAX_SQS_WAIT_SECONDS, math.ceil(remaining)))
+                    finally:
+                        self._receiving.release()
+                        # Let another waiter take over receiving
+                        with self._condition:
+                            self._condition.notify_all()
+                else:
+                    with self._condition:
+                        if self._receiving.locked() and job_id not in self._statuses:
+                            self._condition.wait(timeout=remaining)
+        finally:
+            with self._condition:
+                self._waiting[job_id] -= 1
+                if not self._waiting[job_id]:
+                    del self._waiting[job_id]
+
+    def _receive(self, wait_seconds: int) -> None:
+        response = self.sqs_client.receive_message(
+            QueueUrl=self.queue_url,
+            MaxNumberOfMessages=10,
+            WaitTimeSeconds=wait_seconds,
+            AttributeNames=["ApproximateReceiveCount"],
+        )
+        for message in response.get("Messages", []):
+            parsed = parse_completion_event(message["Body"])
+            claimed = False
+            if parsed is not None:
+                # Only events of awaited jobs are recorded; the statuses of
+                # other processes' jobs would never be discarded
+                with self._condition:
+                    claimed = parsed["job_id"] in self._waiting
+                    if claimed:
+                        self.notify(message["Body"])
+            receive_count = int(
+                message.get("Attributes", {}).get("ApproximateReceiveCount", 1)
+            )
+            if parsed is None or claimed or receive_count >= MAX_UNCLAIMED_RECEIVES:
+                # Claimed events, messages that are not BDA events and events
+                # nobody has claimed in time are consumed
+                if parsed is not None and not claimed:
+                    logger.info(
+                        f"Deleting BDA event of job {parsed['job_id']} not awaited "
+                        f"after {receive_count} receives"
+                    )
+                self.sqs_client.delete_message(
+                    QueueUrl=self.queue_url, ReceiptHandle=message["ReceiptHandle"]
+                )
+            else:
+                self.sqs_client.change_message_visibility(
+                    QueueUrl=self.queue_url,
+                    ReceiptHandle=message["ReceiptHandle"],
+                    VisibilityTimeout=min(
+                        MAX_UNCLAIMED_VISIBILITY_SECONDS,
+                        UNCLAIMED_VISIBILITY_SECONDS * 2 ** (receive_count - 1),
+                    ),
+                )
+
+
+class S3JobMetadataCompletionSource:
+    """
+    Completion source checking for the job_metadata.json file of a job.
+
+    BDA writes <output_s3_uri>/<job_id>/job_metadata.json when a job has
+    finished. Checking for it is a HEAD request on the output bucket, which
+    does not count against the BDA status API quota.
+    """
+
+    def __init__(
+        self,
+        output_s3_uri: str,
+        s3_client: Optional[Any] = None,
+        poller: Optional[AdaptivePoller] = None,
+    ):
+        """
+        Initialize the source.
+
+        Args:
+            output_s3_uri: Output location of the BDA invocations
+            s3_client: Optional S3 client
+            poller: Delays between checks within one wait (default: 0.5s growing to 5s)
+        """
+        self.bucket, prefix = S3Util.s3_url_to_bucket_key(output_s3_uri.rstrip("/"))
+        self.prefix = prefix.rstrip("/")
+        self.s3_client = s3_client or boto3.client("s3")
+        self.poller = poller or AdaptivePoller(initial_delay=0.5, max_delay=5.0)
+
+    def metadata_key(self, invocation_arn: str) -> str:
+        job_id = job_id_from_invocation_arn(invocation_arn)
+        return f"{self.prefix}/{job_id}/job_metadata.json".lstrip("/")
+
+    def wait(self, invocation_arn: str, timeout: float) -> bool:
+        key = self.metadata_key(invocation_arn)
+        deadline = time.monotonic() + timeout
+        for delay in self.poller.delays():
+            try:
+                self.s3_client.head_object(Bucket=self.bucket, Key=key)
+                return True
+            except ClientError as e:
+                if e.response.get("Error", {}).get("Code") not in ("404", "NoSuchKey"):
+                    raise
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(delay, remaining))
+        return False
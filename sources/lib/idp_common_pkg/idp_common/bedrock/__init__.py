@@ -4,6 +4,29 @@
 """Bedrock integration module for IDP Common package."""
 
 from .client import BedrockClient, invoke_model, default_client
+from .batch import (
+    BatchInference,
+    BatchInferenceError,
+    BatchRequestDeferred,
+    BedrockBatchJobRunner,
+    LocalBatchJobRunner,
+    batch_labels,
+)
+from .concurrency import (
+    ConcurrencyLimiter,
+    get_concurrency_limiter,
+    run_coroutine,
+    set_max_concurrency,
+)
+from .rate_limiter import AdaptiveRateLimiter, get_rate_limiter, set_rate_limiter
+from .response_cache import (
+    ResponseCache,
+    MemoryCacheTier,
+    DynamoDBCacheTier,
+    S3CacheTier,
+    get_response_cache,
+    set_response_cache,
+)
 
 # Add version info
 __version__ = "0.1.0"
@@ -12,10 +35,31 @@ __version__ = "0.1.0"
 __all__ = [
     "BedrockClient",
     "invoke_model",
-    "default_client"
+    "invoke_model_async",
+    "default_client",
+    "ConcurrencyLimiter",
+    "get_concurrency_limiter",
+    "run_coroutine",
+    "set_max_concurrency",
+    "AdaptiveRateLimiter",
+    "get_rate_limiter",
+    "set_rate_limiter",
+    "ResponseCache",
+    "MemoryCacheTier",
+    "DynamoDBCacheTier",
+    "S3CacheTier",
+    "get_response_cache",
+    "set_response_cache",
+    "BatchInference",
+    "BatchInferenceError",
+    "BatchRequestDeferred",
+    "BedrockBatchJobRunner",
+    "LocalBatchJobRunner",
+    "batch_labels",
 ]
 
 # Re-export key functions from the default client for backward compatibility
 extract_text_from_response = default_client.extract_text_from_response
 generate_embedding = default_client.generate_embedding
-format_prompt = default_client.format_prompt
\ No newline at end of file
+format_prompt = default_client.format_prompt
+invoke_model_async = default_client.invoke_model_async
\ No newline at end of file
@@ -0,0 +1,766 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Bedrock batch inference for non-interactive workloads.
+
+Batch inference jobs process JSONL files of model requests asynchronously, at
+roughly half the on-demand price and without consuming on-demand quota. This
+suits test-set runs, backfills and reprocessing, where latency does not matter.
+
+A stage (classification, extraction or assessment) runs twice over the same
+documents:
+
+1. Collect: the services run unchanged, but every Bedrock request of a batched
+   stage is recorded instead of invoked and raises BatchRequestDeferred. The
+   results of this pass are discarded.
+2. The recorded requests are submitted as batch jobs, one or more per model,
+   and the jobs are polled until they finish.
+3. Replay: the services run again and each request is answered from the batch
+   results. Requests without a result (failed records, jobs below the minimum
+   size, unsupported models) are invoked on demand unless fallback is disabled.
+
+Requests are matched by the same content hash as the response cache, so
+identical prompts are submitted once. Each record keeps the document, page,
+section and task IDs of the calls that produced it (see batch_labels()).
+
+    runner = BedrockBatchJobRunner(role_arn, input_s3_uri, output_s3_uri)
+    batch = BatchInference(runner, stages=["extraction"], min_records=100)
+    with batch.collect():
+        process(documents)
+    batch.submit()
+    batch.wait()
+    with batch.replay():
+        process(documents)
+
+The state returned by to_dict() is JSON serializable, so a caller can submit
+the jobs, persist the state and resume with from_dict() once they finish.
+
+This is a library API for scripts that drive the services directly (test-set
+runs, backfills). The document processing workflows do not use it.
+"""
+
+import base64
+import contextvars
+import json
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import boto3
+
+from .response_cache import make_cache_key
+
+logger = logging.getLogger(__name__)
+
+# Metering contexts of the Bedrock requests of each stage
+STAGE_CONTEXTS = {
+    "classification": ("Classification",),
+    "extraction": ("Extraction",),
+    "assessment": ("Assessment", "GranularAssessment"),
+}
+
+# Job states reported by GetModelInvocationJob
+COMPLETED_STATES = ("Completed", "PartiallyCompleted")
+FAILED_STATES = ("Failed", "Stopped", "Expired")
+
+# Claude requires max_tokens, used when the request does not set it
+DEFAULT_ANTHROPIC_MAX_TOKENS = 4096
+ANTHROPIC_VERSION = "bedrock-2023-05-31"
+
+_batch_session: Optional["BatchInference"] = None
+_batch_session_lock = threading.Lock()
+_batch_labels: contextvars.ContextVar[Dict[str, str]] = contextvars.ContextVar(
+    "batch_labels", default={}
+)
+
+
+class BatchRequestDeferred(Exception):
+    """Raised for a request that was recorded for batch inference instead of invoked."""
+
+
+class BatchInferenceError(Exception):
+    """Raised when batch inference cannot answer a request."""
+
+
+@contextmanager
+def batch_labels(**labels: Any) -> Iterator[None]:
+    """
+    Label the Bedrock requests made within the block for batch inference.
+
+    Labels (e.g. document_id, page_id, section_id, task_id) are stored with the
+    batch records, so results and failures can be traced back to their origin.
+    Nested blocks add to the labels of the enclosing block.
+
+    Args:
+        **labels: Label values; None values are ignored
+    """
+    merged = {**_batch_labels.get()}
+    merged.update(
+        {key: str(value) for key, value in labels.items() if value is not None}
+    )
+    token = _batch_labels.set(merged)
+    try:
+        yield
+    finally:
+        _batch_labels.reset(token)
+
+
+def get_batch_session() -> Optional["BatchInference"]:
+    """Get the batch inference session currently collecting or replaying, if any."""
+    return _batch_session
+
+
+def to_model_input(converse_params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a converse request into the model's native request body.
+
+    Batch inference records use the InvokeModel request format of the model.
+
+    Args:
+        converse_params: Keyword arguments for bedrock-runtime converse
+
+    Returns:
+        Native request body for the model
+
+    Raises:
+        ValueError: If the model or request content is not supported
+    """
+    if converse_params.get("guardrailConfig"):
+        raise ValueError("Guardrails are not supported by batch inference")
+    model_id = converse_params["modelId"].lower()
+    if "anthropic" in model_id:
+        return _anthropic_input(converse_params)
+    if "amazon.nova" in model_id:
+        return _nova_input(converse_params)
+    raise ValueError(
+        f"Batch inference is not supported for model {converse_params['modelId']}"
+    )
+
+
+def from_model_output(model_id: str, model_output: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a model's native response body into a converse response.
+
+    Args:
+        model_id: Bedrock model ID of the request
+        model_output: Native response body from the batch output
+
+    Returns:
+        Response in the format of bedrock-runtime converse
+    """
+    if "anthropic" in model_id.lower():
+        usage = model_output.get("usage", {})
+        input_tokens = usage.get("input_tokens", 0)
+        output_tokens = usage.get("output_tokens", 0)
+        return {
+            "output": {
+                "message": {
+                    "role": "assistant",
+                    "content": [
+                        {"text": block.get("text", "")}
+                        for block in model_output.get("content", [])
+                        if block.get("type") == "text"
+                    ],
+                }
+            },
+            "stopReason": model_output.get("stop_reason", "end_turn"),
+            "usage": {
+                "inputTokens": input_tokens,
+                "outputTokens": output_tokens,
+                "totalTokens": input_tokens + output_tokens,
+                "cacheReadInputTokens": usage.get("cache_read_input_tokens", 0),
+                "cacheWriteInputTokens": usage.get("cache_creation_input_tokens", 0),
+            },
+        }
+    # Nova responses already have the converse structure
+    return {
+        "output": model_output.get("output", {}),
+        "stopReason": model_output.get("stopReason", "end_turn"),
+        "usage": model_output.get("usage", {}),
+    }
+
+
+def _image_base64(block: Dict[str, Any]) -> Tuple[str, str]:
+    """Get the format and base64 data of a converse image block."""
+    image = block["image"]
+    data = image["source"]["bytes"]
+    if isinstance(data, (bytes, bytearray)):
+        data = base64.b64encode(data).decode("ascii")
+    return image["format"], data
+
+
+def _anthropic_input(converse_params: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a Claude messages request body from a converse request."""
+    messages = []
+    for message in converse_params["messages"]:
+        content = []
+        for block in message["content"]:
+            if "text" in block:
+                content.append({"type": "text", "text": block["text"]})
+            elif "image" in block:
+                image_format, data = _image_base64(block)
+                content.append(
+                    {
+                        "type": "image",
+                        "source": {
+                            "type": "base64",
+                            "media_type": f"image/{image_format}",
+                            "data": data,
+                        },
+                    }
+                )
+            elif "cachePoint" in block:
+                # Prompt caching does not apply to batch records
+                continue
+            else:
+                raise ValueError(
+                    f"Unsupported content block for batch inference: {list(block)}"
+                )
+        messages.append({"role": message["role"], "content": content})
+
+    additional = dict(converse_params.get("additionalModelRequestFields") or {})
+    inference_config = converse_params.get("inferenceConfig") or {}
+    body: Dict[str, Any] = {
+        "anthropic_version": ANTHROPIC_VERSION,
+        "max_tokens": additional.pop("max_tokens", None)
+        or inference_config.get("maxTokens")
+        or DEFAULT_ANTHROPIC_MAX_TOKENS,
+        "system": "\n".join(
+            block["text"]
+            for block in converse_params.get("system") or []
+            if "text" in block
+        ),
+        "messages": messages,
+    }
+    if "temperature" in inference_config:
+        body["temperature"] = inference_config["temperature"]
+    if "topP" in inference_config:
+        body["top_p"] = inference_config["topP"]
+    body.update(additional)
+    return body
+
+
+def _nova_input(converse_params: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a Nova messages-v1 request body from a converse request."""
+    messages = []
+    for message in converse_params["messages"]:
+        content = []
+        for block in message["content"]:
+            if "text" in block:
+                content.append({"text": block["text"]})
+            elif "image" in block:
+                image_format, data = _image_base64(block)
+                content.append(
+                    {"image": {"format": image_format, "source": {"bytes": data}}}
+                )
+            elif "cachePoint" in block:
+                continue
+            else:
+                raise ValueError(
+                    f"Unsupported content block for batch inference: {list(block)}"
+                )
+        messages.append({"role": message["role"], "content": content})
+
+    inference_config = dict(converse_params.get("inferenceConfig") or {})
+    additional = converse_params.get("additionalModelRequestFields") or {}
+    inference_config.update(additional.get("inferenceConfig", {}))
+    return {
+        "schemaVersion": "messages-v1",
+        "system": [
+            block for block in converse_params.get("system") or [] if "text" in block
+        ],
+        "messages": messages,
+        "inferenceConfig": inference_config,
+    }
+
+
+@dataclass
+class BatchRecord:
+    """A Bedrock request recorded for batch inference."""
+
+    record_id: str
+    model_id: str
+    context: str
+    # Labels of every call that made this request (identical prompts share a record)
+    labels: List[Dict[str, str]] = field(default_factory=list)
+    # Native request body; only kept until the record is submitted
+    model_input: Optional[Dict[str, Any]] = None
+    job_id: Optional[str] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "record_id": self.record_id,
+            "model_id": self.model_id,
+            "context": self.context,
+            "labels": self.labels,
+            "job_id": self.job_id,
+            "error": self.error,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BatchRecord":
+        return cls(
+            record_id=data["record_id"],
+            model_id=data["model_id"],
+            context=data["context"],
+            labels=data.get("labels", []),
+            job_id=data.get("job_id"),
+            error=data.get("error"),
+        )
+
+
+@dataclass
+class BatchJob:
+    """A submitted batch inference job."""
+
+    job_id: str
+    model_id: str
+    record_count: int
+    status: str = "Submitted"
+
+    @property
+    def finished(self) -> bool:
+        return self.status in COMPLETED_STATES or self.status in FAILED_STATES
+
+
+class BedrockBatchJobRunner:
+    """Runs batch inference jobs with Amazon Bedrock."""
+
+    def __init__(
+        self,
+        role_arn: str,
+        input_s3_uri: str,
+        output_s3_uri: str,
+        region: Optional[str] = None,
+        timeout_hours: int = 24,
+    ):
+        """
+        Initialize the runner.
+
+        Args:
+            role_arn: Service role Bedrock assumes to read the input and write the output
+            input_s3_uri: S3 prefix for the JSONL input files
+            output_s3_uri: S3 prefix for the job output
+            region: AWS region
+            timeout_hours: Hours after which unfinished jobs expire
+        """
+        self.role_arn = role_arn
+        self.input_s3_uri = input_s3_uri.rstrip("/")
+        self.output_s3_uri = output_s3_uri.rstrip("/")
+        self.timeout_hours = timeout_hours
+        self.bedrock = boto3.client("bedrock", region_name=region)
+        self.s3 = boto3.client("s3", region_name=region)
+
+    def submit(
+        self, job_name: str, model_id: str, records: List[Dict[str, Any]]
+    ) -> str:
+        """
+        Upload records as a JSONL file and start a batch inference job.
+
+        Args:
+            job_name: Unique job name
+            model_id: Bedrock model ID
+            records: Records with recordId and modelInput
+
+        Returns:
+            Job ARN
+        """
+        input_uri = f"{self.input_s3_uri}/{job_name}.jsonl"
+        bucket, key = _split_s3_uri(input_uri)
+        body = "\n".join(json.dumps(record) for record in records) + "\n"
+        self.s3.put_object(Bucket=bucket, Key=key, Body=body.encode("utf-8"))
+        response = self.bedrock.create_model_invocation_job(
+            jobName=job_name,
+            roleArn=self.role_arn,
+            modelId=model_id,
+            inputDataConfig={
+                "s3InputDataConfig": {"s3Uri": input_uri, "s3InputFormat": "JSONL"}
+            },
+            outputDataConfig={
+                "s3OutputDataConfig": {"s3Uri": f"{self.output_s3_uri}/"}
+            },
+            timeoutDurationInHours=self.timeout_hours,
+        )
+        return response["jobArn"]
+
+    def status(self, job_id: str) -> str:
+        """Get the status of a job."""
+        return self.bedrock.get_model_invocation_job(jobIdentifier=job_id)["status"]
+
+    def results(self, job_id: str) -> Iterator[Dict[str, Any]]:
+        """
+        Read the output records of a finished job.
+
+        Bedrock writes <output prefix>/<job ID>/<input file name>.out with one
+        record per line, holding either modelOutput or error.
+        """
+        job = self.bedrock.get_model_invocation_job(jobIdentifier=job_id)
+        input_uri = job["inputDataConfig"]["s3InputDataConfig"]["s3Uri"]
+        output_prefix = job["outputDataConfig"]["s3OutputDataConfig"]["s3Uri"].rstrip(
+            "/"
+        )
+        output_uri = (
+            f"{output_prefix}/{job_id.split('/')[-1]}/{input_uri.split('/')[-1]}.out"
+        )
+        bucket, key = _split_s3_uri(output_uri)
+        body = self.s3.get_object(Bucket=bucket, Key=key)["Body"]
+        for line in body.iter_lines():
+            if line.strip():
+                yield json.loads(line)
+
+
+class LocalBatchJobRunner:
+    """
+    Runs batch jobs in process, for tests and local runs.
+
+    Each record is answered by a handler called with the model ID and native
+    request body, returning the native response body. Exceptions raised by the
+    handler become record errors, as in the Bedrock output.
+    """
+
+    def __init__(self, handler: Callable[[str, Dict[str, Any]], Dict[str, Any]]):
+        self.handler = handler
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+
+    def submit(
+        self, job_name: str, model_id: str, records: List[Dict[str, Any]]
+    ) -> str:
+        job_id = f"local/{job_name}"
+        self.jobs[job_id] = {"model_id": model_id, "records": records}
+        return job_id
+
+    def status(self, job_id: str) -> str:
+        return "Completed"
+
+    def results(self, job_id: str) -> Iterator[Dict[str, Any]]:
+        job = self.jobs[job_id]
+        for record in job["records"]:
+            try:
+                output = self.handler(job["model_id"], record["modelInput"])
+                yield {**record, "modelOutput": output}
+            except Exception as e:
+                yield {**record, "error": {"errorCode": 400, "errorMessage": str(e)}}
+
+
+class BatchInference:
+    """Collects Bedrock requests into batch jobs and replays their results."""
+
+    def __init__(
+        self,
+        runner: Any,
+        stages: Optional[Iterable[str]] = None,
+        min_records: int = 0,
+        max_records_per_job: int = 50000,
+        poll_interval_seconds: float = 60,
+        on_demand_fallback: bool = True,
+    ):
+        """
+        Initialize batch inference.
+
+        Args:
+            runner: Job runner (BedrockBatchJobRunner or LocalBatchJobRunner)
+            stages: Stages whose requests are batched (default: all of STAGE_CONTEXTS)
+            min_records: Models with fewer records are invoked on demand instead
+            max_records_per_job: Records per job; larger batches are split
+            poll_interval_seconds: Delay between job status checks
+            on_demand_fallback: Invoke requests without a batch result on demand
+        """
+        stages = list(stages) if stages is not None else list(STAGE_CONTEXTS)
+        unknown = [stage for stage in stages if stage not in STAGE_CONTEXTS]
+        if unknown:
+            raise ValueError(
+                f"Unknown batch inference stages: {unknown}. Valid stages: {list(STAGE_CONTEXTS)}"
+            )
+        self.runner = runner
+        self.stages = stages
+        self.contexts = {
+            context for stage in stages for context in STAGE_CONTEXTS[stage]
+        }
+        self.min_records = min_records
+        self.max_records_per_job = max(1, max_records_per_job)
+        self.poll_interval_seconds = poll_interval_seconds
+        self.on_demand_fallback = on_demand_fallback
+        self.records: Dict[str, BatchRecord] = {}
+        self.jobs: List[BatchJob] = []
+        self.responses: Dict[str, Dict[str, Any]] = {}
+        self._mode: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def collect(self) -> Iterator["BatchInference"]:
+        """Record the Bedrock requests of the batched stages made within the block."""
+        with self._activate("collect"):
+            yield self
+
+    @contextmanager
+    def replay(self) -> Iterator["BatchInference"]:
+        """Answer the Bedrock requests made within the block from the batch results."""
+        with self._activate("replay"):
+            yield self
+
+    @contextmanager
+    def _activate(self, mode: str) -> Iterator[None]:
+        global _batch_session
+        with _batch_session_lock:
+            if _batch_session is not None:
+                raise BatchInferenceError("Another batch inference session is active")
+            _batch_session = self
+            self._mode = mode
+        try:
+            yield
+        finally:
+            with _batch_session_lock:
+                _batch_session = None
+                self._mode = None
+
+    def handle(
+        self, converse_params: Dict[str, Any], model_id: str, context: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Handle a Bedrock request made while collecting or replaying.
+
+        Args:
+            converse_params: Keyword arguments for bedrock-runtime converse
+            model_id: Bedrock model ID as requested by the caller
+            context: Metering context of the request
+
+        Returns:
+            Result with response and metering, or None to invoke on demand
+
+        Raises:
+            BatchRequestDeferred: While collecting a request of a batched stage
+            BatchInferenceError: While replaying a request without a result, if fallback is disabled
+        """
+        if self._mode is None or context not in self.contexts:
+            return None
+        record_id = make_cache_key(converse_params)
+
+        if self._mode == "collect":
+            self._record(record_id, converse_params, context)
+            raise BatchRequestDeferred(
+                f"{context} request {record_id[:12]} deferred to batch inference"
+            )
+
+        response = self.responses.get(record_id)
+        if response is None:
+            record = self.records.get(record_id)
+            reason = record.error if record and record.error else "no batch result"
+            if not self.on_demand_fallback:
+                raise BatchInferenceError(
+                    f"{context} request {record_id[:12]} has no batch result: {reason}"
+                )
+            logger.info(
+                f"Invoking {context} request {record_id[:12]} on demand: {reason}"
+            )
+            return None
+        return {
+            "response": response,
+            "metering": {
+                f"{context}/bedrock-batch/{model_id}": {**response.get("usage", {})}
+            },
+        }
+
+    def _record(
+        self, record_id: str, converse_params: Dict[str, Any], context: str
+    ) -> None:
+        labels = dict(_batch_labels.get())
+        with self._lock:
+            record = self.records.get(record_id)
+            if record is None:
+                record = BatchRecord(
+                    record_id=record_id,
+                    model_id=converse_params["modelId"],
+                    context=context,
+                )
+                try:
+                    record.model_input = to_model_input(converse_params)
+                except ValueError as e:
+                    # Left to the on-demand fallback during replay
+                    record.error = str(e)
+                self.records[record_id] = record
+            if labels and labels not in record.labels:
+                record.labels.append(labels)
+
+    def submit(self, job_name_prefix: str = "idp-batch") -> List[BatchJob]:
+        """
+        Submit the collected records as batch jobs, one or more per model.
+
+        Args:
+            job_name_prefix: Prefix of the job names
+
+        Returns:
+            Jobs submitted by this call
+        """
+        pending: Dict[str, List[BatchRecord]] = {}
+        for record in self.records.values():
+            if (
+                record.job_id is None
+                and record.error is None
+                and record.model_input is not None
+            ):
+                pending.setdefault(record.model_id, []).append(record)
+
+        submitted = []
+        for model_id, records in pending.items():
+            if len(records) < self.min_records:
+                logger.info(
+                    f"{len(records)} requests for {model_id} are below the batch minimum of "
+                    f"{self.min_records}, they will be invoked on demand"
+                )
+                for record in records:
+                    record.error = "below the batch job minimum"
+                continue
+            for start in range(0, len(records), self.max_records_per_job):
+                chunk = records[start : start + self.max_records_per_job]
+                job_name = f"{job_name_prefix}-{uuid.uuid4().hex[:12]}"
+                job_id = self.runner.submit(
+                    job_name,
+                    model_id,
+                    [
+                        {"recordId": record.record_id, "modelInput": record.model_input}
+                        for record in chunk
+                    ],
+                )
+                for record in chunk:
+                    record.job_id = job_id
+                    record.model_input = None
+                job = BatchJob(
+                    job_id=job_id, model_id=model_id, record_count=len(chunk)
+                )
+                self.jobs.append(job)
+                submitted.append(job)
+                logger.info(
+                    f"Submitted batch inference job {job_id} with {len(chunk)} records for {model_id}"
+                )
+        return submitted
+
+    def poll(self) -> bool:
+        """
+        Update the status of unfinished jobs and load the results of finished ones.
+
+        Returns:
+            True when all jobs are finished
+        """
+        for job in self.jobs:
+            if job.finished:
+                continue
+            job.status = self.runner.status(job.job_id)
+            if job.status in COMPLETED_STATES:
+                self._load_results(job)
+            elif job.status in FAILED_STATES:
+                logger.warning(
+                    f"Batch inference job {job.job_id} ended with status {job.status}"
+                )
+                for record in self.records.values():
+                    if record.job_id == job.job_id:
+                        record.error = f"batch job {job.status.lower()}"
+        return all(job.finished for job in self.jobs)
+
+    def wait(self, timeout_seconds: Optional[float] = None) -> bool:
+        """
+        Wait for all jobs to finish.
+
+        Args:
+            timeout_seconds: Maximum time to wait; None waits until the jobs finish or expire
+
+        Returns:
+            True when all jobs finished, False on timeout
+        """
+        deadline = (
+            None if timeout_seconds is None else time.monotonic() + timeout_seconds
+        )
+        while not self.poll():
+            if (
+                deadline is not None
+                and time.monotonic() + self.poll_interval_seconds > deadline
+            ):
+                return False
+            time.sleep(self.poll_interval_seconds)
+        return True
+
+    def _load_results(self, job: BatchJob) -> None:
+        """Store the responses of a finished job by record ID."""
+        loaded = 0
+        for output in self.runner.results(job.job_id):
+            record = self.records.get(output.get("recordId"))
+            if record is None:
+                continue
+            if output.get("modelOutput") is not None:
+                self.responses[record.record_id] = from_model_output(
+                    job.model_id, output["modelOutput"]
+                )
+                loaded += 1
+            else:
+                error = output.get("error") or {}
+                record.error = error.get("errorMessage") or "no model output"
+        logger.info(
+            f"Loaded {loaded} of {job.record_count} results of batch inference job {job.job_id}"
+        )
+
+    def failed_records(self) -> List[BatchRecord]:
+        """Records without a batch result after all jobs finished, with their labels and errors."""
+        return [
+            record
+            for record in self.records.values()
+            if record.record_id not in self.responses
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialize the state needed to resume after submitting.
+
+        Results are not included; they are read from the job output again.
+        """
+        return {
+            "stages": self.stages,
+            "min_records": self.min_records,
+            "max_records_per_job": self.max_records_per_job,
+            "poll_interval_seconds": self.poll_interval_seconds,
+            "on_demand_fallback": self.on_demand_fallback,
+            "records": [record.to_dict() for record in self.records.values()],
+            "jobs": [
+                {
+                    "job_id": job.job_id,
+                    "model_id": job.model_id,
+                    "record_count": job.record_count,
+                }
+                for job in self.jobs
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], runner: Any) -> "BatchInference":
+        """
+        Restore batch inference from to_dict() output.
+
+        Jobs are polled again, so their results are loaded by the next poll() or wait().
+
+        Args:
+            data: Serialized state
+            runner: Job runner the jobs were submitted with
+        """
+        batch = cls(
+            runner,
+            stages=data["stages"],
+            min_records=data["min_records"],
+            max_records_per_job=data["max_records_per_job"],
+            poll_interval_seconds=data["poll_interval_seconds"],
+            on_demand_fallback=data["on_demand_fallback"],
+        )
+        for record_data in data["records"]:
+            record = BatchRecord.from_dict(record_data)
+            batch.records[record.record_id] = record
+        batch.jobs = [BatchJob(**job) for job in data["jobs"]]
+        return batch
+
+
+def _split_s3_uri(uri: str) -> Tuple[str, str]:
+    """Split s3://bucket/key into bucket and key."""
+    bucket, _, key = uri.replace("s3://", "", 1).partition("/")
+    return bucket, key
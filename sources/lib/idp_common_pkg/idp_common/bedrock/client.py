@@ -8,6 +8,7 @@ This module provides a class-based interface for invoking Bedrock models
 with built-in retry logic, metrics tracking, and configuration options.
 """
 
+import asyncio
 import boto3
 import json
 import os
@@ -26,6 +27,16 @@ from botocore.exceptions import (
 )
 from urllib3.exceptions import ReadTimeoutError as Urllib3ReadTimeoutError
 
+from .batch import get_batch_session
+from .concurrency import ConcurrencyLimiter, get_concurrency_limiter
+from .rate_limiter import AdaptiveRateLimiter, get_rate_limiter
+from .response_cache import (
+    ResponseCache,
+    get_response_cache,
+    is_cacheable_request,
+    make_cache_key,
+)
+
 
 # Dummy exception classes for requests timeouts if requests is not available
 class _RequestsReadTimeout(Exception):
@@ -58,6 +69,49 @@ DEFAULT_MAX_RETRIES = 7
 DEFAULT_INITIAL_BACKOFF = 2  # seconds
 DEFAULT_MAX_BACKOFF = 300  # 5 minutes
 
+# Converse API error codes that are retried with backoff
+RETRYABLE_ERROR_CODES = [
+    "ThrottlingException",
+    "ServiceQuotaExceededException",
+    "RequestLimitExceeded",
+    "TooManyRequestsException",
+    "ServiceUnavailableException",
+    "ModelErrorException",
+    "RequestTimeout",
+    "RequestTimeoutException",
+]
+
+# InvokeModel error codes that are retried for embedding requests
+EMBEDDING_RETRYABLE_ERROR_CODES = [
+    "ThrottlingException",
+    "ServiceQuotaExceededException",
+    "RequestLimitExceeded",
+    "TooManyRequestsException",
+    "ServiceUnavailableException",
+    "RequestTimeout",
+    "ReadTimeout",
+    "TimeoutError",
+    "RequestTimeoutException",
+]
+
+# Error codes that signal the caller is exceeding its quota and should slow down
+THROTTLING_ERROR_CODES = [
+    "ThrottlingException",
+    "ServiceQuotaExceededException",
+    "RequestLimitExceeded",
+    "TooManyRequestsException",
+]
+
+# Timeout and connection errors that are retried with backoff
+RETRYABLE_TIMEOUT_ERRORS = (
+    ReadTimeoutError,
+    ConnectTimeoutError,
+    EndpointConnectionError,
+    Urllib3ReadTimeoutError,
+    RequestsReadTimeout,
+    RequestsConnectTimeout,
+)
+
 
 # Models that support cachePoint functionality
 CACHEPOINT_SUPPORTED_MODELS = [
@@ -97,6 +151,9 @@ class BedrockClient:
         initial_backoff: float = DEFAULT_INITIAL_BACKOFF,
         max_backoff: float = DEFAULT_MAX_BACKOFF,
         metrics_enabled: bool = True,
+        concurrency_limiter: Optional[ConcurrencyLimiter] = None,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        response_cache: Optional[ResponseCache] = None,
     ):
         """
         Initialize a Bedrock client.
@@ -107,12 +164,21 @@ class BedrockClient:
             initial_backoff: Initial backoff time in seconds
             max_backoff: Maximum backoff time in seconds
             metrics_enabled: Whether to publish metrics
+            concurrency_limiter: Optional limiter for in-flight requests
+                (defaults to the process-wide limiter)
+            rate_limiter: Optional adaptive per-model rate limiter
+                (defaults to the process-wide limiter, see BEDROCK_RATE_LIMIT_ENABLED)
+            response_cache: Optional response cache for deterministic requests
+                (defaults to the process-wide cache, see BEDROCK_RESPONSE_CACHE_ENABLED)
         """
         self.region = region or os.environ.get("AWS_REGION")
         self.max_retries = max_retries
         self.initial_backoff = initial_backoff
         self.max_backoff = max_backoff
         self.metrics_enabled = metrics_enabled
+        self._concurrency_limiter = concurrency_limiter
+        self._rate_limiter = rate_limiter
+        self._response_cache = response_cache
         self._client = None
 
     @property
@@ -128,6 +194,25 @@ class BedrockClient:
             )
         return self._client
 
+    @property
+    def concurrency_limiter(self) -> ConcurrencyLimiter:
+        """Limiter shared by all in-flight requests of this client."""
+        return self._concurrency_limiter or get_concurrency_limiter()
+
+    @property
+    def rate_limiter(self) -> Optional[AdaptiveRateLimiter]:
+        """Adaptive rate limiter used to pace requests, or None if disabled."""
+        if self._rate_limiter is not None:
+            return self._rate_limiter
+        return get_rate_limiter()
+
+    @property
+    def response_cache(self) -> Optional[ResponseCache]:
+        """Response cache for deterministic requests, or None if disabled."""
+        if self._response_cache is not None:
+            return self._response_cache
+        return get_response_cache()
+
     def __call__(
         self,
         model_id: str,
@@ -289,6 +374,213 @@ class BedrockClient:
             max_retries if max_retries is not None else self.max_retries
         )
 
+        converse_params = self._build_converse_params(
+            model_id=model_id,
+            system_prompt=system_prompt,
+            content=content,
+            temperature=temperature,
+            top_k=top_k,
+            top_p=top_p,
+            max_tokens=max_tokens,
+        )
+
+        cache_key, cached_result = self._lookup_response_cache(
+            converse_params, model_id, context
+        )
+        if cached_result is not None:
+            return cached_result
+
+        batch_result = self._handle_batch_request(converse_params, model_id, context)
+        if batch_result is not None:
+            return batch_result
+
+        # Start timing the entire request
+        request_start_time = time.time()
+
+        result = self._invoke_with_retry(
+            model_id=model_id,
+            converse_params=converse_params,
+            retry_count=0,
+            max_retries=effective_max_retries,
+            request_start_time=request_start_time,
+            context=context,
+        )
+
+        if cache_key is not None:
+            self._store_response_cache(cache_key, result)
+        return result
+
+    async def invoke_model_async(
+        self,
+        model_id: str,
+        system_prompt: Union[str, List[Dict[str, str]]],
+        content: List[Dict[str, Any]],
+        temperature: Union[float, str] = 0.0,
+        top_k: Optional[Union[float, str]] = 5,
+        top_p: Optional[Union[float, str]] = 0.1,
+        max_tokens: Optional[Union[int, str]] = None,
+        max_retries: Optional[int] = None,
+        context: str = "Unspecified",
+    ) -> Dict[str, Any]:
+        """
+        Awaitable variant of invoke_model.
+
+        Requests are dispatched through the shared concurrency limiter, so any
+        number of coroutines can be gathered without a thread per call. Backoff
+        between retries is an asyncio sleep and does not hold a concurrency slot.
+        Arguments and return value are the same as invoke_model.
+
+        Returns:
+            Bedrock response object with metering information
+        """
+        # Track total requests
+        self._put_metric("BedrockRequestsTotal", 1)
+
+        # Use instance max_retries if not overridden
+        effective_max_retries = (
+            max_retries if max_retries is not None else self.max_retries
+        )
+
+        converse_params = self._build_converse_params(
+            model_id=model_id,
+            system_prompt=system_prompt,
+            content=content,
+            temperature=temperature,
+            top_k=top_k,
+            top_p=top_p,
+            max_tokens=max_tokens,
+        )
+
+        # Cache tiers may call DynamoDB or S3, keep them off the event loop
+        cache_key, cached_result = await asyncio.to_thread(
+            self._lookup_response_cache, converse_params, model_id, context
+        )
+        if cached_result is not None:
+            return cached_result
+
+        batch_result = self._handle_batch_request(converse_params, model_id, context)
+        if batch_result is not None:
+            return batch_result
+
+        # Resolve the boto3 client on the calling thread, client creation is not thread-safe
+        client = self.client
+        limiter = self.concurrency_limiter
+        rate_limiter = self.rate_limiter
+        request_start_time = time.time()
+        retry_count = 0
+
+        while True:
+            self._log_request(converse_params, retry_count, effective_max_retries)
+            if rate_limiter is not None:
+                self._record_rate_limit_wait(
+                    await rate_limiter.acquire_async(converse_params["modelId"])
+                )
+            attempt_start_time = time.time()
+            try:
+                response = await limiter.run_async(client.converse, **converse_params)
+            except Exception as e:
+                self._record_rate_limit_outcome(rate_limiter, converse_params, error=e)
+                backoff = self._handle_invoke_error(
+                    e, retry_count, effective_max_retries
+                )
+                await asyncio.sleep(backoff)
+                retry_count += 1
+                continue
+
+            duration = time.time() - attempt_start_time
+            self._record_rate_limit_outcome(
+                rate_limiter, converse_params, duration=duration
+            )
+            result = self._process_response(
+                response=response,
+                model_id=model_id,
+                retry_count=retry_count,
+                duration=duration,
+                request_start_time=request_start_time,
+                context=context,
+            )
+            if cache_key is not None:
+                await asyncio.to_thread(self._store_response_cache, cache_key, result)
+            return result
+
+    def _lookup_response_cache(
+        self, converse_params: Dict[str, Any], model_id: str, context: str
+    ) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Look up a deterministic request in the response cache.
+
+        Args:
+            converse_params: Parameters for the Bedrock converse API call
+            model_id: The Bedrock model ID as requested by the caller
+            context: Metering context prefix
+
+        Returns:
+            Tuple of (cache key, cached result). The key is None when the request
+            is not cached; the result is None on a miss.
+        """
+        cache = self.response_cache
+        if cache is None or not is_cacheable_request(converse_params):
+            return None, None
+
+        cache_key = make_cache_key(converse_params)
+        cached_response = cache.get(cache_key)
+        if cached_response is None:
+            self._put_metric("BedrockResponseCacheMisses", 1)
+            return cache_key, None
+
+        self._put_metric("BedrockResponseCacheHits", 1)
+        # No tokens were consumed, only the cache hit is metered
+        return cache_key, {
+            "response": cached_response,
+            "metering": {f"{context}/bedrock/{model_id}": {"responseCacheHits": 1}},
+        }
+
+    def _handle_batch_request(
+        self, converse_params: Dict[str, Any], model_id: str, context: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Pass a request to the active batch inference session, if any.
+
+        While collecting, requests of batched stages are recorded and raise
+        BatchRequestDeferred; while replaying they are answered from the batch
+        results.
+
+        Returns:
+            Batch result, or None to invoke the model on demand
+        """
+        session = get_batch_session()
+        if session is None:
+            return None
+        result = session.handle(converse_params, model_id, context)
+        if result is not None:
+            self._put_metric("BedrockBatchResponses", 1)
+        return result
+
+    def _store_response_cache(self, cache_key: str, result: Dict[str, Any]) -> None:
+        """Store a fresh result in the response cache and meter the miss."""
+        cache = self.response_cache
+        if cache is None:
+            return
+        cache.put(cache_key, result["response"])
+        for usage in result["metering"].values():
+            usage["responseCacheMisses"] = 1
+
+    def _build_converse_params(
+        self,
+        model_id: str,
+        system_prompt: Union[str, List[Dict[str, str]]],
+        content: List[Dict[str, Any]],
+        temperature: Union[float, str],
+        top_k: Optional[Union[float, str]],
+        top_p: Optional[Union[float, str]],
+        max_tokens: Optional[Union[int, str]],
+    ) -> Dict[str, Any]:
+        """
+        Build the parameters for a Bedrock converse API call.
+
+        Returns:
+            Keyword arguments for bedrock-runtime converse
+        """
         # Format system prompt if needed
         if isinstance(system_prompt, str):
             formatted_system_prompt = [{"text": system_prompt}]
@@ -454,20 +746,7 @@ class BedrockClient:
         if guardrail_config:
             converse_params["guardrailConfig"] = guardrail_config
 
-        # Start timing the entire request
-        request_start_time = time.time()
-
-        # Call the recursive retry function
-        result = self._invoke_with_retry(
-            model_id=model_id,
-            converse_params=converse_params,
-            retry_count=0,
-            max_retries=effective_max_retries,
-            request_start_time=request_start_time,
-            context=context,
-        )
-
-        return result
+        return converse_params
 
     def _invoke_with_retry(
         self,
@@ -476,18 +755,16 @@ class BedrockClient:
         retry_count: int,
         max_retries: int,
         request_start_time: float,
-        last_exception: Optional[Exception] = None,
         context: str = "Unspecified",
     ) -> Dict[str, Any]:
         """
-        Recursive helper method to handle retries for Bedrock invocation.
+        Invoke the Bedrock converse API, retrying throttling and timeout errors.
 
         Args:
             converse_params: Parameters for the Bedrock converse API call
             retry_count: Current retry attempt (0-based)
             max_retries: Maximum number of retry attempts
             request_start_time: Time when the original request started
-            last_exception: The last exception encountered (for final error reporting)
 
         Returns:
             Bedrock response object with metering information
@@ -495,190 +772,226 @@ class BedrockClient:
         Raises:
             Exception: The last exception encountered if max retries are exceeded
         """
-        try:
-            # Create a copy of the messages to sanitize for logging
-            sanitized_params = copy.deepcopy(converse_params)
-            if "messages" in sanitized_params:
-                sanitized_params["messages"] = self._sanitize_messages_for_logging(
-                    sanitized_params["messages"]
+        rate_limiter = self.rate_limiter
+        while True:
+            self._log_request(converse_params, retry_count, max_retries)
+            if rate_limiter is not None:
+                self._record_rate_limit_wait(
+                    rate_limiter.acquire(converse_params["modelId"])
+                )
+            attempt_start_time = time.time()
+            try:
+                response = self.concurrency_limiter.run(
+                    self.client.converse, **converse_params
                 )
+            except Exception as e:
+                self._record_rate_limit_outcome(rate_limiter, converse_params, error=e)
+                backoff = self._handle_invoke_error(e, retry_count, max_retries)
+                time.sleep(backoff)
+                retry_count += 1
+                continue
 
-            # Log detailed request parameters
-            logger.info(f"Bedrock request attempt {retry_count + 1}/{max_retries}:")
-            logger.info(f"  - model: {converse_params['modelId']}")
-            logger.info(f"  - inferenceConfig: {converse_params['inferenceConfig']}")
-            logger.info(f"  - system: {converse_params['system']}")
-            logger.info(f"  - messages: {sanitized_params['messages']}")
-            logger.info(
-                f"  - additionalModelRequestFields: {converse_params['additionalModelRequestFields']}"
+            duration = time.time() - attempt_start_time
+            self._record_rate_limit_outcome(
+                rate_limiter, converse_params, duration=duration
+            )
+            return self._process_response(
+                response=response,
+                model_id=model_id,
+                retry_count=retry_count,
+                duration=duration,
+                request_start_time=request_start_time,
+                context=context,
             )
 
-            # Log guardrail usage if configured
-            if "guardrailConfig" in converse_params:
-                logger.debug(
-                    f"  - guardrailConfig: {converse_params['guardrailConfig']}"
-                )
+    def _log_request(
+        self, converse_params: Dict[str, Any], retry_count: int, max_retries: int
+    ) -> None:
+        """Log the parameters of a converse request attempt."""
+        # Create a copy of the messages to sanitize for logging
+        sanitized_params = copy.deepcopy(converse_params)
+        if "messages" in sanitized_params:
+            sanitized_params["messages"] = self._sanitize_messages_for_logging(
+                sanitized_params["messages"]
+            )
 
-            # Start timing this attempt
-            attempt_start_time = time.time()
+        # Log detailed request parameters
+        logger.info(f"Bedrock request attempt {retry_count + 1}/{max_retries}:")
+        logger.info(f"  - model: {converse_params['modelId']}")
+        logger.info(f"  - inferenceConfig: {converse_params['inferenceConfig']}")
+        logger.info(f"  - system: {converse_params['system']}")
+        logger.info(f"  - messages: {sanitized_params['messages']}")
+        logger.info(
+            f"  - additionalModelRequestFields: {converse_params['additionalModelRequestFields']}"
+        )
 
-            # Make the API call
-            response = self.client.converse(**converse_params)
+        # Log guardrail usage if configured
+        if "guardrailConfig" in converse_params:
+            logger.debug(
+                f"  - guardrailConfig: {converse_params['guardrailConfig']}"
+            )
 
-            # Calculate duration
-            duration = time.time() - attempt_start_time
+    def _record_rate_limit_wait(self, wait: float) -> None:
+        """Publish the time a request was held back by the rate limiter."""
+        if wait > 0:
+            logger.debug(f"Rate limiter delayed Bedrock request by {wait:.2f}s")
+            self._put_metric("BedrockRateLimitDelay", wait * 1000, "Milliseconds")
 
-            # Log response details, but sanitize large content
-            sanitized_response = self._sanitize_response_for_logging(response)
-            logger.info(
-                f"Bedrock request successful after {retry_count + 1} attempts. Duration: {duration:.2f}s"
-            )
-            logger.debug(f"Response: {sanitized_response}")
-            logger.info(f"Token Usage: {response.get('usage')}")
-            # Track successful requests and latency
-            self._put_metric("BedrockRequestsSucceeded", 1)
-            self._put_metric("BedrockRequestLatency", duration * 1000, "Milliseconds")
-            if retry_count > 0:
-                self._put_metric("BedrockRetrySuccess", 1)
-
-            # Track token usage
-            if "usage" in response:
-                inputTokens = response["usage"].get("inputTokens", 0)
-                outputTokens = response["usage"].get("outputTokens", 0)
-                total_tokens = response["usage"].get("totalTokens", 0)
-                cacheReadInputTokens = response["usage"].get("cacheReadInputTokens", 0)
-                cacheWriteInputTokens = response["usage"].get(
-                    "cacheWriteInputTokens", 0
-                )
-                self._put_metric("InputTokens", inputTokens)
-                self._put_metric("OutputTokens", outputTokens)
-                self._put_metric("TotalTokens", total_tokens)
-                self._put_metric("CacheReadInputTokens", cacheReadInputTokens)
-                self._put_metric("CacheWriteInputTokens", cacheWriteInputTokens)
-
-            # Calculate total duration
-            total_duration = time.time() - request_start_time
-            self._put_metric(
-                "BedrockTotalLatency", total_duration * 1000, "Milliseconds"
-            )
+    def _record_rate_limit_outcome(
+        self,
+        rate_limiter: Optional[AdaptiveRateLimiter],
+        converse_params: Dict[str, Any],
+        duration: Optional[float] = None,
+        error: Optional[Exception] = None,
+    ) -> None:
+        """
+        Feed the outcome of an attempt back into the adaptive rate limiter.
 
-            # Create metering data
-            usage = response.get("usage", {})
-            response_with_metering = {
-                "response": response,
-                "metering": {f"{context}/bedrock/{model_id}": {**usage}},
-            }
+        Args:
+            rate_limiter: The limiter used for the attempt, if any
+            converse_params: Parameters of the attempt (the rate is keyed on modelId)
+            duration: Attempt duration in seconds for successful attempts
+            error: The exception raised by a failed attempt
+        """
+        if rate_limiter is None:
+            return
+        model_id = converse_params["modelId"]
+        if error is None:
+            rate_limiter.record_success(model_id, duration)
+        elif (
+            isinstance(error, ClientError)
+            and error.response["Error"]["Code"] in THROTTLING_ERROR_CODES
+        ):
+            rate_limiter.record_throttle(model_id)
+
+    def _process_response(
+        self,
+        response: Dict[str, Any],
+        model_id: str,
+        retry_count: int,
+        duration: float,
+        request_start_time: float,
+        context: str,
+    ) -> Dict[str, Any]:
+        """
+        Record metrics for a successful converse call and attach metering data.
 
-            return response_with_metering
+        Args:
+            response: Raw converse API response
+            model_id: The Bedrock model ID as requested by the caller
+            retry_count: Number of retries before the successful attempt
+            duration: Duration of the successful attempt in seconds
+            request_start_time: Time when the original request started
+            context: Metering context prefix
 
-        except ClientError as e:
-            # Handle boto3/botocore client errors (have response structure)
-            error_code = e.response["Error"]["Code"]
-            error_message = e.response["Error"]["Message"]
-
-            retryable_errors = [
-                "ThrottlingException",
-                "ServiceQuotaExceededException",
-                "RequestLimitExceeded",
-                "TooManyRequestsException",
-                "ServiceUnavailableException",
-                "ModelErrorException",
-                "RequestTimeout",
-                "RequestTimeoutException",
-            ]
+        Returns:
+            Bedrock response object with metering information
+        """
+        # Log response details, but sanitize large content
+        sanitized_response = self._sanitize_response_for_logging(response)
+        logger.info(
+            f"Bedrock request successful after {retry_count + 1} attempts. Duration: {duration:.2f}s"
+        )
+        logger.debug(f"Response: {sanitized_response}")
+        logger.info(f"Token Usage: {response.get('usage')}")
+        # Track successful requests and latency
+        self._put_metric("BedrockRequestsSucceeded", 1)
+        self._put_metric("BedrockRequestLatency", duration * 1000, "Milliseconds")
+        if retry_count > 0:
+            self._put_metric("BedrockRetrySuccess", 1)
+
+        # Track token usage
+        if "usage" in response:
+            inputTokens = response["usage"].get("inputTokens", 0)
+            outputTokens = response["usage"].get("outputTokens", 0)
+            total_tokens = response["usage"].get("totalTokens", 0)
+            cacheReadInputTokens = response["usage"].get("cacheReadInputTokens", 0)
+            cacheWriteInputTokens = response["usage"].get(
+                "cacheWriteInputTokens", 0
+            )
+            self._put_metric("InputTokens", inputTokens)
+            self._put_metric("OutputTokens", outputTokens)
+            self._put_metric("TotalTokens", total_tokens)
+            self._put_metric("CacheReadInputTokens", cacheReadInputTokens)
+            self._put_metric("CacheWriteInputTokens", cacheWriteInputTokens)
+
+        # Calculate total duration
+        total_duration = time.time() - request_start_time
+        self._put_metric(
+            "BedrockTotalLatency", total_duration * 1000, "Milliseconds"
+        )
 
-            if error_code in retryable_errors:
-                self._put_metric("BedrockThrottles", 1)
+        # Create metering data
+        usage = response.get("usage", {})
+        return {
+            "response": response,
+            "metering": {f"{context}/bedrock/{model_id}": {**usage}},
+        }
 
-                # Check if we've reached max retries
-                if retry_count >= max_retries:
-                    logger.error(
-                        f"Max retries ({max_retries}) exceeded. Last error: {error_message}"
-                    )
-                    self._put_metric("BedrockRequestsFailed", 1)
-                    self._put_metric("BedrockMaxRetriesExceeded", 1)
-                    raise
+    def _handle_invoke_error(
+        self, error: Exception, retry_count: int, max_retries: int
+    ) -> float:
+        """
+        Classify a failed converse attempt and decide whether to retry.
 
-                # Calculate backoff time
-                backoff = self._calculate_backoff(retry_count)
-                logger.warning(
-                    f"Bedrock throttling occurred (attempt {retry_count + 1}/{max_retries}). "
-                    f"Error: {error_message}. "
-                    f"Backing off for {backoff:.2f}s"
-                )
+        Args:
+            error: The exception raised by the attempt
+            retry_count: Current retry attempt (0-based)
+            max_retries: Maximum number of retry attempts
 
-                # Sleep for backoff period
-                time.sleep(backoff)
+        Returns:
+            Backoff time in seconds before the next attempt
 
-                # Recursive call with incremented retry count
-                return self._invoke_with_retry(
-                    model_id=model_id,
-                    converse_params=converse_params,
-                    retry_count=retry_count + 1,
-                    max_retries=max_retries,
-                    request_start_time=request_start_time,
-                    last_exception=e,
-                    context=context,
-                )
-            else:
+        Raises:
+            Exception: The original error if it is not retryable or retries are exhausted
+        """
+        if isinstance(error, ClientError):
+            # Handle boto3/botocore client errors (have response structure)
+            error_code = error.response["Error"]["Code"]
+            error_message = error.response["Error"]["Message"]
+
+            if error_code not in RETRYABLE_ERROR_CODES:
                 logger.error(
                     f"Non-retryable Bedrock error: {error_code} - {error_message}"
                 )
                 self._put_metric("BedrockRequestsFailed", 1)
                 self._put_metric("BedrockNonRetryableErrors", 1)
-                raise
-
-        except (
-            ReadTimeoutError,
-            ConnectTimeoutError,
-            EndpointConnectionError,
-            Urllib3ReadTimeoutError,
-            RequestsReadTimeout,
-            RequestsConnectTimeout,
-        ) as e:
-            # Handle timeout and connection errors (these are retryable)
-            error_message = str(e)
-
-            self._put_metric("BedrockTimeouts", 1)
-
-            # Check if we've reached max retries
-            if retry_count >= max_retries:
-                logger.error(
-                    f"Max retries ({max_retries}) exceeded. Last timeout error: {error_message}"
-                )
-                self._put_metric("BedrockRequestsFailed", 1)
-                self._put_metric("BedrockMaxRetriesExceeded", 1)
-                raise
-
-            # Calculate backoff time
-            backoff = self._calculate_backoff(retry_count)
-            logger.warning(
-                f"Bedrock timeout occurred (attempt {retry_count + 1}/{max_retries}). "
-                f"Error: {error_message}. "
-                f"Backing off for {backoff:.2f}s"
-            )
+                raise error
 
-            # Sleep for backoff period
-            time.sleep(backoff)
+            self._put_metric("BedrockThrottles", 1)
+            description = "throttling"
+            last_error_label = "Last error"
 
-            # Recursive call with incremented retry count
-            return self._invoke_with_retry(
-                model_id=model_id,
-                converse_params=converse_params,
-                retry_count=retry_count + 1,
-                max_retries=max_retries,
-                request_start_time=request_start_time,
-                last_exception=e,
-                context=context,
-            )
+        elif isinstance(error, RETRYABLE_TIMEOUT_ERRORS):
+            # Handle timeout and connection errors (these are retryable)
+            error_message = str(error)
+            self._put_metric("BedrockTimeouts", 1)
+            description = "timeout"
+            last_error_label = "Last timeout error"
 
-        except Exception as e:
+        else:
             # Handle unexpected errors (not retryable)
-            error_message = str(e)
-            logger.error(f"Unexpected Bedrock error: {error_message}", exc_info=True)
+            logger.error(f"Unexpected Bedrock error: {str(error)}", exc_info=error)
             self._put_metric("BedrockRequestsFailed", 1)
             self._put_metric("BedrockUnexpectedErrors", 1)
-            raise
+            raise error
+
+        # Check if we've reached max retries
+        if retry_count >= max_retries:
+            logger.error(
+                f"Max retries ({max_retries}) exceeded. {last_error_label}: {error_message}"
+            )
+            self._put_metric("BedrockRequestsFailed", 1)
+            self._put_metric("BedrockMaxRetriesExceeded", 1)
+            raise error
+
+        backoff = self._calculate_backoff(retry_count)
+        logger.warning(
+            f"Bedrock {description} occurred (attempt {retry_count + 1}/{max_retries}). "
+            f"Error: {error_message}. "
+            f"Backing off for {backoff:.2f}s"
+        )
+        return backoff
 
     def get_guardrail_config(self) -> Optional[Dict[str, str]]:
         """
@@ -748,7 +1061,6 @@ class BedrockClient:
             # Default format for other models
             request_body = json.dumps({"text": normalized_text})
 
-        # Call the recursive embedding function
         return self._generate_embedding_with_retry(
             model_id=model_id,
             request_body=request_body,
@@ -764,10 +1076,12 @@ class BedrockClient:
         normalized_text: str,
         retry_count: int,
         max_retries: int,
-        last_exception: Optional[Exception] = None,
     ) -> List[float]:
         """
-        Recursive helper method to handle retries for embedding generation.
+        Invoke an embedding model, retrying throttling errors.
+
+        Each attempt holds a slot of the concurrency limiter, which is released
+        before backing off.
 
         Args:
             model_id: The embedding model ID
@@ -775,7 +1089,6 @@ class BedrockClient:
             normalized_text: Normalized input text (for logging)
             retry_count: Current retry attempt (0-based)
             max_retries: Maximum number of retry attempts
-            last_exception: The last exception encountered (for final error reporting)
 
         Returns:
             List of floats representing the embedding vector
@@ -783,7 +1096,7 @@ class BedrockClient:
         Raises:
             Exception: The last exception encountered if max retries are exceeded
         """
-        try:
+        while True:
             logger.info(
                 f"Bedrock embedding request attempt {retry_count + 1}/{max_retries}:"
             )
@@ -791,23 +1104,26 @@ class BedrockClient:
             logger.debug(f"  - input text length: {len(normalized_text)} characters")
 
             attempt_start_time = time.time()
-            response = self.client.invoke_model(
-                modelId=model_id,
-                contentType="application/json",
-                accept="application/json",
-                body=request_body,
-            )
-            duration = time.time() - attempt_start_time
+            try:
+                response = self.concurrency_limiter.run(
+                    self.client.invoke_model,
+                    modelId=model_id,
+                    contentType="application/json",
+                    accept="application/json",
+                    body=request_body,
+                )
+                duration = time.time() - attempt_start_time
 
-            # Extract the embedding vector from response
-            response_body = json.loads(response["body"].read())
+                # Extract the embedding vector from response
+                response_body = json.loads(response["body"].read())
+            except Exception as e:
+                backoff = self._handle_embedding_error(e, retry_count, max_retries)
+                time.sleep(backoff)
+                retry_count += 1
+                continue
 
-            # Handle different response formats based on the model
-            if "amazon.titan-embed" in model_id:
-                embedding = response_body.get("embedding", [])
-            else:
-                # Default extraction format
-                embedding = response_body.get("embedding", [])
+            # Titan and the default format both return the vector as "embedding"
+            embedding = response_body.get("embedding", [])
 
             # Track successful requests and latency
             self._put_metric("BedrockEmbeddingRequestsSucceeded", 1)
@@ -818,69 +1134,60 @@ class BedrockClient:
             logger.debug(f"Generated embedding with {len(embedding)} dimensions")
             return embedding
 
-        except ClientError as e:
-            error_code = e.response["Error"]["Code"]
-            error_message = e.response["Error"]["Message"]
-
-            retryable_errors = [
-                "ThrottlingException",
-                "ServiceQuotaExceededException",
-                "RequestLimitExceeded",
-                "TooManyRequestsException",
-                "ServiceUnavailableException",
-                "RequestTimeout",
-                "ReadTimeout",
-                "TimeoutError",
-                "RequestTimeoutException",
-            ]
+    def _handle_embedding_error(
+        self, error: Exception, retry_count: int, max_retries: int
+    ) -> float:
+        """
+        Classify a failed embedding attempt and decide whether to retry.
 
-            if error_code in retryable_errors:
-                self._put_metric("BedrockEmbeddingThrottles", 1)
+        Args:
+            error: The exception raised by the attempt
+            retry_count: Current retry attempt (0-based)
+            max_retries: Maximum number of retry attempts
 
-                # Check if we've reached max retries
-                if retry_count >= max_retries:
-                    logger.error(
-                        f"Max retries ({max_retries}) exceeded for embedding. Last error: {error_message}"
-                    )
-                    self._put_metric("BedrockEmbeddingRequestsFailed", 1)
-                    self._put_metric("BedrockEmbeddingMaxRetriesExceeded", 1)
-                    raise
+        Returns:
+            Backoff time in seconds before the next attempt
 
-                # Calculate backoff time
-                backoff = self._calculate_backoff(retry_count)
-                logger.warning(
-                    f"Bedrock throttling occurred (attempt {retry_count + 1}/{max_retries}). "
-                    f"Error: {error_message}. "
-                    f"Backing off for {backoff:.2f}s"
-                )
+        Raises:
+            Exception: The original error if it is not retryable or retries are exhausted
+        """
+        if not isinstance(error, ClientError):
+            logger.error(
+                f"Unexpected error generating embedding: {str(error)}", exc_info=error
+            )
+            self._put_metric("BedrockEmbeddingRequestsFailed", 1)
+            self._put_metric("BedrockEmbeddingUnexpectedErrors", 1)
+            raise error
 
-                # Sleep for backoff period
-                time.sleep(backoff)
+        error_code = error.response["Error"]["Code"]
+        error_message = error.response["Error"]["Message"]
 
-                # Recursive call with incremented retry count
-                return self._generate_embedding_with_retry(
-                    model_id=model_id,
-                    request_body=request_body,
-                    normalized_text=normalized_text,
-                    retry_count=retry_count + 1,
-                    max_retries=max_retries,
-                    last_exception=e,
-                )
-            else:
-                logger.error(
-                    f"Non-retryable Bedrock error for embedding: {error_code} - {error_message}"
-                )
-                self._put_metric("BedrockEmbeddingRequestsFailed", 1)
-                self._put_metric("BedrockEmbeddingNonRetryableErrors", 1)
-                raise
+        if error_code not in EMBEDDING_RETRYABLE_ERROR_CODES:
+            logger.error(
+                f"Non-retryable Bedrock error for embedding: {error_code} - {error_message}"
+            )
+            self._put_metric("BedrockEmbeddingRequestsFailed", 1)
+            self._put_metric("BedrockEmbeddingNonRetryableErrors", 1)
+            raise error
+
+        self._put_metric("BedrockEmbeddingThrottles", 1)
 
-        except Exception as e:
+        # Check if we've reached max retries
+        if retry_count >= max_retries:
             logger.error(
-                f"Unexpected error generating embedding: {str(e)}", exc_info=True
+                f"Max retries ({max_retries}) exceeded for embedding. Last error: {error_message}"
             )
             self._put_metric("BedrockEmbeddingRequestsFailed", 1)
-            self._put_metric("BedrockEmbeddingUnexpectedErrors", 1)
-            raise
+            self._put_metric("BedrockEmbeddingMaxRetriesExceeded", 1)
+            raise error
+
+        backoff = self._calculate_backoff(retry_count)
+        logger.warning(
+            f"Bedrock throttling occurred (attempt {retry_count + 1}/{max_retries}). "
+            f"Error: {error_message}. "
+            f"Backing off for {backoff:.2f}s"
+        )
+        return backoff
 
     def extract_text_from_response(self, response: Dict[str, Any]) -> str:
         """
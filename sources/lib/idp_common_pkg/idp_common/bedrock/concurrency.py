@@ -0,0 +1,199 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Process-wide concurrency control for Bedrock invocations.
+
+All BedrockClient instances share one limiter so that synchronous calls made
+from service thread pools and awaitable calls made from asyncio code draw from
+the same budget of in-flight requests.
+"""
+
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Coroutine, Iterator, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Default maximum number of concurrent Bedrock requests per process
+DEFAULT_MAX_CONCURRENCY = 50
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+class ConcurrencyLimiter:
+    """
+    Semaphore-based limiter for in-flight Bedrock requests.
+
+    Synchronous callers hold a slot only while the request is on the wire, never
+    while backing off. Asynchronous callers are dispatched to a dedicated thread
+    pool whose size equals the limit, so any number of coroutines can wait for a
+    slot without each one occupying a thread.
+    """
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
+        """
+        Initialize the limiter.
+
+        Args:
+            max_concurrency: Maximum number of requests in flight at once
+        """
+        if max_concurrency < 1:
+            raise ValueError(
+                f"max_concurrency must be a positive integer, got {max_concurrency}"
+            )
+        self.max_concurrency = max_concurrency
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold one concurrency slot for the duration of the block."""
+        self._semaphore.acquire()
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+
+    def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking call while holding a slot.
+
+        Args:
+            func: Callable to run
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            The return value of func
+        """
+        with self.slot():
+            return func(*args, **kwargs)
+
+    async def run_async(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking call on the limiter's thread pool while holding a slot.
+
+        Args:
+            func: Callable to run
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            The return value of func
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(), lambda: self.run(func, *args, **kwargs)
+        )
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Lazily create the thread pool used by run_async."""
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_concurrency,
+                        thread_name_prefix="bedrock",
+                    )
+        return self._executor
+
+    def shutdown(self) -> None:
+        """Shut down the thread pool used by run_async."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+
+def get_concurrency_limiter() -> ConcurrencyLimiter:
+    """
+    Get the process-wide Bedrock concurrency limiter.
+
+    The limit is read from the BEDROCK_MAX_CONCURRENCY environment variable the
+    first time the limiter is created.
+
+    Returns:
+        Shared ConcurrencyLimiter instance
+    """
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                max_concurrency = int(
+                    os.environ.get("BEDROCK_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)
+                )
+                logger.debug(
+                    f"Creating Bedrock concurrency limiter with {max_concurrency} slots"
+                )
+                _limiter = ConcurrencyLimiter(max_concurrency)
+    return _limiter
+
+
+def set_max_concurrency(max_concurrency: int) -> ConcurrencyLimiter:
+    """
+    Replace the process-wide limiter with one of a different size.
+
+    Requests already holding a slot on the previous limiter are unaffected.
+
+    Args:
+        max_concurrency: Maximum number of requests in flight at once
+
+    Returns:
+        The new shared ConcurrencyLimiter
+    """
+    global _limiter
+    with _limiter_lock:
+        previous = _limiter
+        _limiter = ConcurrencyLimiter(max_concurrency)
+    if previous is not None:
+        previous.shutdown()
+    return _limiter
+
+
+def run_coroutine(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    Run a coroutine to completion from synchronous code.
+
+    Services use this to fan out invoke_model_async calls from their synchronous
+    entry points. When the calling thread already runs an event loop (e.g. a
+    notebook or an agent tool), the coroutine runs on a new loop in a helper
+    thread instead. Context variables such as batch_labels are carried over.
+
+    Args:
+        coro: Coroutine to run
+
+    Returns:
+        The return value of the coroutine
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    result: Any = None
+    error: Optional[BaseException] = None
+    context = contextvars.copy_context()
+
+    def run_in_new_loop() -> None:
+        nonlocal result, error
+        try:
+            result = context.run(asyncio.run, coro)
+        except BaseException as e:
+            error = e
+
+    thread = threading.Thread(target=run_in_new_loop)
+    thread.start()
+    thread.join()
+    if error is not None:
+        raise error
+    return result
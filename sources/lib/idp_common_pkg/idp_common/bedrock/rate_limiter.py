@@ -0,0 +1,334 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Adaptive client-side rate limiting for Bedrock invocations.
+
+Each model ID gets a token bucket whose refill rate is tuned by
+additive-increase/multiplicative-decrease (AIMD): every successful request
+nudges the rate up, every throttle cuts it down. Threads and coroutines that
+share the limiter therefore pace themselves below the service quota instead of
+retrying in lockstep after a ThrottlingException.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Default AIMD settings (rates are requests per second)
+DEFAULT_INITIAL_RATE = 10.0
+DEFAULT_MIN_RATE = 0.1
+DEFAULT_MAX_RATE = 100.0
+DEFAULT_BURST = 10.0
+DEFAULT_ADDITIVE_INCREASE = 1.0  # requests/second gained per second of successful traffic
+DEFAULT_MULTIPLICATIVE_DECREASE = 0.5
+DEFAULT_DECREASE_COOLDOWN = 1.0  # seconds
+STATE_SAVE_INTERVAL = 30.0  # seconds between state file writes on success
+
+_UNSET = object()
+_rate_limiter = _UNSET
+_rate_limiter_lock = threading.Lock()
+
+
+class _TokenBucket:
+    """Token bucket state for one model."""
+
+    __slots__ = ("rate", "tokens", "updated", "last_decrease")
+
+    def __init__(self, rate: float, tokens: float, now: float):
+        self.rate = rate
+        self.tokens = tokens
+        self.updated = now
+        self.last_decrease = float("-inf")
+
+
+class AdaptiveRateLimiter:
+    """
+    Per-model token bucket limiter with AIMD rate adjustment.
+
+    Callers reserve a token before each request. When the bucket is empty the
+    reservation returns the time until the token becomes available, so waiting
+    callers are released in order at the current rate without polling.
+
+    Rates are adjusted from observed outcomes:
+    - success: rate += additive_increase / rate, i.e. roughly additive_increase
+      requests/second per second of traffic. If latency_target is set and the
+      request took longer, the rate is held instead of increased.
+    - throttle: rate *= multiplicative_decrease, at most once per
+      decrease_cooldown so that a burst of concurrent throttles counts once.
+    """
+
+    def __init__(
+        self,
+        initial_rate: float = DEFAULT_INITIAL_RATE,
+        min_rate: float = DEFAULT_MIN_RATE,
+        max_rate: float = DEFAULT_MAX_RATE,
+        burst: float = DEFAULT_BURST,
+        additive_increase: float = DEFAULT_ADDITIVE_INCREASE,
+        multiplicative_decrease: float = DEFAULT_MULTIPLICATIVE_DECREASE,
+        decrease_cooldown: float = DEFAULT_DECREASE_COOLDOWN,
+        latency_target: Optional[float] = None,
+        state_path: Optional[str] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            initial_rate: Starting rate for models without saved state (requests/second)
+            min_rate: Lower bound for the rate
+            max_rate: Upper bound for the rate
+            burst: Maximum number of tokens a bucket can accumulate
+            additive_increase: Rate increase per second of successful traffic
+            multiplicative_decrease: Factor applied to the rate on throttling
+            decrease_cooldown: Minimum seconds between two decreases for a model
+            latency_target: Optional latency in seconds above which the rate is held
+            state_path: Optional JSON file used to persist learned rates
+            clock: Monotonic clock function (for testing)
+        """
+        if not 0 < min_rate <= max_rate:
+            raise ValueError(
+                f"Invalid rate bounds: min_rate={min_rate}, max_rate={max_rate}"
+            )
+        if not 0 < multiplicative_decrease < 1:
+            raise ValueError(
+                f"multiplicative_decrease must be between 0 and 1, got {multiplicative_decrease}"
+            )
+        self.initial_rate = min(max(initial_rate, min_rate), max_rate)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = max(1.0, burst)
+        self.additive_increase = additive_increase
+        self.multiplicative_decrease = multiplicative_decrease
+        self.decrease_cooldown = decrease_cooldown
+        self.latency_target = latency_target
+        self.state_path = state_path
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, _TokenBucket] = {}
+        self._saved_rates: Dict[str, float] = {}
+        self._last_save = clock()
+        if state_path:
+            self._saved_rates = self._load_state(state_path)
+
+    def reserve(self, model_id: str) -> float:
+        """
+        Reserve one token for a request to model_id.
+
+        Args:
+            model_id: Bedrock model ID
+
+        Returns:
+            Seconds the caller must wait before sending the request
+        """
+        with self._lock:
+            now = self._clock()
+            bucket = self._get_bucket(model_id, now)
+            self._refill(bucket, now)
+            bucket.tokens -= 1
+            if bucket.tokens >= 0:
+                return 0.0
+            return -bucket.tokens / bucket.rate
+
+    def acquire(self, model_id: str) -> float:
+        """
+        Block until a request to model_id may be sent.
+
+        Returns:
+            Seconds spent waiting
+        """
+        wait = self.reserve(model_id)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, model_id: str) -> float:
+        """
+        Wait without blocking the event loop until a request to model_id may be sent.
+
+        Returns:
+            Seconds spent waiting
+        """
+        wait = self.reserve(model_id)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def record_success(self, model_id: str, latency: Optional[float] = None) -> None:
+        """
+        Additively increase the rate for model_id after a successful request.
+
+        Args:
+            model_id: Bedrock model ID
+            latency: Optional request latency in seconds
+        """
+        if self.latency_target is not None and latency is not None:
+            if latency > self.latency_target:
+                return
+
+        with self._lock:
+            now = self._clock()
+            bucket = self._get_bucket(model_id, now)
+            self._refill(bucket, now)
+            bucket.rate = min(
+                self.max_rate, bucket.rate + self.additive_increase / bucket.rate
+            )
+            save_due = now - self._last_save >= STATE_SAVE_INTERVAL
+
+        if save_due:
+            self.save_state()
+
+    def record_throttle(self, model_id: str) -> None:
+        """
+        Multiplicatively decrease the rate for model_id after a throttling error.
+
+        Args:
+            model_id: Bedrock model ID
+        """
+        with self._lock:
+            now = self._clock()
+            bucket = self._get_bucket(model_id, now)
+            self._refill(bucket, now)
+            # Drop any accumulated burst so queued callers slow down immediately
+            bucket.tokens = min(bucket.tokens, 0.0)
+            if now - bucket.last_decrease < self.decrease_cooldown:
+                return
+            previous_rate = bucket.rate
+            bucket.rate = max(self.min_rate, bucket.rate * self.multiplicative_decrease)
+            bucket.last_decrease = now
+
+        logger.info(
+            f"Bedrock throttling for {model_id}: "
+            f"rate reduced from {previous_rate:.2f} to {bucket.rate:.2f} requests/second"
+        )
+        self.save_state()
+
+    def get_rate(self, model_id: str) -> float:
+        """Current rate for model_id in requests per second."""
+        with self._lock:
+            bucket = self._buckets.get(model_id)
+            if bucket is not None:
+                return bucket.rate
+            return self._saved_rates.get(model_id, self.initial_rate)
+
+    def rates(self) -> Dict[str, float]:
+        """Current rates for all known models."""
+        with self._lock:
+            rates = dict(self._saved_rates)
+            rates.update({model_id: b.rate for model_id, b in self._buckets.items()})
+            return rates
+
+    def save_state(self) -> None:
+        """Persist learned rates to state_path, if configured."""
+        if not self.state_path:
+            return
+        with self._lock:
+            self._last_save = self._clock()
+        rates = self.rates()
+        temp_path = f"{self.state_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "w") as f:
+                json.dump({"rates": rates}, f)
+            os.replace(temp_path, self.state_path)
+        except OSError as e:
+            logger.warning(f"Failed to save Bedrock rate limiter state: {e}")
+
+    def _get_bucket(self, model_id: str, now: float) -> _TokenBucket:
+        """Get or create the bucket for a model. Caller must hold the lock."""
+        bucket = self._buckets.get(model_id)
+        if bucket is None:
+            rate = self._saved_rates.get(model_id, self.initial_rate)
+            rate = min(max(rate, self.min_rate), self.max_rate)
+            bucket = self._buckets[model_id] = _TokenBucket(
+                rate, min(self.burst, max(1.0, rate)), now
+            )
+        return bucket
+
+    def _refill(self, bucket: _TokenBucket, now: float) -> None:
+        """Add tokens accrued since the last update. Caller must hold the lock."""
+        elapsed = now - bucket.updated
+        if elapsed > 0:
+            bucket.tokens = min(self.burst, bucket.tokens + elapsed * bucket.rate)
+            bucket.updated = now
+
+    @staticmethod
+    def _load_state(state_path: str) -> Dict[str, float]:
+        """Load persisted rates, ignoring a missing or unreadable file."""
+        try:
+            with open(state_path) as f:
+                rates = json.load(f).get("rates", {})
+            return {str(k): float(v) for k, v in rates.items() if float(v) > 0}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable Bedrock rate limiter state: {e}")
+            return {}
+
+
+def get_rate_limiter() -> Optional[AdaptiveRateLimiter]:
+    """
+    Get the process-wide Bedrock rate limiter.
+
+    The limiter is created on first use from environment variables:
+    BEDROCK_RATE_LIMIT_ENABLED (default false), BEDROCK_RATE_LIMIT_INITIAL_RPS,
+    BEDROCK_RATE_LIMIT_MIN_RPS, BEDROCK_RATE_LIMIT_MAX_RPS,
+    BEDROCK_RATE_LIMIT_LATENCY_TARGET_SECONDS and BEDROCK_RATE_LIMIT_STATE_PATH.
+    Because it lives at module level, learned rates carry over between warm
+    Lambda invocations; set BEDROCK_RATE_LIMIT_STATE_PATH (e.g. under /tmp) to
+    also keep them across runtime restarts in the same execution environment.
+
+    Returns:
+        Shared AdaptiveRateLimiter, or None when rate limiting is disabled
+    """
+    global _rate_limiter
+    if _rate_limiter is _UNSET:
+        with _rate_limiter_lock:
+            if _rate_limiter is _UNSET:
+                _rate_limiter = _create_rate_limiter_from_env()
+    return _rate_limiter  # type: ignore[return-value]
+
+
+def set_rate_limiter(
+    rate_limiter: Optional[AdaptiveRateLimiter],
+) -> Optional[AdaptiveRateLimiter]:
+    """
+    Replace the process-wide rate limiter.
+
+    Args:
+        rate_limiter: New limiter, or None to disable rate limiting
+
+    Returns:
+        The limiter that was replaced (None if it was disabled or never created)
+    """
+    global _rate_limiter
+    with _rate_limiter_lock:
+        previous = _rate_limiter
+        _rate_limiter = rate_limiter
+    return None if previous is _UNSET else previous  # type: ignore[return-value]
+
+
+def _create_rate_limiter_from_env() -> Optional[AdaptiveRateLimiter]:
+    """Build the shared limiter from environment variables."""
+    # Opt-in: a fixed starting rate would throttle deployments with higher quotas
+    enabled = os.environ.get("BEDROCK_RATE_LIMIT_ENABLED", "false").lower()
+    if enabled not in ("true", "1", "yes", "on"):
+        logger.info("Bedrock client-side rate limiting is disabled")
+        return None
+
+    latency_target = os.environ.get("BEDROCK_RATE_LIMIT_LATENCY_TARGET_SECONDS")
+    return AdaptiveRateLimiter(
+        initial_rate=float(
+            os.environ.get("BEDROCK_RATE_LIMIT_INITIAL_RPS", DEFAULT_INITIAL_RATE)
+        ),
+        min_rate=float(os.environ.get("BEDROCK_RATE_LIMIT_MIN_RPS", DEFAULT_MIN_RATE)),
+        max_rate=float(os.environ.get("BEDROCK_RATE_LIMIT_MAX_RPS", DEFAULT_MAX_RATE)),
+        latency_target=float(latency_target) if latency_target else None,
+        state_path=os.environ.get("BEDROCK_RATE_LIMIT_STATE_PATH") or None,
+    )
@@ -0,0 +1,355 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Content-addressed cache for Bedrock converse responses.
+
+Responses are keyed on a SHA-256 hash of the complete converse request (model
+ID, system prompt, messages including image and document bytes, inference
+parameters and guardrail configuration). Reprocessing a document or rerunning a
+test set with an unchanged configuration therefore reuses earlier responses
+instead of paying for the same inference again.
+
+The cache is opt-in and layered: an in-process LRU tier backed by optional
+DynamoDB and S3 tiers shared across Lambda invocations.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import boto3
+
+logger = logging.getLogger(__name__)
+
+# Bump when the key derivation or stored format changes to invalidate old entries
+CACHE_KEY_VERSION = "v1"
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60  # 7 days
+DEFAULT_MAX_MEMORY_ENTRIES = 256
+DEFAULT_S3_PREFIX = "bedrock-response-cache"
+
+# Stay well below the 400 KB DynamoDB item size limit
+MAX_DYNAMODB_ITEM_BYTES = 350 * 1024
+
+_UNSET = object()
+_response_cache = _UNSET
+_response_cache_lock = threading.Lock()
+
+
+def _canonical_default(value: Any) -> Any:
+    """JSON encoder fallback that replaces binary payloads with their digest."""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {"__sha256__": hashlib.sha256(value).hexdigest()}
+    return str(value)
+
+
+def make_cache_key(converse_params: Dict[str, Any]) -> str:
+    """
+    Build the content address for a converse request.
+
+    Args:
+        converse_params: Keyword arguments for bedrock-runtime converse
+
+    Returns:
+        Hex SHA-256 digest identifying the request
+    """
+    canonical = json.dumps(
+        converse_params,
+        sort_keys=True,
+        separators=(",", ":"),
+        default=_canonical_default,
+    )
+    digest = hashlib.sha256(f"{CACHE_KEY_VERSION}:{canonical}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def is_cacheable_request(converse_params: Dict[str, Any]) -> bool:
+    """
+    Check whether a request is deterministic enough to be served from cache.
+
+    Only requests with an explicit temperature of 0 and no top-p sampling are
+    cached. Without a temperature the model samples at its default (usually
+    1.0), so responses are expected to vary between calls.
+    """
+    inference_config = converse_params.get("inferenceConfig") or {}
+    temperature = inference_config.get("temperature")
+    if temperature is None or float(temperature) > 0:
+        return False
+    return float(inference_config.get("topP") or 0) <= 0
+
+
+def is_cacheable_response(response: Dict[str, Any]) -> bool:
+    """Check whether a response should be stored (guardrail interventions are not)."""
+    return response.get("stopReason") != "guardrail_intervened"
+
+
+class MemoryCacheTier:
+    """In-process LRU tier with per-entry expiry."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_MEMORY_ENTRIES):
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def put(self, key: str, payload: str, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DynamoDBCacheTier:
+    """
+    DynamoDB tier using PK/SK items with an ExpiresAfter TTL attribute, so it
+    can share the tracking table like the granular assessment task cache.
+    """
+
+    name = "dynamodb"
+
+    def __init__(self, table_name: str, region: Optional[str] = None):
+        self.table_name = table_name
+        self._region = region
+        self._table = None
+
+    @property
+    def table(self):
+        if self._table is None:
+            dynamodb = boto3.resource("dynamodb", region_name=self._region)
+            self._table = dynamodb.Table(self.table_name)  # type: ignore[attr-defined]
+        return self._table
+
+    def get(self, key: str) -> Optional[str]:
+        response = self.table.get_item(Key={"PK": f"llmcache#{key}", "SK": "response"})
+        item = response.get("Item")
+        if not item:
+            return None
+        # DynamoDB deletes expired items lazily, so check the TTL explicitly
+        if int(item.get("ExpiresAfter", 0)) <= time.time():
+            return None
+        return item.get("response")
+
+    def put(self, key: str, payload: str, expires_at: float) -> None:
+        if len(payload.encode("utf-8")) > MAX_DYNAMODB_ITEM_BYTES:
+            logger.debug(f"Response for {key} too large for DynamoDB cache tier, skipping")
+            return
+        self.table.put_item(
+            Item={
+                "PK": f"llmcache#{key}",
+                "SK": "response",
+                "cached_at": str(int(time.time())),
+                "response": payload,
+                "ExpiresAfter": int(expires_at),
+            }
+        )
+
+
+class S3CacheTier:
+    """S3 tier for large responses; expiry is stored as object metadata."""
+
+    name = "s3"
+
+    def __init__(self, bucket: str, prefix: str = DEFAULT_S3_PREFIX, region: Optional[str] = None):
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self._region = region
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = boto3.client("s3", region_name=self._region)
+        return self._client
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}/{key[:2]}/{key}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))
+        except self.client.exceptions.NoSuchKey:
+            return None
+        expires_at = float(response.get("Metadata", {}).get("expires-at", 0))
+        if expires_at <= time.time():
+            return None
+        return response["Body"].read().decode("utf-8")
+
+    def put(self, key: str, payload: str, expires_at: float) -> None:
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=self._object_key(key),
+            Body=payload.encode("utf-8"),
+            ContentType="application/json",
+            Metadata={"expires-at": str(int(expires_at))},
+        )
+
+
+class ResponseCache:
+    """
+    Layered Bedrock response cache.
+
+    Lookups go through the tiers in order; a hit in a slower tier is copied
+    into the faster tiers before it is returned. Stores write to every tier.
+    Errors from remote tiers are logged and treated as misses so that the cache
+    can never fail an inference.
+    """
+
+    def __init__(self, tiers: List[Any], ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        """
+        Initialize the cache.
+
+        Args:
+            tiers: Cache tiers ordered from fastest to slowest
+            ttl_seconds: Lifetime of stored responses in seconds
+        """
+        self.tiers = tiers
+        self.ttl_seconds = ttl_seconds
+        self._counter_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Cache key from make_cache_key
+
+        Returns:
+            The cached converse response, or None on a miss
+        """
+        for index, tier in enumerate(self.tiers):
+            try:
+                payload = tier.get(key)
+            except Exception as e:
+                logger.warning(f"Bedrock response cache {tier.name} lookup failed: {e}")
+                continue
+            if payload is None:
+                continue
+
+            logger.info(f"Bedrock response cache hit ({tier.name}) for key {key}")
+            if index > 0:
+                self._store(self.tiers[:index], key, payload)
+            with self._counter_lock:
+                self.hits += 1
+            return json.loads(payload)
+
+        with self._counter_lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, response: Dict[str, Any]) -> None:
+        """
+        Store a converse response in every tier.
+
+        Args:
+            key: Cache key from make_cache_key
+            response: Converse API response
+        """
+        if not is_cacheable_response(response):
+            return
+        stored = {k: v for k, v in response.items() if k != "ResponseMetadata"}
+        self._store(self.tiers, key, json.dumps(stored, default=str))
+
+    def _store(self, tiers: List[Any], key: str, payload: str) -> None:
+        expires_at = time.time() + self.ttl_seconds
+        for tier in tiers:
+            try:
+                tier.put(key, payload, expires_at)
+            except Exception as e:
+                logger.warning(f"Bedrock response cache {tier.name} store failed: {e}")
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    Get the process-wide Bedrock response cache.
+
+    The cache is disabled unless BEDROCK_RESPONSE_CACHE_ENABLED is true. Tiers
+    are configured from environment variables:
+    BEDROCK_RESPONSE_CACHE_MAX_ENTRIES (in-memory LRU size),
+    BEDROCK_RESPONSE_CACHE_TABLE (DynamoDB table with PK/SK keys),
+    BEDROCK_RESPONSE_CACHE_BUCKET and BEDROCK_RESPONSE_CACHE_PREFIX (S3), and
+    BEDROCK_RESPONSE_CACHE_TTL_SECONDS.
+
+    Returns:
+        Shared ResponseCache, or None when caching is disabled
+    """
+    global _response_cache
+    if _response_cache is _UNSET:
+        with _response_cache_lock:
+            if _response_cache is _UNSET:
+                _response_cache = _create_response_cache_from_env()
+    return _response_cache  # type: ignore[return-value]
+
+
+def set_response_cache(cache: Optional[ResponseCache]) -> Optional[ResponseCache]:
+    """
+    Replace the process-wide response cache.
+
+    Args:
+        cache: New cache, or None to disable response caching
+
+    Returns:
+        The cache that was replaced (None if it was disabled or never created)
+    """
+    global _response_cache
+    with _response_cache_lock:
+        previous = _response_cache
+        _response_cache = cache
+    return None if previous is _UNSET else previous  # type: ignore[return-value]
+
+
+def _create_response_cache_from_env() -> Optional[ResponseCache]:
+    """Build the shared cache from environment variables."""
+    enabled = os.environ.get("BEDROCK_RESPONSE_CACHE_ENABLED", "false").lower()
+    if enabled not in ("true", "1", "yes", "on"):
+        return None
+
+    region = os.environ.get("AWS_REGION")
+    tiers: List[Any] = [
+        MemoryCacheTier(
+            int(os.environ.get("BEDROCK_RESPONSE_CACHE_MAX_ENTRIES", DEFAULT_MAX_MEMORY_ENTRIES))
+        )
+    ]
+    table_name = os.environ.get("BEDROCK_RESPONSE_CACHE_TABLE")
+    if table_name:
+        tiers.append(DynamoDBCacheTier(table_name, region=region))
+    bucket = os.environ.get("BEDROCK_RESPONSE_CACHE_BUCKET")
+    if bucket:
+        tiers.append(
+            S3CacheTier(
+                bucket,
+                prefix=os.environ.get("BEDROCK_RESPONSE_CACHE_PREFIX", DEFAULT_S3_PREFIX),
+                region=region,
+            )
+        )
+
+    ttl_seconds = int(os.environ.get("BEDROCK_RESPONSE_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+    logger.info(
+        f"Bedrock response cache enabled with tiers "
+        f"{', '.join(tier.name for tier in tiers)} (TTL {ttl_seconds}s)"
+    )
+    return ResponseCache(tiers, ttl_seconds=ttl_seconds)
@@ -17,19 +17,18 @@ Classification methods:
   across the entire document packet at once.
 """
 
+import asyncio
 import json
 import logging
 import os
-import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional, Set, Union
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
 import boto3
 from botocore.exceptions import ClientError
 
-from idp_common import bedrock, image, s3, utils
+from idp_common import bedrock, image, s3, tokens, utils
 from idp_common.classification.models import (
     ClassificationResult,
     DocumentClassification,
@@ -44,7 +43,7 @@ from idp_common.config.schema_constants import (
     X_AWS_IDP_DOCUMENT_TYPE,
     X_AWS_IDP_PAGE_CONTENT_REGEX,
 )
-from idp_common.models import Document, Section, Status
+from idp_common.models import Document, Page, Section, Status
 from idp_common.utils import extract_json_from_text, extract_structured_data_from_text
 from idp_common.utils.few_shot_example_builder import build_few_shot_examples_content
 
@@ -358,7 +357,6 @@ class ClassificationService:
             )
             all_page_results = list(cached_page_classifications.values())
             combined_metering = {}
-            errors_lock = threading.Lock()  # Thread safety for error collection
             failed_page_exceptions = {}  # Store original exceptions for failed pages
 
             # Determine which pages need classification
@@ -395,70 +393,59 @@ class ClassificationService:
                     f"Found {len(cached_page_classifications)} cached page classifications, classifying {len(pages_to_classify)} remaining pages"
                 )
 
-                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                    futures = {}
+                # Classify uncached pages concurrently with async Bedrock calls
+                page_outcomes = bedrock.run_coroutine(
+                    self._classify_pages_async(pages_to_classify)
+                )
 
-                    # Start processing only uncached pages
-                    for page_id, page in pages_to_classify.items():
-                        future = executor.submit(
-                            self.classify_page,
-                            page_id=page_id,
-                            text_uri=page.parsed_text_uri,
-                            image_uri=page.image_uri,
-                            raw_text_uri=page.raw_text_uri,
+                # Process results in page order
+                for page_id, page_result in zip(pages_to_classify, page_outcomes):
+                    try:
+                        if isinstance(page_result, BaseException):
+                            raise page_result
+                        all_page_results.append(page_result)
+
+                        # Check if there was an error in the classification
+                        if "error" in page_result.classification.metadata:
+                            error_msg = f"Error classifying page {page_id}: {page_result.classification.metadata['error']}"
+                            document.errors.append(error_msg)
+
+                        # Update the page in the document
+                        document.pages[
+                            page_id
+                        ].classification = page_result.classification.doc_type
+                        document.pages[
+                            page_id
+                        ].confidence = page_result.classification.confidence
+
+                        # Copy metadata (including boundary information) to the page
+                        setattr(
+                            document.pages[page_id],
+                            "metadata",
+                            page_result.classification.metadata,
                         )
-                        futures[future] = page_id
-
-                    # Process results as they complete
-                    for future in as_completed(futures):
-                        page_id = futures[future]
-                        try:
-                            page_result = future.result()
-                            all_page_results.append(page_result)
 
-                            # Check if there was an error in the classification
-                            if "error" in page_result.classification.metadata:
-                                with errors_lock:
-                                    error_msg = f"Error classifying page {page_id}: {page_result.classification.metadata['error']}"
-                                    document.errors.append(error_msg)
-
-                            # Update the page in the document
-                            document.pages[
-                                page_id
-                            ].classification = page_result.classification.doc_type
+                        # Merge metering data
+                        page_metering = page_result.classification.metadata.get(
+                            "metering", {}
+                        )
+                        combined_metering = utils.merge_metering_data(
+                            combined_metering, page_metering
+                        )
+                    except Exception as e:
+                        # Capture exception details in the document object instead of raising
+                        error_msg = f"Error classifying page {page_id}: {str(e)}"
+                        logger.error(error_msg)
+                        document.errors.append(error_msg)
+                        # Store the original exception for later use
+                        failed_page_exceptions[page_id] = e
+
+                        # Mark page as unclassified on error
+                        if page_id in document.pages:
                             document.pages[
                                 page_id
-                            ].confidence = page_result.classification.confidence
-
-                            # Copy metadata (including boundary information) to the page
-                            setattr(
-                                document.pages[page_id],
-                                "metadata",
-                                page_result.classification.metadata,
-                            )
-
-                            # Merge metering data
-                            page_metering = page_result.classification.metadata.get(
-                                "metering", {}
-                            )
-                            combined_metering = utils.merge_metering_data(
-                                combined_metering, page_metering
-                            )
-                        except Exception as e:
-                            # Capture exception details in the document object instead of raising
-                            error_msg = f"Error classifying page {page_id}: {str(e)}"
-                            logger.error(error_msg)
-                            with errors_lock:
-                                document.errors.append(error_msg)
-                                # Store the original exception for later use
-                                failed_page_exceptions[page_id] = e
-
-                            # Mark page as unclassified on error
-                            if page_id in document.pages:
-                                document.pages[
-                                    page_id
-                                ].classification = "error (backoff/retry)"
-                                document.pages[page_id].confidence = 0.0
+                            ].classification = "error (backoff/retry)"
+                            document.pages[page_id].confidence = 0.0
 
                 # Store failed page exceptions in document metadata for caller to access
                 if failed_page_exceptions:
@@ -538,6 +525,35 @@ class ClassificationService:
 
         return document
 
+    async def _classify_pages_async(
+        self, pages: Dict[str, Page]
+    ) -> List[Union[PageClassification, BaseException]]:
+        """
+        Classify pages concurrently, at most max_workers pages at a time.
+
+        Args:
+            pages: Pages to classify, keyed by page ID
+
+        Returns:
+            Classification result, or the exception raised, for each page in order
+        """
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def classify(page_id: str, page: Page) -> PageClassification:
+            async with semaphore:
+                return await self.classify_page_async(
+                    page_id=page_id,
+                    text_uri=page.parsed_text_uri,
+                    image_uri=page.image_uri,
+                    raw_text_uri=page.raw_text_uri,
+                    image_renditions=page.image_renditions,
+                )
+
+        return await asyncio.gather(
+            *(classify(page_id, page) for page_id, page in pages.items()),
+            return_exceptions=True,
+        )
+
     def _check_page_content_regex(self, text_content: str) -> Optional[str]:
         """
         Check if page content matches any class regex patterns.
@@ -848,6 +864,7 @@ class ClassificationService:
         text_uri: Optional[str] = None,
         image_uri: Optional[str] = None,
         raw_text_uri: Optional[str] = None,
+        image_renditions: Optional[Dict[str, str]] = None,
     ) -> PageClassification:
         """
         Classify a single page using Bedrock LLMs.
@@ -857,10 +874,116 @@ class ClassificationService:
             text_uri: URI of the text content
             image_uri: URI of the image content
             raw_text_uri: URI of the raw text content
+            image_renditions: Precomputed page image renditions from OCR
+
+        Returns:
+            PageClassification: Classification result for the page
+        """
+        prepared = self._prepare_page_request(
+            page_id, text_uri, image_uri, raw_text_uri, image_renditions
+        )
+        if isinstance(prepared, PageClassification):
+            return prepared
+        content, config = prepared
+
+        logger.info(f"Classifying page {page_id} with Bedrock")
+
+        t0 = time.time()
+
+        # Invoke Bedrock model
+        try:
+            with bedrock.batch_labels(page_id=page_id):
+                response_with_metering = self._invoke_bedrock_model(
+                    content=content, config=config
+                )
+
+            t1 = time.time()
+            logger.info(
+                f"Time taken for classification of page {page_id}: {t1 - t0:.2f} seconds"
+            )
+
+            return self._parse_page_response(
+                page_id, response_with_metering, image_uri, text_uri, raw_text_uri
+            )
+        except Exception as e:
+            logger.error(f"Error classifying page {page_id}: {str(e)}")
+            raise
+
+    async def classify_page_bedrock_async(
+        self,
+        page_id: str,
+        text_uri: Optional[str] = None,
+        image_uri: Optional[str] = None,
+        raw_text_uri: Optional[str] = None,
+        image_renditions: Optional[Dict[str, str]] = None,
+    ) -> PageClassification:
+        """
+        Awaitable variant of classify_page_bedrock.
+
+        Page content is loaded on a worker thread and the model is invoked with
+        bedrock.invoke_model_async. Arguments and return value are the same as
+        classify_page_bedrock.
 
         Returns:
             PageClassification: Classification result for the page
         """
+        prepared = await asyncio.to_thread(
+            self._prepare_page_request,
+            page_id,
+            text_uri,
+            image_uri,
+            raw_text_uri,
+            image_renditions,
+        )
+        if isinstance(prepared, PageClassification):
+            return prepared
+        content, config = prepared
+
+        logger.info(f"Classifying page {page_id} with Bedrock")
+
+        t0 = time.time()
+
+        # Invoke Bedrock model
+        try:
+            with bedrock.batch_labels(page_id=page_id):
+                response_with_metering = await self._invoke_bedrock_model_async(
+                    content=content, config=config
+                )
+
+            t1 = time.time()
+            logger.info(
+                f"Time taken for classification of page {page_id}: {t1 - t0:.2f} seconds"
+            )
+
+            return self._parse_page_response(
+                page_id, response_with_metering, image_uri, text_uri, raw_text_uri
+            )
+        except Exception as e:
+            logger.error(f"Error classifying page {page_id}: {str(e)}")
+            raise
+
+    def _prepare_page_request(
+        self,
+        page_id: str,
+        text_uri: Optional[str],
+        image_uri: Optional[str],
+        raw_text_uri: Optional[str],
+        image_renditions: Optional[Dict[str, str]],
+    ) -> Union[PageClassification, Tuple[List[Dict[str, Any]], Dict[str, Any]]]:
+        """
+        Load the content of a page and build its Bedrock classification request.
+
+        Args:
+            page_id: ID of the page
+            text_uri: URI of the text content
+            image_uri: URI of the image content
+            raw_text_uri: URI of the raw text content
+            image_renditions: Precomputed page image renditions from OCR
+
+        Returns:
+            Tuple of (content, classification config) to invoke the model with, or
+            the final PageClassification if the page needs no model call
+        """
         # Initialize content variables
         text_content = None
         image_content = None
@@ -880,9 +1003,9 @@ class ClassificationService:
                 target_width = self.config.classification.image.target_width
                 target_height = self.config.classification.image.target_height
 
-                # Just pass the values directly - prepare_image handles empty strings/None
-                image_content = image.prepare_image(
-                    image_uri, target_width, target_height
+                # Just pass the values directly - prepare_page_image handles empty strings/None
+                image_content = image.prepare_page_image(
+                    image_uri, target_width, target_height, image_renditions
                 )
             except Exception as e:
                 logger.warning(f"Failed to load image content from {image_uri}: {e}")
@@ -934,86 +1057,90 @@ class ClassificationService:
             self._format_classes_list(),
             image_content,
         )
+        return content, config
 
-        logger.info(f"Classifying page {page_id} with Bedrock")
-
-        t0 = time.time()
+    def _parse_page_response(
+        self,
+        page_id: str,
+        response_with_metering: Dict[str, Any],
+        image_uri: Optional[str],
+        text_uri: Optional[str],
+        raw_text_uri: Optional[str],
+    ) -> PageClassification:
+        """
+        Build the classification result of a page from the model response.
 
-        # Invoke Bedrock model
-        try:
-            response_with_metering = self._invoke_bedrock_model(
-                content=content, config=config
-            )
+        Args:
+            page_id: ID of the page
+            response_with_metering: Bedrock response with metering data
+            image_uri: URI of the image content
+            text_uri: URI of the text content
+            raw_text_uri: URI of the raw text content
 
-            t1 = time.time()
-            logger.info(
-                f"Time taken for classification of page {page_id}: {t1 - t0:.2f} seconds"
-            )
+        Returns:
+            PageClassification: Classification result for the page
+        """
+        response = response_with_metering["response"]
+        metering = response_with_metering["metering"]
 
-            response = response_with_metering["response"]
-            metering = response_with_metering["metering"]
+        # Extract classification result
+        classification_text = response["output"]["message"]["content"][0].get(
+            "text", ""
+        )
 
-            # Extract classification result
-            classification_text = response["output"]["message"]["content"][0].get(
-                "text", ""
+        # Try to extract structured data (JSON or YAML) from the response
+        try:
+            classification_data, detected_format = extract_structured_data_from_text(
+                classification_text
             )
-
-            # Try to extract structured data (JSON or YAML) from the response
-            try:
-                classification_data, detected_format = (
-                    extract_structured_data_from_text(classification_text)
+            if isinstance(classification_data, dict):
+                doc_type = classification_data.get("class", "")
+                document_boundary = classification_data.get(
+                    "document_boundary", "continue"
                 )
-                if isinstance(classification_data, dict):
-                    doc_type = classification_data.get("class", "")
-                    document_boundary = classification_data.get(
-                        "document_boundary", "continue"
-                    )
-                    logger.info(
-                        f"Parsed classification response as {detected_format}: {classification_data}"
-                    )
-                else:
-                    # If parsing failed, try to extract classification directly from text
-                    doc_type = self._extract_class_from_text(classification_text)
-                    document_boundary = "continue"
-            except Exception as e:
-                logger.warning(f"Failed to parse structured data from response: {e}")
-                # Try to extract classification directly from text
+                logger.info(
+                    f"Parsed classification response as {detected_format}: {classification_data}"
+                )
+            else:
+                # If parsing failed, try to extract classification directly from text
                 doc_type = self._extract_class_from_text(classification_text)
                 document_boundary = "continue"
+        except Exception as e:
+            logger.warning(f"Failed to parse structured data from response: {e}")
+            # Try to extract classification directly from text
+            doc_type = self._extract_class_from_text(classification_text)
+            document_boundary = "continue"
+
+        # Validate classification against known document types
+        if not doc_type:
+            doc_type = "unclassified"
+            logger.warning(
+                f"Empty classification for page {page_id}, using 'unclassified'"
+            )
+        elif doc_type not in self.valid_doc_types:
+            logger.warning(
+                f"Unknown document type '{doc_type}' for page {page_id}, "
+                f"valid types are: {', '.join(self.valid_doc_types)}"
+            )
+            # Still use the classification, it might be a new valid type
 
-            # Validate classification against known document types
-            if not doc_type:
-                doc_type = "unclassified"
-                logger.warning(
-                    f"Empty classification for page {page_id}, using 'unclassified'"
-                )
-            elif doc_type not in self.valid_doc_types:
-                logger.warning(
-                    f"Unknown document type '{doc_type}' for page {page_id}, "
-                    f"valid types are: {', '.join(self.valid_doc_types)}"
-                )
-                # Still use the classification, it might be a new valid type
-
-            logger.info(f"Page {page_id} classified as {doc_type}")
+        logger.info(f"Page {page_id} classified as {doc_type}")
 
-            # Create and return classification result
-            return PageClassification(
-                page_id=page_id,
-                classification=DocumentClassification(
-                    doc_type=doc_type,
-                    confidence=1.0,  # Default confidence
-                    metadata={
-                        "metering": metering,
-                        "document_boundary": str(document_boundary).lower(),
-                    },
-                ),
-                image_uri=image_uri,
-                text_uri=text_uri,
-                raw_text_uri=raw_text_uri,
-            )
-        except Exception as e:
-            logger.error(f"Error classifying page {page_id}: {str(e)}")
-            raise
+        # Create and return classification result
+        return PageClassification(
+            page_id=page_id,
+            classification=DocumentClassification(
+                doc_type=doc_type,
+                confidence=1.0,  # Default confidence
+                metadata={
+                    "metering": metering,
+                    "document_boundary": str(document_boundary).lower(),
+                },
+            ),
+            image_uri=image_uri,
+            text_uri=text_uri,
+            raw_text_uri=raw_text_uri,
+        )
 
     def classify_page_sagemaker(
         self,
@@ -1180,6 +1307,7 @@ class ClassificationService:
         text_uri: Optional[str] = None,
         image_uri: Optional[str] = None,
         raw_text_uri: Optional[str] = None,
+        image_renditions: Optional[Dict[str, str]] = None,
     ) -> PageClassification:
         """
         Classify a single page based on its text and/or image content.
@@ -1190,6 +1318,7 @@ class ClassificationService:
             text_uri: URI of the text content
             image_uri: URI of the image content
             raw_text_uri: URI of the raw text content
+            image_renditions: Precomputed page image renditions from OCR
 
         Returns:
             PageClassification: Classification result for the page
@@ -1200,6 +1329,7 @@ class ClassificationService:
                 text_uri=text_uri,
                 image_uri=image_uri,
                 raw_text_uri=raw_text_uri,
+                image_renditions=image_renditions,
             )
         else:  # sagemaker
             return self.classify_page_sagemaker(
@@ -1209,6 +1339,40 @@ class ClassificationService:
                 text_uri=text_uri,
             )
 
+    async def classify_page_async(
+        self,
+        page_id: str,
+        text_uri: Optional[str] = None,
+        image_uri: Optional[str] = None,
+        raw_text_uri: Optional[str] = None,
+        image_renditions: Optional[Dict[str, str]] = None,
+    ) -> PageClassification:
+        """
+        Awaitable variant of classify_page.
+
+        Bedrock pages are classified with classify_page_bedrock_async; SageMaker
+        pages run classify_page on a worker thread.
+
+        Returns:
+            PageClassification: Classification result for the page
+        """
+        if self.backend == "bedrock":
+            return await self.classify_page_bedrock_async(
+                page_id=page_id,
+                text_uri=text_uri,
+                image_uri=image_uri,
+                raw_text_uri=raw_text_uri,
+                image_renditions=image_renditions,
+            )
+        return await asyncio.to_thread(
+            self.classify_page,
+            page_id=page_id,
+            text_uri=text_uri,
+            image_uri=image_uri,
+            raw_text_uri=raw_text_uri,
+            image_renditions=image_renditions,
+        )
+
     def _invoke_bedrock_model(
         self, content: List[Dict[str, Any]], config: Dict[str, Any]
     ) -> Dict[str, Any]:
@@ -1233,6 +1397,30 @@ class ClassificationService:
             context="Classification",
         )
 
+    async def _invoke_bedrock_model_async(
+        self, content: List[Dict[str, Any]], config: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Awaitable variant of _invoke_bedrock_model.
+
+        Args:
+            content: Content to send to the model
+            config: Configuration with model parameters
+
+        Returns:
+            Dictionary with response and metering data
+        """
+        return await bedrock.invoke_model_async(
+            model_id=config["model_id"],
+            system_prompt=config["system_prompt"],
+            content=content,
+            temperature=config["temperature"],
+            top_k=config["top_k"],
+            top_p=config["top_p"],
+            max_tokens=config["max_tokens"],
+            context="Classification",
+        )
+
     def _create_unclassified_result(
         self,
         page_id: str,
@@ -1598,33 +1786,31 @@ class ClassificationService:
             ClassificationResult: Result with classified pages grouped into sections
         """
         all_results = []
-        futures = []
         metering = {}
 
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            for page_num, page_data in pages.items():
-                future = executor.submit(
-                    self.classify_page,
-                    page_id=page_num,
-                    text_uri=page_data.get("parsedTextUri"),
-                    image_uri=page_data.get("imageUri"),
-                    raw_text_uri=page_data.get("rawTextUri"),
-                )
-                futures.append(future)
-
-            for future in as_completed(futures):
-                try:
-                    page_result = future.result()
-                    page_metering = page_result.classification.metadata.get(
-                        "metering", {}
+        page_outcomes = bedrock.run_coroutine(
+            self._classify_pages_async(
+                {
+                    page_num: Page(
+                        page_id=page_num,
+                        image_uri=page_data.get("imageUri"),
+                        raw_text_uri=page_data.get("rawTextUri"),
+                        parsed_text_uri=page_data.get("parsedTextUri"),
                     )
-                    all_results.append(page_result)
+                    for page_num, page_data in pages.items()
+                }
+            )
+        )
 
-                    # Merge metering data
-                    metering = utils.merge_metering_data(metering, page_metering)
-                except Exception as e:
-                    logger.error(f"Error in concurrent classification: {str(e)}")
-                    raise
+        for page_result in page_outcomes:
+            if isinstance(page_result, BaseException):
+                logger.error(f"Error in concurrent classification: {str(page_result)}")
+                raise page_result
+            page_metering = page_result.classification.metadata.get("metering", {})
+            all_results.append(page_result)
+
+            # Merge metering data
+            metering = utils.merge_metering_data(metering, page_metering)
 
         # Group pages into sections
         sections = self._group_consecutive_pages(all_results)
@@ -2007,6 +2193,132 @@ class ClassificationService:
 
         return pages_content
 
+    def _holistic_page_windows(
+        self,
+        document: Document,
+        sorted_page_ids: List[str],
+        pages_content: Dict[str, str],
+        config: Dict[str, Any],
+    ) -> List[List[str]]:
+        """
+        Split the pages of a document into windows that fit the model's context.
+
+        Page token counts come from Page.token_counts when OCR already counted
+        them with the classification model's tokenizer.
+
+        Args:
+            document: Document being classified
+            sorted_page_ids: Page IDs in document order
+            pages_content: Text content of each page
+            config: Classification configuration
+
+        Returns:
+            Page IDs of each window; a single window when the document fits
+        """
+        tokenizer = tokens.get_tokenizer(config["model_id"])
+        prompt_tokens = tokenizer.count(config["system_prompt"]) + tokenizer.count(
+            self._prepare_prompt_from_template(
+                config["task_prompt"],
+                {
+                    "DOCUMENT_TEXT": "",
+                    "CLASS_NAMES_AND_DESCRIPTIONS": self._format_classes_and_descriptions(),
+                },
+                required_placeholders=[],
+            )
+        )
+        budget = (
+            tokens.input_token_budget(config["model_id"], config.get("max_tokens"))
+            - prompt_tokens
+        )
+
+        page_tokens = []
+        for page_id in sorted_page_ids:
+            page = document.pages.get(page_id)
+            text = pages_content[page_id]
+            if page is not None and page.parsed_text_uri:
+                count = tokens.page_token_count(page, text, tokenizer)
+            else:
+                count = tokenizer.count(text)
+            tag_tokens = tokenizer.count(f"<page-number>{page_id}</page-number>\n\n\n")
+            page_tokens.append((page_id, count + tag_tokens))
+
+        total_tokens = sum(count for _, count in page_tokens)
+        if total_tokens <= budget:
+            return [sorted_page_ids]
+
+        windows = tokens.chunk_pages(page_tokens, max(1, budget))
+        logger.info(
+            f"Document of {total_tokens} tokens exceeds the input budget of {budget} tokens "
+            f"for {config['model_id']}, classifying in {len(windows)} page windows"
+        )
+        return windows
+
+    def _clip_segments_to_window(
+        self, segments: List[Dict[str, Any]], window: List[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Clip segments returned for a page window to the pages of the window.
+
+        Args:
+            segments: Segments with ordinal_start_page, ordinal_end_page and type
+            window: Page IDs of the window
+
+        Returns:
+            Segments within the window
+        """
+        window_pages = [int(page_id) for page_id in window if page_id.isdigit()]
+        if not window_pages:
+            return segments
+        first_page, last_page = min(window_pages), max(window_pages)
+
+        clipped = []
+        for segment in segments:
+            try:
+                start_page = max(int(segment["ordinal_start_page"]), first_page)
+                end_page = min(int(segment["ordinal_end_page"]), last_page)
+            except (KeyError, TypeError, ValueError):
+                # Left to the segment validation of the caller
+                clipped.append(segment)
+                continue
+            if start_page <= end_page:
+                clipped.append(
+                    {
+                        **segment,
+                        "ordinal_start_page": start_page,
+                        "ordinal_end_page": end_page,
+                    }
+                )
+        return clipped
+
+    def _merge_window_segments(
+        self, segments: List[Dict[str, Any]], window_segments: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Append the segments of a page window, joining a segment split by the window boundary.
+
+        Args:
+            segments: Segments of the previous windows
+            window_segments: Segments of the next window
+
+        Returns:
+            Combined segments
+        """
+        if segments and window_segments:
+            last, first = segments[-1], window_segments[0]
+            try:
+                contiguous = (
+                    int(first["ordinal_start_page"])
+                    == int(last["ordinal_end_page"]) + 1
+                )
+            except (KeyError, TypeError, ValueError):
+                contiguous = False
+            if contiguous and first.get("type") == last.get("type"):
+                segments = segments[:-1] + [
+                    {**last, "ordinal_end_page": first["ordinal_end_page"]}
+                ]
+                window_segments = window_segments[1:]
+        return segments + window_segments
+
     def holistic_classify_document(self, document: Document) -> Document:
         """
         Classify a document using holistic packet classification.
@@ -2071,52 +2383,87 @@ class ClassificationService:
             # Get classification configuration
             config = self._get_classification_config()
 
-            # Prepare paged document text
-            doc_text = ""
-            for page_id, page_text in sorted(
-                pages_content.items(),
-                key=lambda x: int(x[0]) if x[0].isdigit() else float("inf"),
-            ):
-                doc_text += f"<page-number>{page_id}</page-number>\n{page_text}\n\n"
+            # Split the pages into windows that fit the model's context
+            sorted_page_ids = sorted(
+                pages_content.keys(),
+                key=lambda x: int(x) if x.isdigit() else float("inf"),
+            )
+            windows = self._holistic_page_windows(
+                document, sorted_page_ids, pages_content, config
+            )
 
             # Prepare document classes and descriptions as a table
             classes_table = self._format_classes_and_descriptions()
 
-            # Prepare prompt using common function
-            prepared_prompt = self._prepare_prompt_from_template(
-                config["task_prompt"],
-                {
-                    "DOCUMENT_TEXT": doc_text,
-                    "CLASS_NAMES_AND_DESCRIPTIONS": classes_table,
-                },
-                required_placeholders=[],
-            )
+            metering = {}
+            window_responses = []
+            deferred = None
+            for window_index, window in enumerate(windows, start=1):
+                # Prepare paged document text
+                doc_text = ""
+                for page_id in window:
+                    doc_text += f"<page-number>{page_id}</page-number>\n{pages_content[page_id]}\n\n"
+
+                # Prepare prompt using common function
+                prepared_prompt = self._prepare_prompt_from_template(
+                    config["task_prompt"],
+                    {
+                        "DOCUMENT_TEXT": doc_text,
+                        "CLASS_NAMES_AND_DESCRIPTIONS": classes_table,
+                    },
+                    required_placeholders=[],
+                )
 
-            # Invoke Bedrock to get the holistic classification
-            logger.info("Invoking Bedrock for holistic packet classification")
+                # Invoke Bedrock to get the holistic classification
+                logger.info(
+                    f"Invoking Bedrock for holistic packet classification "
+                    f"(window {window_index}/{len(windows)}, pages {window[0]}-{window[-1]})"
+                )
 
-            response_with_metering = self._invoke_bedrock_model(
-                content=[{"text": prepared_prompt}], config=config
-            )
+                try:
+                    with bedrock.batch_labels(
+                        document_id=document.id, page_id=f"{window[0]}-{window[-1]}"
+                    ):
+                        response_with_metering = self._invoke_bedrock_model(
+                            content=[{"text": prepared_prompt}], config=config
+                        )
+                except bedrock.BatchRequestDeferred as e:
+                    # Record the requests of the remaining windows before deferring
+                    deferred = deferred or e
+                    continue
+                metering = utils.merge_metering_data(
+                    metering, response_with_metering["metering"]
+                )
+
+                # Extract classification result
+                response = response_with_metering["response"]
+                window_responses.append(
+                    (
+                        window,
+                        response["output"]["message"]["content"][0].get("text", ""),
+                    )
+                )
+
+            if deferred is not None:
+                raise deferred
 
             t1 = time.time()
             logger.info(
                 f"Time taken for holistic classification: {t1 - t0:.2f} seconds"
             )
 
-            response = response_with_metering["response"]
-            metering = response_with_metering["metering"]
-
-            # Extract classification result
-            classification_text = response["output"]["message"]["content"][0].get(
-                "text", ""
-            )
-
             # Try to extract JSON from the response
             try:
-                classification_json = extract_json_from_text(classification_text)
-                classification_data = json.loads(classification_json)
-                segments = classification_data.get("segments", [])
+                segments = []
+                for window, classification_text in window_responses:
+                    classification_json = extract_json_from_text(classification_text)
+                    classification_data = json.loads(classification_json)
+                    window_segments = classification_data.get("segments", [])
+                    if len(windows) > 1:
+                        window_segments = self._clip_segments_to_window(
+                            window_segments, window
+                        )
+                    segments = self._merge_window_segments(segments, window_segments)
 
                 if not segments:
                     raise ValueError("No segments found in the classification result")
@@ -7,6 +7,7 @@ from typing import Dict, Any, Optional, Union, overload, Literal
 from botocore.exceptions import ClientError
 import logging
 from copy import deepcopy
+from .cache import ConfigurationCache
 from .configuration_manager import ConfigurationManager
 from .merge_utils import deep_update
 from .models import (
@@ -30,6 +31,10 @@ from .constants import (
 
 logger = logging.getLogger(__name__)
 
+# Merged configurations and readers kept across warm Lambda invocations
+_config_cache = ConfigurationCache()
+_readers: Dict[str, "ConfigurationReader"] = {}
+
 
 class ConfigurationReader:
     def __init__(self, table_name=None):
@@ -186,6 +191,11 @@ def get_config(
     """
     Get the merged configuration using the environment variable for table name.
 
+    The merged configuration is cached across calls and validated against
+    the configuration version stamp (see idp_common.config.cache), so warm
+    Lambda invocations do not re-read and re-validate it. Each call returns
+    a copy that the caller may modify.
+
     Args:
         table_name: Optional override for configuration table name
         as_model: If True, return IDPConfig Pydantic model. If False (default), return dict.
@@ -202,5 +212,37 @@ def get_config(
         config = get_config(as_model=True)
         config_dict = config.to_dict(sagemaker_endpoint_name=endpoint)
     """
-    reader = ConfigurationReader(table_name)
-    return reader.get_merged_configuration(as_model=as_model)
+    table_name = table_name or os.environ.get("CONFIGURATION_TABLE_NAME")
+    reader = _readers.get(table_name) if table_name else None
+    if reader is None:
+        reader = ConfigurationReader(table_name)
+        _readers[reader.manager.table_name] = reader
+    return _config_cache.get(reader, as_model=as_model)
+
+
+def current_config_version() -> Optional[str]:
+    """
+    Get the version stamp of the configuration last returned by get_config().
+
+    Does not read the configuration table, so caches of data derived from the
+    configuration can check it on every call.
+
+    Returns:
+        Version stamp, or None if no versioned configuration was loaded yet
+    """
+    return _config_cache.last_version
+
+
+def invalidate_config_cache(table_name: Optional[str] = None) -> None:
+    """
+    Drop configurations cached by get_config().
+
+    Args:
+        table_name: Only drop the configuration of this table
+    """
+    _config_cache.invalidate(table_name)
+    _config_cache.last_version = None
+    if table_name is None:
+        _readers.clear()
+    else:
+        _readers.pop(table_name, None)
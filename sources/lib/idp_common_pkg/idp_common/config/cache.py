@@ -0,0 +1,147 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Cross-invocation cache of the merged configuration.
+
+Pattern Lambdas call get_config() at the start of every invocation, which
+reads the Default and Custom records, merges them and validates the result
+into IDPConfig. ConfigurationCache keeps the merged configuration at module
+level, so warm invocations reuse it:
+
+- Every ConfigurationManager write (through _send_update_notification) and
+  delete stores a new version stamp in the configuration table. A cached
+  configuration is used only while the stamp it was loaded with is current,
+  which costs one small GetItem per call instead of two reads, a merge and a
+  validation.
+- Entries also expire after a TTL (CONFIG_CACHE_TTL_SECONDS, default 300s),
+  which bounds staleness when the stamp cannot be read or is missing.
+  A TTL of 0 disables the cache.
+
+Every load publishes the ConfigurationLoadTime metric (milliseconds), and every
+call a ConfigurationCacheHit or ConfigurationCacheMiss count.
+"""
+
+import logging
+import os
+import threading
+import time
+from copy import deepcopy
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Union
+
+from botocore.exceptions import ClientError
+
+from .models import IDPConfig
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 300.0
+
+
+@dataclass
+class _CacheEntry:
+    version: Optional[str]
+    config: Dict[str, Any]
+    loaded_at: float
+    model: Optional[IDPConfig] = None
+
+
+class ConfigurationCache:
+    """Caches merged configurations per configuration table."""
+
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl_seconds: Longest time an entry is used without reloading;
+                defaults to the CONFIG_CACHE_TTL_SECONDS environment variable
+                or 300 seconds. 0 disables the cache.
+        """
+        if ttl_seconds is None:
+            ttl_seconds = float(
+                os.environ.get("CONFIG_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)
+            )
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, _CacheEntry] = {}
+        self._lock = threading.Lock()
+        # Version stamp of the configuration returned by the last get()
+        self.last_version: Optional[str] = None
+
+    def get(self, reader, as_model: bool = False) -> Union[IDPConfig, Dict[str, Any]]:
+        """
+        Get the merged configuration of a reader's table.
+
+        Args:
+            reader: ConfigurationReader of the configuration table
+            as_model: If True, return IDPConfig. If False, return dict.
+
+        Returns:
+            A copy of the merged configuration that the caller may modify
+        """
+        from ..metrics import put_metric
+
+        table_name = reader.manager.table_name
+        version = self._read_version(reader) if self.ttl_seconds > 0 else None
+
+        with self._lock:
+            entry = self._entries.get(table_name)
+        if (
+            entry is not None
+            and entry.version == version
+            and time.monotonic() - entry.loaded_at < self.ttl_seconds
+        ):
+            put_metric("ConfigurationCacheHit", 1)
+        else:
+            put_metric("ConfigurationCacheMiss", 1)
+            entry = self._load(reader, version, as_model)
+            if self.ttl_seconds > 0:
+                with self._lock:
+                    self._entries[table_name] = entry
+        self.last_version = entry.version
+
+        if as_model:
+            with self._lock:
+                if entry.model is None:
+                    entry.model = IDPConfig(**deepcopy(entry.config))
+            return entry.model.model_copy(deep=True)
+        return deepcopy(entry.config)
+
+    def invalidate(self, table_name: Optional[str] = None) -> None:
+        """
+        Drop cached configurations.
+
+        Args:
+            table_name: Only drop the configuration of this table
+        """
+        with self._lock:
+            if table_name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(table_name, None)
+
+    def _read_version(self, reader) -> Optional[str]:
+        try:
+            return reader.manager.get_config_version()
+        except ClientError as e:
+            logger.warning(
+                f"Could not read configuration version, using TTL expiry only: {e}"
+            )
+            return None
+
+    def _load(self, reader, version: Optional[str], as_model: bool) -> _CacheEntry:
+        from ..metrics import put_metric
+
+        start = time.perf_counter()
+        config = reader.get_merged_configuration(as_model=False)
+        model = IDPConfig(**deepcopy(config)) if as_model else None
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        put_metric("ConfigurationLoadTime", elapsed_ms, "Milliseconds")
+        logger.info(
+            f"Loaded configuration from {reader.manager.table_name} "
+            f"(version {version}) in {elapsed_ms:.0f} ms"
+        )
+        return _CacheEntry(
+            version=version, config=config, loaded_at=time.monotonic(), model=model
+        )
@@ -10,6 +10,8 @@ from typing import Dict, Any, Optional, Union
 from botocore.exceptions import ClientError
 import logging
 import datetime
+import time
+import uuid
 
 from .models import IDPConfig, SchemaConfig, ConfigurationRecord
 from .merge_utils import deep_update, get_diff_dict
@@ -17,6 +19,7 @@ from .constants import (
     CONFIG_TYPE_SCHEMA,
     CONFIG_TYPE_DEFAULT,
     CONFIG_TYPE_CUSTOM,
+    CONFIG_VERSION_KEY,
     VALID_CONFIG_TYPES,
 )
 
@@ -224,6 +227,29 @@ class ConfigurationManager:
             logger.error(f"Error deleting configuration {config_type}: {e}")
             raise
 
+        self._publish_config_version()
+
+    def get_config_version(self) -> Optional[str]:
+        """
+        Get the version stamp of the configuration records.
+
+        The stamp changes whenever a configuration is saved or deleted through
+        this class; cached configurations are valid while it is unchanged.
+
+        Returns:
+            The version stamp, or None if no configuration change was recorded yet
+
+        Raises:
+            ClientError: If DynamoDB operation fails
+        """
+        response = self.table.get_item(
+            Key={"Configuration": CONFIG_VERSION_KEY},
+            ProjectionExpression="#version",
+            ExpressionAttributeNames={"#version": "Version"},
+        )
+        item = response.get("Item")
+        return item.get("Version") if item else None
+
     def handle_update_custom_configuration(
         self, custom_config: Union[str, Dict[str, Any], IDPConfig]
     ) -> bool:
@@ -361,12 +387,15 @@ class ConfigurationManager:
     ) -> None:
         """
         Send a message to the ConfigurationQueue to notify pattern-specific processors
-        about configuration updates.
+        about configuration updates, after publishing a new version stamp that
+        invalidates cached configurations (see idp_common.config.cache).
 
         Args:
             configuration_key: The configuration key that was updated ('Schema', 'Custom' or 'Default')
             configuration_data: The updated configuration (SchemaConfig or IDPConfig model)
         """
+        self._publish_config_version()
+
         try:
             configuration_queue_url = os.environ.get("CONFIGURATION_QUEUE_URL")
             if not configuration_queue_url:
@@ -410,3 +439,23 @@ class ConfigurationManager:
         except Exception as e:
             logger.warning(f"Failed to send configuration update message: {e}")
             # Don't fail the entire operation if queue message fails
+
+    def _publish_config_version(self) -> None:
+        """
+        Store a new configuration version stamp.
+
+        Failures are logged and not raised: cached configurations then expire
+        by TTL instead.
+        """
+        version = f"{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}"
+        try:
+            self.table.put_item(
+                Item={
+                    "Configuration": CONFIG_VERSION_KEY,
+                    "Version": version,
+                    "UpdatedAt": datetime.datetime.utcnow().isoformat() + "Z",
+                }
+            )
+            logger.info(f"Published configuration version {version}")
+        except Exception as e:
+            logger.warning(f"Failed to publish configuration version: {e}")
@@ -15,3 +15,6 @@ CONFIG_TYPE_CUSTOM = "Custom"
 
 # All valid configuration types
 VALID_CONFIG_TYPES = [CONFIG_TYPE_SCHEMA, CONFIG_TYPE_DEFAULT, CONFIG_TYPE_CUSTOM]
+
+# Key of the item holding the version stamp of the configuration records
+CONFIG_VERSION_KEY = "ConfigVersion"
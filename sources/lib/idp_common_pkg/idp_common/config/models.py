@@ -44,6 +44,14 @@ class ImageConfig(BaseModel):
     preprocessing: Optional[bool] = Field(
         default=None, description="Enable image preprocessing"
     )
+    binarization_block_size: Optional[int] = Field(
+        default=None,
+        description="Neighbourhood size for adaptive binarization preprocessing",
+    )
+    binarization_c: Optional[int] = Field(
+        default=None,
+        description="Constant subtracted from the local mean for adaptive binarization",
+    )
 
     @field_validator("target_width", "target_height", mode="before")
     @classmethod
@@ -71,6 +79,14 @@ class ImageConfig(BaseModel):
             return int(v) if v else None
         return int(v)
 
+    @field_validator("binarization_block_size", "binarization_c", mode="before")
+    @classmethod
+    def parse_binarization_params(cls, v: Any) -> Optional[int]:
+        """Parse binarization parameters from string or number"""
+        if v is None or (isinstance(v, str) and not v.strip()):
+            return None
+        return int(v)
+
     @field_validator("preprocessing", mode="before")
     @classmethod
     def parse_preprocessing(cls, v: Any) -> Optional[bool]:
@@ -19,7 +19,7 @@ from typing import Any, Dict, List, Optional, Union
 
 import s3fs
 
-from idp_common import bedrock, s3, utils
+from idp_common import bedrock, s3, tokens, utils
 from idp_common.config.models import IDPConfig
 from idp_common.criteria_validation.models import (
     CriteriaValidationResult,
@@ -87,42 +87,25 @@ class CriteriaValidationService:
         """
         Chunk text with overlap for better context preservation.
 
+        Chunks are sized with the criteria validation model's tokenizer and
+        end at paragraph, line or word boundaries.
+
         Args:
             text: Text to chunk
             max_chunk_size: Maximum chunk size in tokens
-            token_size: Average token size
+            token_size: Average token size (unused, tokens are counted)
             overlap_percentage: Percentage of overlap between chunks
 
         Returns:
             List of text chunks
         """
-        # Simple token estimation
-        estimated_tokens = len(text) // token_size
-
-        if estimated_tokens <= max_chunk_size:
-            return [text]
-
-        # Calculate chunk size in characters
-        chunk_size_chars = max_chunk_size * token_size
-        overlap_chars = int(chunk_size_chars * (overlap_percentage / 100))
-
-        chunks = []
-        start = 0
-
-        while start < len(text):
-            end = start + chunk_size_chars
-            if end > len(text):
-                end = len(text)
-
-            chunk = text[start:end]
-            chunks.append(chunk)
-
-            # Move start position with overlap
-            start = end - overlap_chars
-            if start >= len(text):
-                break
-
-        return chunks
+        overlap_tokens = max_chunk_size * overlap_percentage // 100
+        return tokens.chunk_text(
+            text,
+            max_chunk_size,
+            model_id=self.config.criteria_validation.model,
+            overlap_tokens=overlap_tokens,
+        )
 
     def _prepare_prompt(
         self,
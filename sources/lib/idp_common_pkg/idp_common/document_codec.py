@@ -0,0 +1,110 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Codecs for Document state stored in S3 between workflow steps.
+
+Document state has been stored as plain JSON. For documents with thousands of
+pages the JSON is several MB, and encoding and parsing it is part of the cold
+path of every Lambda of the workflow. The "msgpack+zstd" codec stores the same
+dict as MessagePack in a zstd frame, which is smaller and faster to parse.
+
+The codec of stored state is recorded next to it ("codec" in the wrapper of
+Document.compress, and in the base index of DocumentStateStore), and state
+without a codec marker is JSON, so existing state stays readable. Writers use
+the codec named by the DOCUMENT_STATE_CODEC environment variable (default
+"json"). The binary codec needs the optional msgpack and zstandard packages
+(pip install "idp_common[state_codec]").
+"""
+
+import json
+import os
+from typing import Any, Dict, Optional
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+JSON_CODEC = "json"
+MSGPACK_ZSTD_CODEC = "msgpack+zstd"
+CODEC_ENV_VAR = "DOCUMENT_STATE_CODEC"
+
+# zstd level 3 is the library default: most of the size reduction at a fraction of the CPU of higher levels
+ZSTD_LEVEL = 3
+
+
+class DocumentCodec:
+    """Encodes Document dicts to bytes and back."""
+
+    name = JSON_CODEC
+    content_type = "application/json"
+    extension = ".json"
+
+    def encode(self, value: Any) -> bytes:
+        return json.dumps(value, default=str).encode("utf-8")
+
+    def decode(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class MsgpackZstdCodec(DocumentCodec):
+    """MessagePack in a zstd frame."""
+
+    name = MSGPACK_ZSTD_CODEC
+    content_type = "application/vnd.msgpack+zstd"
+    extension = ".msgpack.zst"
+
+    def __init__(self):
+        if msgpack is None or zstandard is None:
+            raise ImportError(
+                f"The {MSGPACK_ZSTD_CODEC} document codec requires the msgpack and "
+                'zstandard packages: pip install "idp_common[state_codec]"'
+            )
+
+    def encode(self, value: Any) -> bytes:
+        packed = msgpack.packb(value, default=str, use_bin_type=True)
+        return zstandard.compress(packed, level=ZSTD_LEVEL)
+
+    def decode(self, data: bytes) -> Any:
+        packed = zstandard.decompress(data)
+        return msgpack.unpackb(packed, raw=False, strict_map_key=False)
+
+
+_CODEC_CLASSES = {
+    JSON_CODEC: DocumentCodec,
+    MSGPACK_ZSTD_CODEC: MsgpackZstdCodec,
+}
+_codecs: Dict[str, DocumentCodec] = {}
+
+
+def get_codec(name: Optional[str] = None) -> DocumentCodec:
+    """
+    Get a document codec by name.
+
+    Args:
+        name: Codec name; defaults to the DOCUMENT_STATE_CODEC environment
+            variable, or "json" if it is not set
+
+    Returns:
+        The codec
+
+    Raises:
+        ValueError: If the codec is unknown
+        ImportError: If the packages of the codec are not installed
+    """
+    if name is None:
+        name = os.environ.get(CODEC_ENV_VAR) or JSON_CODEC
+    codec = _codecs.get(name)
+    if codec is None:
+        if name not in _CODEC_CLASSES:
+            raise ValueError(
+                f"Unknown document codec '{name}', expected one of {sorted(_CODEC_CLASSES)}"
+            )
+        codec = _codecs[name] = _CODEC_CLASSES[name]()
+    return codec
@@ -0,0 +1,600 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Versioned, delta-based storage of Document state between workflow steps.
+
+Document.compress writes the whole document to S3 after every step, and every
+Lambda downloads and parses the whole document again, including the per-section
+Lambdas of the Step Functions Map state. DocumentStateStore instead keeps:
+
+- a base snapshot: one data object holding every page and section as a
+  separate JSON record, and an index with the document-level fields and the
+  byte range of each record
+- per-step deltas: the document-level fields, pages and sections a step
+  changed, and the section and page IDs it kept when it dropped others
+
+The Step Functions payload is a small wrapper listing the snapshot and deltas
+(format "delta"). Loading a single section reads the index, the deltas and,
+with ranged GETs, only the records of that section and its pages, so
+per-section Lambda I/O grows with the section rather than the document.
+Deltas are merged when a document is loaded; a step that holds the whole
+document writes a new base snapshot once the delta chain gets long.
+
+DocumentView exposes the document-level fields and the section and page IDs
+of any document payload, and parses sections and pages only when they are
+requested (Document.load_section uses it).
+
+Records of a base snapshot are encoded with the codec named in its index
+(see idp_common.document_codec); the index and the deltas are always JSON.
+"""
+
+import hashlib
+import json
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+import boto3
+
+from idp_common.document_codec import JSON_CODEC, get_codec
+
+if TYPE_CHECKING:
+    from idp_common.models import Document, Page, Section
+
+logger = logging.getLogger(__name__)
+
+STATE_FORMAT = "delta"
+STATE_PREFIX = "document_state"
+INDEX_VERSION = 1
+
+# A document loaded in full writes a new base snapshot after this many deltas
+MAX_DELTAS = 8
+# Record ranges closer than this are fetched with one ranged GET
+RANGE_MERGE_GAP_BYTES = 256 * 1024
+# Fetch the whole data object when more than this share of it is needed
+FULL_READ_RATIO = 0.5
+
+
+def _fingerprint(value: Any) -> str:
+    encoded = json.dumps(value, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha1(encoded, usedforsecurity=False).hexdigest()
+
+
+def _split_document(
+    document_dict: Dict[str, Any],
+) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """Split Document.to_dict() into document-level fields, sections and pages."""
+    header = dict(document_dict)
+    pages = header.pop("pages", {}) or {}
+    sections = {
+        section["section_id"]: section for section in header.pop("sections", []) or []
+    }
+    # to_dict leaves out empty HITL metadata; keep the key so that clearing it is a change
+    header.setdefault("hitl_metadata", [])
+    return header, sections, pages
+
+
+@dataclass
+class DocumentState:
+    """Where a loaded Document came from, used to write only what changed."""
+
+    document_id: str
+    base_key: str
+    delta_keys: List[str]
+    section_ids: List[str]
+    page_ids: List[str]
+    header_fingerprints: Dict[str, str] = field(default_factory=dict)
+    section_fingerprints: Dict[str, str] = field(default_factory=dict)
+    page_fingerprints: Dict[str, str] = field(default_factory=dict)
+    # True if only some sections and pages were loaded
+    scoped: bool = False
+
+
+@dataclass
+class _Base:
+    index: Dict[str, Any]
+    sections: Dict[str, Tuple[int, int, List[str]]]
+    pages: Dict[str, Tuple[int, int]]
+
+
+class DocumentStateStore:
+    """Stores Document state as a base snapshot plus per-step deltas in S3."""
+
+    def __init__(self, bucket: str, s3_client: Optional[Any] = None):
+        """
+        Initialize the store.
+
+        Args:
+            bucket: Working bucket holding the document state
+            s3_client: Optional S3 client
+        """
+        self.bucket = bucket
+        self.s3_client = s3_client or boto3.client("s3")
+
+    @staticmethod
+    def is_state_reference(data: Any) -> bool:
+        """Whether data is a wrapper returned by save()."""
+        return (
+            isinstance(data, dict)
+            and data.get("compressed") is True
+            and data.get("format") == STATE_FORMAT
+        )
+
+    def save(self, document: "Document", step_name: str) -> Dict[str, Any]:
+        """
+        Store the state of a document after a step.
+
+        Documents loaded by this store are written as a delta against the
+        state they were loaded from; other documents, and documents loaded in
+        full with a long delta chain, are written as a new base snapshot.
+
+        Args:
+            document: Document to store
+            step_name: Name of the processing step (for the S3 keys)
+
+        Returns:
+            Lightweight wrapper for the Step Functions payload
+        """
+        state: Optional[DocumentState] = getattr(document, "_state", None)
+        if state is not None and state.document_id != document.id:
+            state = None
+
+        if state is None or (not state.scoped and len(state.delta_keys) >= MAX_DELTAS):
+            state = self._write_base(document, step_name)
+        else:
+            state = self._write_delta(document, step_name, state)
+
+        document._state = state
+        return {
+            "document_id": document.id,
+            "format": STATE_FORMAT,
+            "base": state.base_key,
+            "deltas": list(state.delta_keys),
+            "version": len(state.delta_keys),
+            "status": document.status.value,
+            "num_pages": document.num_pages,
+            "sections": [section.section_id for section in document.sections],
+            "compressed": True,
+        }
+
+    def open(self, data: Dict[str, Any]) -> "DocumentView":
+        """
+        Open a view of the document in a wrapper returned by save().
+
+        Reads the base index and the deltas; section and page records are
+        only read when the view materializes them.
+
+        Args:
+            data: Wrapper returned by save()
+
+        Returns:
+            DocumentView with all deltas applied
+        """
+        base_key = data["base"]
+        delta_keys = list(data.get("deltas", []))
+        base = self._read_index(base_key)
+        deltas = [self._get_json(key) for key in delta_keys]
+
+        header = dict(base.index["header"])
+        section_ids = [entry[0] for entry in base.index["sections"]]
+        page_ids = [entry[0] for entry in base.index["pages"]]
+        records: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for delta in deltas:
+            header.update(delta.get("header", {}))
+            for section_id, section in delta.get("sections", {}).items():
+                records[("section", section_id)] = section
+            for page_id, page in delta.get("pages", {}).items():
+                records[("page", page_id)] = page
+            if delta.get("section_ids") is not None:
+                section_ids = delta["section_ids"]
+            if delta.get("page_ids") is not None:
+                page_ids = delta["page_ids"]
+
+        ranges = {("section", sid): entry[:2] for sid, entry in base.sections.items()}
+        ranges.update({("page", pid): entry for pid, entry in base.pages.items()})
+        section_page_ids = {sid: entry[2] for sid, entry in base.sections.items()}
+
+        def fetch(
+            wanted: List[Tuple[int, int]],
+        ) -> Dict[Tuple[int, int], Dict[str, Any]]:
+            return self._read_records(base_key + ".data", base, wanted)
+
+        return DocumentView(
+            header=header,
+            section_ids=section_ids,
+            page_ids=page_ids,
+            records=records,
+            section_page_ids=section_page_ids,
+            ranges=ranges,
+            fetch=fetch,
+            base_key=base_key,
+            delta_keys=delta_keys,
+        )
+
+    def load(
+        self, data: Dict[str, Any], section_id: Optional[str] = None
+    ) -> "Document":
+        """
+        Load a document from a wrapper returned by save().
+
+        Args:
+            data: Wrapper returned by save()
+            section_id: Load only this section and its pages. The document
+                then behaves like the per-section documents of the Map state:
+                saving it keeps only the loaded section and pages.
+
+        Returns:
+            The document with all deltas applied
+        """
+        return self.open(data).to_document(section_id)
+
+    def _key(self, document_id: str, step_name: str, suffix: str) -> str:
+        timestamp = int(time.time() * 1000)
+        return (
+            f"{STATE_PREFIX}/{document_id}/"
+            f"{timestamp}_{step_name}_{uuid.uuid4().hex[:8]}{suffix}"
+        )
+
+    def _write_base(self, document: "Document", step_name: str) -> DocumentState:
+        header, sections, pages = _split_document(document.to_dict())
+        codec = get_codec()
+        # JSON records are newline-delimited so the data object stays readable
+        separator = b"\n" if codec.name == JSON_CODEC else b""
+
+        chunks: List[bytes] = []
+        offset = 0
+        section_entries = []
+        page_entries = []
+
+        def append(record: Dict[str, Any]) -> Tuple[int, int]:
+            nonlocal offset
+            encoded = codec.encode(record) + separator
+            chunks.append(encoded)
+            start, offset = offset, offset + len(encoded)
+            return start, offset
+
+        # Pages of a section are stored next to it, so a section is usually one ranged GET
+        written_pages = set()
+        for section_id, section in sections.items():
+            start, end = append(section)
+            section_entries.append(
+                [section_id, start, end, section.get("page_ids", [])]
+            )
+            for page_id in section.get("page_ids", []):
+                if page_id in pages and page_id not in written_pages:
+                    page_entries.append([page_id, *append(pages[page_id])])
+                    written_pages.add(page_id)
+        for page_id, page in pages.items():
+            if page_id not in written_pages:
+                page_entries.append([page_id, *append(page)])
+
+        # The index lists pages in document order
+        page_order = {page_id: i for i, page_id in enumerate(pages)}
+        page_entries.sort(key=lambda entry: page_order[entry[0]])
+
+        base_key = self._key(document.id, step_name, ".base")
+        self.s3_client.put_object(
+            Bucket=self.bucket,
+            Key=base_key + ".data",
+            Body=b"".join(chunks),
+            ContentType="application/x-ndjson"
+            if codec.name == JSON_CODEC
+            else codec.content_type,
+        )
+        self._put_json(
+            base_key + ".index.json",
+            {
+                "version": INDEX_VERSION,
+                "codec": codec.name,
+                "size": offset,
+                "header": header,
+                "sections": section_entries,
+                "pages": page_entries,
+            },
+        )
+        logger.info(
+            f"Stored document {document.id} base snapshot "
+            f"s3://{self.bucket}/{base_key} ({offset} bytes, {codec.name})"
+        )
+        return DocumentState(
+            document_id=document.id,
+            base_key=base_key,
+            delta_keys=[],
+            section_ids=list(sections),
+            page_ids=list(pages),
+            header_fingerprints={k: _fingerprint(v) for k, v in header.items()},
+            section_fingerprints={k: _fingerprint(v) for k, v in sections.items()},
+            page_fingerprints={k: _fingerprint(v) for k, v in pages.items()},
+        )
+
+    def _write_delta(
+        self, document: "Document", step_name: str, state: DocumentState
+    ) -> DocumentState:
+        header, sections, pages = _split_document(document.to_dict())
+        header_fps = {k: _fingerprint(v) for k, v in header.items()}
+        section_fps = {k: _fingerprint(v) for k, v in sections.items()}
+        page_fps = {k: _fingerprint(v) for k, v in pages.items()}
+
+        delta: Dict[str, Any] = {
+            "header": {
+                k: header[k]
+                for k, fp in header_fps.items()
+                if state.header_fingerprints.get(k) != fp
+            },
+            "sections": {
+                k: sections[k]
+                for k, fp in section_fps.items()
+                if state.section_fingerprints.get(k) != fp
+            },
+            "pages": {
+                k: pages[k]
+                for k, fp in page_fps.items()
+                if state.page_fingerprints.get(k) != fp
+            },
+        }
+        if list(sections) != state.section_ids:
+            delta["section_ids"] = list(sections)
+        if list(pages) != state.page_ids:
+            delta["page_ids"] = list(pages)
+
+        delta_keys = list(state.delta_keys)
+        if any(delta.values()):
+            delta_key = self._key(document.id, step_name, ".delta.json")
+            self._put_json(delta_key, delta)
+            delta_keys.append(delta_key)
+            logger.info(
+                f"Stored document {document.id} delta s3://{self.bucket}/{delta_key}: "
+                f"{len(delta['header'])} fields, {len(delta['sections'])} sections, "
+                f"{len(delta['pages'])} pages"
+            )
+        else:
+            logger.info(f"Document {document.id} unchanged by {step_name}")
+
+        return DocumentState(
+            document_id=document.id,
+            base_key=state.base_key,
+            delta_keys=delta_keys,
+            section_ids=list(sections),
+            page_ids=list(pages),
+            header_fingerprints=header_fps,
+            section_fingerprints=section_fps,
+            page_fingerprints=page_fps,
+            scoped=state.scoped,
+        )
+
+    def _read_index(self, base_key: str) -> _Base:
+        index = self._get_json(base_key + ".index.json")
+        if index.get("version") != INDEX_VERSION:
+            raise ValueError(
+                f"Unsupported document state index version: {index.get('version')}"
+            )
+        return _Base(
+            index=index,
+            sections={
+                entry[0]: (entry[1], entry[2], entry[3]) for entry in index["sections"]
+            },
+            pages={entry[0]: (entry[1], entry[2]) for entry in index["pages"]},
+        )
+
+    def _read_records(
+        self, data_key: str, base: _Base, ranges: List[Tuple[int, int]]
+    ) -> Dict[Tuple[int, int], Dict[str, Any]]:
+        """Fetch records by byte range, merging nearby ranges into one GET."""
+        if not ranges:
+            return {}
+        ranges = sorted(set(ranges))
+        needed = sum(end - start for start, end in ranges)
+        if needed > base.index["size"] * FULL_READ_RATIO:
+            spans = [(0, base.index["size"])]
+        else:
+            spans = []
+            for start, end in ranges:
+                if spans and start - spans[-1][1] <= RANGE_MERGE_GAP_BYTES:
+                    spans[-1] = (spans[-1][0], max(spans[-1][1], end))
+                else:
+                    spans.append((start, end))
+
+        # Indexes written before codecs were introduced have JSON records
+        codec = get_codec(base.index.get("codec", JSON_CODEC))
+        records = {}
+        i = 0
+        for span_start, span_end in spans:
+            request = {"Bucket": self.bucket, "Key": data_key}
+            if (span_start, span_end) != (0, base.index["size"]):
+                request["Range"] = f"bytes={span_start}-{span_end - 1}"
+            body = self.s3_client.get_object(**request)["Body"].read()
+            while i < len(ranges) and ranges[i][1] <= span_end:
+                start, end = ranges[i]
+                records[ranges[i]] = codec.decode(
+                    body[start - span_start : end - span_start]
+                )
+                i += 1
+        return records
+
+    def _get_json(self, key: str, bucket: Optional[str] = None) -> Dict[str, Any]:
+        return self._get_decoded(key, bucket=bucket, codec_name=JSON_CODEC)
+
+    def _get_decoded(
+        self, key: str, bucket: Optional[str] = None, codec_name: str = JSON_CODEC
+    ) -> Any:
+        response = self.s3_client.get_object(Bucket=bucket or self.bucket, Key=key)
+        return get_codec(codec_name).decode(response["Body"].read())
+
+    def _put_json(self, key: str, content: Dict[str, Any]) -> None:
+        self.s3_client.put_object(
+            Bucket=self.bucket,
+            Key=key,
+            Body=json.dumps(content, default=str),
+            ContentType="application/json",
+        )
+
+
+class DocumentView:
+    """
+    Read-only view of a stored document that materializes records on demand.
+
+    The document-level fields and the section and page IDs are available
+    right away; sections and pages are read (and parsed) only when they are
+    requested, and cached. Views are created by DocumentStateStore.open, or by
+    open_document_view for any document payload of a Lambda event.
+    """
+
+    def __init__(
+        self,
+        header: Dict[str, Any],
+        section_ids: List[str],
+        page_ids: List[str],
+        records: Dict[Tuple[str, str], Dict[str, Any]],
+        section_page_ids: Optional[Dict[str, List[str]]] = None,
+        ranges: Optional[Dict[Tuple[str, str], Tuple[int, int]]] = None,
+        fetch: Optional[Callable[[List[Tuple[int, int]]], Dict]] = None,
+        base_key: Optional[str] = None,
+        delta_keys: Optional[List[str]] = None,
+    ):
+        self.header = header
+        self.section_ids = list(section_ids)
+        self.page_ids = list(page_ids)
+        self._records = records
+        self._section_page_ids = section_page_ids or {}
+        self._ranges = ranges or {}
+        self._fetch = fetch
+        self._base_key = base_key
+        self._delta_keys = delta_keys or []
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DocumentView":
+        """View of an uncompressed document dict (Document.to_dict() format)."""
+        header, sections, pages = _split_document(data)
+        records = {("section", sid): section for sid, section in sections.items()}
+        records.update({("page", pid): page for pid, page in pages.items()})
+        return cls(header, list(sections), list(pages), records)
+
+    @property
+    def id(self) -> Optional[str]:
+        return self.header.get("id", self.header.get("input_key"))
+
+    def section_page_ids(self, section_id: str) -> List[str]:
+        """Page IDs of a section, without reading the section record if possible."""
+        record = self._records.get(("section", section_id))
+        if record is not None:
+            page_ids = record.get("page_ids", [])
+        elif section_id in self._section_page_ids:
+            page_ids = self._section_page_ids[section_id]
+        else:
+            page_ids = self.section_record(section_id).get("page_ids", [])
+        available = set(self.page_ids)
+        return [page_id for page_id in page_ids if page_id in available]
+
+    def section_record(self, section_id: str) -> Dict[str, Any]:
+        """Section as a dict in Document.to_dict() format."""
+        if section_id not in self.section_ids:
+            raise ValueError(f"Section {section_id} not found in document {self.id}")
+        return self._get([("section", section_id)])[0]
+
+    def section(self, section_id: str) -> "Section":
+        from idp_common.models import Section
+
+        return Section.from_dict(self.section_record(section_id))
+
+    def page(self, page_id: str) -> "Page":
+        from idp_common.models import Document
+
+        page_record = self._get([("page", page_id)])[0]
+        return Document.from_dict({"pages": {page_id: page_record}}).pages[page_id]
+
+    def to_document(self, section_id: Optional[str] = None) -> "Document":
+        """
+        Materialize a Document.
+
+        Args:
+            section_id: Only materialize this section and its pages
+
+        Returns:
+            The document; if the view is backed by a DocumentStateStore,
+            saving it writes only what changed
+        """
+        from idp_common.models import Document
+
+        if section_id is not None:
+            if section_id not in self.section_ids:
+                raise ValueError(
+                    f"Section {section_id} not found in document {self.id}"
+                )
+            section_ids = [section_id]
+            page_ids = self.section_page_ids(section_id)
+        else:
+            section_ids = self.section_ids
+            page_ids = self.page_ids
+
+        keys = [("section", sid) for sid in section_ids]
+        keys += [("page", pid) for pid in page_ids]
+        records = self._get(keys)
+        sections = records[: len(section_ids)]
+        pages = dict(zip(page_ids, records[len(section_ids) :]))
+        document = Document.from_dict(
+            {**self.header, "sections": sections, "pages": pages}
+        )
+
+        if self._base_key is not None:
+            header, section_dicts, page_dicts = _split_document(document.to_dict())
+            document._state = DocumentState(
+                document_id=document.id,
+                base_key=self._base_key,
+                delta_keys=list(self._delta_keys),
+                section_ids=list(self.section_ids),
+                page_ids=list(self.page_ids),
+                header_fingerprints={k: _fingerprint(v) for k, v in header.items()},
+                section_fingerprints={
+                    k: _fingerprint(v) for k, v in section_dicts.items()
+                },
+                page_fingerprints={k: _fingerprint(v) for k, v in page_dicts.items()},
+                scoped=section_id is not None,
+            )
+        logger.info(
+            f"Materialized document {document.id} "
+            f"({len(sections)} of {len(self.section_ids)} sections, "
+            f"{len(pages)} of {len(self.page_ids)} pages)"
+        )
+        return document
+
+    def _get(self, keys: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        missing = [key for key in keys if key not in self._records]
+        if missing:
+            if self._fetch is None or any(key not in self._ranges for key in missing):
+                raise KeyError(f"Document {self.id} has no record for {missing[0]}")
+            fetched = self._fetch([self._ranges[key] for key in missing])
+            for key in missing:
+                self._records[key] = fetched[self._ranges[key]]
+        return [self._records[key] for key in keys]
+
+
+def open_document_view(
+    data: Dict[str, Any], bucket: Optional[str] = None
+) -> DocumentView:
+    """
+    Open a view of a document payload of a Lambda event.
+
+    Args:
+        data: Delta state wrapper, compress() wrapper or document dict
+        bucket: Working bucket, required for compressed payloads
+
+    Returns:
+        DocumentView of the document
+    """
+    if isinstance(data, dict) and data.get("compressed") is True:
+        if not bucket:
+            raise ValueError("Bucket required for decompressing document")
+        store = DocumentStateStore(bucket)
+        if DocumentStateStore.is_state_reference(data):
+            return store.open(data)
+        # Full document written by Document.compress: one GET, but only the requested records are materialized
+        bucket_name, key = data["s3_uri"][len("s3://") :].split("/", 1)
+        return DocumentView.from_dict(
+            store._get_decoded(
+                key, bucket=bucket_name, codec_name=data.get("codec", JSON_CODEC)
+            )
+        )
+    return DocumentView.from_dict(data)
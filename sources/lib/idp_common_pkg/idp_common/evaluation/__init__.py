@@ -17,6 +17,12 @@ from idp_common.evaluation.comparator import (
     compare_values,
 )
 
+# Cached embeddings for semantic comparison
+from idp_common.evaluation.embedding_service import (
+    EmbeddingService,
+    get_embedding_service,
+)
+
 # Stickler integration components
 from idp_common.evaluation.llm_comparator import LLMComparator
 
@@ -46,6 +52,9 @@ __all__ = [
     # Stickler components
     "SticklerConfigMapper",
     "LLMComparator",
+    # Embeddings
+    "EmbeddingService",
+    "get_embedding_service",
     # Metrics
     "calculate_metrics",
     # Legacy comparison functions (deprecated)
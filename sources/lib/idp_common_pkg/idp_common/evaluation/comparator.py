@@ -27,11 +27,27 @@ import logging
 import math
 import re
 from abc import ABC, abstractmethod
-from typing import Any, List, Optional, Tuple
-
-from munkres import Munkres, make_cost_matrix
-
-from idp_common import bedrock
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:  # pragma: no cover - scipy is installed with stickler-eval
+    linear_sum_assignment = None
+    from munkres import Munkres, make_cost_matrix
+
+try:
+    from rapidfuzz.distance import Levenshtein as rapidfuzz_levenshtein
+    from rapidfuzz.process import cdist as rapidfuzz_cdist
+except ImportError:  # pragma: no cover - rapidfuzz is installed with stickler-eval
+    rapidfuzz_levenshtein = None
+    rapidfuzz_cdist = None
+from idp_common.evaluation.embedding_service import (
+    DEFAULT_EMBEDDING_MODEL,
+    cosine_similarity_matrix,
+    get_embedding_service,
+)
 from idp_common.evaluation.models import EvaluationMethod
 
 logger = logging.getLogger(__name__)
@@ -54,6 +70,26 @@ class Comparator(ABC):
         """
         pass
 
+    def similarity_matrix(self, values1: List[Any], values2: List[Any]) -> np.ndarray:
+        """
+        Compare every value in values1 with every value in values2.
+
+        Subclasses can override this with a batched implementation that avoids
+        repeating per-value work such as normalization.
+
+        Args:
+            values1: Values for the rows of the matrix
+            values2: Values for the columns of the matrix
+
+        Returns:
+            Array of shape (len(values1), len(values2)) with similarity scores
+        """
+        matrix = np.zeros((len(values1), len(values2)))
+        for i, value1 in enumerate(values1):
+            for j, value2 in enumerate(values2):
+                matrix[i, j] = self.compare(value1, value2)
+        return matrix
+
 
 class ExactComparator(Comparator):
     """Exact string match comparator."""
@@ -64,6 +100,16 @@ class ExactComparator(Comparator):
         value2_norm = strip_punctuation_space(str(value2))
         return 1.0 if value1_norm == value2_norm else 0.0
 
+    def similarity_matrix(self, values1: List[Any], values2: List[Any]) -> np.ndarray:
+        """Normalize each value once and compare all pairs for equality."""
+        norm1 = np.array(
+            [strip_punctuation_space(str(v)) for v in values1], dtype=object
+        )
+        norm2 = np.array(
+            [strip_punctuation_space(str(v)) for v in values2], dtype=object
+        )
+        return np.equal.outer(norm1, norm2).astype(float)
+
 
 class NumericComparator(Comparator):
     """Numeric exact match comparator."""
@@ -96,6 +142,29 @@ class FuzzyComparator(Comparator):
         score = fuzz_score(str(value1), str(value2))
         return score
 
+    def similarity_matrix(self, values1: List[Any], values2: List[Any]) -> np.ndarray:
+        """
+        Normalize each value once, then score all pairs with rapidfuzz's native
+        cdist, or without rapidfuzz reuse the bit-parallel pattern of each row
+        value for all columns.
+        """
+        norm1 = [strip_punctuation_space(str(v)) for v in values1]
+        norm2 = [strip_punctuation_space(str(v)) for v in values2]
+        if rapidfuzz_cdist is not None:
+            return rapidfuzz_cdist(
+                norm1,
+                norm2,
+                scorer=rapidfuzz_levenshtein.normalized_similarity,
+                dtype=np.float64,
+            )
+
+        matrix = np.zeros((len(values1), len(values2)))
+        for i, s1 in enumerate(norm1):
+            peq = _pattern_bitmasks(s1) if s1 else None
+            for j, s2 in enumerate(norm2):
+                matrix[i, j] = _similarity(s1, s2, peq)
+        return matrix
+
 
 def strip_punctuation_space(text: str) -> str:
     """
@@ -237,6 +306,43 @@ def convert_to_list(value: Any) -> List[str]:
     return [str(value)]
 
 
+class SemanticComparator(Comparator):
+    """Embedding similarity comparator backed by the shared embedding cache."""
+
+    def __init__(self, threshold: float = 0.8, model_id: str = DEFAULT_EMBEDDING_MODEL):
+        """
+        Initialize the semantic comparator.
+
+        Args:
+            threshold: Minimum similarity score to consider a match (0.0 to 1.0)
+            model_id: The embedding model to use
+        """
+        self.threshold = threshold
+        self.model_id = model_id
+
+    def compare(self, value1: Any, value2: Any) -> float:
+        """Compare values using the cosine similarity of their embeddings."""
+        return float(self.similarity_matrix([value1], [value2])[0, 0])
+
+    def similarity_matrix(self, values1: List[Any], values2: List[Any]) -> np.ndarray:
+        """
+        Embed all distinct values of both lists in one batch and compute the
+        whole cosine similarity matrix at once. Falls back to fuzzy matching
+        if embeddings cannot be generated.
+        """
+        try:
+            matrix = get_embedding_service(self.model_id).similarity_matrix(
+                [str(v) for v in values1], [str(v) for v in values2]
+            )
+        except Exception as e:
+            logger.error(f"Error in semantic comparison: {str(e)}", exc_info=True)
+            logger.warning(
+                "Error in semantic comparison, falling back to fuzzy matching"
+            )
+            return FuzzyComparator(self.threshold).similarity_matrix(values1, values2)
+        return np.clip(matrix, 0.0, 1.0)
+
+
 def compare_hungarian(
     expected: Any,
     actual: Any,
@@ -277,24 +383,13 @@ def compare_hungarian(
         return 0, 0, 0.0
 
     # Create similarity matrix for Hungarian algorithm
-    matrix: List[List[float]] = [
-        [0.0 for _ in range(len(actual_list))] for _ in range(len(expected_list))
-    ]
-
-    # Fill matrix with comparison scores from the provided comparator
-    for i, exp_val in enumerate(expected_list):
-        for j, act_val in enumerate(actual_list):
-            matrix[i][j] = comparator.compare(exp_val, act_val)
-
-    # Convert to cost matrix (Hungarian algorithm minimizes cost)
-    cost_matrix = make_cost_matrix(matrix, lambda x: 1 - x)  # type: ignore[arg-type]
+    matrix = comparator.similarity_matrix(expected_list, actual_list)
 
     # Compute the optimal assignment
-    m = Munkres()
-    indexes = m.compute(cost_matrix)
+    indexes = _maximum_assignment(matrix)
 
     # Count matches and calculate average score
-    matches = [(i, j, matrix[i][j]) for i, j in indexes]
+    matches = [(i, j, float(matrix[i, j])) for i, j in indexes]
     true_positives = sum(1 for _, _, score in matches if score >= threshold)
     false_positives = len(actual_list) - true_positives
 
@@ -303,24 +398,123 @@ def compare_hungarian(
     return true_positives, false_positives, avg_score
 
 
-def fuzz_score(s1: str, s2: str) -> float:
+def _maximum_assignment(matrix: np.ndarray) -> List[Tuple[int, int]]:
     """
-    Calculate fuzzy match score between two strings.
+    Find the assignment of rows to columns with the highest total similarity.
+
+    Args:
+        matrix: Similarity matrix (rows: expected, columns: actual)
+
+    Returns:
+        List of (row, column) index pairs
+    """
+    if linear_sum_assignment is not None:
+        rows, cols = linear_sum_assignment(matrix, maximize=True)
+        return list(zip(rows.tolist(), cols.tolist()))
+
+    # Convert to cost matrix (Hungarian algorithm minimizes cost)
+    cost_matrix = make_cost_matrix(matrix.tolist(), lambda x: 1 - x)  # type: ignore[arg-type]
+    return Munkres().compute(cost_matrix)
+
+
+def _pattern_bitmasks(pattern: str) -> Dict[str, int]:
+    """Map each character of pattern to a bitmask of the positions where it occurs."""
+    peq: Dict[str, int] = {}
+    for i, char in enumerate(pattern):
+        peq[char] = peq.get(char, 0) | (1 << i)
+    return peq
+
 
-    This is a simplified implementation. For a real implementation,
-    you might want to use a dedicated library like python-Levenshtein or fuzzywuzzy.
+def _myers_distance(
+    peq: Dict[str, int],
+    pattern_len: int,
+    text: str,
+    max_distance: Optional[int] = None,
+) -> int:
+    """
+    Levenshtein distance using Myers' bit-parallel algorithm (Hyyro's variant).
+
+    Each DP column is encoded as vertical +1/-1 delta bit vectors, so the whole
+    column is updated with a handful of integer operations per text character.
+    Python integers have arbitrary width, so patterns of any length fit in one
+    word.
+
+    Args:
+        peq: Character bitmasks of the pattern from _pattern_bitmasks
+        pattern_len: Length of the pattern
+        text: String compared against the pattern
+        max_distance: Optional bound; once the distance is known to exceed it,
+            max_distance + 1 is returned
+
+    Returns:
+        Edit distance, or max_distance + 1 if it exceeds max_distance
+    """
+    mask = (1 << pattern_len) - 1
+    last = 1 << (pattern_len - 1)
+    pv = mask
+    mv = 0
+    score = pattern_len
+    remaining = len(text)
+
+    for char in text:
+        eq = peq.get(char, 0)
+        xv = eq | mv
+        xh = ((((eq & pv) + pv) & mask) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        remaining -= 1
+        # Each remaining text character can lower the distance by at most one
+        if max_distance is not None and score - remaining > max_distance:
+            return max_distance + 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+
+    return score
+
+
+def levenshtein_distance(s1: str, s2: str, max_distance: Optional[int] = None) -> int:
+    """
+    Calculate the Levenshtein edit distance between two strings.
+
+    Uses rapidfuzz when it is installed and the bit-parallel algorithm otherwise.
 
     Args:
         s1: First string
         s2: Second string
+        max_distance: Optional bound for early exit; if the distance exceeds it,
+            max_distance + 1 is returned
 
     Returns:
-        Similarity score between 0.0 and 1.0
+        Number of single-character insertions, deletions and substitutions
     """
-    # Normalize inputs
-    s1 = strip_punctuation_space(s1)
-    s2 = strip_punctuation_space(s2)
-
+    if rapidfuzz_levenshtein is not None:
+        return rapidfuzz_levenshtein.distance(s1, s2, score_cutoff=max_distance)
+    if s1 == s2:
+        return 0
+    if not s1 or not s2:
+        distance = len(s1) + len(s2)
+    elif max_distance is not None and abs(len(s1) - len(s2)) > max_distance:
+        distance = abs(len(s1) - len(s2))
+    else:
+        return _myers_distance(_pattern_bitmasks(s1), len(s1), s2, max_distance)
+    if max_distance is not None and distance > max_distance:
+        return max_distance + 1
+    return distance
+
+
+def _similarity(
+    s1: str,
+    s2: str,
+    peq: Optional[Dict[str, int]] = None,
+    score_cutoff: Optional[float] = None,
+) -> float:
+    """Normalized Levenshtein similarity of two already-normalized strings."""
     # Perfect match
     if s1 == s2:
         return 1.0
@@ -329,27 +523,44 @@ def fuzz_score(s1: str, s2: str) -> float:
     if not s1 or not s2:
         return 0.0
 
-    # Calculate Levenshtein distance (simplified implementation)
-    len_s1, len_s2 = len(s1), len(s2)
-    d = [[0 for _ in range(len_s2 + 1)] for _ in range(len_s1 + 1)]
-
-    for i in range(len_s1 + 1):
-        d[i][0] = i
-    for j in range(len_s2 + 1):
-        d[0][j] = j
-
-    for i in range(1, len_s1 + 1):
-        for j in range(1, len_s2 + 1):
-            cost = 0 if s1[i - 1] == s2[j - 1] else 1
-            d[i][j] = min(
-                d[i - 1][j] + 1,  # deletion
-                d[i][j - 1] + 1,  # insertion
-                d[i - 1][j - 1] + cost,  # substitution
-            )
+    max_len = max(len(s1), len(s2))
+    max_distance = None
+    if score_cutoff is not None:
+        max_distance = math.floor((1.0 - score_cutoff) * max_len + 1e-9)
+        if max_distance < 0 or abs(len(s1) - len(s2)) > max_distance:
+            return 0.0
+
+    if peq is not None:
+        distance = _myers_distance(peq, len(s1), s2, max_distance)
+    else:
+        distance = levenshtein_distance(s1, s2, max_distance)
+    if max_distance is not None and distance > max_distance:
+        return 0.0
 
     # Convert to similarity score (1.0 for identical, approaching 0.0 for very different)
-    max_len = max(len_s1, len_s2)
-    return 1.0 - (d[len_s1][len_s2] / max_len if max_len > 0 else 0.0)
+    return 1.0 - distance / max_len
+
+
+def fuzz_score(s1: str, s2: str, score_cutoff: Optional[float] = None) -> float:
+    """
+    Calculate fuzzy match score between two strings.
+
+    The score is 1 - levenshtein_distance / max(len(s1), len(s2)) after
+    normalizing punctuation, whitespace and case.
+
+    Args:
+        s1: First string
+        s2: Second string
+        score_cutoff: Optional minimum score; comparisons that cannot reach it
+            stop early and return 0.0
+
+    Returns:
+        Similarity score between 0.0 and 1.0
+    """
+    # Normalize inputs
+    s1 = strip_punctuation_space(s1)
+    s2 = strip_punctuation_space(s2)
+    return _similarity(s1, s2, score_cutoff=score_cutoff)
 
 
 def compare_fuzzy(
@@ -423,7 +634,7 @@ def compare_semantic(
     expected: Any,
     actual: Any,
     threshold: float = 0.8,
-    model_id: str = "amazon.titan-embed-text-v1",
+    model_id: str = DEFAULT_EMBEDDING_MODEL,
 ) -> Tuple[bool, float]:
     """
     Compare values using semantic embedding similarity.
@@ -459,7 +670,7 @@ def compare_semantic(
 
         # Log embedding generation
         logger.info(
-            f"Generating embeddings for semantic comparison using model: {model_id}"
+            f"Comparing embeddings for semantic comparison using model: {model_id}"
         )
         logger.debug(
             f"Expected text: {expected_str[:100]}{'...' if len(expected_str) > 100 else ''}"
@@ -468,19 +679,24 @@ def compare_semantic(
             f"Actual text: {actual_str[:100]}{'...' if len(actual_str) > 100 else ''}"
         )
 
-        # Generate embeddings
-        expected_embedding = bedrock.generate_embedding(expected_str, model_id)
-        actual_embedding = bedrock.generate_embedding(actual_str, model_id)
+        # Embed both values in one batch through the shared embedding cache
+        expected_embedding, actual_embedding = get_embedding_service(model_id).embed(
+            [expected_str, actual_str]
+        )
 
         # If either embedding is empty, fall back to fuzzy matching
-        if not expected_embedding or not actual_embedding:
+        if expected_embedding is None or actual_embedding is None:
             logger.warning(
                 "Failed to generate embeddings, falling back to fuzzy matching"
             )
             return compare_fuzzy(expected, actual, threshold)
 
         # Calculate cosine similarity
-        similarity = cosine_similarity(expected_embedding, actual_embedding)
+        similarity = float(
+            cosine_similarity_matrix(
+                expected_embedding[None, :], actual_embedding[None, :]
+            )[0, 0]
+        )
         logger.info(f"Semantic similarity score: {similarity:.4f}")
 
         return similarity >= threshold, similarity
@@ -555,6 +771,8 @@ def compare_values(
             comparator = FuzzyComparator(threshold)
         elif comparator_type == "NUMERIC":
             comparator = NumericComparator()
+        elif comparator_type == "SEMANTIC":
+            comparator = SemanticComparator(threshold)
         else:
             # Default to exact comparator
             comparator = ExactComparator()
@@ -0,0 +1,419 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Cached, batched text embeddings for semantic evaluation.
+
+Semantic comparison embeds the same strings over and over: ground-truth values
+repeat across every document of a test set, and list matching compares every
+expected item with every actual item. This module embeds each distinct string
+once per model and keeps the vectors in a layered cache keyed on a hash of the
+model ID and the normalized text:
+
+- an in-process LRU, shared by all comparators in the process
+- a local directory of .npy files (defaults to a directory under /tmp, so it
+  survives warm Lambda invocations)
+- an optional S3 prefix shared by every evaluation function and test run
+
+Cache misses for a whole batch are requested concurrently, bounded by the
+shared Bedrock concurrency limiter, and similarities are computed with NumPy
+over whole matrices.
+"""
+
+import hashlib
+import io
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+import boto3
+import numpy as np
+
+from idp_common import bedrock
+
+logger = logging.getLogger(__name__)
+
+# Bump when the key derivation or stored format changes to invalidate old entries
+CACHE_KEY_VERSION = "v1"
+
+DEFAULT_EMBEDDING_MODEL = "amazon.titan-embed-text-v1"
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "idp-embedding-cache")
+DEFAULT_S3_PREFIX = "embedding-cache"
+DEFAULT_MAX_MEMORY_ENTRIES = 10000
+DEFAULT_MAX_WORKERS = 16
+
+_services: Dict[str, "EmbeddingService"] = {}
+_services_lock = threading.Lock()
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace the same way BedrockClient.generate_embedding does."""
+    return " ".join(text.split())
+
+
+def make_cache_key(model_id: str, text: str) -> str:
+    """
+    Build the cache key for an embedding.
+
+    Args:
+        model_id: Embedding model ID
+        text: Input text (normalized before hashing)
+
+    Returns:
+        Hex SHA-256 digest identifying the embedding
+    """
+    payload = f"{CACHE_KEY_VERSION}:{model_id}:{normalize_text(text)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cosine_similarity_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Cosine similarity between every row of a and every row of b.
+
+    Rows with zero magnitude (e.g. embeddings of empty text) have a similarity
+    of 0.0 with everything.
+
+    Args:
+        a: Array of shape (n, d)
+        b: Array of shape (m, d)
+
+    Returns:
+        Array of shape (n, m)
+    """
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    norm_a = np.linalg.norm(a, axis=1, keepdims=True)
+    norm_b = np.linalg.norm(b, axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        similarity = (a @ b.T) / (norm_a * norm_b.T)
+    return np.nan_to_num(similarity, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def _to_bytes(vector: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    np.save(buffer, vector.astype(np.float32), allow_pickle=False)
+    return buffer.getvalue()
+
+
+def _from_bytes(data: bytes) -> np.ndarray:
+    return np.load(io.BytesIO(data), allow_pickle=False)
+
+
+class EmbeddingService:
+    """
+    Embedding generator with a memory, local disk and optional S3 cache.
+
+    Vectors are stored as float32. Empty or whitespace-only text has no
+    embedding and is returned as None without calling Bedrock.
+    """
+
+    def __init__(
+        self,
+        model_id: str = DEFAULT_EMBEDDING_MODEL,
+        bedrock_client: Optional[Any] = None,
+        cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+        s3_bucket: Optional[str] = None,
+        s3_prefix: str = DEFAULT_S3_PREFIX,
+        max_memory_entries: int = DEFAULT_MAX_MEMORY_ENTRIES,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ):
+        """
+        Initialize the service.
+
+        Args:
+            model_id: Bedrock embedding model ID
+            bedrock_client: Client exposing generate_embedding(text, model_id);
+                defaults to the shared idp_common.bedrock client
+            cache_dir: Directory for the local cache, or None to disable it
+            s3_bucket: Optional S3 bucket for the shared cache
+            s3_prefix: Key prefix for the shared cache
+            max_memory_entries: Size of the in-process LRU
+            max_workers: Maximum concurrent embedding requests per batch
+        """
+        self.model_id = model_id
+        self.bedrock_client = bedrock_client
+        self.cache_dir = cache_dir
+        self.s3_bucket = s3_bucket
+        self.s3_prefix = s3_prefix.strip("/")
+        self.max_memory_entries = max(1, max_memory_entries)
+        self.max_workers = max(1, max_workers)
+
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._s3_client = None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.s3_hits = 0
+        self.requests = 0
+
+    @property
+    def s3_client(self):
+        if self._s3_client is None:
+            self._s3_client = boto3.client(
+                "s3", region_name=os.environ.get("AWS_REGION")
+            )
+        return self._s3_client
+
+    def embed(self, texts: Sequence[Any]) -> List[Optional[np.ndarray]]:
+        """
+        Embed a batch of texts.
+
+        Each distinct text is looked up once; all cache misses are then
+        requested from Bedrock concurrently.
+
+        Args:
+            texts: Values to embed (non-strings are converted with str())
+
+        Returns:
+            One float32 vector per input, or None for empty input or when the
+            model returned no embedding
+
+        Raises:
+            Exception: If Bedrock fails for any text after retries
+        """
+        keys: List[Optional[str]] = []
+        unique: Dict[str, str] = {}
+        for text in texts:
+            normalized = normalize_text(str(text)) if text is not None else ""
+            if not normalized:
+                keys.append(None)
+                continue
+            key = make_cache_key(self.model_id, normalized)
+            keys.append(key)
+            unique.setdefault(key, normalized)
+
+        vectors: Dict[str, np.ndarray] = {}
+        missing: Dict[str, str] = {}
+        for key, normalized in unique.items():
+            vector = self._lookup(key)
+            if vector is None:
+                missing[key] = normalized
+            else:
+                vectors[key] = vector
+
+        if missing:
+            vectors.update(self._generate(missing))
+
+        results: List[Optional[np.ndarray]] = []
+        for key in keys:
+            vector = vectors.get(key) if key is not None else None
+            results.append(vector if vector is not None and vector.size else None)
+        return results
+
+    def embed_one(self, text: Any) -> List[float]:
+        """
+        Embed a single text, returning a list like generate_embedding does.
+
+        This is a drop-in embedding function for comparators that expect one.
+        """
+        vector = self.embed([text])[0]
+        return [] if vector is None else vector.tolist()
+
+    def similarity_matrix(
+        self, texts1: Sequence[Any], texts2: Sequence[Any]
+    ) -> np.ndarray:
+        """
+        Cosine similarity between every text in texts1 and every text in texts2.
+
+        Both sides are embedded in a single batch. Texts without an embedding
+        score 0.0 against everything.
+
+        Returns:
+            Array of shape (len(texts1), len(texts2))
+        """
+        vectors = self.embed(list(texts1) + list(texts2))
+        dimension = next((len(v) for v in vectors if v is not None), 0)
+        if not dimension:
+            return np.zeros((len(texts1), len(texts2)))
+        zero = np.zeros(dimension, dtype=np.float32)
+        stacked = np.vstack([zero if v is None else v for v in vectors])
+        return cosine_similarity_matrix(stacked[: len(texts1)], stacked[len(texts1) :])
+
+    def _lookup(self, key: str) -> Optional[np.ndarray]:
+        """Look up a vector in the memory, disk and S3 tiers, backfilling faster tiers."""
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return vector
+
+        data = self._read_disk(key)
+        if data is not None:
+            with self._lock:
+                self.disk_hits += 1
+        else:
+            data = self._read_s3(key)
+            if data is None:
+                return None
+            with self._lock:
+                self.s3_hits += 1
+            self._write_disk(key, data)
+
+        try:
+            vector = _from_bytes(data)
+        except ValueError as e:
+            logger.warning(f"Ignoring unreadable cached embedding {key}: {e}")
+            return None
+        self._remember(key, vector)
+        return vector
+
+    def _generate(self, missing: Dict[str, str]) -> Dict[str, np.ndarray]:
+        """Request embeddings for all cache misses and store them in every tier."""
+        client = self.bedrock_client or bedrock
+        logger.info(
+            f"Generating {len(missing)} embeddings with {self.model_id} "
+            f"({self.memory_hits + self.disk_hits + self.s3_hits} cache hits so far)"
+        )
+
+        def generate(key: str) -> np.ndarray:
+            embedding = client.generate_embedding(missing[key], self.model_id)
+            return np.asarray(embedding, dtype=np.float32)
+
+        keys = list(missing)
+        if len(keys) == 1:
+            results = [generate(keys[0])]
+        else:
+            with ThreadPoolExecutor(
+                max_workers=min(self.max_workers, len(keys))
+            ) as executor:
+                results = list(executor.map(generate, keys))
+
+        with self._lock:
+            self.requests += len(keys)
+
+        vectors = {}
+        for key, vector in zip(keys, results):
+            vectors[key] = vector
+            if vector.size == 0:
+                # Do not cache empty responses; they would mask a transient failure
+                continue
+            self._remember(key, vector)
+            data = _to_bytes(vector)
+            self._write_disk(key, data)
+            self._write_s3(key, data)
+        return vectors
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir or "", key[:2], f"{key}.npy")
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._disk_path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Embedding disk cache read failed: {e}")
+            return None
+
+    def _write_disk(self, key: str, data: bytes) -> None:
+        if not self.cache_dir:
+            return
+        path = self._disk_path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"Embedding disk cache write failed: {e}")
+
+    def _s3_key(self, key: str) -> str:
+        return f"{self.s3_prefix}/{key[:2]}/{key}.npy"
+
+    def _read_s3(self, key: str) -> Optional[bytes]:
+        if not self.s3_bucket:
+            return None
+        try:
+            response = self.s3_client.get_object(
+                Bucket=self.s3_bucket, Key=self._s3_key(key)
+            )
+            return response["Body"].read()
+        except self.s3_client.exceptions.NoSuchKey:
+            return None
+        except Exception as e:
+            logger.warning(f"Embedding S3 cache read failed: {e}")
+            return None
+
+    def _write_s3(self, key: str, data: bytes) -> None:
+        if not self.s3_bucket:
+            return
+        try:
+            self.s3_client.put_object(
+                Bucket=self.s3_bucket,
+                Key=self._s3_key(key),
+                Body=data,
+                ContentType="application/octet-stream",
+            )
+        except Exception as e:
+            logger.warning(f"Embedding S3 cache write failed: {e}")
+
+
+def get_embedding_service(model_id: str = DEFAULT_EMBEDDING_MODEL) -> EmbeddingService:
+    """
+    Get the process-wide embedding service for a model.
+
+    Services are created on first use from environment variables:
+    EMBEDDING_CACHE_DIR (local cache directory; set to an empty string to
+    disable), EMBEDDING_CACHE_BUCKET and EMBEDDING_CACHE_PREFIX (shared S3
+    cache), EMBEDDING_CACHE_MAX_ENTRIES (in-memory LRU size) and
+    EMBEDDING_MAX_WORKERS.
+
+    Args:
+        model_id: Bedrock embedding model ID
+
+    Returns:
+        Shared EmbeddingService for model_id
+    """
+    service = _services.get(model_id)
+    if service is None:
+        with _services_lock:
+            service = _services.get(model_id)
+            if service is None:
+                service = _services[model_id] = EmbeddingService(
+                    model_id=model_id,
+                    cache_dir=os.environ.get("EMBEDDING_CACHE_DIR", DEFAULT_CACHE_DIR)
+                    or None,
+                    s3_bucket=os.environ.get("EMBEDDING_CACHE_BUCKET") or None,
+                    s3_prefix=os.environ.get(
+                        "EMBEDDING_CACHE_PREFIX", DEFAULT_S3_PREFIX
+                    ),
+                    max_memory_entries=int(
+                        os.environ.get(
+                            "EMBEDDING_CACHE_MAX_ENTRIES", DEFAULT_MAX_MEMORY_ENTRIES
+                        )
+                    ),
+                    max_workers=int(
+                        os.environ.get("EMBEDDING_MAX_WORKERS", DEFAULT_MAX_WORKERS)
+                    ),
+                )
+    return service
+
+
+def set_embedding_service(service: EmbeddingService) -> Optional[EmbeddingService]:
+    """
+    Replace the process-wide embedding service for service.model_id.
+
+    Returns:
+        The service that was replaced, if any
+    """
+    with _services_lock:
+        previous = _services.get(service.model_id)
+        _services[service.model_id] = service
+    return previous
@@ -0,0 +1,75 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Semantic Comparator for Stickler.
+
+This module provides a drop-in replacement for Stickler's SemanticComparator
+that takes its embeddings from the IDP embedding service, so every distinct
+value is embedded once per model and reused across fields, list items and
+documents of a test set instead of being requested from Bedrock per comparison.
+"""
+
+import logging
+from typing import Any, Callable, Optional
+
+from idp_common.evaluation.embedding_service import get_embedding_service
+
+logger = logging.getLogger(__name__)
+
+# Check if Stickler is available
+try:
+    from stickler.comparators.semantic import (
+        SemanticComparator as SticklerSemanticComparator,
+    )
+
+    STICKLER_AVAILABLE = True
+except ImportError:
+    STICKLER_AVAILABLE = False
+
+    # Create a placeholder base class if Stickler is not available
+    class SticklerSemanticComparator:  # type: ignore
+        """Placeholder SemanticComparator base class."""
+
+        def __init__(self, *args, **kwargs):
+            pass
+
+
+class CachedSemanticComparator(SticklerSemanticComparator):
+    """
+    Stickler SemanticComparator whose embeddings come from the cached
+    IDP embedding service.
+    """
+
+    def __init__(
+        self,
+        model_id: str = "amazon.titan-embed-text-v2:0",
+        sim_function: str = "cosine_similarity",
+        embedding_function: Optional[Callable] = None,
+        threshold: float = 0.7,
+        **kwargs: Any,
+    ):
+        """
+        Initialize the semantic comparator.
+
+        Args:
+            model_id: Bedrock embedding model ID (Stickler's default)
+            sim_function: Name of the Stickler similarity function to use
+            embedding_function: Optional custom embedding function; when not
+                provided, the cached embedding service for model_id is used
+            threshold: Similarity threshold (0.0-1.0)
+            **kwargs: Additional parameters (ignored)
+        """
+        if embedding_function is None:
+            embedding_function = get_embedding_service(model_id).embed_one
+        super().__init__(
+            model_id=model_id,
+            sim_function=sim_function,
+            embedding_function=embedding_function,
+            threshold=threshold,
+        )
+        self.model_id = model_id
+
+        logger.debug(
+            f"Initialized CachedSemanticComparator with model={model_id}, threshold={threshold}"
+        )
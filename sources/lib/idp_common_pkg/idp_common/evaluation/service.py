@@ -173,6 +173,19 @@ class EvaluationService:
                         "Registered IDP LLMComparator with Stickler comparator registry"
                     )
 
+                # Replace Stickler's SemanticComparator with one that reuses
+                # cached embeddings across fields and documents
+                from idp_common.evaluation.semantic_comparator import (
+                    CachedSemanticComparator,
+                )
+
+                _global_registry._registry["SemanticComparator"] = (
+                    CachedSemanticComparator  # type: ignore[assignment]
+                )
+                logger.info(
+                    "Replaced Stickler's SemanticComparator with CachedSemanticComparator in registry"
+                )
+
             except ImportError as e:
                 logger.warning(f"LLMComparator setup failed: {e}")
                 config_dict = None
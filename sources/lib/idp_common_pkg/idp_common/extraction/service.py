@@ -648,7 +648,9 @@ class ExtractionService:
 
             page = document.pages[page_id]
             image_uri = page.image_uri
-            image_content = image.prepare_image(image_uri, target_width, target_height)
+            image_content = image.prepare_page_image(
+                image_uri, target_width, target_height, page.image_renditions
+            )
             page_images.append(image_content)
 
         t1 = time.time()
@@ -1075,7 +1077,10 @@ class ExtractionService:
             )
 
             # Invoke model
-            result = self._invoke_extraction_model(content, system_prompt, section_info)
+            with bedrock.batch_labels(document_id=document.id, section_id=section_id):
+                result = self._invoke_extraction_model(
+                    content, system_prompt, section_info
+                )
 
             # Save results
             self._save_results(document, section, result, section_info, section_id, t0)
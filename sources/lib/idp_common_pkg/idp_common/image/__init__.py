@@ -4,12 +4,16 @@
 from PIL import Image, ImageFilter, ImageChops, ImageOps
 import io
 import logging
-from typing import Tuple, Optional, Dict, Any, Union
+from typing import Tuple, Optional, Dict, Any, List, Union
 from ..s3 import get_binary_content
 from ..utils import parse_s3_uri
 
 logger = logging.getLogger(__name__)
 
+# Defaults for adaptive binarization (ADAPTIVE_THRESH_MEAN_C style)
+DEFAULT_BINARIZATION_BLOCK_SIZE = 15
+DEFAULT_BINARIZATION_C = 10
+
 def resize_image(image_data: bytes,
                 target_width: Optional[int] = None,
                 target_height: Optional[int] = None,
@@ -82,37 +86,130 @@ def resize_image(image_data: bytes,
         new_height = int(current_height * scale_factor)
         logger.info(f"Resizing image from {current_width}x{current_height} to {new_width}x{new_height} (scale: {scale_factor:.3f})")
         image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+        return _encode_resized_image(image, original_format)
+    else:
+        # No resizing needed - return original data unchanged
+        logger.info(f"Image {current_width}x{current_height} already fits within {target_width}x{target_height}, returning original")
+        return image_data
 
-        # Save in original format if possible
-        img_byte_array = io.BytesIO()
+def _encode_resized_image(image: Image.Image, original_format: Optional[str]) -> bytes:
+    """
+    Encode a resized image, preserving the original format when possible.
 
-        # Determine save format - use original if available, otherwise JPEG
-        if original_format and original_format in ['JPEG', 'PNG', 'GIF', 'BMP', 'TIFF', 'WEBP']:
-            save_format = original_format
-        else:
-            save_format = 'JPEG'
-            logger.info(f"Converting from {original_format or 'unknown'} to JPEG")
+    Args:
+        image: Resized PIL image
+        original_format: PIL format of the source image
 
-        # Prepare save parameters
-        save_kwargs = {"format": save_format}
+    Returns:
+        Encoded image bytes (JPEG if the original format cannot be preserved)
+    """
+    img_byte_array = io.BytesIO()
 
-        # Add quality parameters for JPEG
-        if save_format in ['JPEG', 'JPG']:
-            save_kwargs["quality"] = 95  # High quality
-            save_kwargs["optimize"] = True
+    # Determine save format - use original if available, otherwise JPEG
+    if original_format and original_format in ['JPEG', 'PNG', 'GIF', 'BMP', 'TIFF', 'WEBP']:
+        save_format = original_format
+    else:
+        save_format = 'JPEG'
+        logger.info(f"Converting from {original_format or 'unknown'} to JPEG")
 
-        # Handle format-specific requirements
-        if save_format == 'PNG' and image.mode not in ['RGBA', 'LA', 'L', 'P']:
-            # PNG requires specific modes
-            if image.mode == 'CMYK':
-                image = image.convert('RGB')
+    # Prepare save parameters
+    save_kwargs = {"format": save_format}
 
-        image.save(img_byte_array, **save_kwargs)
-        return img_byte_array.getvalue()
-    else:
-        # No resizing needed - return original data unchanged
-        logger.info(f"Image {current_width}x{current_height} already fits within {target_width}x{target_height}, returning original")
-        return image_data
+    # Add quality parameters for JPEG
+    if save_format in ['JPEG', 'JPG']:
+        save_kwargs["quality"] = 95  # High quality
+        save_kwargs["optimize"] = True
+
+    # Handle format-specific requirements
+    if save_format == 'PNG' and image.mode not in ['RGBA', 'LA', 'L', 'P']:
+        # PNG requires specific modes
+        if image.mode == 'CMYK':
+            image = image.convert('RGB')
+
+    image.save(img_byte_array, **save_kwargs)
+    return img_byte_array.getvalue()
+
+def _normalize_dimensions(target_width: Optional[Union[int, str]],
+                          target_height: Optional[Union[int, str]]) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Normalize target dimensions the same way resize_image does.
+
+    Empty strings become None. Invalid values make both dimensions None.
+    """
+    if isinstance(target_width, str) and not target_width.strip():
+        target_width = None
+    if isinstance(target_height, str) and not target_height.strip():
+        target_height = None
+    try:
+        return (int(target_width) if target_width is not None else None,
+                int(target_height) if target_height is not None else None)
+    except (ValueError, TypeError):
+        return None, None
+
+def rendition_label(target_width: Optional[Union[int, str]] = None,
+                    target_height: Optional[Union[int, str]] = None) -> Optional[str]:
+    """
+    Get the key under which a page stores its rendition for a target size.
+
+    Args:
+        target_width: Target width in pixels (None or empty string = unconstrained)
+        target_height: Target height in pixels (None or empty string = unconstrained)
+
+    Returns:
+        Label such as "951x1268" (or "autox1268" when only the height is set),
+        or None when no resize is requested
+    """
+    target_width, target_height = _normalize_dimensions(target_width, target_height)
+    if target_width is None and target_height is None:
+        return None
+    return f"{target_width or 'auto'}x{target_height or 'auto'}"
+
+def create_renditions(image_data: bytes,
+                      sizes: List[Tuple[Optional[int], Optional[int]]]) -> Dict[str, Optional[bytes]]:
+    """
+    Create resized renditions of an image for several target sizes.
+
+    The image is decoded once and every rendition is produced from the decoded
+    pixels with the same scaling and encoding as resize_image, so a rendition
+    is byte-for-byte what prepare_image would return for that target size.
+
+    Args:
+        image_data: Raw image bytes
+        sizes: List of (target_width, target_height) tuples
+
+    Returns:
+        Dictionary mapping rendition_label to the rendition bytes, or to None
+        when the original image already fits within the target size
+    """
+    renditions: Dict[str, Optional[bytes]] = {}
+    source = None
+    for target_width, target_height in sizes:
+        label = rendition_label(target_width, target_height)
+        if label is None or label in renditions:
+            continue
+        target_width, target_height = _normalize_dimensions(target_width, target_height)
+
+        if source is None:
+            source = Image.open(io.BytesIO(image_data))
+            source.load()
+        current_width, current_height = source.size
+
+        if target_width is None:
+            target_width = int(target_height * (current_width / current_height))
+        elif target_height is None:
+            target_height = int(target_width * (current_height / current_width))
+
+        scale_factor = min(target_width / current_width, target_height / current_height)
+        if scale_factor >= 1.0:
+            renditions[label] = None
+            continue
+
+        new_size = (int(current_width * scale_factor), int(current_height * scale_factor))
+        resized = source.resize(new_size, Image.Resampling.LANCZOS)
+        renditions[label] = _encode_resized_image(resized, source.format)
+        logger.debug(f"Created {label} rendition: {new_size[0]}x{new_size[1]}")
+
+    return renditions
 
 def prepare_image(image_source: Union[str, bytes],
                  target_width: Optional[int] = None,
@@ -141,7 +238,36 @@ def prepare_image(image_source: Union[str, bytes],
     # Resize and process
     return resize_image(image_data, target_width, target_height, allow_upscale)
 
-def apply_adaptive_binarization(image_data: bytes) -> bytes:
+def prepare_page_image(image_uri: str,
+                       target_width: Optional[int] = None,
+                       target_height: Optional[int] = None,
+                       renditions: Optional[Dict[str, str]] = None) -> bytes:
+    """
+    Prepare a page image for model input, using a precomputed rendition if available.
+
+    OCR stores page renditions for the image sizes configured for classification,
+    extraction and assessment (see Page.image_renditions). When one matches the
+    target size it is returned as stored, without decoding or resizing. Otherwise
+    this falls back to prepare_image.
+
+    Args:
+        image_uri: S3 URI of the page image
+        target_width: Target width in pixels (None or empty string = no resize)
+        target_height: Target height in pixels (None or empty string = no resize)
+        renditions: Mapping of rendition_label to S3 URI, from Page.image_renditions
+
+    Returns:
+        Processed image bytes ready for model input
+    """
+    label = rendition_label(target_width, target_height)
+    if renditions and label in renditions:
+        logger.debug(f"Using precomputed {label} rendition for {image_uri}")
+        return get_binary_content(renditions[label])
+    return prepare_image(image_uri, target_width, target_height)
+
+def apply_adaptive_binarization(image_data: bytes,
+                                block_size: int = DEFAULT_BINARIZATION_BLOCK_SIZE,
+                                c: int = DEFAULT_BINARIZATION_C) -> bytes:
     """
     Apply adaptive binarization using Pillow-only implementation.
 
@@ -150,11 +276,15 @@ def apply_adaptive_binarization(image_data: bytes) -> bytes:
     - Low contrast text
     - Background noise or gradients
 
-    Implements adaptive mean thresholding similar to OpenCV's ADAPTIVE_THRESH_MEAN_C
-    with block_size=15 and C=10.
+    Implements adaptive mean thresholding similar to OpenCV's ADAPTIVE_THRESH_MEAN_C.
+    The local mean comes from Pillow's running-sum BoxBlur and the threshold is
+    applied with ImageChops plus a 256-entry lookup table, so every step runs in
+    Pillow's C core instead of iterating over pixels in Python.
 
     Args:
         image_data: Raw image bytes
+        block_size: Size of the neighbourhood used for the local mean (default 15)
+        c: Constant subtracted from the local mean (default 10)
 
     Returns:
         Processed image as JPEG bytes with adaptive binarization applied
@@ -167,36 +297,15 @@ def apply_adaptive_binarization(image_data: bytes) -> bytes:
         if pil_image.mode != 'L':
             pil_image = pil_image.convert('L')
 
-        # Apply adaptive thresholding using Pillow operations
-        block_size = 15
-        C = 10
-
-        # Create a blurred version for local mean calculation
-        # Use BoxBlur with radius = block_size // 2 to approximate local mean
-        radius = block_size // 2
-        blurred = pil_image.filter(ImageFilter.BoxBlur(radius))
-
-        # Apply adaptive threshold: original > (blurred - C) ? 255 : 0
-        # Load pixel data for efficient access
-        width, height = pil_image.size
-        original_pixels = list(pil_image.getdata())
-        blurred_pixels = list(blurred.getdata())
-
-        binary_pixels = []
-        # Apply thresholding pixel by pixel
-        for orig, blur in zip(original_pixels, blurred_pixels):
-            threshold = blur - C
-            binary_pixels.append(255 if orig > threshold else 0)
-
-        # Create binary image
-        binary_image = Image.new('L', (width, height))
-        binary_image.putdata(binary_pixels)
+        binary_image = _adaptive_threshold(pil_image, int(block_size), int(c))
 
         # Convert to JPEG bytes
         img_byte_array = io.BytesIO()
         binary_image.save(img_byte_array, format="JPEG")
 
-        logger.debug("Applied adaptive binarization preprocessing (Pillow implementation)")
+        logger.debug(
+            f"Applied adaptive binarization preprocessing (block_size={block_size}, C={c})"
+        )
         return img_byte_array.getvalue()
 
     except Exception as e:
@@ -206,6 +315,38 @@ def apply_adaptive_binarization(image_data: bytes) -> bytes:
         return image_data
 
 
+def _adaptive_threshold(gray_image: Image.Image, block_size: int, c: int) -> Image.Image:
+    """
+    Threshold a grayscale image against its local mean: original > (mean - C) ? 255 : 0
+
+    Args:
+        gray_image: Image in mode 'L'
+        block_size: Size of the neighbourhood used for the local mean
+        c: Constant subtracted from the local mean
+
+    Returns:
+        Binary image in mode 'L'
+    """
+    if block_size < 1:
+        raise ValueError(f"block_size must be a positive integer, got {block_size}")
+
+    # Local mean over a block_size x block_size window (edge pixels are replicated)
+    blurred = gray_image.filter(ImageFilter.BoxBlur(block_size // 2))
+
+    # ImageChops.subtract clamps to [0, 255], so pick the operand order that keeps
+    # the comparison exact for the sign of C:
+    #   C > 0:  orig > mean - C  <=>  clamp(mean - orig) < C
+    #   C <= 0: orig > mean - C  <=>  clamp(orig - mean) > -C
+    if c > 0:
+        difference = ImageChops.subtract(blurred, gray_image)
+        lookup = [255 if value < c else 0 for value in range(256)]
+    else:
+        difference = ImageChops.subtract(gray_image, blurred)
+        lookup = [255 if value > -c else 0 for value in range(256)]
+
+    return difference.point(lookup)
+
+
 def prepare_bedrock_image_attachment(image_data: bytes) -> Dict[str, Any]:
     """
     Format an image for Bedrock API attachment
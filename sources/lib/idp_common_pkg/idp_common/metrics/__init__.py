@@ -1,23 +1,43 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: MIT-0
 
+"""
+CloudWatch metrics for IDP Common package.
+
+Metrics are buffered in memory and published off the hot path. The publishing
+mode is selected with the METRICS_MODE environment variable:
+
+- batch (default): aggregated PutMetricData calls with up to 1000 entries each
+- emf: CloudWatch Embedded Metric Format documents written to stdout
+- sync: one PutMetricData call per data point (legacy behaviour)
+
+Lambda handlers should call flush_metrics() before returning, or use the
+flush_metrics_on_return decorator, so that buffered data points are published
+before the execution environment is frozen.
+"""
+
+import atexit
 import boto3
+import functools
 import os
 import logging
 import threading
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Optional
+
+from .buffer import MetricsBuffer, MODE_BATCH, MODE_EMF, MODE_SYNC, DEFAULT_FLUSH_INTERVAL
 
 logger = logging.getLogger(__name__)
 
 # Initialize clients
 _cloudwatch_client = None
 _client_lock = threading.Lock()
-_metric_lock = threading.Lock()
+_buffer = None
+_buffer_lock = threading.Lock()
 
 def get_cloudwatch_client():
     """
     Get or initialize the CloudWatch client in a thread-safe manner
-    
+
     Returns:
         boto3 CloudWatch client
     """
@@ -27,12 +47,67 @@ def get_cloudwatch_client():
             _cloudwatch_client = boto3.client('cloudwatch')
         return _cloudwatch_client
 
-def put_metric(name: str, value: float, unit: str = 'Count', 
+def get_metrics_buffer() -> MetricsBuffer:
+    """
+    Get or initialize the process-wide metrics buffer
+
+    The buffer is configured from environment variables:
+    METRICS_MODE, METRICS_FLUSH_INTERVAL_SECONDS and METRICS_MAX_BATCH_SIZE.
+
+    Returns:
+        Shared MetricsBuffer instance
+    """
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = MetricsBuffer(
+                    mode=os.environ.get('METRICS_MODE', MODE_BATCH),
+                    max_batch_size=int(os.environ.get('METRICS_MAX_BATCH_SIZE', 1000)),
+                    flush_interval=float(
+                        os.environ.get('METRICS_FLUSH_INTERVAL_SECONDS', DEFAULT_FLUSH_INTERVAL)
+                    ),
+                    client_factory=get_cloudwatch_client,
+                )
+    return _buffer
+
+def flush_metrics() -> int:
+    """
+    Publish all buffered metrics. Call at the end of each Lambda invocation.
+
+    Returns:
+        Number of metric series published
+    """
+    if _buffer is None:
+        return 0
+    try:
+        return _buffer.flush()
+    except Exception as e:
+        logger.error(f"Error flushing metrics: {e}")
+        return 0
+
+def flush_metrics_on_return(handler):
+    """
+    Decorator for Lambda handlers that flushes buffered metrics when the handler
+    returns or raises.
+    """
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        try:
+            return handler(*args, **kwargs)
+        finally:
+            flush_metrics()
+    return wrapper
+
+def put_metric(name: str, value: float, unit: str = 'Count',
               dimensions: Optional[List[Dict[str, str]]] = None,
               namespace: Optional[str] = None) -> None:
     """
-    Publish a metric to CloudWatch in a thread-safe manner
-    
+    Record a metric for publishing to CloudWatch in a thread-safe manner
+
+    The data point is buffered and published asynchronously (see METRICS_MODE),
+    so this call does not wait on CloudWatch.
+
     Args:
         name: The name of the metric
         value: The value of the metric
@@ -41,86 +116,51 @@ def put_metric(name: str, value: float, unit: str = 'Count',
         namespace: Optional metric namespace, defaults to environment variable
     """
     dimensions = dimensions or []
-    
+
     # Get namespace from environment if not provided
     if namespace is None:
         namespace = os.environ.get('METRIC_NAMESPACE', 'GENAIDP')
-    
-    # Use thread lock to ensure thread safety when publishing metrics
-    with _metric_lock:
-        logger.debug(f"Publishing metric {name}: {value}")
-        try:
-            cloudwatch = get_cloudwatch_client()
-            cloudwatch.put_metric_data(
-                Namespace=namespace,
-                MetricData=[{
-                    'MetricName': name,
-                    'Value': value,
-                    'Unit': unit,
-                    'Dimensions': dimensions
-                }]
-            )
-        except Exception as e:
-            logger.error(f"Error publishing metric {name}: {e}")
-
-def create_client_performance_metrics(name: str, duration_ms: float, 
-                                     is_success: bool = True, 
+
+    logger.debug(f"Recording metric {name}: {value}")
+    try:
+        get_metrics_buffer().add(namespace, name, value, unit, dimensions)
+    except Exception as e:
+        logger.error(f"Error publishing metric {name}: {e}")
+
+def create_client_performance_metrics(name: str, duration_ms: float,
+                                     is_success: bool = True,
                                      error_type: Optional[str] = None) -> None:
     """
-    Helper to publish standardized client performance metrics in a thread-safe manner
-    
+    Helper to record standardized client performance metrics in a thread-safe manner
+
     Args:
         name: Base name for the metric group
         duration_ms: Duration in milliseconds
         is_success: Whether the operation succeeded
         error_type: Optional error type for failures
     """
-    # Use a single lock for all metrics to ensure they are published as a group
-    with _metric_lock:
-        # Get namespace from environment
-        namespace = os.environ.get('METRIC_NAMESPACE', 'GENAIDP')
-        dimensions = []
-        cloudwatch = get_cloudwatch_client()
-        
-        # Build metric data array for all metrics we want to publish
-        metric_data = [
-            {
-                'MetricName': f"{name}Latency",
-                'Value': duration_ms,
-                'Unit': 'Milliseconds',
-                'Dimensions': dimensions
-            }
-        ]
-        
-        # Add success/failure metrics
-        if is_success:
-            metric_data.append({
-                'MetricName': f"{name}Success",
-                'Value': 1,
-                'Unit': 'Count',
-                'Dimensions': dimensions
-            })
-        else:
-            metric_data.append({
-                'MetricName': f"{name}Failure",
-                'Value': 1,
-                'Unit': 'Count',
-                'Dimensions': dimensions
-            })
-            if error_type:
-                metric_data.append({
-                    'MetricName': f"{name}Error.{error_type}",
-                    'Value': 1,
-                    'Unit': 'Count',
-                    'Dimensions': dimensions
-                })
-        
-        # Publish all metrics in a single API call for efficiency
-        try:
-            cloudwatch.put_metric_data(
-                Namespace=namespace,
-                MetricData=metric_data
-            )
-            logger.debug(f"Published {len(metric_data)} metrics for {name}")
-        except Exception as e:
-            logger.error(f"Error publishing performance metrics for {name}: {e}")
\ No newline at end of file
+    put_metric(f"{name}Latency", duration_ms, 'Milliseconds')
+
+    # Add success/failure metrics
+    if is_success:
+        put_metric(f"{name}Success", 1)
+    else:
+        put_metric(f"{name}Failure", 1)
+        if error_type:
+            put_metric(f"{name}Error.{error_type}", 1)
+
+# Publish whatever is still buffered when a non-Lambda process exits
+atexit.register(flush_metrics)
+
+__all__ = [
+    "MetricsBuffer",
+    "MODE_BATCH",
+    "MODE_EMF",
+    "MODE_SYNC",
+    "get_cloudwatch_client",
+    "get_metrics_buffer",
+    "flush_metrics",
+    "flush_metrics_on_return",
+    "put_metric",
+    "create_client_performance_metrics",
+]
@@ -0,0 +1,309 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Buffered CloudWatch metrics emitter.
+
+Metric data points are aggregated in memory per (namespace, metric, unit, dimensions)
+and published off the hot path, either as batched PutMetricData calls or as
+CloudWatch Embedded Metric Format (EMF) log lines on stdout.
+"""
+
+import json
+import logging
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, TextIO, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Publishing modes
+MODE_BATCH = "batch"  # Aggregated PutMetricData calls (up to 1000 entries per call)
+MODE_EMF = "emf"  # Embedded Metric Format documents written to stdout
+MODE_SYNC = "sync"  # One PutMetricData call per data point (legacy behaviour)
+VALID_MODES = (MODE_BATCH, MODE_EMF, MODE_SYNC)
+
+# CloudWatch limits
+MAX_METRIC_DATA_PER_CALL = 1000  # MetricData entries per PutMetricData request
+MAX_VALUES_PER_METRIC_DATA = 150  # Distinct Values/Counts per MetricData entry
+MAX_EMF_METRICS_PER_DOCUMENT = 100  # Metric definitions per EMF document
+MAX_EMF_VALUES_PER_METRIC = 100  # Values per metric in an EMF document
+
+DEFAULT_FLUSH_INTERVAL = 10.0  # seconds
+
+# (namespace, metric name, unit, ((dimension name, dimension value), ...))
+MetricKey = Tuple[str, str, str, Tuple[Tuple[str, str], ...]]
+
+
+class _MetricSeries:
+    """Aggregated data points for one metric key."""
+
+    __slots__ = ("values", "first_timestamp")
+
+    def __init__(self, timestamp: float):
+        self.values: Dict[float, int] = {}
+        self.first_timestamp = timestamp
+
+    def add(self, value: float) -> None:
+        self.values[value] = self.values.get(value, 0) + 1
+
+
+class MetricsBuffer:
+    """
+    Thread-safe in-memory buffer that aggregates metric data points and publishes
+    them in batches without blocking the caller on network round-trips.
+
+    Adding a data point only takes a short lock to update the in-memory
+    aggregation. When the buffer holds max_batch_size distinct metric series, or
+    flush_interval seconds have passed since the last flush, a background thread
+    is woken up to publish. Call flush() at the end of a Lambda invocation to
+    publish everything that is still pending.
+    """
+
+    def __init__(
+        self,
+        mode: str = MODE_BATCH,
+        max_batch_size: int = MAX_METRIC_DATA_PER_CALL,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        client_factory: Optional[Callable[[], Any]] = None,
+        stream: Optional[TextIO] = None,
+    ):
+        """
+        Initialize the metrics buffer.
+
+        Args:
+            mode: Publishing mode - 'batch', 'emf' or 'sync'
+            max_batch_size: Number of buffered metric series that triggers a flush
+                (capped at the PutMetricData limit of 1000)
+            flush_interval: Seconds between background flushes
+            client_factory: Callable returning a CloudWatch client (batch and sync modes)
+            stream: Output stream for EMF documents (defaults to sys.stdout)
+        """
+        mode = (mode or MODE_BATCH).lower()
+        if mode not in VALID_MODES:
+            raise ValueError(
+                f"Invalid metrics mode: {mode}. Must be one of {', '.join(VALID_MODES)}"
+            )
+        self.mode = mode
+        self.max_batch_size = max(1, min(int(max_batch_size), MAX_METRIC_DATA_PER_CALL))
+        self.flush_interval = float(flush_interval)
+        self._client_factory = client_factory
+        self._stream = stream
+
+        self._lock = threading.Lock()
+        self._publish_lock = threading.Lock()
+        self._pending: Dict[MetricKey, _MetricSeries] = {}
+        self._last_flush = time.time()
+
+        self._flush_event = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    def add(
+        self,
+        namespace: str,
+        name: str,
+        value: float,
+        unit: str = "Count",
+        dimensions: Optional[List[Dict[str, str]]] = None,
+    ) -> None:
+        """
+        Record a metric data point.
+
+        Args:
+            namespace: CloudWatch namespace
+            name: Metric name
+            value: Metric value
+            unit: CloudWatch unit
+            dimensions: Optional list of {'Name': ..., 'Value': ...} dimensions
+        """
+        dimension_key = tuple(
+            (str(dimension["Name"]), str(dimension["Value"]))
+            for dimension in (dimensions or [])
+        )
+        key: MetricKey = (namespace, name, unit, dimension_key)
+
+        if self.mode == MODE_SYNC:
+            series = _MetricSeries(time.time())
+            series.add(float(value))
+            self._publish({key: series})
+            return
+
+        now = time.time()
+        with self._lock:
+            series = self._pending.get(key)
+            if series is None:
+                series = self._pending[key] = _MetricSeries(now)
+            series.add(float(value))
+            should_flush = (
+                len(self._pending) >= self.max_batch_size
+                or now - self._last_flush >= self.flush_interval
+            )
+
+        self._ensure_flusher()
+        if should_flush:
+            self._flush_event.set()
+
+    def flush(self) -> int:
+        """
+        Publish all pending metric data points.
+
+        Returns:
+            Number of metric series published
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.time()
+
+        if not pending:
+            return 0
+
+        self._publish(pending)
+        return len(pending)
+
+    def pending_count(self) -> int:
+        """Number of metric series waiting to be published."""
+        with self._lock:
+            return len(self._pending)
+
+    def _ensure_flusher(self) -> None:
+        """Start the background flusher thread if it is not running."""
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        with self._lock:
+            if self._flusher is not None and self._flusher.is_alive():
+                return
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name="idp-metrics-flusher", daemon=True
+            )
+            self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        """Background loop that flushes on size/time triggers."""
+        while True:
+            self._flush_event.wait(self.flush_interval)
+            self._flush_event.clear()
+            try:
+                self.flush()
+            except Exception as e:  # pragma: no cover - defensive
+                logger.error(f"Error flushing metrics: {e}")
+
+    def _publish(self, pending: Dict[MetricKey, _MetricSeries]) -> None:
+        """Publish aggregated series using the configured mode."""
+        with self._publish_lock:
+            if self.mode == MODE_EMF:
+                self._publish_emf(pending)
+            else:
+                self._publish_put_metric_data(pending)
+
+    def _publish_put_metric_data(self, pending: Dict[MetricKey, _MetricSeries]) -> None:
+        """Publish series with as few PutMetricData calls as possible."""
+        by_namespace: Dict[str, List[Dict[str, Any]]] = {}
+        for (namespace, name, unit, dimension_key), series in pending.items():
+            by_namespace.setdefault(namespace, []).extend(
+                _build_metric_data(name, unit, dimension_key, series)
+            )
+
+        if self._client_factory is None:
+            logger.warning("No CloudWatch client configured, dropping metrics")
+            return
+
+        cloudwatch = self._client_factory()
+        for namespace, metric_data in by_namespace.items():
+            for start in range(0, len(metric_data), MAX_METRIC_DATA_PER_CALL):
+                batch = metric_data[start : start + MAX_METRIC_DATA_PER_CALL]
+                try:
+                    cloudwatch.put_metric_data(Namespace=namespace, MetricData=batch)
+                    logger.debug(
+                        f"Published {len(batch)} metric entries to namespace {namespace}"
+                    )
+                except Exception as e:
+                    logger.error(
+                        f"Error publishing {len(batch)} metric entries to {namespace}: {e}"
+                    )
+
+    def _publish_emf(self, pending: Dict[MetricKey, _MetricSeries]) -> None:
+        """Write series as Embedded Metric Format documents."""
+        stream = self._stream or sys.stdout
+        for document in _build_emf_documents(pending):
+            stream.write(json.dumps(document) + "\n")
+        stream.flush()
+
+
+def _build_metric_data(
+    name: str,
+    unit: str,
+    dimension_key: Tuple[Tuple[str, str], ...],
+    series: _MetricSeries,
+) -> List[Dict[str, Any]]:
+    """Convert one aggregated series into PutMetricData entries (Values/Counts)."""
+    dimensions = [{"Name": n, "Value": v} for n, v in dimension_key]
+    timestamp = datetime.fromtimestamp(series.first_timestamp, tz=timezone.utc)
+    items = list(series.values.items())
+
+    entries = []
+    for start in range(0, len(items), MAX_VALUES_PER_METRIC_DATA):
+        chunk = items[start : start + MAX_VALUES_PER_METRIC_DATA]
+        entries.append(
+            {
+                "MetricName": name,
+                "Dimensions": dimensions,
+                "Timestamp": timestamp,
+                "Unit": unit,
+                "Values": [value for value, _ in chunk],
+                "Counts": [float(count) for _, count in chunk],
+            }
+        )
+    return entries
+
+
+def _build_emf_documents(
+    pending: Dict[MetricKey, _MetricSeries],
+) -> List[Dict[str, Any]]:
+    """Group series by namespace and dimension set into EMF documents."""
+    groups: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], List[Tuple[str, str, List[float], float]]] = {}
+    for (namespace, name, unit, dimension_key), series in pending.items():
+        values = [
+            value for value, count in series.values.items() for _ in range(count)
+        ]
+        groups.setdefault((namespace, dimension_key), []).append(
+            (name, unit, values, series.first_timestamp)
+        )
+
+    documents = []
+    for (namespace, dimension_key), metrics in groups.items():
+        # Split large value lists so that each document stays within EMF limits
+        rounds: List[List[Tuple[str, str, List[float], float]]] = []
+        for name, unit, values, timestamp in metrics:
+            for index, start in enumerate(range(0, len(values), MAX_EMF_VALUES_PER_METRIC)):
+                if index >= len(rounds):
+                    rounds.append([])
+                rounds[index].append(
+                    (name, unit, values[start : start + MAX_EMF_VALUES_PER_METRIC], timestamp)
+                )
+
+        for round_metrics in rounds:
+            for start in range(0, len(round_metrics), MAX_EMF_METRICS_PER_DOCUMENT):
+                chunk = round_metrics[start : start + MAX_EMF_METRICS_PER_DOCUMENT]
+                document: Dict[str, Any] = {
+                    "_aws": {
+                        "Timestamp": int(min(m[3] for m in chunk) * 1000),
+                        "CloudWatchMetrics": [
+                            {
+                                "Namespace": namespace,
+                                "Dimensions": [[n for n, _ in dimension_key]],
+                                "Metrics": [
+                                    {"Name": name, "Unit": unit}
+                                    for name, unit, _, _ in chunk
+                                ],
+                            }
+                        ],
+                    }
+                }
+                for dimension_name, dimension_value in dimension_key:
+                    document[dimension_name] = dimension_value
+                for name, _, values, _ in chunk:
+                    document[name] = values[0] if len(values) == 1 else values
+                documents.append(document)
+    return documents
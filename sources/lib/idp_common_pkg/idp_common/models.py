@@ -9,6 +9,7 @@ as it moves through the processing pipeline.
 """
 
 import json
+import os
 import time
 from dataclasses import dataclass, field
 from enum import Enum
@@ -32,7 +33,7 @@ class Status(Enum):
     FAILED = "FAILED"  # Processing failed
 
 
-@dataclass
+@dataclass(slots=True)
 class Page:
     """Represents a single page in a document."""
 
@@ -45,9 +46,15 @@ class Page:
     confidence: float = 0.0
     tables: List[Dict[str, Any]] = field(default_factory=list)
     forms: Dict[str, str] = field(default_factory=dict)
+    # Page image renditions precomputed by OCR, keyed by image.rendition_label
+    image_renditions: Dict[str, str] = field(default_factory=dict)
+    # Token counts of the page text, keyed by tokenizer name (see idp_common.tokens)
+    token_counts: Dict[str, int] = field(default_factory=dict)
+    # Classification metadata of the page (e.g. section boundaries); not serialized
+    metadata: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class Section:
     """Represents a section of pages with the same classification."""
 
@@ -163,6 +170,10 @@ class Document:
     - load_document(): Process document input from Lambda events
     - serialize_document(): Prepare document output with automatic compression
 
+    serialize_document() stores delta-encoded state (see idp_common.document_state):
+    a base snapshot plus the changes of each step, so that load_section() reads
+    only one section and its pages.
+
     Usage Examples:
         # Handle input in Lambda functions
         document = Document.load_document(event_data, working_bucket, logger)
@@ -247,6 +258,8 @@ class Document:
                 "confidence": page.confidence,
                 "tables": page.tables,
                 "forms": page.forms,
+                "image_renditions": page.image_renditions,
+                "token_counts": page.token_counts,
             }
 
         # Convert sections
@@ -316,6 +329,8 @@ class Document:
                 confidence=page_data.get("confidence", 0.0),
                 tables=page_data.get("tables", []),
                 forms=page_data.get("forms", {}),
+                image_renditions=page_data.get("image_renditions", {}),
+                token_counts=page_data.get("token_counts", {}),
             )
 
         # Convert sections
@@ -525,6 +540,10 @@ class Document:
         """
         Store full document in S3 and return lightweight wrapper for Step Functions.
 
+        The document is encoded with the codec named by the DOCUMENT_STATE_CODEC
+        environment variable (JSON by default); a codec other than JSON is
+        recorded as "codec" in the wrapper.
+
         Args:
             bucket: S3 bucket to store the full document
             step_name: Name of the processing step (for unique S3 key)
@@ -536,21 +555,23 @@ class Document:
 
         import boto3
 
+        from idp_common.document_codec import JSON_CODEC, get_codec
+
         logger = logging.getLogger(__name__)
         s3_client = boto3.client("s3")
+        codec = get_codec()
 
         # Generate unique S3 key with timestamp
         timestamp = str(int(time.time() * 1000))  # milliseconds for uniqueness
-        s3_key = f"compressed_documents/{self.id}/{timestamp}_{step_name}_state.json"
+        s3_key = f"compressed_documents/{self.id}/{timestamp}_{step_name}_state{codec.extension}"
 
         try:
             # Store full document in S3
-            full_document_json = self.to_json()
             s3_client.put_object(
                 Bucket=bucket,
                 Key=s3_key,
-                Body=full_document_json,
-                ContentType="application/json",
+                Body=codec.encode(self.to_dict()),
+                ContentType=codec.content_type,
             )
 
             s3_uri = f"s3://{bucket}/{s3_key}"
@@ -560,7 +581,7 @@ class Document:
             # This significantly reduces payload size for large documents
             sections_for_map = [section.section_id for section in self.sections]
 
-            return {
+            wrapper = {
                 "document_id": self.id,
                 "s3_uri": s3_uri,
                 "timestamp": timestamp,
@@ -569,6 +590,9 @@ class Document:
                 "sections": sections_for_map,  # For Step Functions Map state
                 "compressed": True,
             }
+            if codec.name != JSON_CODEC:
+                wrapper["codec"] = codec.name
+            return wrapper
 
         except Exception as e:
             logger.error(f"Error compressing document {self.id}: {str(e)}")
@@ -591,6 +615,8 @@ class Document:
 
         import boto3
 
+        from idp_common.document_codec import JSON_CODEC, get_codec
+
         logger = logging.getLogger(__name__)
         s3_client = boto3.client("s3")
 
@@ -603,12 +629,12 @@ class Document:
             parsed_uri = urlparse(s3_uri)
             s3_key = parsed_uri.path.lstrip("/")
 
-            # Retrieve full document from S3
+            # Retrieve full document from S3; wrappers without a codec hold JSON
+            codec = get_codec(compressed_data.get("codec", JSON_CODEC))
             response = s3_client.get_object(Bucket=bucket, Key=s3_key)
-            document_json = response["Body"].read().decode("utf-8")
 
             # Restore full document
-            document = cls.from_json(document_json)
+            document = cls.from_dict(codec.decode(response["Body"].read()))
 
             logger.info(f"Decompressed document {document.id} from {s3_uri}")
             return document
@@ -632,12 +658,16 @@ class Document:
         if isinstance(data, dict) and data.get("compressed") is True:
             if not bucket:
                 raise ValueError("Bucket required for decompressing document")
+            if data.get("format") == "delta":
+                from idp_common.document_state import DocumentStateStore
+
+                return DocumentStateStore(bucket).load(data)
             return cls.decompress(bucket, data)
         else:
             return cls.from_dict(data)
 
     @classmethod
-    def load_document(cls, event_data, working_bucket, logger=None):
+    def load_document(cls, event_data, working_bucket, logger=None, section_id=None):
         """
         Utility method to handle document input from Lambda events.
         Automatically handles both compressed and uncompressed documents.
@@ -646,10 +676,24 @@ class Document:
             event_data: The document data from the Lambda event
             working_bucket: S3 bucket for decompression
             logger: Optional logger for debug messages
+            section_id: Optional section to load; see load_section()
 
         Returns:
             Document: The document instance
         """
+        if section_id is not None:
+            if logger:
+                logger.info(f"Loading section {section_id} of document")
+            return cls.load_section(working_bucket, event_data, section_id)
+
+        from idp_common.document_state import DocumentStateStore
+
+        if DocumentStateStore.is_state_reference(event_data):
+            if logger:
+                logger.info(
+                    f"Loading document state version {event_data.get('version')}"
+                )
+            return DocumentStateStore(working_bucket).load(event_data)
         if isinstance(event_data, dict) and event_data.get("compressed") is True:
             if logger:
                 logger.info("Decompressed document from S3")
@@ -659,6 +703,32 @@ class Document:
                 logger.info("Loaded uncompressed document")
             return cls.from_dict(event_data)
 
+    @classmethod
+    def load_section(cls, bucket, compressed, section_id):
+        """
+        Load one section of a document and the pages it spans.
+
+        The returned document has the document-level fields, the section and
+        its pages only, like the per-section documents of the Map state. Other
+        sections and pages are never materialized, and for delta-encoded state
+        they are not read from S3 either.
+
+        Args:
+            bucket: Working bucket holding compressed documents
+            compressed: Document payload of the Lambda event (delta state,
+                compressed wrapper or document dict)
+            section_id: ID of the section to load
+
+        Returns:
+            Document: The section-scoped document
+
+        Raises:
+            ValueError: If the document has no section with this ID
+        """
+        from idp_common.document_state import open_document_view
+
+        return open_document_view(compressed, bucket).to_document(section_id)
+
     def serialize_document(
         self, working_bucket, step_name, logger=None, size_threshold_kb=0
     ):
@@ -666,6 +736,10 @@ class Document:
         Utility method to prepare document output for Lambda responses.
         Automatically compresses documents and returns appropriate response format.
 
+        Compressed documents are stored as delta-encoded state (DocumentStateStore)
+        unless the DOCUMENT_STATE_FORMAT environment variable is set to
+        "compressed", which stores the full document JSON with compress().
+
         Args:
             working_bucket: S3 bucket for compression
             step_name: Name of the processing step (for S3 key generation)
@@ -675,6 +749,20 @@ class Document:
         Returns:
             dict: Response data with either compressed reference or document dict
         """
+        from idp_common.document_state import STATE_FORMAT, DocumentStateStore
+
+        use_state_store = (
+            os.environ.get("DOCUMENT_STATE_FORMAT", STATE_FORMAT) == STATE_FORMAT
+        )
+        if working_bucket and use_state_store and size_threshold_kb <= 0:
+            # Skip serializing the whole document just to measure it
+            wrapper = DocumentStateStore(working_bucket).save(self, step_name)
+            if logger:
+                logger.info(
+                    f"Stored document state version {wrapper['version']} after {step_name}"
+                )
+            return wrapper
+
         document_json = json.dumps(self.to_dict(), default=str)
         document_size = len(document_json.encode("utf-8"))
         threshold_bytes = size_threshold_kb * 1024
@@ -688,6 +776,8 @@ class Document:
                 logger.info(
                     f"Document size ({document_size} bytes) exceeds {size_threshold_kb}KB threshold, compressing to S3"
                 )
+            if use_state_store:
+                return DocumentStateStore(working_bucket).save(self, step_name)
             compressed_data = self.compress(working_bucket, step_name)
             return compressed_data
         else:
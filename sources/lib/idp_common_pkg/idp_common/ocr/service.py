@@ -13,7 +13,11 @@ from __future__ import annotations
 
 import concurrent.futures
 import logging
+import mmap
 import os
+import shutil
+import tempfile
+import threading
 import time
 from typing import Any, Dict, List, Optional, Tuple, Union
 
@@ -21,13 +25,22 @@ import boto3
 import fitz  # PyMuPDF
 from botocore.config import Config
 
-from idp_common import bedrock, image, s3, utils
+from idp_common import bedrock, image, s3, tokens, utils
 from idp_common.config.models import IDPConfig
 from idp_common.models import Document, Page, Status
 from idp_common.ocr.document_converter import DocumentConverter
 
 logger = logging.getLogger(__name__)
 
+# Chunk size for streaming the input document to the spool file
+SPOOL_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Share of the Lambda memory that rendered pages in flight may use
+PAGE_MEMORY_BUDGET_FRACTION = 0.5
+
+# Lower bound for the per-page memory estimate
+MIN_PAGE_MEMORY_MB = 8.0
+
 
 class OcrService:
     """Service for OCR processing of documents using AWS Textract or Amazon Bedrock."""
@@ -87,6 +100,8 @@ class OcrService:
             self.bedrock_config = bedrock_config
             self.preprocessing_config = preprocessing_config
             self.enhanced_features = enhanced_features
+            self.rendition_sizes = []
+            self.tokenizers = {}
         else:
             # Convert dict to IDPConfig if needed
             if config is not None and isinstance(config, dict):
@@ -190,6 +205,14 @@ class OcrService:
                 and preprocessing_value.lower() == "true"
             ):
                 self.preprocessing_config = {"enabled": True}
+                if self.config.ocr.image.binarization_block_size is not None:
+                    self.preprocessing_config["block_size"] = (
+                        self.config.ocr.image.binarization_block_size
+                    )
+                if self.config.ocr.image.binarization_c is not None:
+                    self.preprocessing_config["c"] = (
+                        self.config.ocr.image.binarization_c
+                    )
             else:
                 self.preprocessing_config = None
 
@@ -211,6 +234,35 @@ class OcrService:
             else:
                 self.bedrock_config = None
 
+            # Image sizes used by the downstream stages; OCR stores a rendition
+            # of each page per size so they don't have to resize the page image
+            self.rendition_sizes = [
+                (stage.image.target_width, stage.image.target_height)
+                for stage in (
+                    self.config.classification,
+                    self.config.extraction,
+                    self.config.assessment,
+                )
+                if image.rendition_label(
+                    stage.image.target_width, stage.image.target_height
+                )
+            ]
+
+            # Tokenizers of the downstream models; OCR counts the tokens of each
+            # page once so they can size prompts without counting again
+            self.tokenizers = {
+                tokenizer.name: tokenizer
+                for tokenizer in (
+                    tokens.get_tokenizer(stage.model)
+                    for stage in (
+                        self.config.classification,
+                        self.config.extraction,
+                        self.config.assessment,
+                    )
+                    if stage.model
+                )
+            }
+
         # Log DPI and sizing configuration together for clarity
         if self.resize_config:
             logger.info(
@@ -291,16 +343,21 @@ class OcrService:
                 "OCR Service initialized with 'none' backend - image-only processing"
             )
 
-        # Initialize S3 client with connection pool matching max_workers
+        # Initialize S3 client with connection pool matching the number of
+        # background upload workers, which scales with max_workers
+        self.upload_workers = max(self.max_workers, 10)
         s3_config = Config(
             retries={"max_attempts": 10, "mode": "adaptive"},
-            max_pool_connections=max(self.max_workers, 10),
+            max_pool_connections=self.upload_workers,
         )
         self.s3_client = boto3.client("s3", config=s3_config)
         logger.info(
-            f"S3 client initialized with {max(self.max_workers, 10)} connection pool size"
+            f"S3 client initialized with {self.upload_workers} connection pool size"
         )
 
+        # Background writer for page artifacts, active during process_document
+        self._artifact_writer: Optional[s3.S3ArtifactWriter] = None
+
         # Initialize document converter for non-PDF formats
         self.document_converter = DocumentConverter(dpi=self.dpi or 150)
 
@@ -309,6 +366,12 @@ class OcrService:
         Process a document with OCR and update the Document model.
         Supports PDF, images, text, CSV, Excel, and Word documents.
 
+        The input is streamed to a local spool file rather than read into
+        memory. PDF pages are rendered one at a time by a single producer and
+        handed to the OCR workers, with at most _max_pages_in_flight() rendered
+        pages held in memory at once, so memory use stays flat regardless of
+        the page count.
+
         Args:
             document: Document model object to update with OCR results
 
@@ -317,14 +380,11 @@ class OcrService:
         """
         t0 = time.time()
 
-        # Get the document from S3
+        # Stream the document from S3 to a local spool file
         try:
-            response = self.s3_client.get_object(
-                Bucket=document.input_bucket, Key=document.input_key
-            )
-            file_content = response["Body"].read()
+            spool_path = self._spool_input(document)
             t1 = time.time()
-            logger.debug(f"Time taken for S3 GetObject: {t1 - t0:.6f} seconds")
+            logger.debug(f"Time taken to spool S3 object: {t1 - t0:.6f} seconds")
         except Exception as e:
             import traceback
 
@@ -335,120 +395,41 @@ class OcrService:
             document.status = Status.FAILED
             return document
 
+        # Upload page artifacts in the background so that page workers move on
+        # to their next OCR call while the PUTs complete
+        self._artifact_writer = s3.S3ArtifactWriter(
+            max_workers=self.upload_workers, s3_client=self.s3_client
+        )
+
         # Detect file type and process accordingly
         try:
-            file_type = self._detect_file_type(document.input_key, file_content)
-            logger.info(f"Detected file type: {file_type}")
-
-            if file_type in ["txt", "csv", "xlsx", "docx"]:
-                # Process non-PDF documents
-                pages_data = self._process_non_pdf_document(file_type, file_content)
-                document.num_pages = len(pages_data)
-
-                # Process each page
-                for page_index, (image_bytes, page_text) in enumerate(pages_data):
-                    page_id = str(page_index + 1)
-                    try:
-                        ocr_result, page_metering = self._process_converted_page(
-                            page_index,
-                            image_bytes,
-                            page_text,
-                            document.output_bucket,
-                            document.input_key,
-                        )
-
-                        # Create Page object and add to document
-                        document.pages[page_id] = Page(
-                            page_id=page_id,
-                            image_uri=ocr_result["image_uri"],
-                            raw_text_uri=ocr_result["raw_text_uri"],
-                            parsed_text_uri=ocr_result["parsed_text_uri"],
-                            text_confidence_uri=ocr_result["text_confidence_uri"],
-                        )
+            with open(spool_path, "rb") as spool_file:
+                file_content = self._map_file(spool_file)
+                try:
+                    file_type = self._detect_file_type(document.input_key, file_content)
+                    logger.info(f"Detected file type: {file_type}")
 
-                        # Merge metering data
-                        document.metering = utils.merge_metering_data(
-                            document.metering, page_metering
+                    if file_type in ["txt", "csv", "xlsx", "docx"]:
+                        # Non-PDF documents are converted in memory
+                        self._process_converted_document(
+                            document, file_type, bytes(file_content)
                         )
-
-                    except Exception as e:
-                        import traceback
-
-                        error_msg = f"Error processing page {page_index + 1}: {str(e)}"
-                        stack_trace = traceback.format_exc()
-                        logger.error(f"{error_msg}\nStack trace:\n{stack_trace}")
-                        document.errors.append(f"{error_msg} (see logs for full trace)")
-            else:
-                # Process PDF/image documents using existing logic
-                pdf_document = fitz.open(stream=file_content, filetype=file_type)
-                num_pages = len(pdf_document)
-                document.num_pages = num_pages
-
-                with concurrent.futures.ThreadPoolExecutor(
-                    max_workers=self.max_workers
-                ) as executor:
-                    # Pass original file content for image files
-                    original_content = file_content if not pdf_document.is_pdf else None
-
-                    future_to_page = {
-                        executor.submit(
-                            self._process_single_page,
-                            i,
-                            pdf_document,
-                            document.output_bucket,
-                            document.input_key,
-                            original_content,
-                        ): i
-                        for i in range(num_pages)
-                    }
-
-                    # Start memory monitoring in background thread
-                    memory_monitor_shutdown = self._start_memory_monitoring()
-                    completed_pages = 0
-
-                    try:
-                        for future in concurrent.futures.as_completed(future_to_page):
-                            page_index = future_to_page[future]
-                            page_id = str(page_index + 1)
-                            try:
-                                ocr_result, page_metering = future.result()
-
-                                # Create Page object and add to document
-                                document.pages[page_id] = Page(
-                                    page_id=page_id,
-                                    image_uri=ocr_result["image_uri"],
-                                    raw_text_uri=ocr_result["raw_text_uri"],
-                                    parsed_text_uri=ocr_result["parsed_text_uri"],
-                                    text_confidence_uri=ocr_result[
-                                        "text_confidence_uri"
-                                    ],
-                                )
-
-                                # Merge metering data
-                                document.metering = utils.merge_metering_data(
-                                    document.metering, page_metering
-                                )
-
-                                completed_pages += 1
-
-                            except Exception as e:
-                                import traceback
-
-                                error_msg = (
-                                    f"Error processing page {page_index + 1}: {str(e)}"
-                                )
-                                stack_trace = traceback.format_exc()
-                                logger.error(
-                                    f"{error_msg}\nStack trace:\n{stack_trace}"
-                                )
-                                document.errors.append(
-                                    f"{error_msg} (see logs for full trace)"
-                                )
-                    finally:
-                        # Stop memory monitoring
-                        memory_monitor_shutdown.set()
-
-                pdf_document.close()
+                    else:
+                        # Images are small and processed from their original bytes;
+                        # PDFs are opened from the spool file and read on demand
+                        pdf_document = fitz.open(spool_path, filetype=file_type)
+                        try:
+                            original_content = (
+                                None if pdf_document.is_pdf else bytes(file_content)
+                            )
+                            self._process_pdf_pages(
+                                document, pdf_document, original_content
+                            )
+                        finally:
+                            pdf_document.close()
+                finally:
+                    if hasattr(file_content, "close"):
+                        file_content.close()
 
             # Sort the pages dictionary by ascending page number
             logger.info(f"Sorting {len(document.pages)} pages by page number")
@@ -474,6 +455,15 @@ class OcrService:
             document.errors.append(f"{error_msg} (see logs for full trace)")
             document.status = Status.FAILED
 
+        finally:
+            try:
+                os.unlink(spool_path)
+            except OSError as e:
+                logger.warning(f"Failed to remove spool file {spool_path}: {e}")
+
+        # Wait for every page artifact to reach S3 before returning page URIs
+        self._flush_artifacts(document)
+
         t2 = time.time()
         logger.info(f"OCR processing completed in {t2 - t0:.2f} seconds")
         logger.info(
@@ -481,6 +471,316 @@ class OcrService:
         )
         return document
 
+    def _spool_input(self, document: Document) -> str:
+        """
+        Stream the input document from S3 into a local spool file.
+
+        The spool directory defaults to the system temp directory (/tmp on
+        Lambda) and can be changed with the OCR_SPOOL_DIR environment variable.
+
+        Args:
+            document: Document with input_bucket and input_key
+
+        Returns:
+            Path of the spool file; the caller is responsible for removing it
+        """
+        response = self.s3_client.get_object(
+            Bucket=document.input_bucket, Key=document.input_key
+        )
+        spool_dir = os.environ.get("OCR_SPOOL_DIR") or tempfile.gettempdir()
+        fd, spool_path = tempfile.mkstemp(prefix="ocr-input-", dir=spool_dir)
+        try:
+            with os.fdopen(fd, "wb") as spool_file:
+                shutil.copyfileobj(response["Body"], spool_file, SPOOL_CHUNK_SIZE)
+        except BaseException:
+            os.unlink(spool_path)
+            raise
+        return spool_path
+
+    @staticmethod
+    def _map_file(spool_file) -> Union[bytes, mmap.mmap]:
+        """Memory-map a spool file read-only (empty files cannot be mapped)."""
+        if os.fstat(spool_file.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(spool_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _max_pages_in_flight(self) -> int:
+        """
+        Maximum number of rendered pages held in memory at once.
+
+        Enough pages are kept in flight to give every OCR worker a page to work
+        on and one ready to go, capped by a memory budget derived from the
+        Lambda memory size (AWS_LAMBDA_FUNCTION_MEMORY_SIZE) and the rendered
+        page size. OCR_MAX_PAGES_IN_FLIGHT overrides the computed value.
+        """
+        override = os.environ.get("OCR_MAX_PAGES_IN_FLIGHT")
+        if override:
+            return max(1, int(override))
+
+        pages_in_flight = self.max_workers * 2
+        memory_mb = int(os.environ.get("AWS_LAMBDA_FUNCTION_MEMORY_SIZE") or 0)
+        if memory_mb > 0:
+            budget_mb = memory_mb * PAGE_MEMORY_BUDGET_FRACTION
+            memory_limit = int(budget_mb // self._estimated_page_memory_mb())
+            pages_in_flight = min(pages_in_flight, memory_limit)
+        return max(1, pages_in_flight)
+
+    def _estimated_page_memory_mb(self) -> float:
+        """
+        Conservative estimate of the memory one in-flight page needs.
+
+        Based on the uncompressed RGB size of a rendered page: a US Letter page
+        at the configured DPI, or the configured target size if smaller. It is
+        doubled to cover the encoded image, preprocessing copies and the OCR
+        response held while the page is processed.
+        """
+        dpi = self.dpi or 150
+        width, height = 8.5 * dpi, 11 * dpi
+        if self.resize_config:
+            target_width = self.resize_config.get("target_width")
+            target_height = self.resize_config.get("target_height")
+            if target_width and target_height:
+                scale = min(1.0, target_width / width, target_height / height)
+                width, height = width * scale, height * scale
+        raw_mb = width * height * 3 / (1024 * 1024)
+        return max(MIN_PAGE_MEMORY_MB, raw_mb * 2)
+
+    def _process_converted_document(
+        self, document: Document, file_type: str, file_content: bytes
+    ) -> None:
+        """Convert a text, CSV, Excel or Word document to pages and process them."""
+        pages_data = self._process_non_pdf_document(file_type, file_content)
+        document.num_pages = len(pages_data)
+
+        # Process each page
+        for page_index, (image_bytes, page_text) in enumerate(pages_data):
+            page_id = str(page_index + 1)
+            try:
+                ocr_result, page_metering = self._process_converted_page(
+                    page_index,
+                    image_bytes,
+                    page_text,
+                    document.output_bucket,
+                    document.input_key,
+                )
+
+                # Create Page object and add to document
+                document.pages[page_id] = Page(
+                    page_id=page_id,
+                    image_uri=ocr_result["image_uri"],
+                    raw_text_uri=ocr_result["raw_text_uri"],
+                    parsed_text_uri=ocr_result["parsed_text_uri"],
+                    text_confidence_uri=ocr_result["text_confidence_uri"],
+                    image_renditions=ocr_result.get("image_renditions", {}),
+                    token_counts=ocr_result.get("token_counts", {}),
+                )
+
+                # Merge metering data
+                document.metering = utils.merge_metering_data(
+                    document.metering, page_metering
+                )
+
+            except Exception as e:
+                import traceback
+
+                error_msg = f"Error processing page {page_index + 1}: {str(e)}"
+                stack_trace = traceback.format_exc()
+                logger.error(f"{error_msg}\nStack trace:\n{stack_trace}")
+                document.errors.append(f"{error_msg} (see logs for full trace)")
+
+    def _process_pdf_pages(
+        self,
+        document: Document,
+        pdf_document: fitz.Document,
+        original_content: Optional[bytes] = None,
+    ) -> None:
+        """
+        Render and OCR the pages of a PDF or image document.
+
+        The calling thread is the producer: it renders one page at a time
+        (PyMuPDF documents must not be used from several threads) and submits
+        it to the OCR workers. Before rendering the next page it waits for a
+        free in-flight slot, so when OCR falls behind rendering pauses instead
+        of piling up page images in memory.
+
+        Args:
+            document: Document to add pages, metering and errors to
+            pdf_document: Open PyMuPDF document
+            original_content: Original file content for image files
+        """
+        num_pages = len(pdf_document)
+        document.num_pages = num_pages
+
+        pages_in_flight = self._max_pages_in_flight()
+        num_workers = max(1, min(self.max_workers, pages_in_flight))
+        logger.info(
+            f"Processing {num_pages} pages with {num_workers} workers "
+            f"and at most {pages_in_flight} pages in flight"
+        )
+        slots = threading.BoundedSemaphore(pages_in_flight)
+
+        def page_done(page_index: int, future: concurrent.futures.Future) -> None:
+            slots.release()
+            page_id = str(page_index + 1)
+            try:
+                ocr_result, page_metering = future.result()
+
+                # Create Page object and add to document
+                document.pages[page_id] = Page(
+                    page_id=page_id,
+                    image_uri=ocr_result["image_uri"],
+                    raw_text_uri=ocr_result["raw_text_uri"],
+                    parsed_text_uri=ocr_result["parsed_text_uri"],
+                    text_confidence_uri=ocr_result["text_confidence_uri"],
+                    image_renditions=ocr_result.get("image_renditions", {}),
+                    token_counts=ocr_result.get("token_counts", {}),
+                )
+
+                # Merge metering data
+                with results_lock:
+                    document.metering = utils.merge_metering_data(
+                        document.metering, page_metering
+                    )
+
+            except Exception as e:
+                record_error(page_index, e)
+
+        def record_error(page_index: int, error: Exception) -> None:
+            import traceback
+
+            error_msg = f"Error processing page {page_index + 1}: {str(error)}"
+            stack_trace = "".join(traceback.format_exception(error))
+            logger.error(f"{error_msg}\nStack trace:\n{stack_trace}")
+            with results_lock:
+                document.errors.append(f"{error_msg} (see logs for full trace)")
+
+        results_lock = threading.Lock()
+
+        # Start memory monitoring in background thread
+        memory_monitor_shutdown = self._start_memory_monitoring()
+        try:
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=num_workers
+            ) as executor:
+                for page_index in range(num_pages):
+                    # Backpressure: wait until a worker has finished a page
+                    slots.acquire()
+                    try:
+                        page_image = None
+                        if pdf_document.is_pdf:
+                            page_image = self._render_page(pdf_document, page_index)
+                        future = executor.submit(
+                            self._process_single_page,
+                            page_index,
+                            pdf_document,
+                            document.output_bucket,
+                            document.input_key,
+                            original_content,
+                            page_image,
+                        )
+                    except Exception as e:
+                        slots.release()
+                        record_error(page_index, e)
+                        continue
+                    page_image = None
+                    future.add_done_callback(
+                        lambda f, page_index=page_index: page_done(page_index, f)
+                    )
+        finally:
+            # Stop memory monitoring
+            memory_monitor_shutdown.set()
+
+    def _write_artifact(
+        self,
+        content: Any,
+        bucket: str,
+        key: str,
+        content_type: Optional[str] = None,
+    ) -> None:
+        """
+        Write a page artifact to S3.
+
+        Inside process_document the write is queued on the background artifact
+        writer; otherwise it is written synchronously.
+        """
+        writer = self._artifact_writer
+        if writer is not None:
+            writer.submit(content, bucket, key, content_type=content_type)
+        else:
+            s3.write_content(content, bucket, key, content_type=content_type)
+
+    def _write_renditions(
+        self,
+        img_data: bytes,
+        bucket: str,
+        image_key: str,
+        content_type: str,
+    ) -> Dict[str, str]:
+        """
+        Store the page image renditions for the downstream stage image sizes.
+
+        Renditions are written next to the page image (image.jpg ->
+        image_951x1268.jpg). When the page image already fits a target size
+        the rendition points at the page image itself.
+
+        Args:
+            img_data: Page image bytes as stored at image_key
+            bucket: S3 bucket of the page image
+            image_key: S3 key of the page image
+            content_type: Content type of the page image
+
+        Returns:
+            Dictionary mapping rendition label to S3 URI (empty on failure,
+            in which case the stages resize the page image themselves)
+        """
+        if not self.rendition_sizes:
+            return {}
+
+        try:
+            renditions = image.create_renditions(img_data, self.rendition_sizes)
+        except Exception as e:
+            logger.warning(f"Failed to create renditions for {image_key}: {e}")
+            return {}
+
+        base, ext = os.path.splitext(image_key)
+        rendition_uris = {}
+        for label, rendition_data in renditions.items():
+            if rendition_data is None:
+                rendition_uris[label] = f"s3://{bucket}/{image_key}"
+                continue
+            rendition_key = f"{base}_{label}{ext}"
+            self._write_artifact(
+                rendition_data, bucket, rendition_key, content_type=content_type
+            )
+            rendition_uris[label] = f"s3://{bucket}/{rendition_key}"
+        return rendition_uris
+
+    def _flush_artifacts(self, document: Document) -> None:
+        """
+        Wait for all queued artifact uploads and shut down the artifact writer.
+
+        Failed uploads are recorded as document errors, since the pages that
+        reference them would point at missing objects.
+        """
+        writer = self._artifact_writer
+        if writer is None:
+            return
+        self._artifact_writer = None
+
+        t0 = time.time()
+        try:
+            writer.flush()
+        except s3.ArtifactWriteError as e:
+            logger.error(str(e))
+            document.errors.append(str(e))
+            document.status = Status.FAILED
+        finally:
+            writer.shutdown()
+        logger.debug(
+            f"Flushed {writer.objects_written} page artifacts "
+            f"(waited {time.time() - t0:.3f} seconds)"
+        )
+
     def _feature_combo(self):
         """Return the pricing feature combination string based on enhanced_features.
 
@@ -532,6 +832,7 @@ class OcrService:
         output_bucket: str,
         prefix: str,
         original_file_content: Optional[bytes] = None,
+        page_image: Optional[bytes] = None,
     ) -> Tuple[Dict[str, str], Dict[str, Any]]:
         """
         Process a single page of a document (PDF or image).
@@ -542,6 +843,8 @@ class OcrService:
             output_bucket: S3 bucket to store results
             prefix: S3 prefix for storing results
             original_file_content: Original file content for image files
+            page_image: Page image already rendered by _render_page (PDF pages);
+                rendered here when not provided
 
         Returns:
             Tuple of (page_result_dict, metering_data)
@@ -555,18 +858,19 @@ class OcrService:
             )
 
         # Use the appropriate backend for PDFs
+        rendered = {"page_image": page_image} if page_image is not None else {}
         if self.backend == "none":
             return self._process_single_page_none(
-                page_index, pdf_document, output_bucket, prefix
+                page_index, pdf_document, output_bucket, prefix, **rendered
             )
         elif self.backend == "bedrock":
             return self._process_single_page_bedrock(
-                page_index, pdf_document, output_bucket, prefix
+                page_index, pdf_document, output_bucket, prefix, **rendered
             )
         else:
             # Textract backend (default)
             return self._process_single_page_textract(
-                page_index, pdf_document, output_bucket, prefix
+                page_index, pdf_document, output_bucket, prefix, **rendered
             )
 
     def _process_image_file_direct(
@@ -800,7 +1104,12 @@ class OcrService:
 
         # Store image with appropriate format
         image_key = f"{prefix}/pages/{page_id}/image.{img_ext}"
-        s3.write_content(img_data, output_bucket, image_key, content_type=content_type)
+        self._write_artifact(
+            img_data, output_bucket, image_key, content_type=content_type
+        )
+        renditions = self._write_renditions(
+            img_data, output_bucket, image_key, content_type
+        )
 
         t1 = time.time()
         logger.debug(
@@ -817,7 +1126,7 @@ class OcrService:
 
             # Store empty raw OCR response
             raw_text_key = f"{prefix}/pages/{page_id}/rawText.json"
-            s3.write_content(
+            self._write_artifact(
                 empty_ocr_response,
                 output_bucket,
                 raw_text_key,
@@ -830,7 +1139,7 @@ class OcrService:
             }
 
             text_confidence_key = f"{prefix}/pages/{page_id}/textConfidence.json"
-            s3.write_content(
+            self._write_artifact(
                 text_confidence_data,
                 output_bucket,
                 text_confidence_key,
@@ -840,7 +1149,7 @@ class OcrService:
             # Store empty parsed text result
             parsed_result = {"text": ""}
             parsed_text_key = f"{prefix}/pages/{page_id}/result.json"
-            s3.write_content(
+            self._write_artifact(
                 parsed_result,
                 output_bucket,
                 parsed_text_key,
@@ -854,7 +1163,9 @@ class OcrService:
             if self.preprocessing_config and self.preprocessing_config.get("enabled"):
                 from idp_common.image import apply_adaptive_binarization
 
-                ocr_img_data = apply_adaptive_binarization(ocr_img_data)
+                ocr_img_data = apply_adaptive_binarization(
+                    ocr_img_data, **self._binarization_params()
+                )
                 logger.debug(
                     "Applied adaptive binarization preprocessing for Bedrock OCR"
                 )
@@ -883,7 +1194,7 @@ class OcrService:
 
             # Store raw Bedrock response
             raw_text_key = f"{prefix}/pages/{page_id}/rawText.json"
-            s3.write_content(
+            self._write_artifact(
                 response_with_metering["response"],
                 output_bucket,
                 raw_text_key,
@@ -896,7 +1207,7 @@ class OcrService:
             }
 
             text_confidence_key = f"{prefix}/pages/{page_id}/textConfidence.json"
-            s3.write_content(
+            self._write_artifact(
                 text_confidence_data,
                 output_bucket,
                 text_confidence_key,
@@ -906,7 +1217,7 @@ class OcrService:
             # Store parsed text result
             parsed_result = {"text": extracted_text}
             parsed_text_key = f"{prefix}/pages/{page_id}/result.json"
-            s3.write_content(
+            self._write_artifact(
                 parsed_result,
                 output_bucket,
                 parsed_text_key,
@@ -920,7 +1231,9 @@ class OcrService:
             if self.preprocessing_config and self.preprocessing_config.get("enabled"):
                 from idp_common.image import apply_adaptive_binarization
 
-                ocr_img_data = apply_adaptive_binarization(ocr_img_data)
+                ocr_img_data = apply_adaptive_binarization(
+                    ocr_img_data, **self._binarization_params()
+                )
                 logger.debug("Applied adaptive binarization preprocessing for OCR")
 
             # Process with OCR
@@ -941,7 +1254,7 @@ class OcrService:
 
             # Store raw Textract response
             raw_text_key = f"{prefix}/pages/{page_id}/rawText.json"
-            s3.write_content(
+            self._write_artifact(
                 textract_result,
                 output_bucket,
                 raw_text_key,
@@ -951,7 +1264,7 @@ class OcrService:
             # Generate and store text confidence data
             text_confidence_data = self._generate_text_confidence_data(textract_result)
             text_confidence_key = f"{prefix}/pages/{page_id}/textConfidence.json"
-            s3.write_content(
+            self._write_artifact(
                 text_confidence_data,
                 output_bucket,
                 text_confidence_key,
@@ -961,7 +1274,7 @@ class OcrService:
             # Parse and store text content
             parsed_result = self._parse_textract_response(textract_result, page_id)
             parsed_text_key = f"{prefix}/pages/{page_id}/result.json"
-            s3.write_content(
+            self._write_artifact(
                 parsed_result,
                 output_bucket,
                 parsed_text_key,
@@ -978,9 +1291,40 @@ class OcrService:
             "text_confidence_uri": f"s3://{output_bucket}/{text_confidence_key}",
             "image_uri": f"s3://{output_bucket}/{image_key}",
         }
+        if renditions:
+            result["image_renditions"] = renditions
+        token_counts = self._token_counts(parsed_result["text"])
+        if token_counts:
+            result["token_counts"] = token_counts
 
         return result, metering
 
+    def _token_counts(self, text: str) -> Dict[str, int]:
+        """Count the tokens of a page's text with the downstream tokenizers."""
+        if not isinstance(text, str):
+            return {}
+        return {
+            name: tokenizer.count(text) for name, tokenizer in self.tokenizers.items()
+        }
+
+    def _binarization_params(self) -> Dict[str, int]:
+        """
+        Get the adaptive binarization parameters configured for preprocessing.
+
+        Only explicitly configured values are returned so that
+        apply_adaptive_binarization falls back to its own defaults.
+
+        Returns:
+            Keyword arguments for image.apply_adaptive_binarization
+        """
+        if not self.preprocessing_config:
+            return {}
+        return {
+            key: int(self.preprocessing_config[key])
+            for key in ("block_size", "c")
+            if self.preprocessing_config.get(key) is not None
+        }
+
     def _start_memory_monitoring(self):
         """
         Start background memory monitoring that logs usage every 5 seconds.
@@ -1032,6 +1376,7 @@ class OcrService:
         pdf_document: fitz.Document,
         output_bucket: str,
         prefix: str,
+        page_image: Optional[bytes] = None,
     ) -> Tuple[Dict[str, str], Dict[str, Any]]:
         """
         Process a single page using AWS Textract.
@@ -1041,6 +1386,7 @@ class OcrService:
             pdf_document: PyMuPDF document object
             output_bucket: S3 bucket to store results
             prefix: S3 prefix for storing results
+            page_image: Optional page image already rendered by _render_page
 
         Returns:
             Tuple of (page_result_dict, metering_data)
@@ -1048,13 +1394,21 @@ class OcrService:
         t0 = time.time()
         page_id = page_index + 1
 
-        # Extract page image - now returns image at optimal size directly
-        page = pdf_document.load_page(page_index)
-        img_bytes = self._extract_page_image(page, pdf_document.is_pdf, page_id)
+        # Extract page image at optimal size, unless the pipeline already did
+        img_bytes = (
+            page_image
+            if page_image is not None
+            else self._render_page(pdf_document, page_index)
+        )
 
         # Upload processed image to S3 (already at target size if resize config exists)
         image_key = f"{prefix}/pages/{page_id}/image.jpg"
-        s3.write_content(img_bytes, output_bucket, image_key, content_type="image/jpeg")
+        self._write_artifact(
+            img_bytes, output_bucket, image_key, content_type="image/jpeg"
+        )
+        renditions = self._write_renditions(
+            img_bytes, output_bucket, image_key, "image/jpeg"
+        )
 
         t1 = time.time()
         logger.debug(
@@ -1068,7 +1422,9 @@ class OcrService:
         if self.preprocessing_config and self.preprocessing_config.get("enabled"):
             from idp_common.image import apply_adaptive_binarization
 
-            ocr_img_bytes = apply_adaptive_binarization(ocr_img_bytes)
+            ocr_img_bytes = apply_adaptive_binarization(
+                ocr_img_bytes, **self._binarization_params()
+            )
             logger.debug(
                 f"Applied adaptive binarization preprocessing for OCR processing (page {page_id})"
             )
@@ -1081,15 +1437,10 @@ class OcrService:
                 Document={"Bytes": ocr_img_bytes}
             )
 
-        # Aggressive memory cleanup - clear large image variables immediately after OCR
+        # Release image references before the response is parsed and stored
         img_bytes = None
         ocr_img_bytes = None
 
-        # Force garbage collection after processing large images
-        import gc
-
-        gc.collect()
-
         # Extract metering data
         feature_combo = self._feature_combo()
         metering = {
@@ -1100,7 +1451,7 @@ class OcrService:
 
         # Store raw Textract response
         raw_text_key = f"{prefix}/pages/{page_id}/rawText.json"
-        s3.write_content(
+        self._write_artifact(
             textract_result,
             output_bucket,
             raw_text_key,
@@ -1110,7 +1461,7 @@ class OcrService:
         # Generate and store text confidence data for efficient assessment
         text_confidence_data = self._generate_text_confidence_data(textract_result)
         text_confidence_key = f"{prefix}/pages/{page_id}/textConfidence.json"
-        s3.write_content(
+        self._write_artifact(
             text_confidence_data,
             output_bucket,
             text_confidence_key,
@@ -1120,7 +1471,7 @@ class OcrService:
         # Parse and store text content with markdown
         parsed_result = self._parse_textract_response(textract_result, page_id)
         parsed_text_key = f"{prefix}/pages/{page_id}/result.json"
-        s3.write_content(
+        self._write_artifact(
             parsed_result,
             output_bucket,
             parsed_text_key,
@@ -1137,9 +1488,19 @@ class OcrService:
             "text_confidence_uri": f"s3://{output_bucket}/{text_confidence_key}",
             "image_uri": f"s3://{output_bucket}/{image_key}",
         }
+        if renditions:
+            result["image_renditions"] = renditions
+        token_counts = self._token_counts(parsed_result["text"])
+        if token_counts:
+            result["token_counts"] = token_counts
 
         return result, metering
 
+    def _render_page(self, pdf_document: fitz.Document, page_index: int) -> bytes:
+        """Load and rasterize one page of a PyMuPDF document."""
+        page = pdf_document.load_page(page_index)
+        return self._extract_page_image(page, pdf_document.is_pdf, page_index + 1)
+
     def _extract_page_image(self, page: fitz.Page, is_pdf: bool, page_id: int) -> bytes:
         """
         Extract image bytes from a page at optimal size to prevent memory issues.
@@ -1256,6 +1617,7 @@ class OcrService:
         pdf_document: fitz.Document,
         output_bucket: str,
         prefix: str,
+        page_image: Optional[bytes] = None,
     ) -> Tuple[Dict[str, str], Dict[str, Any]]:
         """
         Process a single page using Amazon Bedrock LLM.
@@ -1265,6 +1627,7 @@ class OcrService:
             pdf_document: PyMuPDF document object
             output_bucket: S3 bucket to store results
             prefix: S3 prefix for storing results
+            page_image: Optional page image already rendered by _render_page
 
         Returns:
             Tuple of (page_result_dict, metering_data)
@@ -1272,13 +1635,21 @@ class OcrService:
         t0 = time.time()
         page_id = page_index + 1
 
-        # Extract page image - now returns image at optimal size directly
-        page = pdf_document.load_page(page_index)
-        img_bytes = self._extract_page_image(page, pdf_document.is_pdf, page_id)
+        # Extract page image at optimal size, unless the pipeline already did
+        img_bytes = (
+            page_image
+            if page_image is not None
+            else self._render_page(pdf_document, page_index)
+        )
 
         # Upload processed image to S3 (already at target size if resize config exists)
         image_key = f"{prefix}/pages/{page_id}/image.jpg"
-        s3.write_content(img_bytes, output_bucket, image_key, content_type="image/jpeg")
+        self._write_artifact(
+            img_bytes, output_bucket, image_key, content_type="image/jpeg"
+        )
+        renditions = self._write_renditions(
+            img_bytes, output_bucket, image_key, "image/jpeg"
+        )
 
         t1 = time.time()
         logger.debug(
@@ -1292,7 +1663,9 @@ class OcrService:
         if self.preprocessing_config and self.preprocessing_config.get("enabled"):
             from idp_common.image import apply_adaptive_binarization
 
-            ocr_img_bytes = apply_adaptive_binarization(ocr_img_bytes)
+            ocr_img_bytes = apply_adaptive_binarization(
+                ocr_img_bytes, **self._binarization_params()
+            )
             logger.debug(
                 f"Applied adaptive binarization preprocessing for Bedrock OCR processing (page {page_id})"
             )
@@ -1324,7 +1697,7 @@ class OcrService:
 
         # Store raw Bedrock response
         raw_text_key = f"{prefix}/pages/{page_id}/rawText.json"
-        s3.write_content(
+        self._write_artifact(
             response_with_metering["response"],
             output_bucket,
             raw_text_key,
@@ -1338,7 +1711,7 @@ class OcrService:
         }
 
         text_confidence_key = f"{prefix}/pages/{page_id}/textConfidence.json"
-        s3.write_content(
+        self._write_artifact(
             text_confidence_data,
             output_bucket,
             text_confidence_key,
@@ -1348,7 +1721,7 @@ class OcrService:
         # Store parsed text result
         parsed_result = {"text": extracted_text}
         parsed_text_key = f"{prefix}/pages/{page_id}/result.json"
-        s3.write_content(
+        self._write_artifact(
             parsed_result,
             output_bucket,
             parsed_text_key,
@@ -1362,6 +1735,11 @@ class OcrService:
             "text_confidence_uri": f"s3://{output_bucket}/{text_confidence_key}",
             "image_uri": f"s3://{output_bucket}/{image_key}",
         }
+        if renditions:
+            result["image_renditions"] = renditions
+        token_counts = self._token_counts(parsed_result["text"])
+        if token_counts:
+            result["token_counts"] = token_counts
 
         return result, metering
 
@@ -1371,6 +1749,7 @@ class OcrService:
         pdf_document: fitz.Document,
         output_bucket: str,
         prefix: str,
+        page_image: Optional[bytes] = None,
     ) -> Tuple[Dict[str, str], Dict[str, Any]]:
         """
         Process a single page with no OCR (image-only processing).
@@ -1380,6 +1759,7 @@ class OcrService:
             pdf_document: PyMuPDF document object
             output_bucket: S3 bucket to store results
             prefix: S3 prefix for storing results
+            page_image: Optional page image already rendered by _render_page
 
         Returns:
             Tuple of (page_result_dict, metering_data)
@@ -1387,13 +1767,21 @@ class OcrService:
         t0 = time.time()
         page_id = page_index + 1
 
-        # Extract page image at specified DPI (consistent with other backends)
-        page = pdf_document.load_page(page_index)
-        img_bytes = self._extract_page_image(page, pdf_document.is_pdf, page_id)
+        # Extract page image at optimal size, unless the pipeline already did
+        img_bytes = (
+            page_image
+            if page_image is not None
+            else self._render_page(pdf_document, page_index)
+        )
 
         # Upload image to S3
         image_key = f"{prefix}/pages/{page_id}/image.jpg"
-        s3.write_content(img_bytes, output_bucket, image_key, content_type="image/jpeg")
+        self._write_artifact(
+            img_bytes, output_bucket, image_key, content_type="image/jpeg"
+        )
+        renditions = self._write_renditions(
+            img_bytes, output_bucket, image_key, "image/jpeg"
+        )
 
         t1 = time.time()
         logger.debug(
@@ -1405,7 +1793,7 @@ class OcrService:
 
         # Store empty raw OCR response
         raw_text_key = f"{prefix}/pages/{page_id}/rawText.json"
-        s3.write_content(
+        self._write_artifact(
             empty_ocr_response,
             output_bucket,
             raw_text_key,
@@ -1418,7 +1806,7 @@ class OcrService:
         }
 
         text_confidence_key = f"{prefix}/pages/{page_id}/textConfidence.json"
-        s3.write_content(
+        self._write_artifact(
             text_confidence_data,
             output_bucket,
             text_confidence_key,
@@ -1428,7 +1816,7 @@ class OcrService:
         # Store empty parsed text result
         parsed_result = {"text": ""}
         parsed_text_key = f"{prefix}/pages/{page_id}/result.json"
-        s3.write_content(
+        self._write_artifact(
             parsed_result,
             output_bucket,
             parsed_text_key,
@@ -1450,6 +1838,11 @@ class OcrService:
             "text_confidence_uri": f"s3://{output_bucket}/{text_confidence_key}",
             "image_uri": f"s3://{output_bucket}/{image_key}",
         }
+        if renditions:
+            result["image_renditions"] = renditions
+        token_counts = self._token_counts(parsed_result["text"])
+        if token_counts:
+            result["token_counts"] = token_counts
 
         return result, metering
 
@@ -1628,13 +2021,13 @@ class OcrService:
 
         return {"text": text}
 
-    def _detect_file_type(self, filename: str, content: bytes) -> str:
+    def _detect_file_type(self, filename: str, content: Union[bytes, mmap.mmap]) -> str:
         """
         Detect file type based on filename extension and content.
 
         Args:
             filename: Name of the file
-            content: File content bytes
+            content: File content bytes or memory-mapped spool file
 
         Returns:
             File type string
@@ -1657,9 +2050,10 @@ class OcrService:
             return ext
         else:
             # Try to detect based on content
-            if content.startswith(b"%PDF"):
+            # Slicing works for bytes and for memory-mapped spool files
+            if content[:4] == b"%PDF":
                 return "pdf"
-            elif content.startswith(b"PK"):
+            elif content[:2] == b"PK":
                 # Could be Excel or Word (both are ZIP-based)
                 if b"xl/" in content[:1000]:
                     return "xlsx"
@@ -1668,7 +2062,7 @@ class OcrService:
 
             # Default to treating as text if we can decode it
             try:
-                content.decode("utf-8")
+                bytes(content).decode("utf-8")
                 return "txt"
             except UnicodeDecodeError:
                 pass
@@ -1752,9 +2146,12 @@ class OcrService:
 
         # Upload image to S3
         image_key = f"{prefix}/pages/{page_id}/image.jpg"
-        s3.write_content(
+        self._write_artifact(
             image_bytes, output_bucket, image_key, content_type="image/jpeg"
         )
+        renditions = self._write_renditions(
+            image_bytes, output_bucket, image_key, "image/jpeg"
+        )
 
         # Create OCR response structure for compatibility
         ocr_response = {
@@ -1773,7 +2170,7 @@ class OcrService:
 
         # Store raw OCR response
         raw_text_key = f"{prefix}/pages/{page_id}/rawText.json"
-        s3.write_content(
+        self._write_artifact(
             ocr_response,
             output_bucket,
             raw_text_key,
@@ -1792,7 +2189,7 @@ class OcrService:
         text_confidence_data = {"text": markdown_table}
 
         text_confidence_key = f"{prefix}/pages/{page_id}/textConfidence.json"
-        s3.write_content(
+        self._write_artifact(
             text_confidence_data,
             output_bucket,
             text_confidence_key,
@@ -1802,7 +2199,7 @@ class OcrService:
         # Store parsed text result
         parsed_result = {"text": page_text}
         parsed_text_key = f"{prefix}/pages/{page_id}/result.json"
-        s3.write_content(
+        self._write_artifact(
             parsed_result,
             output_bucket,
             parsed_text_key,
@@ -1824,5 +2221,10 @@ class OcrService:
             "text_confidence_uri": f"s3://{output_bucket}/{text_confidence_key}",
             "image_uri": f"s3://{output_bucket}/{image_key}",
         }
+        if renditions:
+            result["image_renditions"] = renditions
+        token_counts = self._token_counts(parsed_result["text"])
+        if token_counts:
+            result["token_counts"] = token_counts
 
         return result, metering
@@ -5,6 +5,25 @@
 Reporting module for saving document data to reporting storage.
 """
 
+from .buffered_writer import (
+    FlushResult,
+    LocalSpoolRecordSink,
+    ReportingBatchWriter,
+    SqsRecordSink,
+    drain_spool,
+)
+from .compaction import CompactionResult, ParquetCompactor
 from .save_reporting_data import SaveReportingData
+from .schema_registry import GlueSchemaRegistry
 
-__all__ = ["SaveReportingData"]
+__all__ = [
+    "CompactionResult",
+    "FlushResult",
+    "GlueSchemaRegistry",
+    "LocalSpoolRecordSink",
+    "ParquetCompactor",
+    "ReportingBatchWriter",
+    "SaveReportingData",
+    "SqsRecordSink",
+    "drain_spool",
+]
@@ -0,0 +1,371 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Buffered ingestion of reporting records.
+
+By default SaveReportingData writes one Parquet file per document and table. In
+buffered mode it hands each batch of records to a record sink instead: an SQS
+queue in deployments, or a local spool directory in tests and tools. A
+ReportingBatchWriter consumes the buffered records and writes one Parquet file
+per table partition for many documents at once, inferring the partition schema
+and updating the Glue table once per flush.
+
+Records travel as JSON messages holding the target key of the per-document file
+and the records as a zstd-compressed Arrow IPC stream, so column types (for
+example timestamps) survive the queue unchanged.
+"""
+
+import base64
+import datetime
+import json
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import boto3
+import pyarrow as pa
+
+from .compaction import (
+    DEFAULT_ROW_GROUP_SIZE,
+    SORT_COLUMN,
+    align_tables,
+    to_parquet_bytes,
+)
+from .schema_registry import GlueSchemaRegistry
+
+logger = logging.getLogger(__name__)
+
+# File name prefix of files written by ReportingBatchWriter
+BATCH_FILE_PREFIX = "batch-"
+MESSAGE_VERSION = 1
+
+# SQS message size limit; larger record batches are written directly by SaveReportingData
+MAX_MESSAGE_BYTES = 256 * 1024
+
+DEFAULT_MAX_RECORDS = 200_000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_AGE_SECONDS = 300
+
+
+def encode_records(
+    s3_key: str,
+    records: List[Dict[str, Any]],
+    schema: pa.Schema,
+    section_type: Optional[str] = None,
+) -> str:
+    """
+    Encode records destined for s3_key as a record sink message.
+
+    Args:
+        s3_key: Key of the per-document Parquet file the records belong to
+        records: Records to buffer
+        schema: PyArrow schema of the records
+        section_type: Document section type, for records of document section tables
+
+    Returns:
+        JSON message body
+    """
+    table = pa.Table.from_pylist(records, schema=schema)
+    sink = pa.BufferOutputStream()
+    options = pa.ipc.IpcWriteOptions(compression="zstd")
+    with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return json.dumps(
+        {
+            "version": MESSAGE_VERSION,
+            "key": s3_key,
+            "section_type": section_type,
+            "records": base64.b64encode(sink.getvalue().to_pybytes()).decode("ascii"),
+        }
+    )
+
+
+def decode_records(body: str) -> Tuple[str, Optional[str], pa.Table]:
+    """
+    Decode a record sink message.
+
+    Args:
+        body: JSON message body created by encode_records
+
+    Returns:
+        Tuple of (per-document S3 key, section type, records table)
+    """
+    message = json.loads(body)
+    if message.get("version") != MESSAGE_VERSION:
+        raise ValueError(
+            f"Unsupported reporting message version: {message.get('version')}"
+        )
+    with pa.ipc.open_stream(base64.b64decode(message["records"])) as reader:
+        table = reader.read_all()
+    return message["key"], message.get("section_type"), table
+
+
+class SqsRecordSink:
+    """Record sink that sends each record batch as one SQS message."""
+
+    def __init__(self, queue_url: str, sqs_client: Optional[Any] = None):
+        self.queue_url = queue_url
+        self.sqs_client = sqs_client or boto3.client("sqs")
+
+    def put(self, body: str) -> bool:
+        """
+        Send a message to the queue.
+
+        Returns:
+            False if the message is too large for SQS and was not sent
+        """
+        if len(body.encode("utf-8")) > MAX_MESSAGE_BYTES:
+            return False
+        self.sqs_client.send_message(QueueUrl=self.queue_url, MessageBody=body)
+        return True
+
+
+class LocalSpoolRecordSink:
+    """Record sink that writes each record batch to a file in a spool directory."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def put(self, body: str) -> bool:
+        name = f"{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.json"
+        temp_path = os.path.join(self.directory, f".{name}")
+        with open(temp_path, "w") as f:
+            f.write(body)
+        # Readers never see partially written messages
+        os.replace(temp_path, os.path.join(self.directory, name))
+        return True
+
+    def messages(self) -> Iterator[Tuple[str, str]]:
+        """Yield (path, body) of the spooled messages in the order they were written."""
+        for name in sorted(os.listdir(self.directory)):
+            if name.startswith("."):
+                continue
+            path = os.path.join(self.directory, name)
+            with open(path) as f:
+                yield path, f.read()
+
+
+@dataclass
+class FlushResult:
+    """Files written by a flush, the messages it covered and those that could not be written."""
+
+    files: List[str] = field(default_factory=list)
+    message_ids: List[str] = field(default_factory=list)
+    failed_message_ids: List[str] = field(default_factory=list)
+
+
+@dataclass
+class _PartitionBuffer:
+    section_type: Optional[str] = None
+    tables: List[pa.Table] = field(default_factory=list)
+    keys: List[str] = field(default_factory=list)
+    message_ids: List[str] = field(default_factory=list)
+
+
+class ReportingBatchWriter:
+    """
+    Buffers decoded record batches and writes one Parquet file per partition.
+
+    Callers add messages and flush when should_flush() reports that the buffer
+    reached max_records, max_bytes or max_age_seconds, and once more before
+    they stop.
+    """
+
+    def __init__(
+        self,
+        reporting_bucket: str,
+        database_name: Optional[str] = None,
+        max_records: int = DEFAULT_MAX_RECORDS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+        s3_client: Optional[Any] = None,
+        schema_registry: Optional[GlueSchemaRegistry] = None,
+    ):
+        """
+        Initialize the batch writer.
+
+        Args:
+            reporting_bucket: S3 bucket name for reporting data
+            database_name: Glue database name for document section tables (optional)
+            max_records: Number of buffered records that triggers a flush
+            max_bytes: Buffered Arrow bytes that trigger a flush
+            max_age_seconds: Age of the oldest buffered record that triggers a flush
+            row_group_size: Maximum number of rows per Parquet row group
+            s3_client: Optional S3 client
+            schema_registry: Optional GlueSchemaRegistry shared with other writers
+        """
+        # Imported here because save_reporting_data imports this module
+        from .save_reporting_data import SaveReportingData
+
+        self.reporting_bucket = reporting_bucket
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.row_group_size = row_group_size
+        # Glue table creation and the schema registry are shared with SaveReportingData
+        self.reporter = SaveReportingData(
+            reporting_bucket, database_name, schema_registry=schema_registry
+        )
+        self.s3_client = s3_client or self.reporter.s3_client
+        self._partitions: Dict[str, _PartitionBuffer] = {}
+        self._message_ids = set()
+        self._records = 0
+        self._bytes = 0
+        self._oldest: Optional[float] = None
+
+    @property
+    def buffered_records(self) -> int:
+        return self._records
+
+    def add(self, body: str, message_id: Optional[str] = None) -> None:
+        """
+        Buffer the records of a record sink message.
+
+        Args:
+            body: JSON message body created by encode_records
+            message_id: Optional id reported back in FlushResult; a message id
+                that is already buffered is ignored
+        """
+        if message_id is not None:
+            if message_id in self._message_ids:
+                return
+            self._message_ids.add(message_id)
+        key, section_type, table = decode_records(body)
+        partition_prefix = key.rsplit("/", 1)[0] + "/"
+        buffer = self._partitions.setdefault(
+            partition_prefix, _PartitionBuffer(section_type=section_type)
+        )
+        buffer.tables.append(table)
+        buffer.keys.append(key)
+        if message_id is not None:
+            buffer.message_ids.append(message_id)
+        self._records += table.num_rows
+        self._bytes += table.nbytes
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+
+    def should_flush(self) -> bool:
+        if self._oldest is None:
+            return False
+        return (
+            self._records >= self.max_records
+            or self._bytes >= self.max_bytes
+            or time.monotonic() - self._oldest >= self.max_age_seconds
+        )
+
+    def flush(self) -> FlushResult:
+        """
+        Write the buffered records and clear the buffer.
+
+        Returns:
+            FlushResult with the written keys and the ids of messages in
+            partitions that could not be written
+        """
+        result = FlushResult()
+        partitions, self._partitions = self._partitions, {}
+        result.message_ids = list(self._message_ids)
+        self._message_ids = set()
+        self._records = 0
+        self._bytes = 0
+        self._oldest = None
+
+        for partition_prefix, buffer in partitions.items():
+            try:
+                result.files.extend(self._write_partition(partition_prefix, buffer))
+            except Exception as e:
+                logger.error(
+                    f"Error writing {len(buffer.keys)} buffered record batches to "
+                    f"s3://{self.reporting_bucket}/{partition_prefix}: {e}"
+                )
+                result.failed_message_ids.extend(buffer.message_ids)
+        return result
+
+    def _write_partition(
+        self, partition_prefix: str, buffer: _PartitionBuffer
+    ) -> List[str]:
+        try:
+            schema = pa.unify_schemas(
+                [table.schema.remove_metadata() for table in buffer.tables]
+            )
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            # Documents disagree on a column type; keep them in separate files as unbuffered writes do
+            logger.warning(f"Writing per-document files for {partition_prefix}: {e}")
+            for key, table in zip(buffer.keys, buffer.tables):
+                self._put(key, table)
+                self._update_glue_table(buffer.section_type, table.schema)
+            return list(buffer.keys)
+
+        table = align_tables(buffer.tables, schema)
+        if SORT_COLUMN in table.column_names:
+            table = table.sort_by([(SORT_COLUMN, "ascending")])
+        timestamp = datetime.datetime.now(datetime.timezone.utc)
+        key = (
+            f"{partition_prefix}{BATCH_FILE_PREFIX}"
+            f"{timestamp:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}.parquet"
+        )
+        self._put(key, table)
+        self._update_glue_table(buffer.section_type, schema)
+        logger.info(
+            f"Wrote {table.num_rows} records of {len(buffer.keys)} documents to "
+            f"s3://{self.reporting_bucket}/{key}"
+        )
+        return [key]
+
+    def _put(self, key: str, table: pa.Table) -> None:
+        self.s3_client.put_object(
+            Bucket=self.reporting_bucket,
+            Key=key,
+            Body=to_parquet_bytes(table, self.row_group_size),
+            ContentType="application/octet-stream",
+        )
+
+    def _update_glue_table(
+        self, section_type: Optional[str], schema: pa.Schema
+    ) -> None:
+        if section_type is not None:
+            self.reporter._create_or_update_glue_table(section_type, schema)
+
+
+def drain_spool(
+    sink: LocalSpoolRecordSink, writer: ReportingBatchWriter, force: bool = False
+) -> FlushResult:
+    """
+    Move spooled messages into the writer and flush by its thresholds.
+
+    Spool files are removed once their records have been written. Records below
+    every threshold stay buffered in the writer unless force is set.
+
+    Args:
+        sink: Spool to drain
+        writer: Batch writer receiving the records
+        force: Flush the remaining buffered records at the end
+
+    Returns:
+        Combined FlushResult of all flushes
+    """
+    result = FlushResult()
+
+    def flush() -> None:
+        flushed = writer.flush()
+        result.files.extend(flushed.files)
+        result.message_ids.extend(flushed.message_ids)
+        result.failed_message_ids.extend(flushed.failed_message_ids)
+        failed = set(flushed.failed_message_ids)
+        for path in flushed.message_ids:
+            if path not in failed:
+                os.remove(path)
+
+    for path, body in sink.messages():
+        # Messages still buffered from a previous drain are skipped by the writer
+        writer.add(body, message_id=path)
+        if writer.should_flush():
+            flush()
+    if writer.buffered_records and (force or writer.should_flush()):
+        flush()
+    return result
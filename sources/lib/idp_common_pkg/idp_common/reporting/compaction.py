@@ -0,0 +1,435 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Compaction of per-document reporting Parquet files.
+
+SaveReportingData writes one small Parquet file per document (and per section)
+into the date partitions of each reporting table. ParquetCompactor merges the
+files of a partition into a few large files sorted by document_id, written with
+column statistics and fixed-size row groups, so Athena opens a handful of
+objects per partition and skips row groups that cannot match a document_id
+predicate.
+
+Compacted files are written to the same partition location as the files they
+replace, with the column names and types of the source files, so Glue tables
+(partition projection or crawler-managed partitions) need no changes.
+
+Each partition has a state object under ``_compaction/`` (outside every table
+location) that records the compacted files that are live and the source files
+still to be deleted. Writing the state object commits a compaction run; a run
+interrupted before the commit leaves compacted files that are not listed in the
+state and are removed by the next run, and a run interrupted after the commit
+has its remaining deletes finished by the next run. Re-running a partition with
+no new files is a no-op.
+"""
+
+import datetime
+import io
+import json
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import boto3
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from botocore.config import Config
+
+logger = logging.getLogger(__name__)
+
+# File name prefix of compacted files inside a partition
+COMPACTED_FILE_PREFIX = "compacted-"
+# Key prefix of the per-partition compaction state objects
+STATE_PREFIX = "_compaction/"
+
+# Reporting tables with a fixed location; document section tables are discovered
+METERING_PREFIX = "metering/"
+EVALUATION_PREFIXES = [
+    "evaluation_metrics/document_metrics/",
+    "evaluation_metrics/section_metrics/",
+    "evaluation_metrics/attribute_metrics/",
+]
+DOCUMENT_SECTIONS_PREFIX = "document_sections/"
+
+# Document section files are overwritten in place when a document is reprocessed,
+# so their rows replace previously compacted rows of the same section
+DOCUMENT_SECTIONS_KEY_COLUMNS = ("document_id", "section_id")
+
+SORT_COLUMN = "document_id"
+
+DEFAULT_ROW_GROUP_SIZE = 65536
+DEFAULT_MAX_ROWS_PER_FILE = 4_000_000
+DEFAULT_MIN_FILES = 2
+DEFAULT_MIN_FILE_AGE_SECONDS = 3600
+DEFAULT_MAX_SOURCE_FILES = 50_000
+DEFAULT_MAX_WORKERS = 32
+S3_DELETE_BATCH_SIZE = 1000
+
+
+@dataclass
+class CompactionResult:
+    """Outcome of compacting one date partition."""
+
+    partition_prefix: str
+    source_files: int = 0
+    rows: int = 0
+    output_files: List[str] = field(default_factory=list)
+    skipped_reason: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def compacted(self) -> bool:
+        return self.skipped_reason is None and self.error is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "partition_prefix": self.partition_prefix,
+            "source_files": self.source_files,
+            "rows": self.rows,
+            "output_files": self.output_files,
+            "skipped_reason": self.skipped_reason,
+            "error": self.error,
+        }
+
+
+class ParquetCompactor:
+    """
+    Merges the small Parquet files of reporting date partitions.
+
+    Files younger than min_file_age_seconds are left for a later run, so files
+    that SaveReportingData may still overwrite are never deleted underneath it.
+    """
+
+    def __init__(
+        self,
+        reporting_bucket: str,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+        max_rows_per_file: int = DEFAULT_MAX_ROWS_PER_FILE,
+        min_files: int = DEFAULT_MIN_FILES,
+        min_file_age_seconds: int = DEFAULT_MIN_FILE_AGE_SECONDS,
+        max_source_files: int = DEFAULT_MAX_SOURCE_FILES,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        s3_client: Optional[Any] = None,
+    ):
+        """
+        Initialize the compactor.
+
+        Args:
+            reporting_bucket: S3 bucket name of the reporting data
+            row_group_size: Maximum number of rows per Parquet row group
+            max_rows_per_file: Maximum number of rows per compacted file
+            min_files: Minimum number of small files before a partition without
+                compacted files is compacted
+            min_file_age_seconds: Files modified more recently are not compacted
+            max_source_files: Maximum number of small files merged per partition
+                and run; remaining files are merged by later runs
+            max_workers: Number of concurrent S3 reads
+            s3_client: Optional S3 client; by default a client with a connection
+                pool of max_workers connections is created
+        """
+        if row_group_size < 1 or max_rows_per_file < 1:
+            raise ValueError("row_group_size and max_rows_per_file must be positive")
+        self.reporting_bucket = reporting_bucket
+        self.row_group_size = row_group_size
+        self.max_rows_per_file = max_rows_per_file
+        self.min_files = min_files
+        self.min_file_age_seconds = min_file_age_seconds
+        self.max_source_files = max_source_files
+        self.max_workers = max_workers
+        self.s3_client = s3_client or boto3.client(
+            "s3",
+            config=Config(
+                retries={"max_attempts": 10, "mode": "adaptive"},
+                max_pool_connections=max_workers,
+            ),
+        )
+
+    def list_table_prefixes(self) -> List[str]:
+        """
+        List the locations of all reporting tables.
+
+        Returns:
+            Table prefixes such as "metering/" or "document_sections/invoice/"
+        """
+        prefixes = [METERING_PREFIX, *EVALUATION_PREFIXES]
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(
+            Bucket=self.reporting_bucket, Prefix=DOCUMENT_SECTIONS_PREFIX, Delimiter="/"
+        ):
+            prefixes.extend(p["Prefix"] for p in page.get("CommonPrefixes", []))
+        return prefixes
+
+    def compact_date(self, date: str) -> List[CompactionResult]:
+        """
+        Compact the partition of one date in every reporting table.
+
+        Args:
+            date: Partition date in YYYY-MM-DD format
+
+        Returns:
+            One CompactionResult per table
+        """
+        return [
+            self.compact_partition(f"{table_prefix}date={date}/")
+            for table_prefix in self.list_table_prefixes()
+        ]
+
+    def compact_partition(self, partition_prefix: str) -> CompactionResult:
+        """
+        Compact one partition, e.g. "metering/date=2025-01-31/".
+
+        Errors are logged and reported in the result; source files are only
+        deleted after the compacted files replacing them have been committed.
+
+        Args:
+            partition_prefix: S3 prefix of the partition, ending with "/"
+
+        Returns:
+            CompactionResult for the partition
+        """
+        result = CompactionResult(partition_prefix=partition_prefix)
+        try:
+            self._compact_partition(partition_prefix, result)
+        except Exception as e:
+            logger.error(
+                f"Error compacting s3://{self.reporting_bucket}/{partition_prefix}: {e}"
+            )
+            result.error = str(e)
+        return result
+
+    def _compact_partition(
+        self, partition_prefix: str, result: CompactionResult
+    ) -> None:
+        live_files = self._recover(partition_prefix)
+
+        objects = self._list_objects(partition_prefix)
+        existing = set(live_files)
+        compacted_keys = {
+            obj["Key"]
+            for obj in objects
+            if obj["Key"].rsplit("/", 1)[-1].startswith(COMPACTED_FILE_PREFIX)
+        }
+        # Compacted files of runs that never committed duplicate their still present sources
+        orphans = sorted(compacted_keys - existing)
+        if orphans:
+            logger.info(
+                f"Removing {len(orphans)} uncommitted compacted files from {partition_prefix}"
+            )
+            self._delete_objects(orphans)
+        live_files = [key for key in live_files if key in compacted_keys]
+
+        cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(
+            seconds=self.min_file_age_seconds
+        )
+        sources = sorted(
+            (
+                obj
+                for obj in objects
+                if obj["Key"] not in compacted_keys
+                and obj["Key"].endswith(".parquet")
+                and obj["LastModified"] <= cutoff
+            ),
+            key=lambda obj: (obj["LastModified"], obj["Key"]),
+        )[: self.max_source_files]
+        source_keys = [obj["Key"] for obj in sources]
+        result.source_files = len(source_keys)
+
+        if not source_keys:
+            result.skipped_reason = "no new files"
+            return
+        if not live_files and len(source_keys) < self.min_files:
+            result.skipped_reason = f"fewer than {self.min_files} files"
+            return
+
+        new_rows = self._read_tables(source_keys)
+        compacted_rows = self._read_tables(live_files)
+        try:
+            schema = pa.unify_schemas(
+                [table.schema.remove_metadata() for table in new_rows + compacted_rows]
+            )
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            # Changing a column type would break the Glue table; leave the files as they are
+            result.skipped_reason = f"incompatible schemas: {e}"
+            logger.warning(
+                f"Not compacting {partition_prefix}: {result.skipped_reason}"
+            )
+            return
+
+        new_table = align_tables(new_rows, schema)
+        if compacted_rows:
+            compacted_table = align_tables(compacted_rows, schema)
+            if partition_prefix.startswith(DOCUMENT_SECTIONS_PREFIX):
+                compacted_table = _drop_replaced_rows(
+                    compacted_table, new_table, DOCUMENT_SECTIONS_KEY_COLUMNS
+                )
+            merged = pa.concat_tables([compacted_table, new_table])
+        else:
+            merged = new_table
+        if SORT_COLUMN in merged.column_names:
+            merged = merged.sort_by([(SORT_COLUMN, "ascending")])
+
+        run_id = f"{datetime.datetime.now(datetime.timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        output_files = self._write_compacted_files(partition_prefix, merged, run_id)
+
+        # Commit: from here on the compacted files are live and the replaced files are garbage
+        replaced = live_files + source_keys
+        self._write_state(partition_prefix, output_files, replaced)
+        failed = self._delete_objects(replaced)
+        self._write_state(partition_prefix, output_files, failed)
+
+        result.rows = merged.num_rows
+        result.output_files = output_files
+        logger.info(
+            f"Compacted {len(source_keys)} files and {len(live_files)} compacted files of "
+            f"{partition_prefix} into {len(output_files)} files with {merged.num_rows} rows"
+        )
+
+    def _recover(self, partition_prefix: str) -> List[str]:
+        """Finish deletes of a committed run and return the live compacted files."""
+        state = self._read_state(partition_prefix)
+        live_files = state.get("files", [])
+        pending = state.get("pending_deletes", [])
+        if pending:
+            logger.info(
+                f"Finishing {len(pending)} deletes of a previous compaction of {partition_prefix}"
+            )
+            failed = self._delete_objects(pending)
+            self._write_state(partition_prefix, live_files, failed)
+            if failed:
+                raise RuntimeError(f"Could not delete {len(failed)} replaced files")
+        return live_files
+
+    def _state_key(self, partition_prefix: str) -> str:
+        return f"{STATE_PREFIX}{partition_prefix}state.json"
+
+    def _read_state(self, partition_prefix: str) -> Dict[str, Any]:
+        try:
+            response = self.s3_client.get_object(
+                Bucket=self.reporting_bucket, Key=self._state_key(partition_prefix)
+            )
+        except self.s3_client.exceptions.NoSuchKey:
+            return {}
+        return json.loads(response["Body"].read())
+
+    def _write_state(
+        self, partition_prefix: str, files: List[str], pending_deletes: List[str]
+    ) -> None:
+        self.s3_client.put_object(
+            Bucket=self.reporting_bucket,
+            Key=self._state_key(partition_prefix),
+            Body=json.dumps({"files": files, "pending_deletes": pending_deletes}),
+            ContentType="application/json",
+        )
+
+    def _list_objects(self, prefix: str) -> List[Dict[str, Any]]:
+        objects = []
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.reporting_bucket, Prefix=prefix):
+            objects.extend(page.get("Contents", []))
+        return objects
+
+    def _read_tables(self, keys: Sequence[str]) -> List[pa.Table]:
+        def read(key: str) -> pa.Table:
+            response = self.s3_client.get_object(Bucket=self.reporting_bucket, Key=key)
+            return pq.read_table(pa.BufferReader(response["Body"].read()))
+
+        if not keys:
+            return []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(read, keys))
+
+    def _write_compacted_files(
+        self, partition_prefix: str, table: pa.Table, run_id: str
+    ) -> List[str]:
+        output_files = []
+        for index, offset in enumerate(
+            range(0, table.num_rows, self.max_rows_per_file)
+        ):
+            key = (
+                f"{partition_prefix}{COMPACTED_FILE_PREFIX}{run_id}-{index:04d}.parquet"
+            )
+            self.s3_client.put_object(
+                Bucket=self.reporting_bucket,
+                Key=key,
+                Body=to_parquet_bytes(
+                    table.slice(offset, self.max_rows_per_file), self.row_group_size
+                ),
+                ContentType="application/octet-stream",
+            )
+            output_files.append(key)
+        return output_files
+
+    def _delete_objects(self, keys: Sequence[str]) -> List[str]:
+        """Delete objects in batches and return the keys that could not be deleted."""
+        failed = []
+        for start in range(0, len(keys), S3_DELETE_BATCH_SIZE):
+            batch = keys[start : start + S3_DELETE_BATCH_SIZE]
+            response = self.s3_client.delete_objects(
+                Bucket=self.reporting_bucket,
+                Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+            )
+            for error in response.get("Errors", []):
+                logger.warning(
+                    f"Failed to delete {error.get('Key')}: {error.get('Message')}"
+                )
+                failed.append(error["Key"])
+        return failed
+
+
+def to_parquet_bytes(table: pa.Table, row_group_size: int) -> bytes:
+    """Serialize a table sorted by document_id as Parquet with row group statistics."""
+    sorting_columns = (
+        [pq.SortingColumn(table.schema.get_field_index(SORT_COLUMN))]
+        if SORT_COLUMN in table.column_names
+        else None
+    )
+    buffer = io.BytesIO()
+    pq.write_table(
+        table,
+        buffer,
+        compression="snappy",
+        row_group_size=row_group_size,
+        write_statistics=True,
+        sorting_columns=sorting_columns,
+    )
+    return buffer.getvalue()
+
+
+def align_tables(tables: List[pa.Table], schema: pa.Schema) -> pa.Table:
+    """Concatenate tables after aligning them to a unified schema."""
+    aligned = []
+    for table in tables:
+        columns = []
+        for schema_field in schema:
+            if schema_field.name in table.column_names:
+                column = table[schema_field.name]
+                if column.type != schema_field.type:
+                    column = column.cast(schema_field.type)
+            else:
+                column = pa.nulls(table.num_rows, schema_field.type)
+            columns.append(column)
+        aligned.append(pa.Table.from_arrays(columns, schema=schema))
+    return pa.concat_tables(aligned)
+
+
+def _row_keys(table: pa.Table, key_columns: Sequence[str]) -> pa.ChunkedArray:
+    parts = [
+        pc.fill_null(pc.cast(table[name], pa.string()), "") for name in key_columns
+    ]
+    return pc.binary_join_element_wise(*parts, "\x1f")
+
+
+def _drop_replaced_rows(
+    compacted: pa.Table, new: pa.Table, key_columns: Sequence[str]
+) -> pa.Table:
+    """Drop compacted rows whose key columns match rows of newly written files."""
+    if any(name not in compacted.column_names for name in key_columns):
+        return compacted
+    new_keys = pc.unique(_row_keys(new, key_columns))
+    return compacted.filter(
+        pc.invert(pc.is_in(_row_keys(compacted, key_columns), value_set=new_keys))
+    )
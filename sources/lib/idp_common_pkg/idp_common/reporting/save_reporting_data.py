@@ -19,11 +19,17 @@ import pyarrow.parquet as pq
 
 from idp_common.config.models import IDPConfig
 from idp_common.models import Document
+from idp_common.reporting.buffered_writer import encode_records
+from idp_common.reporting.schema_registry import GlueSchemaRegistry
 from idp_common.s3 import get_json_content
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Share of the on-demand price charged for Bedrock batch inference, used when
+# the pricing configuration has no bedrock-batch/<model> entry
+BATCH_INFERENCE_PRICE_FACTOR = 0.5
+
 
 class SaveReportingData:
     """
@@ -38,6 +44,8 @@ class SaveReportingData:
         reporting_bucket: str,
         database_name: Optional[str] = None,
         config: Optional[IDPConfig] = None,
+        record_sink: Optional[Any] = None,
+        schema_registry: Optional[GlueSchemaRegistry] = None,
     ):
         """
         Initialize the SaveReportingData class.
@@ -46,15 +54,24 @@ class SaveReportingData:
             reporting_bucket: S3 bucket name for reporting data
             database_name: Glue database name for creating tables (optional)
             config: Configuration dictionary containing pricing and other settings (optional)
+            record_sink: Record sink for buffered writes, e.g. SqsRecordSink (optional).
+                When set, records are handed to the sink and written in batches by a
+                ReportingBatchWriter instead of as one Parquet file per document.
+            schema_registry: Registry of known Glue table columns (optional). Pass a
+                shared registry to skip Glue calls across instances; by default the
+                registry lives as long as this instance.
         """
         self.reporting_bucket = reporting_bucket
         self.database_name = database_name
         self.config = config or IDPConfig()
+        self.record_sink = record_sink
         self.s3_client = boto3.client("s3")
         self.glue_client = boto3.client("glue") if database_name else None
 
         # Cache for pricing data to avoid repeated processing
         self._pricing_cache = None
+        # Known Glue table columns, so Glue is only called for new columns
+        self.schema_registry = schema_registry or GlueSchemaRegistry()
 
     def _serialize_value(self, value: Any) -> Optional[str]:
         """
@@ -81,19 +98,41 @@ class SaveReportingData:
             return str(value)
 
     def _save_records_as_parquet(
-        self, records: List[Dict], s3_key: str, schema: pa.Schema
-    ) -> None:
+        self,
+        records: List[Dict],
+        s3_key: str,
+        schema: pa.Schema,
+        section_type: Optional[str] = None,
+    ) -> bool:
         """
         Save a list of records as a Parquet file to S3 with explicit schema.
 
+        With a record sink the records are buffered instead, unless they are too
+        large for a single sink message.
+
         Args:
             records: List of dictionaries to save
             s3_key: S3 key path
             schema: PyArrow schema for the table
+            section_type: Document section type of document section records
+
+        Returns:
+            True if the records were handed to the record sink
         """
         if not records:
             logger.warning("No records to save")
-            return
+            return False
+
+        if self.record_sink is not None:
+            message = encode_records(s3_key, records, schema, section_type)
+            if self.record_sink.put(message):
+                logger.info(
+                    f"Buffered {len(records)} records for s3://{self.reporting_bucket}/{s3_key}"
+                )
+                return True
+            logger.info(
+                f"Records for {s3_key} exceed the record sink message size, writing directly"
+            )
 
         # Create PyArrow table from records with explicit schema
         table = pa.Table.from_pylist(records, schema=schema)
@@ -115,6 +154,7 @@ class SaveReportingData:
         logger.info(
             f"Saved {len(records)} records as Parquet to s3://{self.reporting_bucket}/{s3_key}"
         )
+        return False
 
     def _parse_s3_uri(self, uri: str) -> tuple:
         """
@@ -319,6 +359,21 @@ class SaveReportingData:
 
         return sanitized_records
 
+    @staticmethod
+    def _merge_schemas(schema: Optional[pa.Schema], other: pa.Schema) -> pa.Schema:
+        """
+        Add the fields of other that schema does not have yet.
+
+        Fields present in both keep their type from schema, as Glue keeps the
+        type of existing columns.
+        """
+        if schema is None:
+            return other
+        names = set(schema.names)
+        return pa.schema(
+            list(schema) + [field for field in other if field.name not in names]
+        )
+
     def _convert_schema_to_glue_columns(
         self, schema: pa.Schema
     ) -> List[Dict[str, str]]:
@@ -385,6 +440,10 @@ class SaveReportingData:
         # Convert schema to Glue columns
         columns = self._convert_schema_to_glue_columns(schema)
 
+        # Skip the Glue round trip when the table is known to have all columns
+        if self.schema_registry.is_registered(self.database_name, table_name, columns):
+            return False
+
         # Table input for create/update
         table_input = {
             "Name": table_name,
@@ -441,6 +500,13 @@ class SaveReportingData:
             columns_changed = bool(new_column_names - existing_column_names)
             location_changed = existing_location != new_location
 
+            # Keep existing columns (and their types) and append the new ones, so
+            # documents without some fields never drop columns from the table
+            if existing_columns:
+                table_input["StorageDescriptor"]["Columns"] = existing_columns + [
+                    col for col in columns if col["Name"] not in existing_column_names
+                ]
+
             # If there are new columns or location has changed, update the table
             if columns_changed or location_changed:
                 if columns_changed:
@@ -453,11 +519,21 @@ class SaveReportingData:
                 self.glue_client.update_table(
                     DatabaseName=self.database_name, TableInput=table_input
                 )
+                self.schema_registry.register(
+                    self.database_name,
+                    table_name,
+                    table_input["StorageDescriptor"]["Columns"],
+                )
                 return True
             else:
                 logger.debug(
                     f"Glue table {table_name} already exists with current schema and location"
                 )
+                self.schema_registry.register(
+                    self.database_name,
+                    table_name,
+                    table_input["StorageDescriptor"]["Columns"],
+                )
                 return False
 
         except Exception as get_table_error:
@@ -476,6 +552,9 @@ class SaveReportingData:
                         DatabaseName=self.database_name, TableInput=table_input
                     )
                     logger.info(f"Successfully created Glue table {table_name}")
+                    self.schema_registry.register(
+                        self.database_name, table_name, columns
+                    )
                     return True
                 except Exception as create_error:
                     # Check if it's an AlreadyExistsException
@@ -908,6 +987,11 @@ class SaveReportingData:
         # Convert schema to Glue columns
         columns = self._convert_schema_to_glue_columns(schema)
 
+        # Skip the Glue round trip when the table is known to have all columns
+        if self.schema_registry.is_registered(self.database_name, table_name, columns):
+            logger.debug(f"Glue table {table_name} already up to date")
+            return True
+
         # Table input for create/update
         table_input = {
             "Name": table_name,
@@ -957,6 +1041,11 @@ class SaveReportingData:
             columns_changed = not new_column_names.issubset(existing_column_names)
             location_changed = existing_location != new_location
 
+            # Keep existing columns (and their types) and append the new ones
+            table_input["StorageDescriptor"]["Columns"] = existing_columns + [
+                col for col in columns if col["Name"] not in existing_column_names
+            ]
+
             if columns_changed or location_changed:
                 if columns_changed:
                     logger.info(f"Updating Glue table {table_name} with new columns")
@@ -969,10 +1058,14 @@ class SaveReportingData:
                     DatabaseName=self.database_name, TableInput=table_input
                 )
                 logger.info(f"Successfully updated Glue table {table_name}")
-                return True
             else:
                 logger.debug(f"Glue table {table_name} already up to date")
-                return True
+            self.schema_registry.register(
+                self.database_name,
+                table_name,
+                table_input["StorageDescriptor"]["Columns"],
+            )
+            return True
 
         except Exception as e:
             if "EntityNotFoundException" in str(e):
@@ -983,6 +1076,9 @@ class SaveReportingData:
                         DatabaseName=self.database_name, TableInput=table_input
                     )
                     logger.info(f"Successfully created Glue table {table_name}")
+                    self.schema_registry.register(
+                        self.database_name, table_name, columns
+                    )
                     return True
                 except Exception as create_error:
                     if "AlreadyExistsException" in str(create_error):
@@ -1043,6 +1139,13 @@ class SaveReportingData:
                         )
                         return cost
 
+        # Batch inference is priced at a discount on the on-demand price
+        if "bedrock-batch/" in service_api:
+            on_demand_cost = self._get_unit_cost(
+                service_api.replace("bedrock-batch/", "bedrock/"), unit
+            )
+            return on_demand_cost * BATCH_INFERENCE_PRICE_FACTOR
+
         # Log when no cost mapping is found
         logger.warning(
             f"No unit cost mapping found for service_api='{service_api}', unit='{unit}'. Using $0.0"
@@ -1233,7 +1336,8 @@ class SaveReportingData:
         sections_processed = 0
         sections_with_errors = 0
         total_records_saved = 0
-        section_types_processed = set()  # Track unique section types
+        # Section type -> schema covering all its sections, applied to Glue once at the end
+        section_type_schemas: Dict[str, pa.Schema] = {}
 
         logger.info(
             f"Processing {len(document.sections)} sections for document {document_id}"
@@ -1344,8 +1448,10 @@ class SaveReportingData:
                     f"{escaped_doc_id}_section_{section.section_id}.parquet"
                 )
 
-                # Save the section data as Parquet
-                self._save_records_as_parquet(section_records, s3_key, schema)
+                # Save the section data as Parquet (or buffer it with a record sink)
+                buffered = self._save_records_as_parquet(
+                    section_records, s3_key, schema, section_type=section_type
+                )
 
                 sections_processed += 1
                 total_records_saved += len(section_records)
@@ -1355,23 +1461,31 @@ class SaveReportingData:
                     f"to s3://{self.reporting_bucket}/{s3_key}"
                 )
 
-                # Track this section type and create/update Glue table if needed
-                if section_type not in section_types_processed:
-                    section_types_processed.add(section_type)
-                    # Try to create or update the Glue table for this section type
-                    table_created = self._create_or_update_glue_table(
-                        section_type, schema
+                # Collect the columns of this section type for its Glue table;
+                # buffered records update the table when their batch is written
+                if not buffered:
+                    section_type_schemas[section_type] = self._merge_schemas(
+                        section_type_schemas.get(section_type), schema
                     )
-                    if table_created:
-                        logger.info(
-                            f"Created/updated Glue table for section type: {section_type}"
-                        )
 
             except Exception as e:
                 logger.error(f"Error processing section {section.section_id}: {str(e)}")
                 sections_with_errors += 1
                 continue
 
+        # Create or update the Glue table of each section type once, with the
+        # columns of all its sections
+        for section_type, schema in section_type_schemas.items():
+            try:
+                if self._create_or_update_glue_table(section_type, schema):
+                    logger.info(
+                        f"Created/updated Glue table for section type: {section_type}"
+                    )
+            except Exception as e:
+                logger.error(
+                    f"Error updating Glue table for section type {section_type}: {str(e)}"
+                )
+
         # Log summary
         logger.info(
             f"Document sections processing complete for {document_id}: "
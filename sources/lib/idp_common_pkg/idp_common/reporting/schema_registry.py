@@ -0,0 +1,175 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Registry of the columns known to be in the reporting Glue tables.
+
+SaveReportingData infers a schema for every document it saves. Most of them
+match a table that already has all their columns, so checking the table in
+Glue (GetTable, and UpdateTable for changed locations) on every save only
+adds latency and throttling risk. The registry remembers the columns of each
+table it has seen in Glue, and the fingerprints of the inferred schemas they
+cover, so Glue is only called when a schema brings new columns.
+
+The registry is kept in process and, optionally, in a DynamoDB table shared by
+all reporting functions. Registry items expire after ttl_seconds, so changes
+made to a table outside the reporting functions are picked up eventually.
+"""
+
+import hashlib
+import logging
+import time
+from typing import Any, Dict, List, Optional, Set
+
+import boto3
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+
+
+def schema_fingerprint(columns: List[Dict[str, str]]) -> str:
+    """
+    Fingerprint of a list of Glue columns that is independent of column order.
+
+    Args:
+        columns: Glue columns ({"Name": ..., "Type": ...})
+
+    Returns:
+        Hex digest identifying the column names and types
+    """
+    digest = hashlib.sha256()
+    for name, column_type in sorted((col["Name"], col["Type"]) for col in columns):
+        digest.update(f"{name}:{column_type}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class GlueSchemaRegistry:
+    """Cache of Glue table columns, kept in process and optionally in DynamoDB."""
+
+    def __init__(
+        self,
+        table_name: Optional[str] = None,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        dynamodb_resource: Optional[Any] = None,
+    ):
+        """
+        Initialize the schema registry.
+
+        Args:
+            table_name: DynamoDB table shared by all reporting functions (optional).
+                Without it the registry only lives as long as this instance.
+            ttl_seconds: Time after which registered columns are checked in Glue again
+            dynamodb_resource: Optional boto3 DynamoDB resource
+        """
+        self.ttl_seconds = ttl_seconds
+        self.table = None
+        if table_name:
+            self.table = (dynamodb_resource or boto3.resource("dynamodb")).Table(
+                table_name
+            )
+        # "database.table" -> (column names, expiry)
+        self._columns: Dict[str, tuple] = {}
+        # "database.table" -> fingerprints of inferred schemas covered by the table
+        self._covered: Dict[str, Set[str]] = {}
+
+    @staticmethod
+    def _key(database_name: str, table_name: str) -> str:
+        return f"{database_name}.{table_name}"
+
+    def is_registered(
+        self, database_name: str, table_name: str, columns: List[Dict[str, str]]
+    ) -> bool:
+        """
+        Check whether the table is known to have all the given columns.
+
+        Args:
+            database_name: Glue database name
+            table_name: Glue table name
+            columns: Glue columns of an inferred schema
+
+        Returns:
+            True if no Glue call is needed for these columns
+        """
+        key = self._key(database_name, table_name)
+        fingerprint = schema_fingerprint(columns)
+        known = self._known_columns(key)
+        if known is None:
+            return False
+        if fingerprint in self._covered.setdefault(key, set()):
+            return True
+        if {col["Name"] for col in columns} <= known:
+            self._covered[key].add(fingerprint)
+            return True
+        return False
+
+    def register(
+        self, database_name: str, table_name: str, columns: List[Dict[str, str]]
+    ) -> None:
+        """
+        Record the columns a table has in Glue.
+
+        Args:
+            database_name: Glue database name
+            table_name: Glue table name
+            columns: All Glue columns of the table
+        """
+        key = self._key(database_name, table_name)
+        names = {col["Name"] for col in columns}
+        expires_at = int(time.time()) + self.ttl_seconds
+        self._columns[key] = (names, expires_at)
+        self._covered[key] = {schema_fingerprint(columns)}
+
+        if self.table is None:
+            return
+        try:
+            # Columns are only ever added, so never replace an item with more columns
+            self.table.put_item(
+                Item={
+                    "TableKey": key,
+                    "Columns": sorted(names),
+                    "ColumnCount": len(names),
+                    "Fingerprint": schema_fingerprint(columns),
+                    "ExpiresAt": expires_at,
+                },
+                ConditionExpression="attribute_not_exists(TableKey) OR ColumnCount <= :count OR ExpiresAt < :now",
+                ExpressionAttributeValues={
+                    ":count": len(names),
+                    ":now": int(time.time()),
+                },
+            )
+        except Exception as e:
+            if "ConditionalCheckFailedException" in str(e):
+                logger.debug(f"Schema registry already has more columns for {key}")
+                # Reload the registered columns on the next lookup
+                self._columns.pop(key, None)
+            else:
+                logger.warning(f"Could not update schema registry for {key}: {e}")
+
+    def invalidate(self, database_name: str, table_name: str) -> None:
+        """Forget the columns of a table in this process."""
+        key = self._key(database_name, table_name)
+        self._columns.pop(key, None)
+        self._covered.pop(key, None)
+
+    def _known_columns(self, key: str) -> Optional[Set[str]]:
+        now = time.time()
+        cached = self._columns.get(key)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+        self._columns.pop(key, None)
+        self._covered.pop(key, None)
+
+        if self.table is None:
+            return None
+        try:
+            item = self.table.get_item(Key={"TableKey": key}).get("Item")
+        except Exception as e:
+            logger.warning(f"Could not read schema registry for {key}: {e}")
+            return None
+        # DynamoDB deletes expired items lazily
+        if not item or int(item.get("ExpiresAt", 0)) <= now:
+            return None
+        names = set(item.get("Columns", []))
+        self._columns[key] = (names, int(item["ExpiresAt"]))
+        return names
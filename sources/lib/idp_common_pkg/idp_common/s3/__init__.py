@@ -96,7 +96,8 @@ def get_binary_content(s3_uri: str) -> bytes:
 
 def write_content(content: Union[str, bytes, Dict[str, Any], List[Any]],
                  bucket: str, key: str,
-                 content_type: Optional[str] = None) -> None:
+                 content_type: Optional[str] = None,
+                 s3_client: Optional[Any] = None) -> None:
     """
     Write content to S3
 
@@ -105,9 +106,10 @@ def write_content(content: Union[str, bytes, Dict[str, Any], List[Any]],
         bucket: The S3 bucket
         key: The S3 key
         content_type: Optional content type for the S3 object
+        s3_client: Optional S3 client to use instead of the shared client
     """
     try:
-        s3 = get_s3_client()
+        s3 = s3_client or get_s3_client()
 
         # Handle different content types
         if isinstance(content, (dict, list)):
@@ -279,3 +281,8 @@ def find_matching_files(bucket: str, pattern: str) -> List[str]:
     except Exception as e:
         logger.error(f"Error finding matching files in bucket {bucket} with pattern {pattern}: {e}")
         raise
+
+
+# Background upload queue and bulk transfers (imported last: they resolve write_content from this module)
+from .artifact_writer import ArtifactWriteError, S3ArtifactWriter  # noqa: E402
+from .bulk_transfer import BulkTransferError, S3BulkTransfer, TransferStats  # noqa: E402
@@ -0,0 +1,215 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Background writer for S3 artifacts.
+
+Page workers hand their outputs (page image, raw OCR response, text confidence
+and parsed text) to an S3ArtifactWriter and continue with the next page while
+the uploads run on a dedicated thread pool. Callers wait on flush() before they
+publish URIs that point at the uploaded objects.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+
+import boto3
+from botocore.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Default number of concurrent uploads
+DEFAULT_MAX_WORKERS = 10
+
+
+class ArtifactWriteError(Exception):
+    """Raised by S3ArtifactWriter.flush when one or more uploads failed."""
+
+    description = 'write {count} S3 artifact(s)'
+
+    def __init__(self, failures: List[Tuple[str, Exception]]):
+        self.failures = failures
+        keys = ', '.join(uri for uri, _ in failures[:5])
+        more = f' and {len(failures) - 5} more' if len(failures) > 5 else ''
+        super().__init__(
+            f"Failed to {self.description.format(count=len(failures))}: {keys}{more}. "
+            f"First error: {failures[0][1]}"
+        )
+
+
+class S3ArtifactWriter:
+    """
+    Threaded upload queue for S3 objects.
+
+    Uploads are queued with submit() and run on a thread pool whose S3
+    connection pool matches the number of upload workers. The number of queued
+    uploads is bounded, so producers block instead of buffering an unbounded
+    number of page images in memory when S3 falls behind.
+
+    The writer can be used as a context manager; leaving the block flushes the
+    queue and shuts the thread pool down.
+
+    Subclasses queue other S3 requests with _submit() and set the class
+    attributes below to name their requests, errors and threads.
+    """
+
+    error_class = ArtifactWriteError
+    request_name = 'upload'
+    thread_name_prefix = 's3-artifact'
+    # Attempts of the default client's retry handler
+    client_max_attempts = 10
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS,
+                 s3_client: Optional[Any] = None,
+                 max_pending: Optional[int] = None):
+        """
+        Initialize the writer.
+
+        Args:
+            max_workers: Number of concurrent uploads
+            s3_client: Optional S3 client; by default a client with a
+                connection pool of max_workers connections is created
+            max_pending: Maximum number of queued or in-flight uploads
+                (default: 4 * max_workers)
+        """
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be a positive integer, got {max_workers}")
+        self.max_workers = max_workers
+        self.max_pending = max_pending or max_workers * 4
+        if s3_client is None:
+            s3_client = boto3.client('s3', config=Config(
+                retries={'max_attempts': self.client_max_attempts, 'mode': 'adaptive'},
+                max_pool_connections=max_workers,
+            ))
+        self.s3_client = s3_client
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix=self.thread_name_prefix)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._pending: Dict[Future, str] = {}
+        # Requests whose errors are left to the caller of future.result()
+        self._unreported: Set[Future] = set()
+        self._failures: List[Tuple[str, Exception]] = []
+        self._closed = False
+        self.objects_written = 0
+
+    def submit(self, content: Union[str, bytes, Dict[str, Any], List[Any]],
+               bucket: str, key: str,
+               content_type: Optional[str] = None) -> Future:
+        """
+        Queue an object for upload.
+
+        Accepts the same content as write_content. Blocks while max_pending
+        uploads are already queued.
+
+        Args:
+            content: The content to write (string, bytes, or dict/list written as JSON)
+            bucket: The S3 bucket
+            key: The S3 key
+            content_type: Optional content type for the S3 object
+
+        Returns:
+            Future that completes when the object has been written
+        """
+        return self._submit(f"s3://{bucket}/{key}", self._write, content,
+                            bucket, key, content_type)
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """
+        Wait until every queued upload has completed.
+
+        Args:
+            timeout: Optional maximum number of seconds to wait in total
+
+        Raises:
+            TimeoutError: If uploads are still pending after timeout seconds;
+                they keep running and a later flush() waits for them again
+            ArtifactWriteError: If any upload since the last flush failed
+                (error_class of subclasses)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                pending = list(self._pending)
+            if not pending:
+                break
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            # Failures are recorded by _on_done and reported below
+            _, not_done = wait(pending, timeout=remaining)
+            if not_done:
+                raise TimeoutError(
+                    f"{len(not_done)} S3 {self.request_name}(s) still pending "
+                    f"after {timeout} seconds"
+                )
+
+        with self._lock:
+            failures, self._failures = self._failures, []
+        if failures:
+            raise self.error_class(failures)
+
+    def shutdown(self) -> None:
+        """Stop accepting uploads and release the thread pool after pending uploads finish."""
+        self._closed = True
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> 'S3ArtifactWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        try:
+            if exc_type is None:
+                self.flush()
+        finally:
+            self.shutdown()
+
+    def _submit(self, uri: str, func: Callable, *args,
+                report_failure: bool = True) -> Future:
+        """
+        Run func(*args) on the thread pool, tracking it under uri until it completes.
+
+        With report_failure=False an error is only raised from the future's
+        result() and is not reported by flush().
+        """
+        if self._closed:
+            raise RuntimeError(f'{type(self).__name__} has been shut down')
+
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._pending[future] = uri
+            if not report_failure:
+                self._unreported.add(future)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _write(self, content: Any, bucket: str, key: str,
+               content_type: Optional[str]) -> None:
+        # Resolved at call time so that write_content stays the single code path for PUTs
+        from idp_common.s3 import write_content
+
+        write_content(content, bucket, key, content_type=content_type,
+                      s3_client=self.s3_client)
+        with self._lock:
+            self.objects_written += 1
+
+    def _on_done(self, future: Future) -> None:
+        self._slots.release()
+        with self._lock:
+            uri = self._pending.pop(future, None)
+            report = future not in self._unreported
+            self._unreported.discard(future)
+            error = future.exception() if not future.cancelled() else None
+            if error is not None and report:
+                self._record_failure(uri or '<unknown>', error)
+
+    def _record_failure(self, uri: str, error: Exception) -> None:
+        # Called with self._lock held
+        self._failures.append((uri, error))
@@ -0,0 +1,290 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Concurrent bulk transfers of S3 objects.
+
+Result ingestion steps move hundreds of small objects per document: copying
+service outputs into the output bucket, uploading rendered page images and
+reading per-page results. Done one request at a time, the step is dominated by
+S3 round-trip latency. S3BulkTransfer extends S3ArtifactWriter, so copies,
+uploads and reads share its bounded thread pool, flush barrier and failure
+reporting. On top of that it retries transient S3 errors with exponential
+backoff and jitter, and keeps progress counters that can be published as
+CloudWatch metrics.
+
+Copies are server-side. Objects at or above the multipart threshold are copied
+with multipart UploadPartCopy requests (required above 5 GB and faster for
+large objects); smaller objects use a single CopyObject request.
+"""
+
+import logging
+import random
+import time
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import (
+    ClientError,
+    ConnectionClosedError,
+    ConnectTimeoutError,
+    EndpointConnectionError,
+    IncompleteReadError,
+    ReadTimeoutError,
+    ResponseStreamingError,
+)
+
+from .artifact_writer import ArtifactWriteError, S3ArtifactWriter
+
+logger = logging.getLogger(__name__)
+
+# Default number of concurrent transfers
+DEFAULT_MAX_WORKERS = 32
+# Attempts per transfer, including the first one
+DEFAULT_MAX_ATTEMPTS = 5
+# Objects of at least this size are copied with multipart UploadPartCopy requests
+DEFAULT_MULTIPART_THRESHOLD = 64 * 1024 * 1024
+DEFAULT_MULTIPART_CHUNKSIZE = 64 * 1024 * 1024
+# Log progress every this many completed transfers
+PROGRESS_LOG_INTERVAL = 100
+
+RETRYABLE_ERROR_CODES = {
+    'InternalError',
+    'RequestTimeout',
+    'ServiceUnavailable',
+    'SlowDown',
+    'Throttling',
+    'ThrottlingException',
+}
+# Errors raised while connecting or while streaming a response body; botocore
+# does not retry the latter because they happen after the response was returned
+RETRYABLE_EXCEPTIONS = (
+    ConnectionClosedError,
+    ConnectTimeoutError,
+    EndpointConnectionError,
+    IncompleteReadError,
+    ReadTimeoutError,
+    ResponseStreamingError,
+)
+
+
+class BulkTransferError(ArtifactWriteError):
+    """Raised by S3BulkTransfer.flush when one or more transfers failed."""
+
+    description = 'transfer {count} S3 object(s)'
+
+
+@dataclass
+class TransferStats:
+    """Progress counters of an S3BulkTransfer."""
+
+    copied: int = 0
+    uploaded: int = 0
+    read: int = 0
+    bytes: int = 0
+    retries: int = 0
+    failed: int = 0
+
+    @property
+    def completed(self) -> int:
+        return self.copied + self.uploaded + self.read
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """Whether a failed S3 request is worth retrying."""
+    if isinstance(error, RETRYABLE_EXCEPTIONS):
+        return True
+    if isinstance(error, ClientError):
+        code = error.response.get('Error', {}).get('Code', '')
+        status = error.response.get('ResponseMetadata', {}).get('HTTPStatusCode', 0)
+        return code in RETRYABLE_ERROR_CODES or status >= 500
+    return False
+
+
+class S3BulkTransfer(S3ArtifactWriter):
+    """
+    Bounded, retrying thread pool for S3 copies, uploads and reads.
+
+    Transfers are queued with copy(), upload() and read() and return futures.
+    The number of queued transfers is bounded, so producers block instead of
+    holding an unbounded number of page images or results in memory. flush()
+    waits for everything queued so far and raises BulkTransferError for the
+    copies and uploads that failed after all retries.
+
+    The pool can be used as a context manager, or kept at module level and
+    reused across warm Lambda invocations with a flush() per phase.
+    """
+
+    error_class = BulkTransferError
+    request_name = 'transfer'
+    thread_name_prefix = 's3-bulk'
+    # Transient errors are retried by _with_retries
+    client_max_attempts = 3
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS,
+                 s3_client: Optional[Any] = None,
+                 max_pending: Optional[int] = None,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 multipart_threshold: int = DEFAULT_MULTIPART_THRESHOLD,
+                 multipart_chunksize: int = DEFAULT_MULTIPART_CHUNKSIZE):
+        """
+        Initialize the transfer pool.
+
+        Args:
+            max_workers: Number of concurrent transfers
+            s3_client: Optional S3 client; by default a client with a
+                connection pool of max_workers connections is created
+            max_pending: Maximum number of queued or in-flight transfers
+                (default: 4 * max_workers)
+            max_attempts: Attempts per transfer for transient errors
+            multipart_threshold: Size from which copies use multipart requests
+            multipart_chunksize: Part size of multipart copies
+        """
+        super().__init__(max_workers=max_workers, s3_client=s3_client,
+                         max_pending=max_pending)
+        self.max_attempts = max(1, max_attempts)
+        self.multipart_threshold = multipart_threshold
+        self._transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_chunksize,
+        )
+        self.stats = TransferStats()
+        self._started = time.monotonic()
+
+    def copy(self, source_bucket: str, source_key: str, bucket: str, key: str,
+             size: Optional[int] = None,
+             extra_args: Optional[Dict[str, Any]] = None) -> Future:
+        """
+        Queue a server-side copy.
+
+        Args:
+            source_bucket: Source bucket
+            source_key: Source key
+            bucket: Destination bucket
+            key: Destination key
+            size: Source object size, if known (for example from a listing);
+                unknown sizes are copied with a single CopyObject request
+            extra_args: Additional CopyObject arguments such as ContentType
+                and MetadataDirective
+
+        Returns:
+            Future that completes when the object has been copied
+        """
+        return self._submit(f"s3://{bucket}/{key}", self._with_retries, self._copy,
+                            source_bucket, source_key, bucket, key, size,
+                            dict(extra_args or {}))
+
+    def upload(self, content: Union[str, bytes, Dict[str, Any], List[Any]],
+               bucket: str, key: str,
+               content_type: Optional[str] = None) -> Future:
+        """
+        Queue an upload. Accepts the same content as write_content.
+
+        Returns:
+            Future that completes when the object has been written
+        """
+        return self._submit(f"s3://{bucket}/{key}", self._with_retries, self._upload,
+                            content, bucket, key, content_type)
+
+    def submit(self, content: Union[str, bytes, Dict[str, Any], List[Any]],
+               bucket: str, key: str,
+               content_type: Optional[str] = None) -> Future:
+        """Queue an upload; same as upload()."""
+        return self.upload(content, bucket, key, content_type)
+
+    def read(self, bucket: str, key: str) -> Future:
+        """
+        Queue a read of a whole object.
+
+        A failed read is raised from the future's result() only. flush() does
+        not report it, so callers can fall back (for example to a copy) without
+        failing the batch.
+
+        Returns:
+            Future with the object content as bytes
+        """
+        return self._submit(f"s3://{bucket}/{key}", self._with_retries, self._read,
+                            bucket, key, report_failure=False)
+
+    def reset_stats(self) -> TransferStats:
+        """Return the counters collected so far and start new ones."""
+        with self._lock:
+            stats, self.stats = self.stats, TransferStats()
+            self._started = time.monotonic()
+        return stats
+
+    def publish_metrics(self, prefix: str = 'S3BulkTransfer') -> TransferStats:
+        """
+        Record the counters since the last reset as CloudWatch metrics and reset them.
+
+        Args:
+            prefix: Metric name prefix, e.g. 'BDAResultCopy'
+
+        Returns:
+            The published counters
+        """
+        from idp_common import metrics
+
+        elapsed_ms = (time.monotonic() - self._started) * 1000
+        stats = self.reset_stats()
+        metrics.put_metric(f'{prefix}Objects', stats.completed)
+        metrics.put_metric(f'{prefix}Bytes', stats.bytes, 'Bytes')
+        metrics.put_metric(f'{prefix}Retries', stats.retries)
+        metrics.put_metric(f'{prefix}Failures', stats.failed)
+        metrics.put_metric(f'{prefix}Duration', elapsed_ms, 'Milliseconds')
+        logger.info(f"{prefix}: {asdict(stats)} in {elapsed_ms:.0f} ms")
+        return stats
+
+    def _with_retries(self, func: Callable, *args) -> Any:
+        for attempt in range(self.max_attempts):
+            try:
+                return func(*args)
+            except Exception as e:
+                if attempt + 1 >= self.max_attempts or not is_retryable_error(e):
+                    raise
+                with self._lock:
+                    self.stats.retries += 1
+                # Full jitter: 0.1s, 0.2s, 0.4s ... capped at 5s
+                delay = random.uniform(0, min(5.0, 0.1 * 2 ** attempt))
+                logger.debug(f"Retrying S3 transfer after {type(e).__name__}: {e} (in {delay:.2f}s)")
+                time.sleep(delay)
+
+    def _copy(self, source_bucket: str, source_key: str, bucket: str, key: str,
+              size: Optional[int], extra_args: Dict[str, Any]) -> None:
+        copy_source = {'Bucket': source_bucket, 'Key': source_key}
+        if size is not None and size >= self.multipart_threshold:
+            self.s3_client.copy(copy_source, bucket, key, ExtraArgs=extra_args,
+                                Config=self._transfer_config)
+        else:
+            self.s3_client.copy_object(CopySource=copy_source, Bucket=bucket,
+                                       Key=key, **extra_args)
+        self._count('copied', size or 0)
+
+    def _upload(self, content: Any, bucket: str, key: str,
+                content_type: Optional[str]) -> None:
+        # Resolved at call time so that write_content stays the single code path for PUTs
+        from idp_common.s3 import write_content
+
+        write_content(content, bucket, key, content_type=content_type,
+                      s3_client=self.s3_client)
+        self._count('uploaded', len(content) if isinstance(content, (str, bytes)) else 0)
+
+    def _read(self, bucket: str, key: str) -> bytes:
+        body = self.s3_client.get_object(Bucket=bucket, Key=key)['Body'].read()
+        self._count('read', len(body))
+        return body
+
+    def _count(self, operation: str, size: int) -> None:
+        with self._lock:
+            setattr(self.stats, operation, getattr(self.stats, operation) + 1)
+            self.stats.bytes += size
+            completed = self.stats.completed
+        if completed % PROGRESS_LOG_INTERVAL == 0:
+            logger.info(f"Transferred {completed} S3 objects")
+
+    def _record_failure(self, uri: str, error: Exception) -> None:
+        # Called with self._lock held
+        self.stats.failed += 1
+        super()._record_failure(uri, error)
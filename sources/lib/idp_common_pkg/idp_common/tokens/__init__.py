@@ -0,0 +1,49 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Token counting and token-budgeted chunking per model family.
+
+Replaces character count / 4 estimates when sizing prompts:
+
+    from idp_common.tokens import chunk_text, count_tokens
+
+    tokens = count_tokens(text, model_id="us.anthropic.claude-3-7-sonnet-20250219-v1:0")
+    chunks = chunk_text(text, max_tokens=100_000, model_id=model_id)
+"""
+
+from .chunking import (
+    chunk_pages,
+    chunk_text,
+    input_token_budget,
+    page_token_count,
+)
+from .tokenizers import (
+    TOKEN_TABLES,
+    HuggingFaceTokenizer,
+    TableTokenizer,
+    Tokenizer,
+    TokenTable,
+    context_window,
+    count_tokens,
+    get_tokenizer,
+    model_family,
+    register_tokenizer,
+)
+
+__all__ = [
+    "TOKEN_TABLES",
+    "HuggingFaceTokenizer",
+    "TableTokenizer",
+    "TokenTable",
+    "Tokenizer",
+    "chunk_pages",
+    "chunk_text",
+    "context_window",
+    "count_tokens",
+    "get_tokenizer",
+    "input_token_budget",
+    "model_family",
+    "page_token_count",
+    "register_tokenizer",
+]
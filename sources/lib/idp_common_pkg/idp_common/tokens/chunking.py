@@ -0,0 +1,180 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Token-budgeted chunking of documents.
+
+chunk_text() splits text into chunks within a token budget at the largest
+boundary that fits: paragraphs, then lines, then words. chunk_pages() groups
+consecutive pages within a budget, using the page token counts that OCR
+caches on each page (Page.token_counts).
+"""
+
+import re
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from .tokenizers import Tokenizer, context_window, get_tokenizer
+
+# Share of the context window kept free, since table tokenizers approximate
+CONTEXT_SAFETY_MARGIN = 0.1
+
+_PARAGRAPHS = re.compile(r"[\s\S]*?(?:\n[^\S\n]*\n\s*|\Z)")
+_LINES = re.compile(r"[^\n]*\n|[^\n]+")
+_WORDS = re.compile(r"\S+\s*|\s+")
+
+
+def page_token_count(page, text: str, tokenizer: Tokenizer) -> int:
+    """
+    Get the token count of a page's text, counting it only once.
+
+    Args:
+        page: Page whose token_counts caches the count per tokenizer
+        text: Text of the page
+        tokenizer: Tokenizer of the model the text is sent to
+
+    Returns:
+        Number of tokens of the text
+    """
+    count = page.token_counts.get(tokenizer.name)
+    if count is None:
+        count = tokenizer.count(text)
+        page.token_counts[tokenizer.name] = count
+    return count
+
+
+def input_token_budget(model_id: Optional[str], max_output_tokens: int = 0) -> int:
+    """
+    Get the number of input tokens a request to a model can safely use.
+
+    Args:
+        model_id: Bedrock model ID
+        max_output_tokens: Tokens reserved for the response
+
+    Returns:
+        Input token budget
+    """
+    window = context_window(model_id) - (max_output_tokens or 0)
+    return max(1, int(window * (1 - CONTEXT_SAFETY_MARGIN)))
+
+
+def chunk_pages(
+    page_tokens: Sequence[Tuple[str, int]], max_tokens: int
+) -> List[List[str]]:
+    """
+    Group consecutive pages into chunks within a token budget.
+
+    A page that exceeds the budget on its own forms a chunk by itself.
+
+    Args:
+        page_tokens: Page IDs and their token counts, in document order
+        max_tokens: Token budget of a chunk
+
+    Returns:
+        Page IDs of each chunk
+    """
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    current_tokens = 0
+    for page_id, tokens in page_tokens:
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.append(page_id)
+        current_tokens += tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def chunk_text(
+    text: str,
+    max_tokens: int,
+    model_id: Optional[str] = None,
+    overlap_tokens: int = 0,
+    tokenizer: Optional[Tokenizer] = None,
+) -> List[str]:
+    """
+    Split text into chunks within a token budget.
+
+    Chunks end at paragraph boundaries where possible, then at line and word
+    boundaries. Each chunk after the first starts with trailing paragraphs
+    (or lines, or words) of the previous chunk up to overlap_tokens.
+
+    Args:
+        text: Text to split
+        max_tokens: Token budget of a chunk
+        model_id: Bedrock model ID whose tokenizer counts the tokens
+        overlap_tokens: Tokens of the previous chunk repeated at the start of the next
+        tokenizer: Tokenizer to use instead of the model's
+
+    Returns:
+        Chunks of the text; without overlap they join to the original text
+    """
+    tokenizer = tokenizer or get_tokenizer(model_id)
+    if tokenizer.count(text) <= max_tokens:
+        return [text]
+
+    chunks: List[str] = []
+    current: List[Tuple[str, int]] = []
+    current_tokens = 0
+    for unit, tokens in _units(text, max_tokens, tokenizer, _PARAGRAPHS):
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append("".join(part for part, _ in current))
+            # Carry trailing units of this chunk over to the next one
+            kept: List[Tuple[str, int]] = []
+            kept_tokens = 0
+            for part, part_tokens in reversed(current):
+                if (
+                    kept_tokens + part_tokens > overlap_tokens
+                    or kept_tokens + part_tokens + tokens > max_tokens
+                ):
+                    break
+                kept.insert(0, (part, part_tokens))
+                kept_tokens += part_tokens
+            if not kept and overlap_tokens > 0:
+                # The last unit is larger than the overlap, carry its last words
+                kept = _tail(
+                    current[-1][0], min(overlap_tokens, max_tokens - tokens), tokenizer
+                )
+                kept_tokens = sum(part_tokens for _, part_tokens in kept)
+            current, current_tokens = kept, kept_tokens
+        current.append((unit, tokens))
+        current_tokens += tokens
+    if current:
+        chunks.append("".join(part for part, _ in current))
+    return chunks
+
+
+def _tail(text: str, max_tokens: int, tokenizer: Tokenizer) -> List[Tuple[str, int]]:
+    """Trailing words of text within a token budget."""
+    tail: List[Tuple[str, int]] = []
+    tail_tokens = 0
+    for word in reversed(_WORDS.findall(text)):
+        tokens = tokenizer.count(word)
+        if tail_tokens + tokens > max_tokens:
+            break
+        tail.insert(0, (word, tokens))
+        tail_tokens += tokens
+    return tail
+
+
+def _units(
+    text: str, max_tokens: int, tokenizer: Tokenizer, pattern: re.Pattern
+) -> Iterator[Tuple[str, int]]:
+    """Split text at the boundaries of pattern, splitting further what exceeds the budget."""
+    finer = {_PARAGRAPHS: _LINES, _LINES: _WORDS}.get(pattern)
+    for match in pattern.finditer(text):
+        unit = match.group()
+        if not unit:
+            continue
+        tokens = tokenizer.count(unit)
+        if tokens <= max_tokens:
+            yield unit, tokens
+        elif finer is not None:
+            yield from _units(unit, max_tokens, tokenizer, finer)
+        else:
+            # A single word longer than the budget
+            size = max(1, len(unit) * max_tokens // tokens)
+            for start in range(0, len(unit), size):
+                part = unit[start : start + size]
+                yield part, tokenizer.count(part)
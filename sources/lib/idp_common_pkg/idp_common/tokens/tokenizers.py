@@ -0,0 +1,293 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Tokenizers per model family.
+
+Every model ID maps to a family (claude, nova, llama, mistral, ...), and every
+family has a tokenizer, resolved in this order:
+
+1. A tokenizer registered with register_tokenizer().
+2. A Hugging Face tokenizer file named <family>.json in the directory set by
+   the TOKENIZER_DIR environment variable (requires the optional tokenizers
+   package).
+3. The built-in TableTokenizer of the family. It splits text into words,
+   digit runs, CJK characters, punctuation and whitespace and counts each
+   with the family's token table. This is an offline approximation of the
+   family's vocabulary. It is much closer than characters / 4 for OCR text
+   with numbers, tables, punctuation and non-Latin scripts, but not exact.
+"""
+
+import logging
+import math
+import os
+import re
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FAMILY = "default"
+
+_CJK = r"\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff"
+
+# Pre-tokenization shared by the table tokenizers; one alternative per token class
+_PRETOKENIZE = re.compile(
+    rf"(?P<cjk>[{_CJK}])"
+    r"|(?P<digits>\d+)"
+    r"|(?P<latin>[A-Za-z]+)"
+    rf"|(?P<word>[^\W\d_{_CJK}]+)"
+    r"|(?P<newlines>\n+)"
+    r"|(?P<spaces>[^\S\n]+)"
+    r"|(?P<repeat>(?P<repeated>[^\w\s]|_)(?P=repeated){2,})"
+    r"|(?P<symbol>[^\w\s]|_)"
+)
+
+
+@dataclass(frozen=True)
+class TokenTable:
+    """Token counting rules of a model family."""
+
+    # Letters per token within Latin words; shorter words are one token
+    latin_chars_per_token: float = 4.5
+    # Characters per token within words of other alphabetic scripts
+    other_chars_per_token: float = 2.0
+    # Digits per token; numbers are split into groups of this size
+    digits_per_token: int = 3
+    # Tokens per CJK character
+    cjk_tokens_per_char: float = 1.0
+    # Characters per token in runs of a repeated symbol (e.g. "-----")
+    repeat_chars_per_token: int = 4
+    # Characters per token in whitespace runs longer than one character
+    space_chars_per_token: int = 4
+
+
+# Built-in token tables per model family
+TOKEN_TABLES: Dict[str, TokenTable] = {
+    "claude": TokenTable(latin_chars_per_token=5.0, digits_per_token=3),
+    "nova": TokenTable(latin_chars_per_token=5.0, cjk_tokens_per_char=0.8),
+    "llama": TokenTable(latin_chars_per_token=5.5),
+    "mistral": TokenTable(latin_chars_per_token=5.0, digits_per_token=1),
+    "gpt": TokenTable(latin_chars_per_token=5.5, cjk_tokens_per_char=0.7),
+    "qwen": TokenTable(latin_chars_per_token=5.0, cjk_tokens_per_char=0.7),
+    "deepseek": TokenTable(latin_chars_per_token=5.0, cjk_tokens_per_char=0.7),
+    DEFAULT_FAMILY: TokenTable(),
+}
+
+# Model ID substrings of each family, checked in order
+_FAMILY_PATTERNS = [
+    ("claude", "claude"),
+    ("anthropic", "claude"),
+    ("nova", "nova"),
+    ("llama", "llama"),
+    ("mistral", "mistral"),
+    ("pixtral", "mistral"),
+    ("gpt", "gpt"),
+    ("openai", "gpt"),
+    ("qwen", "qwen"),
+    ("deepseek", "deepseek"),
+]
+
+# Context windows in tokens, by model ID substring, checked in order
+_CONTEXT_WINDOWS = [
+    ("nova-premier", 1_000_000),
+    ("nova-micro", 128_000),
+    ("nova", 300_000),
+    ("claude", 200_000),
+    ("llama4-scout", 3_500_000),
+    ("llama4-maverick", 1_000_000),
+    ("llama", 128_000),
+    ("mistral", 128_000),
+    ("pixtral", 128_000),
+]
+DEFAULT_CONTEXT_WINDOW = 128_000
+
+
+class Tokenizer(ABC):
+    """
+    Counts the tokens of text for a model family.
+
+    The name keys token counts cached on pages (Page.token_counts), so
+    tokenizers that count differently must have different names.
+    """
+
+    name = DEFAULT_FAMILY
+
+    @abstractmethod
+    def count(self, text: str) -> int:
+        """
+        Count the tokens of text.
+
+        Args:
+            text: Text to count
+
+        Returns:
+            Number of tokens
+        """
+        pass
+
+
+class TableTokenizer(Tokenizer):
+    """Counts tokens with the token table of a model family."""
+
+    def __init__(self, name: str, table: TokenTable):
+        self.name = name
+        self.table = table
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        table = self.table
+        tokens = 0.0
+        for match in _PRETOKENIZE.finditer(text):
+            kind = match.lastgroup
+            length = match.end() - match.start()
+            if kind == "latin":
+                tokens += math.ceil(length / table.latin_chars_per_token)
+            elif kind == "digits":
+                tokens += math.ceil(length / table.digits_per_token)
+            elif kind == "cjk":
+                tokens += table.cjk_tokens_per_char
+            elif kind == "word":
+                tokens += math.ceil(length / table.other_chars_per_token)
+            elif kind == "spaces":
+                # A single space is part of the following token
+                if length > 1:
+                    tokens += math.ceil(length / table.space_chars_per_token)
+            elif kind == "repeat":
+                tokens += math.ceil(length / table.repeat_chars_per_token)
+            else:
+                # Newline runs and symbols
+                tokens += 1
+        return math.ceil(tokens)
+
+
+class HuggingFaceTokenizer(Tokenizer):
+    """Counts tokens with a Hugging Face tokenizer.json file."""
+
+    def __init__(self, name: str, path: str):
+        try:
+            from tokenizers import Tokenizer as HFTokenizer
+        except ImportError as e:
+            raise ImportError(
+                "Tokenizer files require the tokenizers package. "
+                "Install with: pip install 'idp_common[tokenizer]'"
+            ) from e
+        self.name = f"{name}-file"
+        self._tokenizer = HFTokenizer.from_file(path)
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        return len(self._tokenizer.encode(text, add_special_tokens=False).ids)
+
+
+_registered: Dict[str, Tokenizer] = {}
+_loaded: Dict[str, Tokenizer] = {}
+_lock = threading.Lock()
+
+
+def model_family(model_id: Optional[str]) -> str:
+    """
+    Get the tokenizer family of a model.
+
+    Args:
+        model_id: Bedrock model ID, inference profile ID or ARN
+
+    Returns:
+        Family name, or "default" for unknown models
+    """
+    model = (model_id or "").lower()
+    for pattern, family in _FAMILY_PATTERNS:
+        if pattern in model:
+            return family
+    return DEFAULT_FAMILY
+
+
+def register_tokenizer(family: str, tokenizer: Tokenizer) -> None:
+    """
+    Use a tokenizer for all models of a family.
+
+    Args:
+        family: Family name as returned by model_family()
+        tokenizer: Tokenizer to use
+    """
+    with _lock:
+        _registered[family] = tokenizer
+        _loaded.pop(family, None)
+
+
+def get_tokenizer(model_id: Optional[str] = None) -> Tokenizer:
+    """
+    Get the tokenizer of a model.
+
+    Args:
+        model_id: Bedrock model ID; None for the default tokenizer
+
+    Returns:
+        Tokenizer of the model's family
+    """
+    family = model_family(model_id)
+    with _lock:
+        tokenizer = _registered.get(family) or _loaded.get(family)
+    if tokenizer is not None:
+        return tokenizer
+
+    tokenizer = _load_tokenizer_file(family)
+    if tokenizer is None:
+        tokenizer = TableTokenizer(
+            family, TOKEN_TABLES.get(family, TOKEN_TABLES[DEFAULT_FAMILY])
+        )
+    with _lock:
+        return _loaded.setdefault(family, tokenizer)
+
+
+def count_tokens(text: str, model_id: Optional[str] = None) -> int:
+    """
+    Count the tokens of text for a model.
+
+    Args:
+        text: Text to count
+        model_id: Bedrock model ID; None for the default tokenizer
+
+    Returns:
+        Number of tokens
+    """
+    return get_tokenizer(model_id).count(text)
+
+
+def context_window(model_id: Optional[str]) -> int:
+    """
+    Get the context window of a model in tokens.
+
+    Args:
+        model_id: Bedrock model ID
+
+    Returns:
+        Context window, or 128000 for unknown models
+    """
+    model = (model_id or "").lower()
+    for pattern, window in _CONTEXT_WINDOWS:
+        if pattern in model:
+            return window
+    return DEFAULT_CONTEXT_WINDOW
+
+
+def _load_tokenizer_file(family: str) -> Optional[Tokenizer]:
+    tokenizer_dir = os.environ.get("TOKENIZER_DIR")
+    if not tokenizer_dir:
+        return None
+    path = os.path.join(tokenizer_dir, f"{family}.json")
+    if not os.path.exists(path):
+        return None
+    try:
+        tokenizer = HuggingFaceTokenizer(family, path)
+        logger.info(f"Loaded {family} tokenizer from {path}")
+        return tokenizer
+    except Exception as e:
+        logger.warning(
+            f"Could not load tokenizer {path}, using the {family} token table: {e}"
+        )
+        return None
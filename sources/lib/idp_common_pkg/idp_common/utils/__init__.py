@@ -7,6 +7,7 @@ import logging
 from typing import Tuple, Dict, Any, Optional
 
 from idp_common.config.models import IDPConfig
+from idp_common.tokens import count_tokens
 
 # Import yaml with fallback for systems that don't have it installed
 try:
@@ -642,7 +643,10 @@ Optional[str]:
     logger.info(f"model_id: {model_id}")
     configured_max_tokens = assessment_config.max_tokens
     logger.info(f"configured_max_tokens: {configured_max_tokens}")
-    estimated_tokens = (len(document_text) + len(str(extraction_results))) / 4
+    # Count with the assessment model's tokenizer rather than characters / 4
+    tokenizer_model = assessment_config.model
+    estimated_tokens = (count_tokens(document_text or "", tokenizer_model) +
+                        count_tokens(str(extraction_results), tokenizer_model))
     logger.info(f"Estimated tokens: {estimated_tokens}")
     if configured_max_tokens and int(configured_max_tokens) < estimated_tokens:
         return (
@@ -2,14 +2,19 @@ import logging
 from idp_common import image, s3
 from typing import Any, Dict, List
 
+from idp_common.config import current_config_version
 from idp_common.config.models import IDPConfig
 from idp_common.config.schema_constants import (
     X_AWS_IDP_CLASSIFICATION,
     X_AWS_IDP_EXAMPLES,
 )
+from idp_common.utils.few_shot_example_cache import FewShotExampleCache
 
 logger = logging.getLogger(__name__)
 
+# Example image listings and image blocks kept across warm Lambda invocations
+_example_cache = FewShotExampleCache()
+
 
 def _get_image_files_from_path(image_path: str) -> List[str]:
     """
@@ -75,6 +80,79 @@ def _get_image_files_from_path(image_path: str) -> List[str]:
             )
 
 
+def _load_image_attachment(image_file_path: str) -> Dict[str, Any]:
+    """
+    Load an example image and prepare it for Bedrock.
+
+    Args:
+        image_file_path: S3 URI or local path of the image
+
+    Returns:
+        Bedrock image content block
+    """
+    if image_file_path.startswith("s3://"):
+        # Direct S3 URI
+        image_content = s3.get_binary_content(image_file_path)
+    else:
+        # Local file
+        with open(image_file_path, "rb") as f:
+            image_content = f.read()
+
+    # Prepare image content for Bedrock
+    return image.prepare_bedrock_image_attachment(image_content)
+
+
+def _get_example_images(image_path: str) -> List[Dict[str, Any]]:
+    """
+    Get the Bedrock image blocks of an example's image path.
+
+    Listings and image blocks are served from the process-wide example cache
+    for the current configuration version.
+
+    Args:
+        image_path: Path to image file, directory, or S3 prefix
+
+    Returns:
+        Bedrock image content blocks; images that fail to load are skipped
+    """
+    version = current_config_version()
+    attachments = []
+    try:
+        # Get list of image files from the path (supports directories/prefixes)
+        image_files = _example_cache.get_listing(
+            version, image_path, lambda: _get_image_files_from_path(image_path)
+        )
+
+        # Process each image file
+        for image_file_path in image_files:
+            try:
+                attachments.append(
+                    _example_cache.get_image(
+                        version,
+                        image_file_path,
+                        lambda: _load_image_attachment(image_file_path),
+                    )
+                )
+            except Exception as e:
+                logger.warning(f"Failed to load image {image_file_path}: {e}")
+                continue
+
+    except Exception as e:
+        raise ValueError(f"Failed to load example images from {image_path}: {e}")
+
+    return attachments
+
+
+def get_example_cache_stats() -> Dict[str, Any]:
+    """
+    Get hit and miss counts of the few-shot example cache of this process.
+
+    Returns:
+        Dict with hits, misses, hit_rate and the size of cached images
+    """
+    return _example_cache.stats()
+
+
 def build_few_shot_examples_content(config: IDPConfig) -> List[Dict[str, Any]]:
     """
     Build content items for few-shot examples from the configuration.
@@ -102,41 +180,9 @@ def build_few_shot_examples_content(config: IDPConfig) -> List[Dict[str, Any]]:
 
             image_path = example.get("imagePath")
             if image_path:
-                try:
-                    # Load image content from the path
-
-                    # Get list of image files from the path (supports directories/prefixes)
-                    image_files = _get_image_files_from_path(image_path)
-
-                    # Process each image file
-                    for image_file_path in image_files:
-                        try:
-                            # Load image content
-                            if image_file_path.startswith("s3://"):
-                                # Direct S3 URI
-                                image_content = s3.get_binary_content(image_file_path)
-                            else:
-                                # Local file
-                                with open(image_file_path, "rb") as f:
-                                    image_content = f.read()
-
-                            # Prepare image content for Bedrock
-                            image_attachment = image.prepare_bedrock_image_attachment(
-                                image_content
-                            )
-                            content.append(image_attachment)
-
-                        except Exception as e:
-                            logger.warning(
-                                f"Failed to load image {image_file_path}: {e}"
-                            )
-                            continue
-
-                except Exception as e:
-                    raise ValueError(
-                        f"Failed to load example images from {image_path}: {e}"
-                    )
+                content.extend(_get_example_images(image_path))
 
+    _log_cache_stats()
     return content
 
 
@@ -173,35 +219,17 @@ def build_few_shot_extraction_examples_content(
 
         image_path = example.get("imagePath")
         if image_path:
-            try:
-                # Get list of image files from the path (supports directories/prefixes)
-                image_files = _get_image_files_from_path(image_path)
-
-                # Process each image file
-                for image_file_path in image_files:
-                    try:
-                        # Load image content
-                        if image_file_path.startswith("s3://"):
-                            # Direct S3 URI
-                            image_content = s3.get_binary_content(image_file_path)
-                        else:
-                            # Local file
-                            with open(image_file_path, "rb") as f:
-                                image_content = f.read()
-
-                        # Prepare image content for Bedrock
-                        image_attachment = image.prepare_bedrock_image_attachment(
-                            image_content
-                        )
-                        content.append(image_attachment)
-
-                    except Exception as e:
-                        logger.warning(f"Failed to load image {image_file_path}: {e}")
-                        continue
-
-            except Exception as e:
-                raise ValueError(
-                    f"Failed to load example images from {image_path}: {e}"
-                )
+            content.extend(_get_example_images(image_path))
 
+    _log_cache_stats()
     return content
+
+
+def _log_cache_stats() -> None:
+    stats = _example_cache.stats()
+    if not stats["hits"] and not stats["misses"]:
+        return
+    logger.info(
+        f"Few-shot example cache: {stats['hits']} hits, {stats['misses']} misses "
+        f"({stats['hit_rate']:.0%} hit rate), {stats['cached_images']} images cached"
+    )
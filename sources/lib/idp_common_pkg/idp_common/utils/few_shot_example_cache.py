@@ -0,0 +1,247 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Process-wide cache of few-shot example assets.
+
+Classification and extraction add the example images of the configured
+classes to every Bedrock request. FewShotExampleCache keeps the image listings
+of example paths and the Bedrock-ready image blocks at module level, so warm
+Lambda invocations build example content without any S3 requests:
+
+- Entries are keyed by the configuration version stamp (see
+  idp_common.config.current_config_version) and the image path or URI. When
+  the configuration is saved, the stamp changes and all entries are dropped.
+- Entries are evicted least recently used first once their images exceed
+  FEW_SHOT_CACHE_MAX_MB (default 100).
+- If FEW_SHOT_CACHE_DIR is set (for example /tmp/few-shot-examples), entries
+  are also written to that directory, and read from it after the module is
+  reloaded in the same execution environment.
+
+Every lookup publishes a FewShotExampleCacheHit or FewShotExampleCacheMiss
+count, and stats() reports the hit rate of the process.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_MB = 100
+
+
+class FewShotExampleCache:
+    """Caches example image listings and Bedrock image blocks."""
+
+    def __init__(
+        self, max_bytes: Optional[int] = None, cache_dir: Optional[str] = None
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Largest total size of cached images; defaults to the
+                FEW_SHOT_CACHE_MAX_MB environment variable or 100 MB
+            cache_dir: Directory for entries that outlive the module; defaults
+                to the FEW_SHOT_CACHE_DIR environment variable, unset disables it
+        """
+        if max_bytes is None:
+            max_bytes = int(
+                float(os.environ.get("FEW_SHOT_CACHE_MAX_MB", DEFAULT_MAX_MB))
+                * 1024
+                * 1024
+            )
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir or os.environ.get("FEW_SHOT_CACHE_DIR")
+        self.hits = 0
+        self.misses = 0
+        self._version: Optional[str] = None
+        self._listings: Dict[str, List[str]] = {}
+        self._images: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._image_bytes = 0
+        self._lock = threading.Lock()
+
+    def get_listing(
+        self, version: Optional[str], path: str, load: Callable[[], List[str]]
+    ) -> List[str]:
+        """
+        Get the image files of an example image path.
+
+        Args:
+            version: Configuration version stamp
+            path: Example image path, directory or S3 prefix
+            load: Lists the image files on a miss
+
+        Returns:
+            Image file paths or URIs
+        """
+        with self._lock:
+            self._check_version(version)
+            listing = self._listings.get(path)
+        if listing is None:
+            listing = self._read_file(version, path, "listing")
+            listing = json.loads(listing) if listing is not None else None
+        if listing is not None:
+            self._record(hit=True)
+            return list(listing)
+
+        self._record(hit=False)
+        listing = load()
+        with self._lock:
+            if self._version == version:
+                self._listings[path] = list(listing)
+        self._write_file(version, path, "listing", json.dumps(listing).encode())
+        return listing
+
+    def get_image(
+        self, version: Optional[str], uri: str, load: Callable[[], Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Get the Bedrock image block of an example image.
+
+        Args:
+            version: Configuration version stamp
+            uri: Image path or S3 URI
+            load: Loads and prepares the image block on a miss
+
+        Returns:
+            Bedrock image content block, shared with other callers and not to
+            be modified
+        """
+        with self._lock:
+            self._check_version(version)
+            block = self._images.get(uri)
+            if block is not None:
+                self._images.move_to_end(uri)
+        if block is None:
+            block = self._read_image_file(version, uri)
+            if block is not None:
+                self._store_image(version, uri, block)
+        if block is not None:
+            self._record(hit=True)
+            return block
+
+        self._record(hit=False)
+        block = load()
+        self._store_image(version, uri, block)
+        image = block["image"]
+        # Stored as the image format, a newline and the image bytes
+        self._write_file(
+            version,
+            uri,
+            "image",
+            image["format"].encode() + b"\n" + image["source"]["bytes"],
+        )
+        return block
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hit and miss counts of this process.
+
+        Returns:
+            Dict with hits, misses, hit_rate and the size of cached images
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "cached_images": len(self._images),
+            "cached_bytes": self._image_bytes,
+        }
+
+    def clear(self) -> None:
+        """Drop all entries held in memory."""
+        with self._lock:
+            self._listings.clear()
+            self._images.clear()
+            self._image_bytes = 0
+
+    def _check_version(self, version: Optional[str]) -> None:
+        # Called with the lock held
+        if version != self._version:
+            if self._listings or self._images:
+                logger.info(
+                    f"Configuration version changed from {self._version} to "
+                    f"{version}, dropping cached few-shot examples"
+                )
+            self._listings.clear()
+            self._images.clear()
+            self._image_bytes = 0
+            self._version = version
+
+    def _store_image(
+        self, version: Optional[str], uri: str, block: Dict[str, Any]
+    ) -> None:
+        size = len(block["image"]["source"]["bytes"])
+        with self._lock:
+            if self._version != version or size > self.max_bytes:
+                return
+            previous = self._images.pop(uri, None)
+            if previous is not None:
+                self._image_bytes -= len(previous["image"]["source"]["bytes"])
+            self._images[uri] = block
+            self._image_bytes += size
+            while self._image_bytes > self.max_bytes:
+                _, evicted = self._images.popitem(last=False)
+                self._image_bytes -= len(evicted["image"]["source"]["bytes"])
+
+    def _record(self, hit: bool) -> None:
+        from idp_common.metrics import put_metric
+
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        put_metric("FewShotExampleCacheHit" if hit else "FewShotExampleCacheMiss", 1)
+
+    def _file_path(self, version: Optional[str], key: str, kind: str) -> str:
+        digest = hashlib.sha256(f"{version}\n{key}".encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.{kind}")
+
+    def _read_file(
+        self, version: Optional[str], key: str, kind: str
+    ) -> Optional[bytes]:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._file_path(version, key, kind), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Could not read cached few-shot example {key}: {e}")
+            return None
+
+    def _read_image_file(
+        self, version: Optional[str], uri: str
+    ) -> Optional[Dict[str, Any]]:
+        data = self._read_file(version, uri, "image")
+        if data is None:
+            return None
+        image_format, _, image_bytes = data.partition(b"\n")
+        return {
+            "image": {"format": image_format.decode(), "source": {"bytes": image_bytes}}
+        }
+
+    def _write_file(
+        self, version: Optional[str], key: str, kind: str, data: bytes
+    ) -> None:
+        if not self.cache_dir:
+            return
+        path = self._file_path(version, key, kind)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write to a temporary file first so readers never see partial files
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not cache few-shot example {key} on disk: {e}")
@@ -65,6 +65,15 @@ extras_require = {
     "appsync": [
         "requests==2.32.4",
     ],
+    # Binary document state codec (DOCUMENT_STATE_CODEC=msgpack+zstd)
+    "state_codec": [
+        "msgpack>=1.0.0",
+        "zstandard>=0.22.0",
+    ],
+    # Exact token counts from tokenizer files (TOKENIZER_DIR)
+    "tokenizer": [
+        "tokenizers==0.21.1",
+    ],
     # Document service factory dependencies (includes both appsync and dynamodb support)
     "docs_service": [
         "requests==2.32.4",
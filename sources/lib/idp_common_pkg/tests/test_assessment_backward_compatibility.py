@@ -11,7 +11,7 @@ import json
 import os
 import unittest
 from typing import Any, Dict
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 
 from idp_common import assessment
 from idp_common.config.models import IDPConfig
@@ -332,7 +332,7 @@ class TestAssessmentBackwardCompatibility(unittest.TestCase):
     @patch("idp_common.s3.write_content")
     @patch("idp_common.image.prepare_image")
     @patch("idp_common.image.prepare_bedrock_image_attachment")
-    @patch("idp_common.bedrock.invoke_model")
+    @patch("idp_common.bedrock.invoke_model_async", new_callable=AsyncMock)
     def test_granular_assessment_service(
         self,
         mock_invoke_model,
@@ -409,7 +409,7 @@ class TestAssessmentBackwardCompatibility(unittest.TestCase):
         self.assertEqual(result_document.id, self.document.id)
 
         # Verify Bedrock was called multiple times (granular assessment)
-        # Expected: 1 simple batch + 1 group + 2 list items = 4 calls
+        # Expected: 1 simple batch + 1 group + 2 list items = 4 concurrent calls
         self.assertGreater(mock_invoke_model.call_count, 1)
 
         # Verify extraction results were written back
@@ -581,9 +581,13 @@ class TestAssessmentBackwardCompatibility(unittest.TestCase):
                         },
                     ),
                     patch("idp_common.bedrock.invoke_model") as mock_invoke,
+                    patch(
+                        "idp_common.bedrock.invoke_model_async",
+                        new_callable=AsyncMock,
+                    ) as mock_invoke_async,
                 ):
                     # Configure mock response
-                    mock_invoke.return_value = {
+                    mock_invoke.return_value = mock_invoke_async.return_value = {
                         "output": {
                             "message": {
                                 "content": [
@@ -634,8 +638,10 @@ class TestAssessmentBackwardCompatibility(unittest.TestCase):
                             type(assessment_service._service).__name__,
                             "GranularAssessmentService",
                         )
-                        # Granular assessment may make multiple calls
-                        self.assertGreaterEqual(mock_invoke.call_count, 1)
+                        # Granular assessment may make multiple concurrent calls
+                        self.assertGreaterEqual(
+                            mock_invoke.call_count + mock_invoke_async.call_count, 1
+                        )
                     else:
                         # The original service is called "AssessmentService" in service.py
                         self.assertEqual(
@@ -0,0 +1,216 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Unit tests for the Athena query tool.
+"""
+
+# ruff: noqa: E402, I001
+# The above line disables E402 (module level import not at top of file) and I001 (import block sorting) for this file
+
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# Mock strands modules before importing analytics modules
+sys.modules["strands"] = MagicMock()
+sys.modules["strands.models"] = MagicMock()
+
+# Mock bedrock_agentcore modules before importing analytics modules
+sys.modules["bedrock_agentcore"] = MagicMock()
+sys.modules["bedrock_agentcore.tools"] = MagicMock()
+sys.modules["bedrock_agentcore.tools.code_interpreter_client"] = MagicMock()
+
+from idp_common.agents.analytics.tools import athena_tool
+from idp_common.agents.analytics.tools.athena_tool import (
+    QueryResultCache,
+    execute_athena_query,
+    iter_query_result_pages,
+)
+
+CONFIG = {
+    "aws_region": "us-east-1",
+    "athena_database": "test_db",
+    "athena_output_location": "s3://test-bucket/results/",
+    "max_polling_attempts": 30,
+    "query_timeout_seconds": 300,
+}
+
+COLUMN_INFO = [{"Name": "count", "Label": "count", "Type": "bigint", "Precision": 19}]
+HEADER_ROW = {"Data": [{"VarCharValue": "count"}]}
+
+
+def _execution(state):
+    return {
+        "QueryExecution": {
+            "Status": {"State": state},
+            "ResultConfiguration": {
+                "OutputLocation": "s3://test-bucket/results/query-1.csv"
+            },
+        }
+    }
+
+
+@pytest.mark.unit
+class TestRunAthenaQuery:
+    """Tests for polling, row counts and result caching."""
+
+    @pytest.fixture
+    def athena(self):
+        client = MagicMock()
+        client.start_query_execution.return_value = {"QueryExecutionId": "query-1"}
+        client.get_query_execution.side_effect = [
+            _execution("QUEUED"),
+            _execution("RUNNING"),
+            _execution("SUCCEEDED"),
+        ]
+        # 1500 rows: a header row and 999 data rows on the first page
+        client.get_query_results.return_value = {
+            "ResultSet": {
+                "ResultSetMetadata": {"ColumnInfo": COLUMN_INFO},
+                "Rows": [HEADER_ROW] + [{"Data": [{"VarCharValue": "7"}]}] * 999,
+            },
+            "NextToken": "page-2",
+        }
+        client.get_query_runtime_statistics.return_value = {
+            "QueryRuntimeStatistics": {"Rows": {"OutputRows": 1499}}
+        }
+        with (
+            patch.object(athena_tool, "_query_cache", QueryResultCache()),
+            patch("boto3.client", return_value=client),
+            patch.object(athena_tool.time, "sleep") as sleep,
+        ):
+            client.sleep = sleep
+            yield client
+
+    def test_polling_backs_off_from_sub_second_delays(self, athena):
+        """Polling starts sub-second and large results are counted from statistics."""
+        result = execute_athena_query("SELECT count(*) FROM metering", CONFIG)
+
+        assert result["success"] is True
+        assert result["rows_returned"] == 1500
+        # Only the first result page is read
+        assert athena.get_query_results.call_count == 1
+        athena.get_paginator.assert_not_called()
+        assert result["result_csv_s3_uri"] == "s3://test-bucket/results/query-1.csv"
+        assert "'count'" in result["result_column_metadata"][0]
+        delays = [call.args[0] for call in athena.sleep.call_args_list]
+        assert delays == pytest.approx([0.2, 0.3])
+
+        request = athena.start_query_execution.call_args.kwargs
+        assert request["ResultReuseConfiguration"] == {
+            "ResultReuseByAgeConfiguration": {"Enabled": True, "MaxAgeInMinutes": 5}
+        }
+
+    def test_row_count_without_statistics(self, athena):
+        """Single-page results are counted directly; missing statistics fall back."""
+        athena.get_query_results.return_value = {
+            "ResultSet": {
+                "ResultSetMetadata": {"ColumnInfo": COLUMN_INFO},
+                "Rows": [HEADER_ROW] * 3,
+            }
+        }
+        result = execute_athena_query("SELECT count(*) FROM metering", CONFIG)
+        assert result["rows_returned"] == 3
+        athena.get_query_runtime_statistics.assert_not_called()
+
+        athena.get_query_execution.side_effect = None
+        athena.get_query_execution.return_value = _execution("SUCCEEDED")
+        athena.get_query_results.return_value = {
+            "ResultSet": {
+                "ResultSetMetadata": {"ColumnInfo": COLUMN_INFO},
+                "Rows": [HEADER_ROW] * 1000,
+            },
+            "NextToken": "page-2",
+        }
+        athena.get_query_runtime_statistics.side_effect = Exception("AccessDenied")
+        result = execute_athena_query("SELECT * FROM metering", CONFIG)
+        assert result["success"] is True
+        assert result["rows_returned"] == 1000
+
+    def test_repeated_query_uses_cache(self, athena):
+        """An identical query within the TTL does not run again."""
+        first = execute_athena_query("SELECT count(*) FROM metering", CONFIG)
+        second = execute_athena_query("SELECT count(*)\n  FROM metering;", CONFIG)
+
+        assert athena.start_query_execution.call_count == 1
+        assert second["cached"] is True
+        assert second["query"] == "SELECT count(*)\n  FROM metering;"
+        assert second["rows_returned"] == first["rows_returned"]
+
+        # A different database is a different query
+        athena.get_query_execution.side_effect = None
+        athena.get_query_execution.return_value = _execution("SUCCEEDED")
+        execute_athena_query(
+            "SELECT count(*) FROM metering", {**CONFIG, "athena_database": "other_db"}
+        )
+        assert athena.start_query_execution.call_count == 2
+
+    def test_cache_ttl_and_disabling(self, athena):
+        """Expired entries are not used and a TTL of 0 disables caching."""
+        config = {**CONFIG, "query_result_cache_ttl_seconds": 0}
+        athena.get_query_execution.side_effect = None
+        athena.get_query_execution.return_value = _execution("SUCCEEDED")
+
+        execute_athena_query("SHOW TABLES", config)
+        execute_athena_query("SHOW TABLES", config)
+        assert athena.start_query_execution.call_count == 2
+        assert (
+            "ResultReuseConfiguration"
+            not in athena.start_query_execution.call_args.kwargs
+        )
+
+        execute_athena_query("SHOW TABLES", CONFIG)
+        with patch.object(athena_tool.time, "monotonic", return_value=1e12):
+            execute_athena_query("SHOW TABLES", CONFIG)
+        assert athena.start_query_execution.call_count == 4
+
+    def test_failed_and_timed_out_queries_are_not_cached(self, athena):
+        """Only successful results are cached."""
+        athena.get_query_execution.side_effect = None
+        athena.get_query_execution.return_value = _execution("FAILED")
+        athena.get_query_execution.return_value["QueryExecution"]["Status"][
+            "StateChangeReason"
+        ] = "Table not found"
+
+        result = execute_athena_query("SELECT * FROM missing", CONFIG)
+        assert result == {
+            "success": False,
+            "error": "Table not found",
+            "state": "FAILED",
+            "athena_error_details": {},
+            "query": "SELECT * FROM missing",
+        }
+
+        athena.get_query_execution.return_value = _execution("QUEUED")
+        with patch.object(athena_tool.time, "monotonic", side_effect=[0.0, 0.0, 100.0]):
+            result = execute_athena_query(
+                "SELECT * FROM missing", {**CONFIG, "max_polling_attempts": 10}
+            )
+        assert result["state"] == "QUEUED"
+        assert result["error"].startswith("Query timed out after 20 seconds")
+        assert athena.start_query_execution.call_count == 2
+
+
+@pytest.mark.unit
+def test_iter_query_result_pages():
+    """Every result page is streamed through the paginator."""
+    client = MagicMock()
+    client.get_paginator.return_value.paginate.return_value = [
+        {
+            "ResultSet": {
+                "ResultSetMetadata": {"ColumnInfo": COLUMN_INFO},
+                "Rows": [HEADER_ROW] * 1000,
+            }
+        },
+        {"ResultSet": {"ResultSetMetadata": {"ColumnInfo": []}, "Rows": [{}] * 500}},
+    ]
+
+    pages = list(iter_query_result_pages(client, "query-1", page_size=500))
+
+    assert [len(page["Rows"]) for page in pages] == [1000, 500]
+    client.get_paginator.assert_called_once_with("get_query_results")
+    client.get_paginator.return_value.paginate.assert_called_once_with(
+        QueryExecutionId="query-1", PaginationConfig={"PageSize": 500}
+    )
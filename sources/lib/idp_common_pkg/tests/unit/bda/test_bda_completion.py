@@ -0,0 +1,255 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Unit tests for event-driven BDA completion and adaptive polling.
+"""
+
+import json
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import boto3
+import pytest
+from idp_common.bda import (
+    AdaptivePoller,
+    EventCompletionSource,
+    S3JobMetadataCompletionSource,
+    SqsEventCompletionSource,
+)
+from idp_common.bda.bda_service import BdaService
+from idp_common.bda.completion import (
+    MAX_UNCLAIMED_RECEIVES,
+    UNCLAIMED_VISIBILITY_SECONDS,
+)
+from moto import mock_aws
+
+OUTPUT_URI = "s3://output-bucket/bda-output"
+INVOCATION_ARN = (
+    "arn:aws:bedrock:us-east-1:123456789012:data-automation-invocation/job-123"
+)
+
+
+def _event(job_id, job_status="SUCCESS"):
+    return {
+        "source": "aws.bedrock",
+        "detail-type": "Bedrock Data Automation Job Succeeded",
+        "detail": {"job_id": job_id, "job_status": job_status},
+    }
+
+
+class StubBdaClient:
+    """Local stand-in for the BDA runtime client."""
+
+    def __init__(self, final_status="Success"):
+        self.final_status = final_status
+        self.finished = threading.Event()
+        self.status_calls = 0
+
+    def invoke_data_automation_async(self, **kwargs):
+        return {"invocationArn": INVOCATION_ARN}
+
+    def get_data_automation_status(self, invocationArn):
+        self.status_calls += 1
+        if not self.finished.is_set():
+            return {"status": "InProgress"}
+        return {
+            "status": self.final_status,
+            "outputConfiguration": {"s3Uri": f"{OUTPUT_URI}/job-123/job_metadata.json"},
+        }
+
+
+@pytest.fixture
+def service():
+    with patch("idp_common.bda.bda_service.boto3"):
+        service = BdaService(
+            output_s3_uri=OUTPUT_URI,
+            dataAutomationProfileArn="arn:aws:bedrock:us-east-1:123456789012:data-automation-profile/us.data-automation-v1",
+        )
+    service._bda_client = StubBdaClient()
+    return service
+
+
+@pytest.mark.unit
+def test_adaptive_poller_starts_fast_and_caps():
+    """Delays grow from the initial delay to the cap."""
+    delays = AdaptivePoller(initial_delay=0.5, max_delay=4, multiplier=2).delays()
+    assert [next(delays) for _ in range(6)] == [0.5, 1, 2, 4, 4, 4]
+
+    with pytest.raises(ValueError):
+        AdaptivePoller(initial_delay=5, max_delay=1)
+
+
+@pytest.mark.unit
+def test_polling_without_source_uses_adaptive_delays(service):
+    """Without a completion source the status API is polled with growing delays."""
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) == 3:
+            service._bda_client.finished.set()
+
+    with patch("idp_common.bda.bda_service.time.sleep", side_effect=sleep):
+        status = service.wait_data_automation_completion(
+            INVOCATION_ARN, poller=AdaptivePoller(0.5, 10, 2)
+        )
+
+    assert status == "Success"
+    assert sleeps == [0.5, 1, 2]
+    assert service._bda_client.status_calls == 3
+
+
+@pytest.mark.unit
+def test_event_completes_wait_with_one_status_call(service):
+    """An event ends the wait at once and the status is confirmed once."""
+    source = EventCompletionSource()
+
+    def finish():
+        time.sleep(0.1)
+        service._bda_client.finished.set()
+        source.notify(json.dumps(_event("job-123")))
+
+    threading.Thread(target=finish).start()
+    started = time.monotonic()
+    result = service.invoke_data_automation_with_completion(
+        "s3://input-bucket/doc.pdf", completion_source=source, timeout=10
+    )
+
+    assert time.monotonic() - started < 5
+    assert result == {
+        "status": "success",
+        "output_location": f"{OUTPUT_URI}/job-123/job_metadata.json",
+    }
+    # One confirmation after the event, one in get_data_automation_invocation
+    assert service._bda_client.status_calls == 2
+    assert source.status(INVOCATION_ARN) is None
+
+
+@pytest.mark.unit
+def test_lost_event_falls_back_to_status_checks(service):
+    """Without an event the status is still checked every status_check_interval."""
+    source = EventCompletionSource()
+    threading.Timer(0.2, service._bda_client.finished.set).start()
+
+    status = service.wait_data_automation_completion(
+        INVOCATION_ARN, completion_source=source, status_check_interval=0.1, timeout=5
+    )
+
+    assert status == "Success"
+    assert service._bda_client.status_calls >= 2
+
+
+@pytest.mark.unit
+def test_wait_times_out(service):
+    """The wait raises TimeoutError when the job does not finish in time."""
+    with pytest.raises(TimeoutError):
+        service.wait_data_automation_completion(
+            INVOCATION_ARN,
+            completion_source=EventCompletionSource(),
+            timeout=0.2,
+        )
+    assert service._bda_client.status_calls == 0
+
+
+@pytest.mark.unit
+@mock_aws
+def test_sqs_source_consumes_only_matching_events():
+    """Events of other jobs stay in the queue, hidden for a backoff period."""
+    sqs = boto3.client("sqs", region_name="us-east-1")
+    queue_url = sqs.create_queue(QueueName="bda-events")["QueueUrl"]
+    sqs.send_message(QueueUrl=queue_url, MessageBody=json.dumps(_event("other-job")))
+    sqs.send_message(QueueUrl=queue_url, MessageBody=json.dumps(_event("job-123")))
+
+    source = SqsEventCompletionSource(queue_url, sqs_client=sqs)
+    assert source.wait(INVOCATION_ARN, timeout=5)
+    assert source.status(INVOCATION_ARN) == "SUCCESS"
+
+    attributes = sqs.get_queue_attributes(QueueUrl=queue_url, AttributeNames=["All"])[
+        "Attributes"
+    ]
+    assert attributes["ApproximateNumberOfMessages"] == "0"
+    assert attributes["ApproximateNumberOfMessagesNotVisible"] == "1"
+
+
+@pytest.mark.unit
+def test_sqs_source_backs_off_and_deletes_unclaimed_events():
+    """Unclaimed events are not recorded, get growing visibility timeouts and are deleted eventually."""
+
+    def message(receive_count):
+        return {
+            "Body": json.dumps(_event("other-job")),
+            "ReceiptHandle": f"handle-{receive_count}",
+            "Attributes": {"ApproximateReceiveCount": str(receive_count)},
+        }
+
+    sqs = Mock()
+    sqs.receive_message.side_effect = [
+        {"Messages": [message(1)]},
+        {"Messages": [message(2)]},
+        {"Messages": [message(MAX_UNCLAIMED_RECEIVES)]},
+        {"Messages": [{"Body": json.dumps(_event("job-123")), "ReceiptHandle": "h"}]},
+    ]
+
+    source = SqsEventCompletionSource("queue-url", sqs_client=sqs)
+    assert source.wait(INVOCATION_ARN, timeout=5)
+
+    timeouts = [
+        call.kwargs["VisibilityTimeout"]
+        for call in sqs.change_message_visibility.call_args_list
+    ]
+    assert timeouts == [UNCLAIMED_VISIBILITY_SECONDS, 2 * UNCLAIMED_VISIBILITY_SECONDS]
+    deleted = [
+        call.kwargs["ReceiptHandle"] for call in sqs.delete_message.call_args_list
+    ]
+    assert deleted == [f"handle-{MAX_UNCLAIMED_RECEIVES}", "h"]
+    # Statuses of jobs awaited elsewhere are not kept
+    assert source._statuses == {"job-123": "SUCCESS"}
+
+
+@pytest.mark.unit
+@mock_aws
+def test_sqs_source_dispatches_events_to_concurrent_waiters():
+    """One waiter receives for all waiters of the process."""
+    sqs = boto3.client("sqs", region_name="us-east-1")
+    queue_url = sqs.create_queue(QueueName="bda-events")["QueueUrl"]
+    source = SqsEventCompletionSource(queue_url, sqs_client=sqs)
+    job_ids = [f"job-{i}" for i in range(4)]
+    results = {}
+
+    def wait(job_id):
+        arn = INVOCATION_ARN.replace("job-123", job_id)
+        results[job_id] = source.wait(arn, timeout=10)
+
+    with patch.object(sqs, "receive_message", wraps=sqs.receive_message) as receive:
+        threads = [threading.Thread(target=wait, args=(job_id,)) for job_id in job_ids]
+        for thread in threads:
+            thread.start()
+        for job_id in job_ids:
+            sqs.send_message(QueueUrl=queue_url, MessageBody=json.dumps(_event(job_id)))
+        for thread in threads:
+            thread.join(10)
+
+    assert results == {job_id: True for job_id in job_ids}
+    # Every event was claimed and deleted
+    assert "Messages" not in sqs.receive_message(QueueUrl=queue_url)
+    assert receive.call_count <= len(job_ids) + 1
+
+
+@pytest.mark.unit
+@mock_aws
+def test_s3_source_detects_job_metadata():
+    """The job is finished once its job_metadata.json exists."""
+    s3 = boto3.client("s3", region_name="us-east-1")
+    s3.create_bucket(Bucket="output-bucket")
+    source = S3JobMetadataCompletionSource(
+        OUTPUT_URI, s3_client=s3, poller=AdaptivePoller(0.05, 0.1)
+    )
+
+    assert not source.wait(INVOCATION_ARN, timeout=0.2)
+
+    s3.put_object(
+        Bucket="output-bucket", Key="bda-output/job-123/job_metadata.json", Body=b"{}"
+    )
+    assert source.wait(INVOCATION_ARN, timeout=0.2)
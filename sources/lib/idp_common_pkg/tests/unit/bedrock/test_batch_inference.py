@@ -0,0 +1,508 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Unit tests for Bedrock batch inference.
+"""
+
+import base64
+import json
+import re
+from textwrap import dedent
+from unittest.mock import MagicMock, patch
+
+import pytest
+from idp_common import bedrock
+from idp_common.bedrock.batch import (
+    BatchInference,
+    BatchInferenceError,
+    BatchRequestDeferred,
+    BedrockBatchJobRunner,
+    LocalBatchJobRunner,
+    batch_labels,
+    from_model_output,
+    to_model_input,
+)
+from idp_common.bedrock.client import BedrockClient
+from idp_common.bedrock.concurrency import ConcurrencyLimiter
+from idp_common.bedrock.rate_limiter import AdaptiveRateLimiter
+from idp_common.classification.service import ClassificationService
+from idp_common.models import Document, Page
+
+CLAUDE = "us.anthropic.claude-3-7-sonnet-20250219-v1:0"
+NOVA = "us.amazon.nova-pro-v1:0"
+
+ON_DEMAND_RESPONSE = {
+    "output": {"message": {"content": [{"text": "on-demand"}]}},
+    "stopReason": "end_turn",
+    "usage": {"inputTokens": 100, "outputTokens": 5, "totalTokens": 105},
+}
+
+
+def _claude_handler(model_id, model_input):
+    """Answer each request with the text of its first content block, reversed."""
+    text = model_input["messages"][0]["content"][0]["text"]
+    if text == "fail":
+        raise ValueError("Malformed input")
+    return {
+        "content": [{"type": "text", "text": text[::-1]}],
+        "stop_reason": "end_turn",
+        "usage": {"input_tokens": 40, "output_tokens": 3},
+    }
+
+
+def _bedrock_client():
+    client = BedrockClient(
+        region="us-east-1",
+        metrics_enabled=False,
+        concurrency_limiter=ConcurrencyLimiter(2),
+        rate_limiter=AdaptiveRateLimiter(initial_rate=1000, max_rate=1000, burst=1000),
+    )
+    client._client = MagicMock()
+    client._client.converse.return_value = ON_DEMAND_RESPONSE
+    return client
+
+
+def _invoke(client, text, context="Extraction", model_id=CLAUDE):
+    return client.invoke_model(
+        model_id=model_id,
+        system_prompt="Extract the fields",
+        content=[{"text": text}],
+        temperature=0.0,
+        top_k=5,
+        top_p=None,
+        max_tokens=1000,
+        context=context,
+    )
+
+
+@pytest.mark.unit
+class TestRequestConversion:
+    """Tests for converting converse requests to batch records and back."""
+
+    def test_claude_request(self):
+        params = {
+            "modelId": CLAUDE,
+            "system": [{"text": "Classify"}],
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {"text": "What is this?"},
+                        {"cachePoint": {"type": "default"}},
+                        {"image": {"format": "png", "source": {"bytes": b"page-1"}}},
+                    ],
+                }
+            ],
+            "inferenceConfig": {"temperature": 0.0},
+            "additionalModelRequestFields": {"top_k": 5, "max_tokens": 1000},
+        }
+
+        assert to_model_input(params) == {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": 1000,
+            "system": "Classify",
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": "What is this?"},
+                        {
+                            "type": "image",
+                            "source": {
+                                "type": "base64",
+                                "media_type": "image/png",
+                                "data": base64.b64encode(b"page-1").decode(),
+                            },
+                        },
+                    ],
+                }
+            ],
+            "temperature": 0.0,
+            "top_k": 5,
+        }
+
+    def test_nova_request(self):
+        params = {
+            "modelId": NOVA,
+            "system": [{"text": "Classify"}],
+            "messages": [{"role": "user", "content": [{"text": "What is this?"}]}],
+            "inferenceConfig": {"topP": 0.1, "maxTokens": 1000},
+            "additionalModelRequestFields": {"inferenceConfig": {"topK": 5}},
+        }
+
+        assert to_model_input(params) == {
+            "schemaVersion": "messages-v1",
+            "system": [{"text": "Classify"}],
+            "messages": [{"role": "user", "content": [{"text": "What is this?"}]}],
+            "inferenceConfig": {"topP": 0.1, "maxTokens": 1000, "topK": 5},
+        }
+
+    def test_unsupported_requests(self):
+        params = {
+            "modelId": "meta.llama3-70b-instruct-v1:0",
+            "system": [],
+            "messages": [{"role": "user", "content": [{"text": "Hi"}]}],
+        }
+        with pytest.raises(ValueError, match="not supported"):
+            to_model_input(params)
+        with pytest.raises(ValueError, match="Guardrails"):
+            to_model_input(
+                {
+                    **params,
+                    "modelId": NOVA,
+                    "guardrailConfig": {"guardrailIdentifier": "g"},
+                }
+            )
+
+    def test_claude_output(self):
+        response = from_model_output(
+            CLAUDE,
+            _claude_handler(CLAUDE, {"messages": [{"content": [{"text": "abc"}]}]}),
+        )
+
+        assert response["output"]["message"]["content"] == [{"text": "cba"}]
+        assert response["usage"]["inputTokens"] == 40
+        assert response["usage"]["totalTokens"] == 43
+
+
+@pytest.mark.unit
+class TestBatchInference:
+    """Tests for collecting, submitting and replaying batch requests."""
+
+    def test_collect_submit_and_replay(self):
+        client = _bedrock_client()
+        runner = LocalBatchJobRunner(_claude_handler)
+        batch = BatchInference(runner, stages=["extraction"])
+
+        with batch.collect():
+            for section_id in ("1", "2"):
+                with batch_labels(document_id="doc.pdf", section_id=section_id):
+                    with pytest.raises(BatchRequestDeferred):
+                        _invoke(client, f"section {section_id}")
+            # The same prompt again shares its record
+            with batch_labels(document_id="other.pdf", section_id="1"):
+                with pytest.raises(BatchRequestDeferred):
+                    _invoke(client, "section 1")
+            # Stages that are not batched are invoked on demand
+            assert (
+                _invoke(client, "page 1", context="Classification")["response"]
+                == ON_DEMAND_RESPONSE
+            )
+
+        assert client._client.converse.call_count == 1
+        assert len(batch.records) == 2
+        assert sorted(
+            (labels for record in batch.records.values() for labels in record.labels),
+            key=str,
+        ) == sorted(
+            [
+                {"document_id": "doc.pdf", "section_id": "1"},
+                {"document_id": "other.pdf", "section_id": "1"},
+                {"document_id": "doc.pdf", "section_id": "2"},
+            ],
+            key=str,
+        )
+
+        jobs = batch.submit()
+        assert [(job.model_id, job.record_count) for job in jobs] == [(CLAUDE, 2)]
+        assert batch.wait() is True
+
+        with batch.replay():
+            result = _invoke(client, "section 2")
+
+        assert client._client.converse.call_count == 1
+        assert result["response"]["output"]["message"]["content"] == [
+            {"text": "2 noitces"}
+        ]
+        assert result["metering"] == {
+            f"Extraction/bedrock-batch/{CLAUDE}": result["response"]["usage"]
+        }
+        assert bedrock.batch.get_batch_session() is None
+
+    def test_requests_without_results_fall_back_to_on_demand(self):
+        client = _bedrock_client()
+        batch = BatchInference(
+            LocalBatchJobRunner(_claude_handler), stages=["extraction"]
+        )
+
+        with batch.collect():
+            for text in ("ok", "fail"):
+                with pytest.raises(BatchRequestDeferred):
+                    _invoke(client, text)
+        batch.submit()
+        batch.wait()
+
+        (failed,) = batch.failed_records()
+        assert failed.error == "Malformed input"
+
+        with batch.replay():
+            assert _invoke(client, "fail")["response"] == ON_DEMAND_RESPONSE
+            # Requests that were never collected too
+            assert _invoke(client, "new")["response"] == ON_DEMAND_RESPONSE
+        assert client._client.converse.call_count == 2
+
+        batch.on_demand_fallback = False
+        with batch.replay():
+            with pytest.raises(BatchInferenceError, match="Malformed input"):
+                _invoke(client, "fail")
+
+    def test_models_below_minimum_are_not_submitted(self):
+        client = _bedrock_client()
+        runner = LocalBatchJobRunner(_claude_handler)
+        batch = BatchInference(runner, min_records=3, max_records_per_job=2)
+
+        with batch.collect():
+            for i in range(3):
+                with pytest.raises(BatchRequestDeferred):
+                    _invoke(client, f"claude {i}")
+            with pytest.raises(BatchRequestDeferred):
+                _invoke(client, "nova", model_id=NOVA)
+
+        jobs = batch.submit()
+
+        # Claude records are split into jobs of two, the single Nova record runs on demand
+        assert [(job.model_id, job.record_count) for job in jobs] == [
+            (CLAUDE, 2),
+            (CLAUDE, 1),
+        ]
+        with batch.replay():
+            assert (
+                _invoke(client, "nova", model_id=NOVA)["response"] == ON_DEMAND_RESPONSE
+            )
+
+    def test_resume_from_serialized_state(self):
+        client = _bedrock_client()
+        runner = LocalBatchJobRunner(_claude_handler)
+        batch = BatchInference(runner, stages=["assessment"])
+
+        with batch.collect():
+            with pytest.raises(BatchRequestDeferred):
+                _invoke(client, "assess", context="GranularAssessment")
+        batch.submit()
+
+        state = json.loads(json.dumps(batch.to_dict()))
+        resumed = BatchInference.from_dict(state, runner)
+        assert resumed.wait() is True
+
+        with resumed.replay():
+            result = _invoke(client, "assess", context="GranularAssessment")
+        assert result["response"]["output"]["message"]["content"] == [
+            {"text": "ssessa"}
+        ]
+
+    def test_wait_timeout_and_failed_jobs(self):
+        runner = MagicMock()
+        runner.submit.return_value = (
+            "arn:aws:bedrock:us-east-1:123456789012:model-invocation-job/abc"
+        )
+        runner.status.return_value = "InProgress"
+        client = _bedrock_client()
+        batch = BatchInference(runner, poll_interval_seconds=10)
+
+        with batch.collect():
+            with pytest.raises(BatchRequestDeferred):
+                _invoke(client, "slow")
+        batch.submit()
+
+        with patch("idp_common.bedrock.batch.time.sleep") as sleep:
+            with patch(
+                "idp_common.bedrock.batch.time.monotonic", side_effect=[0, 0, 5, 25]
+            ):
+                assert batch.wait(timeout_seconds=30) is False
+        assert sleep.call_count == 2
+
+        runner.status.return_value = "Expired"
+        assert batch.poll() is True
+        assert batch.failed_records()[0].error == "batch job expired"
+        runner.results.assert_not_called()
+
+
+@pytest.mark.unit
+class TestBedrockBatchJobRunner:
+    """Tests for running jobs with Amazon Bedrock."""
+
+    def test_submit_and_read_results(self):
+        with patch("boto3.client"):
+            runner = BedrockBatchJobRunner(
+                role_arn="arn:aws:iam::123456789012:role/batch",
+                input_s3_uri="s3://bucket/batch/input/",
+                output_s3_uri="s3://bucket/batch/output",
+            )
+        runner.bedrock = MagicMock()
+        runner.s3 = MagicMock()
+        job_arn = "arn:aws:bedrock:us-east-1:123456789012:model-invocation-job/abc123"
+        runner.bedrock.create_model_invocation_job.return_value = {"jobArn": job_arn}
+
+        records = [{"recordId": "r1", "modelInput": {"messages": []}}]
+        assert runner.submit("idp-batch-1", CLAUDE, records) == job_arn
+
+        runner.s3.put_object.assert_called_once_with(
+            Bucket="bucket",
+            Key="batch/input/idp-batch-1.jsonl",
+            Body=(json.dumps(records[0]) + "\n").encode("utf-8"),
+        )
+        request = runner.bedrock.create_model_invocation_job.call_args.kwargs
+        assert request["modelId"] == CLAUDE
+        assert (
+            request["inputDataConfig"]["s3InputDataConfig"]["s3Uri"]
+            == "s3://bucket/batch/input/idp-batch-1.jsonl"
+        )
+        assert request["timeoutDurationInHours"] == 24
+
+        runner.bedrock.get_model_invocation_job.return_value = {
+            "status": "Completed",
+            "inputDataConfig": request["inputDataConfig"],
+            "outputDataConfig": request["outputDataConfig"],
+        }
+        body = MagicMock()
+        body.iter_lines.return_value = [
+            json.dumps({"recordId": "r1", "modelOutput": {}}).encode(),
+            b"",
+        ]
+        runner.s3.get_object.return_value = {"Body": body}
+
+        assert list(runner.results(job_arn)) == [{"recordId": "r1", "modelOutput": {}}]
+        runner.s3.get_object.assert_called_once_with(
+            Bucket="bucket", Key="batch/output/abc123/idp-batch-1.jsonl.out"
+        )
+
+
+def _classification_config(classification_method):
+    return {
+        "classes": [
+            {
+                "$id": "invoice",
+                "x-aws-idp-document-type": "invoice",
+                "type": "object",
+                "description": "An invoice",
+            },
+            {
+                "$id": "letter",
+                "x-aws-idp-document-type": "letter",
+                "type": "object",
+                "description": "A letter",
+            },
+        ],
+        "classification": {
+            "model": CLAUDE,
+            "system_prompt": "You are a document classification assistant.",
+            "task_prompt": dedent("""
+                Classify the document into one of:
+                {CLASS_NAMES_AND_DESCRIPTIONS}
+
+                {DOCUMENT_TEXT}
+            """),
+            "classificationMethod": classification_method,
+        },
+    }
+
+
+@pytest.mark.unit
+def test_classification_resumes_from_batch_results():
+    """Page classification runs on batch results on the second pass."""
+    config = _classification_config("multimodalPageLevelClassification")
+
+    def handler(model_id, model_input):
+        assert model_input["system"] == "You are a document classification assistant."
+        return {
+            "content": [{"type": "text", "text": '{"class": "invoice"}'}],
+            "usage": {"input_tokens": 50, "output_tokens": 5},
+        }
+
+    with patch("boto3.Session"):
+        service = ClassificationService(
+            region="us-east-1", config=config, backend="bedrock"
+        )
+    batch = BatchInference(LocalBatchJobRunner(handler), stages=["classification"])
+
+    with (
+        patch("idp_common.s3.get_text_content", return_value="Invoice #1 total $100"),
+        patch.object(bedrock.default_client, "_client", MagicMock()) as runtime,
+        patch.object(bedrock.default_client, "metrics_enabled", False),
+    ):
+        with batch.collect():
+            with pytest.raises(BatchRequestDeferred):
+                service.classify_page_bedrock("1", text_uri="s3://bucket/1.txt")
+        batch.submit()
+        batch.wait()
+        with batch.replay():
+            result = service.classify_page_bedrock("1", text_uri="s3://bucket/1.txt")
+
+    runtime.converse.assert_not_called()
+    assert [record.labels for record in batch.records.values()] == [[{"page_id": "1"}]]
+    assert result.classification.doc_type == "invoice"
+    assert result.classification.metadata["metering"] == {
+        f"Classification/bedrock-batch/{CLAUDE}": {
+            "inputTokens": 50,
+            "outputTokens": 5,
+            "totalTokens": 55,
+            "cacheReadInputTokens": 0,
+            "cacheWriteInputTokens": 0,
+        }
+    }
+
+
+@pytest.mark.unit
+def test_holistic_classification_collects_every_window():
+    """All windows of a holistic classification are recorded before it is deferred."""
+    config = _classification_config("textbasedHolisticClassification")
+
+    def handler(model_id, model_input):
+        text = model_input["messages"][0]["content"][0]["text"]
+        pages = [
+            int(page) for page in re.findall(r"<page-number>(\d+)</page-number>", text)
+        ]
+        doc_type = "invoice" if pages[0] == 1 else "letter"
+        segments = [
+            {
+                "ordinal_start_page": pages[0],
+                "ordinal_end_page": pages[-1],
+                "type": doc_type,
+            }
+        ]
+        return {
+            "content": [{"type": "text", "text": json.dumps({"segments": segments})}],
+            "usage": {"input_tokens": 50, "output_tokens": 5},
+        }
+
+    with patch("boto3.Session"):
+        service = ClassificationService(
+            region="us-east-1", config=config, backend="bedrock"
+        )
+    batch = BatchInference(LocalBatchJobRunner(handler), stages=["classification"])
+
+    def new_document():
+        document = Document(id="doc.pdf")
+        for page_id in ("1", "2", "3", "4"):
+            document.pages[page_id] = Page(
+                page_id=page_id, parsed_text_uri=f"s3://bucket/{page_id}.txt"
+            )
+        return document
+
+    with (
+        patch("idp_common.s3.get_text_content", return_value="Page text"),
+        patch.object(
+            service, "_holistic_page_windows", return_value=[["1", "2"], ["3", "4"]]
+        ),
+        patch.object(bedrock.default_client, "_client", MagicMock()) as runtime,
+        patch.object(bedrock.default_client, "metrics_enabled", False),
+    ):
+        with batch.collect():
+            with pytest.raises(BatchRequestDeferred):
+                service.holistic_classify_document(new_document())
+        assert sorted(
+            labels["page_id"]
+            for record in batch.records.values()
+            for labels in record.labels
+        ) == ["1-2", "3-4"]
+
+        batch.submit()
+        batch.wait()
+        with batch.replay():
+            document = service.holistic_classify_document(new_document())
+
+    runtime.converse.assert_not_called()
+    assert [
+        (section.classification, section.page_ids) for section in document.sections
+    ] == [("invoice", ["1", "2"]), ("letter", ["3", "4"])]
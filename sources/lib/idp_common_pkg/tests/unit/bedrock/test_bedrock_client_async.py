@@ -0,0 +1,300 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Unit tests for async Bedrock invocation and the shared concurrency limiter.
+"""
+
+import asyncio
+import io
+import json
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from botocore.exceptions import ClientError, ReadTimeoutError
+from idp_common.bedrock import batch
+from idp_common.bedrock.batch import batch_labels
+from idp_common.bedrock.client import BedrockClient
+from idp_common.bedrock.concurrency import ConcurrencyLimiter, run_coroutine
+from idp_common.bedrock.rate_limiter import AdaptiveRateLimiter
+
+RESPONSE = {
+    "output": {"message": {"content": [{"text": "ok"}]}},
+    "usage": {"inputTokens": 10, "outputTokens": 2, "totalTokens": 12},
+}
+
+
+def _client_error(code):
+    return ClientError({"Error": {"Code": code, "Message": code}}, "Converse")
+
+
+def _bedrock_client(converse, max_concurrency=4, **kwargs):
+    kwargs.setdefault(
+        "rate_limiter",
+        AdaptiveRateLimiter(initial_rate=1000, max_rate=1000, burst=1000),
+    )
+    client = BedrockClient(
+        region="us-east-1",
+        metrics_enabled=False,
+        concurrency_limiter=ConcurrencyLimiter(max_concurrency),
+        **kwargs,
+    )
+    client._client = MagicMock()
+    client._client.converse.side_effect = converse
+    client._calculate_backoff = MagicMock(return_value=0)
+    return client
+
+
+def _invoke_kwargs(**overrides):
+    kwargs = {
+        "model_id": "us.amazon.nova-pro-v1:0",
+        "system_prompt": "system",
+        "content": [{"text": "hello"}],
+        "context": "Test",
+    }
+    kwargs.update(overrides)
+    return kwargs
+
+
+@pytest.mark.unit
+class TestConcurrencyLimiter:
+    """Tests for the semaphore-based limiter."""
+
+    def test_rejects_non_positive_limit(self):
+        with pytest.raises(ValueError):
+            ConcurrencyLimiter(0)
+
+    def test_sync_calls_never_exceed_limit(self):
+        limiter = ConcurrencyLimiter(2)
+        in_flight = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def work():
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.02)
+            with lock:
+                in_flight -= 1
+
+        threads = [threading.Thread(target=limiter.run, args=(work,)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert peak == 2
+
+
+@pytest.mark.unit
+class TestRunCoroutine:
+    """Tests for running async fan-outs from synchronous code."""
+
+    async def _labels(self):
+        await asyncio.sleep(0)
+        return batch._batch_labels.get()
+
+    def test_runs_without_event_loop(self):
+        with batch_labels(document_id="doc"):
+            assert run_coroutine(self._labels()) == {"document_id": "doc"}
+
+    @pytest.mark.asyncio
+    async def test_runs_inside_event_loop(self):
+        with batch_labels(document_id="doc"):
+            assert run_coroutine(self._labels()) == {"document_id": "doc"}
+
+    @pytest.mark.asyncio
+    async def test_reraises_error_inside_event_loop(self):
+        async def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError, match="boom"):
+            run_coroutine(fail())
+
+
+@pytest.mark.unit
+class TestInvokeModelAsync:
+    """Tests for BedrockClient.invoke_model_async."""
+
+    @pytest.mark.asyncio
+    async def test_matches_sync_result(self):
+        client = _bedrock_client(lambda **kwargs: RESPONSE)
+
+        async_result = await client.invoke_model_async(**_invoke_kwargs())
+        sync_result = client.invoke_model(**_invoke_kwargs())
+
+        assert async_result == sync_result
+        assert async_result["metering"] == {
+            "Test/bedrock/us.amazon.nova-pro-v1:0": RESPONSE["usage"]
+        }
+        assert (
+            client._client.converse.call_args_list[0]
+            == client._client.converse.call_args_list[1]
+        )
+
+    @pytest.mark.asyncio
+    async def test_gather_respects_concurrency_limit(self):
+        in_flight = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def converse(**kwargs):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.02)
+            with lock:
+                in_flight -= 1
+            return RESPONSE
+
+        client = _bedrock_client(converse, max_concurrency=3)
+
+        results = await asyncio.gather(
+            *(client.invoke_model_async(**_invoke_kwargs()) for _ in range(12))
+        )
+
+        assert len(results) == 12
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_retries_throttling_with_async_sleep(self):
+        attempts = iter(
+            [_client_error("ThrottlingException"), _client_error("ThrottlingException")]
+        )
+
+        def converse(**kwargs):
+            error = next(attempts, None)
+            if error:
+                raise error
+            return RESPONSE
+
+        client = _bedrock_client(converse)
+
+        with patch("idp_common.bedrock.client.time.sleep") as mock_sleep:
+            result = await client.invoke_model_async(**_invoke_kwargs())
+
+        assert result["response"] == RESPONSE
+        assert client._client.converse.call_count == 3
+        mock_sleep.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_retries_timeouts(self):
+        attempts = iter([ReadTimeoutError(endpoint_url="https://bedrock")])
+
+        def converse(**kwargs):
+            error = next(attempts, None)
+            if error:
+                raise error
+            return RESPONSE
+
+        client = _bedrock_client(converse)
+
+        result = await client.invoke_model_async(**_invoke_kwargs())
+
+        assert result["response"] == RESPONSE
+        assert client._client.converse.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_non_retryable_error_raises_immediately(self):
+        def converse(**kwargs):
+            raise _client_error("ValidationException")
+
+        client = _bedrock_client(converse)
+
+        with pytest.raises(ClientError):
+            await client.invoke_model_async(**_invoke_kwargs())
+        assert client._client.converse.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_raises_after_max_retries(self):
+        def converse(**kwargs):
+            raise _client_error("ThrottlingException")
+
+        client = _bedrock_client(converse, max_retries=2)
+
+        with pytest.raises(ClientError):
+            await client.invoke_model_async(**_invoke_kwargs())
+        assert client._client.converse.call_count == 3
+
+
+@pytest.mark.unit
+class TestInvokeModelRetry:
+    """Tests for the iterative sync retry loop."""
+
+    def test_sync_retry_loop_does_not_recurse(self):
+        attempts = iter([_client_error("ThrottlingException")] * 5)
+
+        def converse(**kwargs):
+            error = next(attempts, None)
+            if error:
+                raise error
+            return RESPONSE
+
+        client = _bedrock_client(converse, max_retries=5)
+
+        with patch.object(
+            client, "_invoke_with_retry", wraps=client._invoke_with_retry
+        ) as mock_retry:
+            result = client.invoke_model(**_invoke_kwargs())
+
+        assert result["response"] == RESPONSE
+        assert client._client.converse.call_count == 6
+        assert mock_retry.call_count == 1
+
+
+@pytest.mark.unit
+class TestGenerateEmbeddingRetry:
+    """Tests for the iterative embedding retry loop."""
+
+    @staticmethod
+    def _embedding_client(outcomes):
+        client = _bedrock_client(None, max_retries=5)
+
+        def invoke_model(**kwargs):
+            outcome = next(outcomes)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return {"body": io.BytesIO(json.dumps(outcome).encode())}
+
+        client._client.invoke_model.side_effect = invoke_model
+        return client
+
+    def test_retries_throttling_in_a_loop_with_limiter_slots(self):
+        client = self._embedding_client(
+            iter([_client_error("ThrottlingException")] * 3 + [{"embedding": [0.5]}])
+        )
+        limiter = client.concurrency_limiter
+
+        with (
+            patch.object(limiter, "run", wraps=limiter.run) as mock_run,
+            patch.object(
+                client,
+                "_generate_embedding_with_retry",
+                wraps=client._generate_embedding_with_retry,
+            ) as mock_retry,
+            patch("idp_common.bedrock.client.time.sleep") as mock_sleep,
+        ):
+            embedding = client.generate_embedding("some  text")
+
+        assert embedding == [0.5]
+        assert client._client.invoke_model.call_count == 4
+        assert mock_run.call_count == 4
+        assert mock_retry.call_count == 1
+        assert mock_sleep.call_count == 3
+        body = json.loads(client._client.invoke_model.call_args.kwargs["body"])
+        assert body == {"inputText": "some text"}
+
+    def test_non_retryable_error_raises_immediately(self):
+        client = self._embedding_client(iter([_client_error("ValidationException")]))
+
+        with patch("idp_common.bedrock.client.time.sleep") as mock_sleep:
+            with pytest.raises(ClientError):
+                client.generate_embedding("text")
+
+        assert client._client.invoke_model.call_count == 1
+        mock_sleep.assert_not_called()
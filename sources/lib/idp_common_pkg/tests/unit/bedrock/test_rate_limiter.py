@@ -0,0 +1,203 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Unit tests for the adaptive Bedrock rate limiter.
+"""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from botocore.exceptions import ClientError
+from idp_common.bedrock import rate_limiter as rate_limiter_module
+from idp_common.bedrock.client import BedrockClient
+from idp_common.bedrock.concurrency import ConcurrencyLimiter
+from idp_common.bedrock.rate_limiter import AdaptiveRateLimiter
+
+MODEL = "us.amazon.nova-pro-v1:0"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _limiter(**kwargs):
+    clock = FakeClock()
+    kwargs.setdefault("initial_rate", 10.0)
+    kwargs.setdefault("burst", 2.0)
+    return AdaptiveRateLimiter(clock=clock, **kwargs), clock
+
+
+@pytest.mark.unit
+class TestTokenBucket:
+    """Tests for token reservation and pacing."""
+
+    def test_burst_then_paced_at_rate(self):
+        limiter, _ = _limiter()
+
+        waits = [limiter.reserve(MODEL) for _ in range(4)]
+
+        assert waits[:2] == [0.0, 0.0]
+        assert waits[2] == pytest.approx(0.1)
+        assert waits[3] == pytest.approx(0.2)
+
+    def test_tokens_refill_over_time(self):
+        limiter, clock = _limiter()
+        limiter.reserve(MODEL)
+        limiter.reserve(MODEL)
+
+        clock.now += 0.1
+
+        assert limiter.reserve(MODEL) == 0.0
+
+    def test_models_are_paced_independently(self):
+        limiter, _ = _limiter(burst=1.0)
+        limiter.reserve(MODEL)
+
+        assert limiter.reserve("us.anthropic.claude-sonnet-4-20250514-v1:0") == 0.0
+        assert limiter.reserve(MODEL) > 0
+
+    def test_invalid_settings_rejected(self):
+        with pytest.raises(ValueError):
+            AdaptiveRateLimiter(min_rate=0)
+        with pytest.raises(ValueError):
+            AdaptiveRateLimiter(multiplicative_decrease=1.0)
+
+
+@pytest.mark.unit
+class TestAimdAdjustment:
+    """Tests for additive increase and multiplicative decrease."""
+
+    def test_success_increases_rate_additively(self):
+        limiter, _ = _limiter(additive_increase=1.0)
+
+        limiter.record_success(MODEL, 0.5)
+
+        assert limiter.get_rate(MODEL) == pytest.approx(10.1)
+
+    def test_rate_capped_at_max(self):
+        limiter, _ = _limiter(max_rate=10.05)
+
+        for _ in range(10):
+            limiter.record_success(MODEL)
+
+        assert limiter.get_rate(MODEL) == 10.05
+
+    def test_throttle_decreases_rate_multiplicatively(self):
+        limiter, clock = _limiter(multiplicative_decrease=0.5)
+
+        limiter.record_throttle(MODEL)
+        clock.now += 5
+        limiter.record_throttle(MODEL)
+
+        assert limiter.get_rate(MODEL) == pytest.approx(2.5)
+
+    def test_concurrent_throttles_within_cooldown_count_once(self):
+        limiter, _ = _limiter(multiplicative_decrease=0.5, decrease_cooldown=1.0)
+
+        for _ in range(5):
+            limiter.record_throttle(MODEL)
+
+        assert limiter.get_rate(MODEL) == pytest.approx(5.0)
+
+    def test_throttle_drains_burst(self):
+        limiter, _ = _limiter()
+
+        limiter.record_throttle(MODEL)
+
+        assert limiter.reserve(MODEL) > 0
+
+    def test_rate_floored_at_min(self):
+        limiter, clock = _limiter(min_rate=4.0)
+
+        for _ in range(5):
+            limiter.record_throttle(MODEL)
+            clock.now += 5
+
+        assert limiter.get_rate(MODEL) == 4.0
+
+    def test_slow_responses_hold_rate(self):
+        limiter, _ = _limiter(latency_target=2.0)
+
+        limiter.record_success(MODEL, 3.0)
+
+        assert limiter.get_rate(MODEL) == 10.0
+
+
+@pytest.mark.unit
+class TestStatePersistence:
+    """Tests for persisting learned rates between runtimes."""
+
+    def test_throttled_rate_restored_from_state_file(self, tmp_path):
+        state_path = str(tmp_path / "rates.json")
+        limiter, _ = _limiter(state_path=state_path)
+        limiter.record_throttle(MODEL)
+
+        restored, _ = _limiter(state_path=state_path)
+
+        assert json.loads((tmp_path / "rates.json").read_text()) == {
+            "rates": {MODEL: 5.0}
+        }
+        assert restored.get_rate(MODEL) == 5.0
+
+    def test_unreadable_state_file_ignored(self, tmp_path):
+        state_path = tmp_path / "rates.json"
+        state_path.write_text("not json")
+
+        limiter, _ = _limiter(state_path=str(state_path))
+
+        assert limiter.get_rate(MODEL) == 10.0
+
+    def test_shared_limiter_is_opt_in(self):
+        previous = rate_limiter_module.set_rate_limiter(None)
+        try:
+            for env, enabled in [
+                ({}, False),
+                ({"BEDROCK_RATE_LIMIT_ENABLED": "false"}, False),
+                ({"BEDROCK_RATE_LIMIT_ENABLED": "true"}, True),
+            ]:
+                rate_limiter_module._rate_limiter = rate_limiter_module._UNSET
+                with patch.dict("os.environ", env, clear=True):
+                    limiter = rate_limiter_module.get_rate_limiter()
+                assert (limiter is not None) == enabled
+        finally:
+            rate_limiter_module.set_rate_limiter(previous)
+
+
+@pytest.mark.unit
+class TestClientIntegration:
+    """Tests for rate limiting inside BedrockClient.invoke_model."""
+
+    def test_throttles_and_successes_feed_limiter(self):
+        limiter = MagicMock(spec=AdaptiveRateLimiter)
+        limiter.acquire.return_value = 0.0
+        client = BedrockClient(
+            region="us-east-1",
+            metrics_enabled=False,
+            concurrency_limiter=ConcurrencyLimiter(2),
+            rate_limiter=limiter,
+        )
+        client._client = MagicMock()
+        client._client.converse.side_effect = [
+            ClientError(
+                {"Error": {"Code": "ThrottlingException", "Message": "slow down"}},
+                "Converse",
+            ),
+            {"output": {"message": {"content": [{"text": "ok"}]}}, "usage": {}},
+        ]
+        client._calculate_backoff = MagicMock(return_value=0)
+
+        client.invoke_model(
+            model_id=MODEL, system_prompt="system", content=[{"text": "hi"}]
+        )
+
+        assert limiter.acquire.call_count == 2
+        limiter.acquire.assert_called_with(MODEL)
+        limiter.record_throttle.assert_called_once_with(MODEL)
+        limiter.record_success.assert_called_once()
+        assert limiter.record_success.call_args[0][0] == MODEL
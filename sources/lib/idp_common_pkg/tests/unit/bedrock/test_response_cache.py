@@ -0,0 +1,255 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Unit tests for the content-addressed Bedrock response cache.
+"""
+
+from unittest.mock import MagicMock
+
+import boto3
+import pytest
+from idp_common.bedrock.client import BedrockClient
+from idp_common.bedrock.concurrency import ConcurrencyLimiter
+from idp_common.bedrock.rate_limiter import AdaptiveRateLimiter
+from idp_common.bedrock.response_cache import (
+    DynamoDBCacheTier,
+    MemoryCacheTier,
+    ResponseCache,
+    S3CacheTier,
+    is_cacheable_request,
+    make_cache_key,
+)
+from moto import mock_aws
+
+MODEL = "us.amazon.nova-pro-v1:0"
+RESPONSE = {
+    "output": {"message": {"content": [{"text": "invoice"}]}},
+    "stopReason": "end_turn",
+    "usage": {"inputTokens": 100, "outputTokens": 5, "totalTokens": 105},
+    "ResponseMetadata": {"RequestId": "abc"},
+}
+
+
+def _params(image=b"page-1", **inference):
+    return {
+        "modelId": MODEL,
+        "system": [{"text": "Classify"}],
+        "messages": [
+            {
+                "role": "user",
+                "content": [
+                    {"text": "What is this?"},
+                    {"image": {"format": "png", "source": {"bytes": image}}},
+                ],
+            }
+        ],
+        "inferenceConfig": inference or {"temperature": 0.0},
+        "additionalModelRequestFields": None,
+    }
+
+
+def _bedrock_client(cache):
+    client = BedrockClient(
+        region="us-east-1",
+        metrics_enabled=False,
+        concurrency_limiter=ConcurrencyLimiter(2),
+        rate_limiter=AdaptiveRateLimiter(initial_rate=1000, max_rate=1000, burst=1000),
+        response_cache=cache,
+    )
+    client._client = MagicMock()
+    client._client.converse.return_value = RESPONSE
+    return client
+
+
+def _invoke(client, text="What is this?", temperature=0.0, top_p=None):
+    return client.invoke_model(
+        model_id=MODEL,
+        system_prompt="Classify",
+        content=[{"text": text}],
+        temperature=temperature,
+        top_p=top_p,
+        context="Classification",
+    )
+
+
+@pytest.mark.unit
+class TestCacheKey:
+    """Tests for request hashing."""
+
+    def test_key_is_stable_and_covers_image_bytes(self):
+        assert make_cache_key(_params()) == make_cache_key(_params())
+        assert make_cache_key(_params()) != make_cache_key(_params(image=b"page-2"))
+
+    def test_key_covers_inference_params(self):
+        assert make_cache_key(_params(temperature=0.0)) != make_cache_key(
+            _params(topP=0.1)
+        )
+
+    def test_sampled_requests_are_not_cacheable(self):
+        assert is_cacheable_request(_params(temperature=0.0))
+        assert not is_cacheable_request(_params(temperature=0.7))
+        # top_p replaces temperature, so the model samples at its default temperature
+        assert not is_cacheable_request(_params(topP=0.1))
+        assert not is_cacheable_request(_params(maxTokens=1000))
+        assert not is_cacheable_request(_params(temperature=0.0, topP=0.1))
+
+
+@pytest.mark.unit
+class TestResponseCacheTiers:
+    """Tests for tier lookup, backfill and expiry."""
+
+    def test_memory_tier_evicts_least_recently_used(self):
+        tier = MemoryCacheTier(max_entries=2)
+        tier.put("a", "1", float("inf"))
+        tier.put("b", "2", float("inf"))
+        tier.get("a")
+        tier.put("c", "3", float("inf"))
+
+        assert tier.get("b") is None
+        assert tier.get("a") == "1"
+        assert tier.get("c") == "3"
+
+    def test_expired_entries_are_misses(self):
+        cache = ResponseCache([MemoryCacheTier()], ttl_seconds=-1)
+        cache.put("key", RESPONSE)
+
+        assert cache.get("key") is None
+        assert cache.misses == 1
+
+    def test_hit_in_slower_tier_backfills_memory(self):
+        memory = MemoryCacheTier()
+        slow = MemoryCacheTier()
+        ResponseCache([slow]).put("key", RESPONSE)
+        cache = ResponseCache([memory, slow])
+
+        cached = cache.get("key")
+
+        assert cached["output"] == RESPONSE["output"]
+        assert "ResponseMetadata" not in cached
+        assert memory.get("key") is not None
+        assert cache.hits == 1
+
+    def test_failing_tier_is_treated_as_miss(self):
+        broken = MagicMock()
+        broken.name = "broken"
+        broken.get.side_effect = RuntimeError("unavailable")
+        broken.put.side_effect = RuntimeError("unavailable")
+        cache = ResponseCache([broken])
+
+        cache.put("key", RESPONSE)
+
+        assert cache.get("key") is None
+
+    def test_guardrail_interventions_not_stored(self):
+        cache = ResponseCache([MemoryCacheTier()])
+        cache.put("key", {**RESPONSE, "stopReason": "guardrail_intervened"})
+
+        assert cache.get("key") is None
+
+    @mock_aws
+    def test_dynamodb_tier_round_trip(self):
+        dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+        dynamodb.create_table(
+            TableName="tracking",
+            KeySchema=[
+                {"AttributeName": "PK", "KeyType": "HASH"},
+                {"AttributeName": "SK", "KeyType": "RANGE"},
+            ],
+            AttributeDefinitions=[
+                {"AttributeName": "PK", "AttributeType": "S"},
+                {"AttributeName": "SK", "AttributeType": "S"},
+            ],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        cache = ResponseCache([DynamoDBCacheTier("tracking", region="us-east-1")])
+
+        cache.put("key", RESPONSE)
+
+        assert cache.get("key")["usage"] == RESPONSE["usage"]
+        assert cache.get("other") is None
+
+    @mock_aws
+    def test_s3_tier_round_trip(self):
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="cache")
+        cache = ResponseCache([S3CacheTier("cache", region="us-east-1")])
+
+        cache.put("key", RESPONSE)
+
+        assert cache.get("key")["usage"] == RESPONSE["usage"]
+        assert cache.get("other") is None
+
+
+@pytest.mark.unit
+class TestClientResponseCache:
+    """Tests for response caching inside BedrockClient.invoke_model."""
+
+    def test_repeated_request_served_from_cache(self):
+        client = _bedrock_client(ResponseCache([MemoryCacheTier()]))
+
+        first = _invoke(client)
+        second = _invoke(client)
+
+        assert client._client.converse.call_count == 1
+        assert second["response"]["output"] == first["response"]["output"]
+        assert first["metering"] == {
+            f"Classification/bedrock/{MODEL}": {
+                **RESPONSE["usage"],
+                "responseCacheMisses": 1,
+            }
+        }
+        assert second["metering"] == {
+            f"Classification/bedrock/{MODEL}": {"responseCacheHits": 1}
+        }
+
+    def test_different_content_misses(self):
+        client = _bedrock_client(ResponseCache([MemoryCacheTier()]))
+
+        _invoke(client, text="page one")
+        _invoke(client, text="page two")
+
+        assert client._client.converse.call_count == 2
+
+    def test_sampled_requests_bypass_cache(self):
+        client = _bedrock_client(ResponseCache([MemoryCacheTier()]))
+
+        _invoke(client, temperature=0.7)
+        result = _invoke(client, temperature=0.7)
+
+        assert client._client.converse.call_count == 2
+        assert (
+            "responseCacheMisses"
+            not in result["metering"][f"Classification/bedrock/{MODEL}"]
+        )
+
+    def test_top_p_requests_bypass_cache(self):
+        """top_p drops the temperature, so responses are sampled at the model default."""
+        client = _bedrock_client(ResponseCache([MemoryCacheTier()]))
+
+        _invoke(client, temperature=0.0, top_p=0.1)
+        _invoke(client, temperature=0.0, top_p=0.1)
+
+        assert client._client.converse.call_count == 2
+        assert (
+            "temperature"
+            not in client._client.converse.call_args.kwargs["inferenceConfig"]
+        )
+
+    @pytest.mark.asyncio
+    async def test_async_invocation_shares_cache(self):
+        client = _bedrock_client(ResponseCache([MemoryCacheTier()]))
+        _invoke(client)
+
+        result = await client.invoke_model_async(
+            model_id=MODEL,
+            system_prompt="Classify",
+            content=[{"text": "What is this?"}],
+            temperature=0.0,
+            top_p=None,
+            context="Classification",
+        )
+
+        assert client._client.converse.call_count == 1
+        assert result["metering"][f"Classification/bedrock/{MODEL}"] == {
+            "responseCacheHits": 1
+        }
@@ -11,13 +11,15 @@ Unit tests for the ClassificationService class.
 import pytest
 
 # Import standard library modules first
+import asyncio
 import json
 from textwrap import dedent
-from unittest.mock import ANY, MagicMock, patch
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
 
 # PIL is now used directly - no mocking needed
 
 from botocore.exceptions import ClientError
+from idp_common.bedrock import batch
 from idp_common.classification.models import (
     DocumentClassification,
     PageClassification,
@@ -501,7 +503,10 @@ class TestClassificationService:
         # Test with no match
         assert service._extract_class_from_text("No class information") == ""
 
-    @patch("idp_common.classification.service.ClassificationService.classify_page")
+    @patch(
+        "idp_common.classification.service.ClassificationService.classify_page_async",
+        new_callable=AsyncMock,
+    )
     @patch("idp_common.utils.merge_metering_data")
     def test_classify_document_page_by_page(
         self, mock_merge_metering, mock_classify_page, service
@@ -553,7 +558,10 @@ class TestClassificationService:
         result.metering = {"tokens": 220}
         assert result.metering == {"tokens": 220}
 
-    @patch("idp_common.classification.service.ClassificationService.classify_page")
+    @patch(
+        "idp_common.classification.service.ClassificationService.classify_page_async",
+        new_callable=AsyncMock,
+    )
     def test_classify_document_with_different_page_types(
         self, mock_classify_page, service
     ):
@@ -593,6 +601,55 @@ class TestClassificationService:
         assert result.sections[2].classification == "invoice"
         assert result.sections[2].page_ids == ["3"]
 
+    @patch("idp_common.bedrock.invoke_model")
+    @patch("idp_common.bedrock.invoke_model_async", new_callable=AsyncMock)
+    @patch("idp_common.s3.get_text_content")
+    def test_classify_document_invokes_pages_concurrently(
+        self, mock_get_text, mock_invoke_async, mock_invoke, service
+    ):
+        """Test that pages are classified with concurrent async Bedrock calls."""
+        doc = Document(
+            id="test-doc", input_key="test-document.pdf", status=Status.CLASSIFYING
+        )
+        for page_id in ("1", "2", "3"):
+            doc.pages[page_id] = Page(
+                page_id=page_id, parsed_text_uri=f"s3://bucket/{page_id}.txt"
+            )
+        mock_get_text.side_effect = lambda uri: f"Text of {uri}"
+
+        in_flight = 0
+        max_in_flight = 0
+        page_labels = []
+
+        async def invoke(**kwargs):
+            nonlocal in_flight, max_in_flight
+            page_labels.append(batch._batch_labels.get()["page_id"])
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {
+                "response": {
+                    "output": {
+                        "message": {"content": [{"text": '{"class": "invoice"}'}]}
+                    }
+                },
+                "metering": {"Classification/bedrock/model": {"inputTokens": 10}},
+            }
+
+        mock_invoke_async.side_effect = invoke
+
+        result = service.classify_document(doc)
+
+        assert mock_invoke_async.call_count == 3
+        mock_invoke.assert_not_called()
+        assert max_in_flight == 3
+        assert sorted(page_labels) == ["1", "2", "3"]
+        assert [page.classification for page in result.pages.values()] == [
+            "invoice"
+        ] * 3
+        assert result.metering["Classification/bedrock/model"]["inputTokens"] == 30
+
     def test_classify_document_single_class_optimization(self, single_class_config):
         """Test document classification optimization when only one class is defined."""
         with (
@@ -615,14 +672,20 @@ class TestClassificationService:
             doc.pages["3"] = Page(page_id="3", image_uri="s3://bucket/image3.jpg")
 
             # Use a spy to verify that classify_page is never called
-            with patch.object(
-                service, "classify_page", wraps=service.classify_page
-            ) as spy_classify_page:
+            with (
+                patch.object(
+                    service, "classify_page", wraps=service.classify_page
+                ) as spy_classify_page,
+                patch.object(
+                    service, "classify_page_async", wraps=service.classify_page_async
+                ) as spy_classify_page_async,
+            ):
                 # Call the method
                 result = service.classify_document(doc)
 
                 # Verify classify_page was never called
                 spy_classify_page.assert_not_called()
+                spy_classify_page_async.assert_not_called()
 
             # Verify results
             assert len(result.sections) == 1
@@ -710,6 +773,66 @@ class TestClassificationService:
         # Verify Bedrock was called once for the whole document
         mock_invoke.assert_called_once()
 
+    @patch("idp_common.s3.get_text_content")
+    @patch(
+        "idp_common.classification.service.ClassificationService._invoke_bedrock_model"
+    )
+    def test_holistic_classify_document_in_page_windows(
+        self, mock_invoke, mock_get_text, service
+    ):
+        """Test holistic classification of a document exceeding the model's context."""
+        doc = Document(
+            id="test-doc", input_key="test-document.pdf", status=Status.CLASSIFYING
+        )
+        for i in range(1, 5):
+            # Token counts cached by OCR for the classification model's tokenizer
+            doc.pages[str(i)] = Page(
+                page_id=str(i),
+                parsed_text_uri=f"s3://bucket/text{i}.txt",
+                token_counts={"claude": 1000},
+            )
+        mock_get_text.side_effect = [f"Page {i} content" for i in range(1, 5)]
+
+        def response(segments):
+            text = json.dumps(
+                {
+                    "segments": [
+                        {"ordinal_start_page": s, "ordinal_end_page": e, "type": t}
+                        for s, e, t in segments
+                    ]
+                }
+            )
+            return {
+                "response": {"output": {"message": {"content": [{"text": text}]}}},
+                "metering": {"bedrock/invoke": {"inputTokens": 100}},
+            }
+
+        # The first window claims a page beyond it, which is clipped
+        mock_invoke.side_effect = [
+            response([(1, 3, "invoice")]),
+            response([(3, 3, "invoice"), (4, 4, "letter")]),
+        ]
+        service.classification_method = service.TEXTBASED_HOLISTIC
+
+        # Room for two pages of 1000 tokens per request
+        with patch(
+            "idp_common.classification.service.tokens.input_token_budget",
+            return_value=2500,
+        ):
+            result = service.holistic_classify_document(doc)
+
+        assert mock_invoke.call_count == 2
+        first_prompt = mock_invoke.call_args_list[0].kwargs["content"][0]["text"]
+        assert "Page 2 content" in first_prompt
+        assert "Page 3 content" not in first_prompt
+
+        # The invoice split by the window boundary is one section
+        assert [(s.classification, s.page_ids) for s in result.sections] == [
+            ("invoice", ["1", "2", "3"]),
+            ("letter", ["4"]),
+        ]
+        assert result.metering == {"bedrock/invoke": {"inputTokens": 200}}
+
     def test_holistic_classify_document_single_class_optimization(
         self, single_class_config
     ):
@@ -0,0 +1,138 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Tests for the cross-invocation configuration cache.
+"""
+
+from unittest.mock import patch
+
+import boto3
+import pytest
+from idp_common.config import (
+    ConfigurationReader,
+    get_config,
+    invalidate_config_cache,
+)
+from idp_common.config.cache import ConfigurationCache
+from idp_common.config.configuration_manager import ConfigurationManager
+from idp_common.config.constants import CONFIG_VERSION_KEY
+from idp_common.config.models import (
+    ConfigurationRecord,
+    ExtractionConfig,
+    IDPConfig,
+)
+from moto import mock_aws
+
+TABLE_NAME = "test-config-table"
+
+
+@pytest.mark.unit
+class TestConfigurationCache:
+    """Test cases for version-stamped configuration caching."""
+
+    @pytest.fixture
+    def table(self):
+        with mock_aws():
+            dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+            table = dynamodb.create_table(
+                TableName=TABLE_NAME,
+                KeySchema=[{"AttributeName": "Configuration", "KeyType": "HASH"}],
+                AttributeDefinitions=[
+                    {"AttributeName": "Configuration", "AttributeType": "S"}
+                ],
+                BillingMode="PAY_PER_REQUEST",
+            )
+            with patch("idp_common.metrics.put_metric") as put_metric:
+                table.put_metric = put_metric
+                yield table
+
+    @pytest.fixture
+    def manager(self, table):
+        manager = ConfigurationManager(table_name=TABLE_NAME)
+        manager.save_configuration(
+            "Default", IDPConfig(extraction=ExtractionConfig(temperature=0.0))
+        )
+        return manager
+
+    def test_warm_calls_reuse_the_configuration(self, table, manager):
+        """Unchanged configuration is read and validated once."""
+        cache = ConfigurationCache(ttl_seconds=300)
+        reader = ConfigurationReader(TABLE_NAME)
+
+        with patch.object(
+            reader, "get_merged_configuration", wraps=reader.get_merged_configuration
+        ) as merged:
+            first = cache.get(reader, as_model=True)
+            second = cache.get(reader, as_model=True)
+
+        assert merged.call_count == 1
+        assert isinstance(second, IDPConfig)
+        assert second.extraction.temperature == 0.0
+        # Callers get copies
+        first.extraction.temperature = 0.9
+        assert cache.get(reader, as_model=True).extraction.temperature == 0.0
+        assert cache.get(reader)["extraction"]["temperature"] == 0.0
+
+        metrics = [call.args[0] for call in table.put_metric.call_args_list]
+        assert metrics.count("ConfigurationLoadTime") == 1
+        assert metrics.count("ConfigurationCacheHit") == 3
+        assert metrics.count("ConfigurationCacheMiss") == 1
+
+    def test_saving_configuration_invalidates_the_cache(self, manager):
+        """A save or delete publishes a new version stamp that forces a reload."""
+        cache = ConfigurationCache(ttl_seconds=300)
+        reader = ConfigurationReader(TABLE_NAME)
+        version = manager.get_config_version()
+        assert version is not None
+        assert cache.get(reader, as_model=True).extraction.temperature == 0.0
+
+        manager.save_configuration(
+            "Custom", IDPConfig(extraction=ExtractionConfig(temperature=0.5))
+        )
+        assert manager.get_config_version() != version
+        assert cache.get(reader, as_model=True).extraction.temperature == 0.5
+
+        manager.delete_configuration("Custom")
+        assert cache.get(reader, as_model=True).extraction.temperature == 0.0
+
+    def test_ttl_bounds_staleness_without_version(self, table, manager):
+        """Without a readable version stamp, entries expire after the TTL."""
+        reader = ConfigurationReader(TABLE_NAME)
+        table.delete_item(Key={"Configuration": CONFIG_VERSION_KEY})
+
+        cache = ConfigurationCache(ttl_seconds=300)
+        cache.get(reader)
+        # A write that bypasses the version stamp
+        manager._write_record(
+            ConfigurationRecord(
+                configuration_type="Custom",
+                config=IDPConfig(extraction=ExtractionConfig(temperature=0.7)),
+            )
+        )
+        assert cache.get(reader)["extraction"]["temperature"] == 0.0
+
+        with patch("idp_common.config.cache.time.monotonic", return_value=1e12):
+            assert cache.get(reader)["extraction"]["temperature"] == 0.7
+
+        disabled = ConfigurationCache(ttl_seconds=0)
+        with patch.object(
+            reader, "get_merged_configuration", wraps=reader.get_merged_configuration
+        ) as merged:
+            disabled.get(reader)
+            disabled.get(reader)
+        assert merged.call_count == 2
+
+    def test_get_config_uses_module_cache(self, manager, monkeypatch):
+        """get_config() reuses the reader and configuration across calls."""
+        monkeypatch.setenv("CONFIGURATION_TABLE_NAME", TABLE_NAME)
+        invalidate_config_cache()
+        try:
+            with patch(
+                "idp_common.config.ConfigurationReader", wraps=ConfigurationReader
+            ) as reader_class:
+                config = get_config(as_model=True)
+                assert get_config(as_model=True) == config
+            assert reader_class.call_count == 1
+        finally:
+            invalidate_config_cache()
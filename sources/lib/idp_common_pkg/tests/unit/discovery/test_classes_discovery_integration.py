@@ -249,8 +249,16 @@ class TestClassesDiscoveryIntegration:
         assert "forms data" in content[1]["text"]
 
         # Verify configuration was updated
-        service_with_mocks._mock_table.put_item.assert_called_once()
-        put_item_args = service_with_mocks._mock_table.put_item.call_args[1]
+        # The Custom record is written once, followed by the configuration version stamp
+        put_items = [
+            call[1]["Item"]
+            for call in service_with_mocks._mock_table.put_item.call_args_list
+        ]
+        assert [item["Configuration"] for item in put_items] == [
+            "Custom",
+            "ConfigVersion",
+        ]
+        put_item_args = {"Item": put_items[0]}
 
         assert put_item_args["Item"]["Configuration"] == "Custom"
         classes = put_item_args["Item"]["classes"]
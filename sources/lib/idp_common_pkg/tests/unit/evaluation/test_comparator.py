@@ -0,0 +1,184 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Unit tests for the legacy comparator functions.
+"""
+
+import importlib.machinery
+import importlib.util
+import random
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from idp_common.evaluation import comparator
+from idp_common.evaluation.comparator import (
+    ExactComparator,
+    FuzzyComparator,
+    NumericComparator,
+    compare_hungarian,
+    fuzz_score,
+    levenshtein_distance,
+)
+
+
+def _load_real_munkres():
+    """
+    Load munkres from disk, bypassing any mock that other test modules put in
+    sys.modules.
+    """
+    spec = importlib.machinery.PathFinder.find_spec("munkres")
+    if spec is None:
+        pytest.skip("munkres is not installed")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _reference_distance(s1, s2):
+    """Textbook dynamic-programming Levenshtein distance."""
+    previous = list(range(len(s2) + 1))
+    for i, c1 in enumerate(s1, 1):
+        current = [i]
+        for j, c2 in enumerate(s2, 1):
+            current.append(
+                min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (c1 != c2))
+            )
+        previous = current
+    return previous[-1]
+
+
+@pytest.fixture(params=["rapidfuzz", "pure_python"])
+def engine(request):
+    """Run a test with rapidfuzz and with the pure-Python bit-parallel fallback."""
+    if request.param == "rapidfuzz":
+        pytest.importorskip("rapidfuzz")
+        yield request.param
+        return
+    with (
+        patch.object(comparator, "rapidfuzz_levenshtein", None),
+        patch.object(comparator, "rapidfuzz_cdist", None),
+    ):
+        yield request.param
+
+
+@pytest.mark.unit
+@pytest.mark.usefixtures("engine")
+class TestLevenshteinDistance:
+    """Tests for the edit distance engines."""
+
+    @pytest.mark.parametrize(
+        "s1,s2,expected",
+        [
+            ("", "", 0),
+            ("abc", "", 3),
+            ("", "abc", 3),
+            ("kitten", "sitting", 3),
+            ("flaw", "lawn", 2),
+            ("invoice total", "invoice totals", 1),
+        ],
+    )
+    def test_known_distances(self, s1, s2, expected):
+        assert levenshtein_distance(s1, s2) == expected
+
+    def test_matches_reference_on_random_strings(self):
+        rng = random.Random(42)
+        for _ in range(500):
+            s1 = "".join(rng.choice("abc d") for _ in range(rng.randint(0, 120)))
+            s2 = "".join(rng.choice("abc d") for _ in range(rng.randint(0, 120)))
+            assert levenshtein_distance(s1, s2) == _reference_distance(s1, s2)
+
+    def test_early_exit_returns_bound_plus_one(self):
+        assert levenshtein_distance("kitten", "sitting", max_distance=2) == 3
+        assert levenshtein_distance("kitten", "sitting", max_distance=3) == 3
+        assert levenshtein_distance("a" * 50, "b", max_distance=5) == 6
+
+
+@pytest.mark.unit
+@pytest.mark.usefixtures("engine")
+class TestFuzzScore:
+    """Tests for the normalized similarity score."""
+
+    def test_score_matches_reference_formula(self):
+        assert fuzz_score("Kitten", "sitting!") == pytest.approx(1 - 3 / 7)
+
+    def test_normalization_and_edge_cases(self):
+        assert fuzz_score("ACME, Inc.", "acme inc") == 1.0
+        assert fuzz_score("", "abc") == 0.0
+
+    def test_score_cutoff(self):
+        assert fuzz_score("kitten", "sitting", score_cutoff=0.5) == pytest.approx(
+            1 - 3 / 7
+        )
+        assert fuzz_score("kitten", "sitting", score_cutoff=0.9) == 0.0
+
+
+@pytest.mark.unit
+@pytest.mark.usefixtures("engine")
+class TestSimilarityMatrix:
+    """Tests for batched similarity matrices."""
+
+    VALUES1 = ["Widget A", "Widget-B", "Service fee", ""]
+    VALUES2 = ["widget a", "Widget C", "service fees", "12.50"]
+
+    @pytest.mark.parametrize(
+        "comparator_instance",
+        [ExactComparator(), FuzzyComparator(), NumericComparator()],
+    )
+    def test_matrix_matches_pairwise_compare(self, comparator_instance):
+        matrix = comparator_instance.similarity_matrix(self.VALUES1, self.VALUES2)
+
+        expected = np.array(
+            [
+                [comparator_instance.compare(a, b) for b in self.VALUES2]
+                for a in self.VALUES1
+            ]
+        )
+        assert matrix.shape == (4, 4)
+        np.testing.assert_allclose(matrix, expected)
+
+
+@pytest.mark.unit
+class TestCompareHungarian:
+    """Tests for list matching."""
+
+    def test_finds_optimal_assignment(self):
+        expected = ["apple", "banana", "cherry"]
+        actual = ["cherry", "apple", "banana"]
+
+        assert compare_hungarian(expected, actual) == (3, 0, 1.0)
+
+    def test_counts_unmatched_actual_items_as_false_positives(self):
+        tp, fp, score = compare_hungarian(["apple"], ["apple", "kiwi", "plum"])
+
+        assert (tp, fp, score) == (1, 2, 1.0)
+
+    def test_fuzzy_matching_with_threshold(self):
+        tp, fp, score = compare_hungarian(
+            ["Widget A - 10 units", "Service fee"],
+            ["service fees", "Widget A 10 units"],
+            comparator=FuzzyComparator(),
+            threshold=0.8,
+        )
+
+        assert (tp, fp) == (2, 0)
+        assert score == pytest.approx((1.0 + 1 - 1 / 12) / 2)
+
+    def test_munkres_fallback_gives_same_assignment(self):
+        munkres = _load_real_munkres()
+        expected = ["Widget A", "Widget B", "Gadget", "Service fee"]
+        actual = ["gadget", "service fees", "widget b", "widget a", "extra"]
+        with_scipy = compare_hungarian(expected, actual, FuzzyComparator())
+
+        with (
+            patch.object(comparator, "linear_sum_assignment", None),
+            patch.object(comparator, "Munkres", munkres.Munkres, create=True),
+            patch.object(
+                comparator, "make_cost_matrix", munkres.make_cost_matrix, create=True
+            ),
+        ):
+            with_munkres = compare_hungarian(expected, actual, FuzzyComparator())
+
+        assert with_munkres[:2] == with_scipy[:2]
+        assert with_munkres[2] == pytest.approx(with_scipy[2])
@@ -0,0 +1,227 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Unit tests for the cached embedding service and semantic comparators.
+"""
+
+import threading
+from unittest.mock import patch
+
+import boto3
+import numpy as np
+import pytest
+from idp_common.evaluation import embedding_service
+from idp_common.evaluation.comparator import (
+    SemanticComparator,
+    compare_hungarian,
+    compare_semantic,
+)
+from idp_common.evaluation.embedding_service import (
+    EmbeddingService,
+    cosine_similarity_matrix,
+    make_cache_key,
+)
+from moto import mock_aws
+
+MODEL_ID = "amazon.titan-embed-text-v2:0"
+
+
+class FakeEmbeddingClient:
+    """Deterministic bag-of-letters embeddings that record every request."""
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def generate_embedding(self, text, model_id):
+        with self._lock:
+            self.calls.append(text)
+        vector = [0.0] * 26
+        for char in text.lower():
+            if "a" <= char <= "z":
+                vector[ord(char) - ord("a")] += 1.0
+        return vector
+
+
+@pytest.fixture
+def client():
+    return FakeEmbeddingClient()
+
+
+@pytest.fixture
+def service(client, tmp_path):
+    return EmbeddingService(
+        model_id=MODEL_ID, bedrock_client=client, cache_dir=str(tmp_path)
+    )
+
+
+@pytest.fixture
+def shared_service(service):
+    """Install the fixture service as the process-wide service for MODEL_ID."""
+    with patch.dict(embedding_service._services, {MODEL_ID: service}, clear=True):
+        yield service
+
+
+@pytest.mark.unit
+class TestEmbeddingService:
+    def test_embed_deduplicates_and_normalizes(self, service, client):
+        vectors = service.embed(["Acme  Corp", "Acme Corp", "Widget", "Acme Corp\n"])
+
+        assert sorted(client.calls) == ["Acme Corp", "Widget"]
+        assert vectors[0] is vectors[1]
+        assert vectors[0].dtype == np.float32
+        np.testing.assert_array_equal(vectors[0], vectors[3])
+
+    def test_empty_text_is_not_embedded(self, service, client):
+        vectors = service.embed(["", "   ", None, "x"])
+
+        assert vectors[:3] == [None, None, None]
+        assert client.calls == ["x"]
+
+    def test_memory_cache_hit(self, service, client):
+        service.embed(["invoice"])
+        service.embed(["invoice", "invoice"])
+
+        assert client.calls == ["invoice"]
+        assert service.memory_hits == 1
+        assert service.requests == 1
+
+    def test_disk_cache_shared_between_instances(self, client, tmp_path):
+        EmbeddingService(
+            MODEL_ID, bedrock_client=client, cache_dir=str(tmp_path)
+        ).embed(["invoice"])
+        other = EmbeddingService(
+            MODEL_ID, bedrock_client=client, cache_dir=str(tmp_path)
+        )
+
+        vector = other.embed(["invoice"])[0]
+
+        assert client.calls == ["invoice"]
+        assert other.disk_hits == 1
+        assert vector[ord("i") - ord("a")] == 2.0
+
+    def test_cache_key_depends_on_model(self):
+        assert make_cache_key("model-a", "text") != make_cache_key("model-b", "text")
+        assert make_cache_key("model-a", "a  b") == make_cache_key("model-a", "a b")
+
+    def test_empty_embedding_is_not_cached(self, service):
+        with patch.object(
+            service.bedrock_client, "generate_embedding", return_value=[]
+        ) as generate:
+            assert service.embed(["text"]) == [None]
+            assert service.embed(["text"]) == [None]
+
+        assert generate.call_count == 2
+
+    def test_bedrock_errors_propagate(self, service):
+        with patch.object(
+            service.bedrock_client,
+            "generate_embedding",
+            side_effect=RuntimeError("boom"),
+        ):
+            with pytest.raises(RuntimeError):
+                service.embed(["a", "b"])
+
+    @mock_aws
+    def test_s3_cache_shared_across_environments(self, client, tmp_path):
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="cache")
+        first = EmbeddingService(
+            MODEL_ID,
+            bedrock_client=client,
+            cache_dir=str(tmp_path / "first"),
+            s3_bucket="cache",
+        )
+        first.embed(["invoice"])
+
+        second = EmbeddingService(
+            MODEL_ID,
+            bedrock_client=client,
+            cache_dir=str(tmp_path / "second"),
+            s3_bucket="cache",
+        )
+        second.embed(["invoice"])
+        third = EmbeddingService(
+            MODEL_ID,
+            bedrock_client=client,
+            cache_dir=str(tmp_path / "second"),
+            s3_bucket="cache",
+        )
+        third.embed(["invoice"])
+
+        assert client.calls == ["invoice"]
+        assert second.s3_hits == 1
+        # S3 hits are backfilled into the local disk cache
+        assert third.disk_hits == 1
+
+    def test_similarity_matrix(self, service, client):
+        matrix = service.similarity_matrix(["ab", "cd", ""], ["ba", "cd", "ab"])
+
+        np.testing.assert_allclose(
+            matrix, [[1.0, 0.0, 1.0], [0.0, 1.0, 0.0], [0.0, 0.0, 0.0]]
+        )
+        assert sorted(client.calls) == ["ab", "ba", "cd"]
+
+
+@pytest.mark.unit
+class TestCosineSimilarityMatrix:
+    def test_matches_pairwise_computation(self):
+        rng = np.random.default_rng(0)
+        a = rng.normal(size=(4, 8))
+        b = rng.normal(size=(3, 8))
+
+        matrix = cosine_similarity_matrix(a, b)
+
+        for i in range(4):
+            for j in range(3):
+                expected = a[i] @ b[j] / (np.linalg.norm(a[i]) * np.linalg.norm(b[j]))
+                assert matrix[i, j] == pytest.approx(expected)
+
+    def test_zero_vectors_score_zero(self):
+        matrix = cosine_similarity_matrix(np.zeros((1, 3)), np.ones((2, 3)))
+
+        np.testing.assert_array_equal(matrix, np.zeros((1, 2)))
+
+
+@pytest.mark.unit
+class TestSemanticComparison:
+    def test_compare_semantic_uses_cache(self, shared_service, client):
+        matched, score = compare_semantic("listen", "silent", model_id=MODEL_ID)
+        compare_semantic("listen", "silent", model_id=MODEL_ID)
+
+        assert matched and score == pytest.approx(1.0)
+        assert sorted(client.calls) == ["listen", "silent"]
+
+    def test_compare_semantic_falls_back_to_fuzzy(self, shared_service):
+        with patch.object(
+            shared_service.bedrock_client,
+            "generate_embedding",
+            side_effect=RuntimeError("boom"),
+        ):
+            matched, score = compare_semantic("Acme", "Acme", model_id=MODEL_ID)
+
+        assert matched and score == 1.0
+
+    def test_hungarian_embeds_each_value_once(self, shared_service, client):
+        expected = ["ab", "cd", "ef", "ab"]
+        actual = ["fe", "dc", "ba", "ba"]
+
+        tp, fp, score = compare_hungarian(
+            expected, actual, SemanticComparator(model_id=MODEL_ID)
+        )
+
+        assert (tp, fp) == (4, 0)
+        assert score == pytest.approx(1.0)
+        assert sorted(client.calls) == ["ab", "ba", "cd", "dc", "ef", "fe"]
+
+    def test_cached_stickler_comparator(self, shared_service, client):
+        pytest.importorskip("stickler")
+        from idp_common.evaluation.semantic_comparator import (
+            CachedSemanticComparator,
+        )
+
+        comparator = CachedSemanticComparator(model_id=MODEL_ID)
+
+        assert comparator.compare("listen", "silent") == pytest.approx(1.0)
+        assert comparator.compare("silent", "listen") == pytest.approx(1.0)
+        assert sorted(client.calls) == ["listen", "silent"]
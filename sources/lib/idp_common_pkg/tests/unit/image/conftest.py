@@ -0,0 +1,63 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Pytest configuration for the image module tests.
+
+The tests in this directory run against the real PIL, which they reach through
+idp_common.image (e.g. image_module.Image) while the real_pil fixture is active.
+"""
+
+import sys
+from unittest.mock import MagicMock
+
+import idp_common.image as image_module
+import pytest
+
+
+def _load_real_pil():
+    """
+    Return the real PIL modules.
+
+    Other test modules replace sys.modules["PIL"] with MagicMock at import time.
+    In that case import a separate real copy and put the mocks back afterwards.
+    """
+
+    def pil_modules():
+        return {
+            name: module
+            for name, module in sys.modules.items()
+            if name == "PIL" or name.startswith("PIL.")
+        }
+
+    if not any(isinstance(module, MagicMock) for module in pil_modules().values()):
+        from PIL import Image, ImageChops, ImageFilter  # noqa: F401
+
+        Image.init()
+        return pil_modules()
+
+    saved = pil_modules()
+    for name in saved:
+        del sys.modules[name]
+    try:
+        from PIL import Image, ImageChops, ImageFilter  # noqa: F401
+
+        Image.init()
+        return pil_modules()
+    finally:
+        for name in pil_modules():
+            del sys.modules[name]
+        sys.modules.update(saved)
+
+
+_PIL = _load_real_pil()
+
+
+@pytest.fixture(autouse=True)
+def real_pil(monkeypatch):
+    """Run each test against the real PIL, restoring any mocks afterwards."""
+    for name, module in _PIL.items():
+        monkeypatch.setitem(sys.modules, name, module)
+    monkeypatch.setattr(image_module, "Image", _PIL["PIL.Image"])
+    monkeypatch.setattr(image_module, "ImageFilter", _PIL["PIL.ImageFilter"])
+    monkeypatch.setattr(image_module, "ImageChops", _PIL["PIL.ImageChops"])
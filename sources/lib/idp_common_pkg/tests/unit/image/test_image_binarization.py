@@ -0,0 +1,104 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Unit tests for adaptive binarization in the image module.
+"""
+
+import io
+import random
+
+import idp_common.image as image_module
+import pytest
+
+
+def _reference_binarization(image_data: bytes, block_size: int, c: int) -> bytes:
+    """Original per-pixel implementation, kept as the byte-for-byte reference."""
+    pil_image = image_module.Image.open(io.BytesIO(image_data))
+    if pil_image.mode != "L":
+        pil_image = pil_image.convert("L")
+    blurred = pil_image.filter(image_module.ImageFilter.BoxBlur(block_size // 2))
+    binary_pixels = [
+        255 if orig > blur - c else 0
+        for orig, blur in zip(pil_image.getdata(), blurred.getdata())
+    ]
+    binary_image = image_module.Image.new("L", pil_image.size)
+    binary_image.putdata(binary_pixels)
+    output = io.BytesIO()
+    binary_image.save(output, format="JPEG")
+    return output.getvalue()
+
+
+def _synthetic_page(width: int, height: int, mode: str = "L", seed: int = 0) -> bytes:
+    """Build a noisy page with a lighting gradient and some dark 'text' strokes."""
+    rng = random.Random(seed)
+    image = image_module.Image.new("L", (width, height))
+    pixels = [
+        min(
+            255,
+            max(0, 150 + (x * 80) // width - (y * 40) // height + rng.randint(-25, 25)),
+        )
+        for y in range(height)
+        for x in range(width)
+    ]
+    image.putdata(pixels)
+    for _ in range(20):
+        x, y = rng.randrange(width), rng.randrange(height)
+        image.paste(rng.randint(0, 60), (x, y, min(width, x + 12), min(height, y + 3)))
+    output = io.BytesIO()
+    image.convert(mode).save(output, format="PNG")
+    return output.getvalue()
+
+
+@pytest.mark.unit
+class TestAdaptiveBinarization:
+    """Tests for apply_adaptive_binarization."""
+
+    @pytest.mark.parametrize(
+        "block_size,c",
+        [(15, 10), (3, 10), (31, 2), (15, 1), (15, 0), (11, -7), (2, 300), (9, -300)],
+    )
+    def test_matches_reference_implementation(self, block_size, c):
+        """Output is byte-identical to the original per-pixel implementation."""
+        image_data = _synthetic_page(157, 113, seed=block_size)
+
+        result = image_module.apply_adaptive_binarization(
+            image_data, block_size=block_size, c=c
+        )
+
+        assert result == _reference_binarization(image_data, block_size, c)
+
+    def test_default_parameters(self):
+        """Defaults correspond to block_size=15 and C=10."""
+        image_data = _synthetic_page(120, 90, mode="RGB")
+
+        assert image_module.apply_adaptive_binarization(
+            image_data
+        ) == _reference_binarization(image_data, 15, 10)
+
+    def test_output_is_binary_jpeg_grayscale(self):
+        """Result is a grayscale JPEG with the original dimensions."""
+        image_data = _synthetic_page(64, 48, mode="RGB")
+
+        result = image_module.Image.open(
+            io.BytesIO(image_module.apply_adaptive_binarization(image_data))
+        )
+
+        assert result.format == "JPEG"
+        assert result.mode == "L"
+        assert result.size == (64, 48)
+
+    def test_invalid_block_size_returns_original(self):
+        """Invalid parameters fall back to the original image."""
+        image_data = _synthetic_page(32, 32)
+
+        assert (
+            image_module.apply_adaptive_binarization(image_data, block_size=0)
+            == image_data
+        )
+
+    def test_invalid_image_returns_original(self):
+        """Undecodable input falls back to the original bytes."""
+        assert (
+            image_module.apply_adaptive_binarization(b"not an image") == b"not an image"
+        )
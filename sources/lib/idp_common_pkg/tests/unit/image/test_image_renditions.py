@@ -0,0 +1,131 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Unit tests for precomputed page image renditions.
+"""
+
+import io
+from unittest.mock import patch
+
+import idp_common.image as image_module
+import pytest
+from idp_common.models import Document, Page
+
+
+def _page_image(width: int, height: int, image_format: str = "JPEG") -> bytes:
+    image = image_module.Image.new("RGB", (width, height))
+    image.putdata(
+        [
+            ((x * 7) % 256, (y * 5) % 256, (x + y) % 256)
+            for y in range(height)
+            for x in range(width)
+        ]
+    )
+    output = io.BytesIO()
+    image.save(output, format=image_format)
+    return output.getvalue()
+
+
+@pytest.mark.unit
+class TestImageRenditions:
+    """Tests for rendition_label, create_renditions and prepare_page_image."""
+
+    def test_rendition_label(self):
+        """Labels are derived from the normalized target size."""
+        assert image_module.rendition_label(951, 1268) == "951x1268"
+        assert image_module.rendition_label("951", "1268") == "951x1268"
+        assert image_module.rendition_label(None, 1268) == "autox1268"
+        assert image_module.rendition_label(951, "") == "951xauto"
+        assert image_module.rendition_label(None, None) is None
+        assert image_module.rendition_label("", " ") is None
+        assert image_module.rendition_label("wide", 100) is None
+
+    @pytest.mark.parametrize("image_format", ["JPEG", "PNG"])
+    def test_renditions_match_resize_image(self, image_format):
+        """Each rendition is byte-identical to resizing the image on demand."""
+        image_data = _page_image(200, 260, image_format)
+        sizes = [(100, 130), (None, 52), (150, None)]
+
+        renditions = image_module.create_renditions(image_data, sizes)
+
+        assert set(renditions) == {"100x130", "autox52", "150xauto"}
+        for width, height in sizes:
+            label = image_module.rendition_label(width, height)
+            assert renditions[label] == image_module.resize_image(
+                image_data, width, height
+            )
+
+    def test_renditions_skip_fitting_and_duplicate_sizes(self):
+        """Sizes the image already fits map to None; repeated sizes are created once."""
+        image_data = _page_image(80, 100)
+
+        with patch.object(
+            image_module,
+            "_encode_resized_image",
+            wraps=image_module._encode_resized_image,
+        ) as mock_encode:
+            renditions = image_module.create_renditions(
+                image_data, [(40, 50), (40, 50), (800, 1000), (None, None)]
+            )
+
+        assert set(renditions) == {"40x50", "800x1000"}
+        assert renditions["800x1000"] is None
+        assert mock_encode.call_count == 1
+
+    def test_prepare_page_image_uses_rendition(self):
+        """A matching rendition is returned as stored, without resizing."""
+        renditions = {"951x1268": "s3://bucket/doc/pages/1/image_951x1268.jpg"}
+
+        with (
+            patch.object(
+                image_module, "get_binary_content", return_value=b"rendition"
+            ) as mock_get,
+            patch.object(image_module, "prepare_image") as mock_prepare,
+        ):
+            result = image_module.prepare_page_image(
+                "s3://bucket/doc/pages/1/image.jpg", 951, 1268, renditions
+            )
+
+        assert result == b"rendition"
+        mock_get.assert_called_once_with(renditions["951x1268"])
+        mock_prepare.assert_not_called()
+
+    def test_prepare_page_image_falls_back_to_prepare_image(self):
+        """Pages without a matching rendition are resized on demand."""
+        renditions = {"951x1268": "s3://bucket/doc/pages/1/image_951x1268.jpg"}
+
+        with patch.object(
+            image_module, "prepare_image", return_value=b"resized"
+        ) as mock_prepare:
+            assert (
+                image_module.prepare_page_image(
+                    "s3://bucket/doc/pages/1/image.jpg", 500, 500, renditions
+                )
+                == b"resized"
+            )
+            assert (
+                image_module.prepare_page_image("s3://bucket/doc/pages/1/image.jpg")
+                == b"resized"
+            )
+
+        assert mock_prepare.call_args_list[0].args == (
+            "s3://bucket/doc/pages/1/image.jpg",
+            500,
+            500,
+        )
+
+    def test_document_round_trip_keeps_renditions(self):
+        """Page renditions survive Document serialization."""
+        document = Document(id="doc")
+        document.pages["1"] = Page(
+            page_id="1",
+            image_uri="s3://bucket/doc/pages/1/image.jpg",
+            image_renditions={"951x1268": "s3://bucket/doc/pages/1/image_951x1268.jpg"},
+        )
+
+        restored = Document.from_dict(document.to_dict())
+
+        assert restored.pages["1"].image_renditions == {
+            "951x1268": "s3://bucket/doc/pages/1/image_951x1268.jpg"
+        }
@@ -0,0 +1,241 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Unit tests for the buffered metrics emitter.
+"""
+
+import io
+import json
+import threading
+from unittest.mock import MagicMock, patch
+
+import idp_common.metrics as metrics
+import pytest
+from idp_common.metrics.buffer import MetricsBuffer
+
+
+def _buffer(mode="batch", client=None, **kwargs):
+    client = client or MagicMock()
+    kwargs.setdefault("flush_interval", 3600)
+    return MetricsBuffer(mode=mode, client_factory=lambda: client, **kwargs), client
+
+
+@pytest.mark.unit
+class TestMetricsBufferBatchMode:
+    """Tests for batched PutMetricData publishing."""
+
+    def test_add_does_not_call_cloudwatch(self):
+        """Recording a data point never makes a network call."""
+        buffer, client = _buffer()
+
+        buffer.add("NS", "Requests", 1)
+
+        client.put_metric_data.assert_not_called()
+        assert buffer.pending_count() == 1
+
+    def test_flush_aggregates_values_per_series(self):
+        """Repeated values are sent once with a count."""
+        buffer, client = _buffer()
+        for _ in range(5):
+            buffer.add("NS", "Requests", 1)
+        buffer.add("NS", "Latency", 120, "Milliseconds")
+        buffer.add("NS", "Latency", 80, "Milliseconds")
+
+        assert buffer.flush() == 2
+
+        client.put_metric_data.assert_called_once()
+        call = client.put_metric_data.call_args.kwargs
+        assert call["Namespace"] == "NS"
+        entries = {entry["MetricName"]: entry for entry in call["MetricData"]}
+        assert entries["Requests"]["Values"] == [1.0]
+        assert entries["Requests"]["Counts"] == [5.0]
+        assert sorted(entries["Latency"]["Values"]) == [80.0, 120.0]
+        assert entries["Latency"]["Unit"] == "Milliseconds"
+        assert buffer.pending_count() == 0
+
+    def test_flush_separates_dimensions_and_namespaces(self):
+        """Different dimension sets and namespaces are kept apart."""
+        buffer, client = _buffer()
+        buffer.add("NS1", "Requests", 1, dimensions=[{"Name": "Model", "Value": "a"}])
+        buffer.add("NS1", "Requests", 1, dimensions=[{"Name": "Model", "Value": "b"}])
+        buffer.add("NS2", "Requests", 1)
+
+        buffer.flush()
+
+        calls = {
+            c.kwargs["Namespace"]: c.kwargs["MetricData"]
+            for c in client.put_metric_data.call_args_list
+        }
+        assert len(calls["NS1"]) == 2
+        assert {e["Dimensions"][0]["Value"] for e in calls["NS1"]} == {"a", "b"}
+        assert calls["NS2"][0]["Dimensions"] == []
+
+    def test_flush_chunks_to_api_limits(self):
+        """Large batches are split into 1000-entry calls and 150-value entries."""
+        buffer, client = _buffer()
+        for i in range(1200):
+            buffer.add("NS", f"Metric{i}", 1)
+        for value in range(200):
+            buffer.add("NS", "Latency", value, "Milliseconds")
+
+        buffer.flush()
+
+        sizes = [
+            len(c.kwargs["MetricData"]) for c in client.put_metric_data.call_args_list
+        ]
+        assert sizes == [1000, 202]
+        latency_entries = [
+            entry
+            for c in client.put_metric_data.call_args_list
+            for entry in c.kwargs["MetricData"]
+            if entry["MetricName"] == "Latency"
+        ]
+        assert [len(e["Values"]) for e in latency_entries] == [150, 50]
+
+    def test_publish_errors_are_logged_not_raised(self):
+        """CloudWatch failures do not propagate to callers."""
+        buffer, client = _buffer()
+        client.put_metric_data.side_effect = Exception("boom")
+        buffer.add("NS", "Requests", 1)
+
+        assert buffer.flush() == 1
+
+    def test_size_trigger_wakes_background_flusher(self):
+        """Reaching max_batch_size publishes from the background thread."""
+        published = threading.Event()
+        client = MagicMock()
+        client.put_metric_data.side_effect = lambda **kwargs: published.set()
+        buffer, _ = _buffer(client=client, max_batch_size=3)
+
+        for i in range(3):
+            buffer.add("NS", f"Metric{i}", 1)
+
+        assert published.wait(5)
+        assert buffer.pending_count() == 0
+
+    def test_invalid_mode(self):
+        """Unknown modes are rejected."""
+        with pytest.raises(ValueError):
+            MetricsBuffer(mode="carrier-pigeon")
+
+
+@pytest.mark.unit
+class TestMetricsBufferOtherModes:
+    """Tests for EMF and sync publishing."""
+
+    def test_emf_documents(self):
+        """EMF mode writes one document per namespace/dimension set."""
+        stream = io.StringIO()
+        client = MagicMock()
+        buffer = MetricsBuffer(
+            mode="emf",
+            client_factory=lambda: client,
+            stream=stream,
+            flush_interval=3600,
+        )
+        buffer.add("NS", "Requests", 1, dimensions=[{"Name": "Model", "Value": "m"}])
+        buffer.add("NS", "Requests", 1, dimensions=[{"Name": "Model", "Value": "m"}])
+        buffer.add(
+            "NS", "Latency", 42, "Milliseconds", [{"Name": "Model", "Value": "m"}]
+        )
+
+        buffer.flush()
+
+        client.put_metric_data.assert_not_called()
+        lines = stream.getvalue().strip().splitlines()
+        assert len(lines) == 1
+        document = json.loads(lines[0])
+        directive = document["_aws"]["CloudWatchMetrics"][0]
+        assert directive["Namespace"] == "NS"
+        assert directive["Dimensions"] == [["Model"]]
+        assert {m["Name"]: m["Unit"] for m in directive["Metrics"]} == {
+            "Requests": "Count",
+            "Latency": "Milliseconds",
+        }
+        assert document["Model"] == "m"
+        assert document["Requests"] == [1.0, 1.0]
+        assert document["Latency"] == 42.0
+
+    def test_emf_splits_large_value_lists(self):
+        """EMF documents never hold more than 100 values per metric."""
+        stream = io.StringIO()
+        buffer = MetricsBuffer(mode="emf", stream=stream, flush_interval=3600)
+        for _ in range(250):
+            buffer.add("NS", "Requests", 1)
+
+        buffer.flush()
+
+        documents = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert [len(d["Requests"]) for d in documents] == [100, 100, 50]
+
+    def test_sync_mode_publishes_immediately(self):
+        """Sync mode keeps the legacy one-call-per-point behaviour."""
+        buffer, client = _buffer(mode="sync")
+
+        buffer.add("NS", "Requests", 1)
+
+        client.put_metric_data.assert_called_once()
+        assert buffer.pending_count() == 0
+
+
+@pytest.mark.unit
+class TestMetricsModuleApi:
+    """Tests for the module-level put_metric/flush API."""
+
+    @pytest.fixture(autouse=True)
+    def reset_buffer(self, monkeypatch):
+        monkeypatch.setattr(metrics, "_buffer", None)
+        monkeypatch.setenv("METRIC_NAMESPACE", "TestNS")
+        yield
+        monkeypatch.setattr(metrics, "_buffer", None)
+
+    def test_put_metric_buffers_until_flush(self):
+        """put_metric is non-blocking and flush_metrics publishes."""
+        client = MagicMock()
+        with patch.object(metrics, "get_cloudwatch_client", return_value=client):
+            metrics.put_metric("Documents", 1)
+            metrics.put_metric("Documents", 1)
+            client.put_metric_data.assert_not_called()
+
+            assert metrics.flush_metrics() == 1
+
+        call = client.put_metric_data.call_args.kwargs
+        assert call["Namespace"] == "TestNS"
+        assert call["MetricData"][0]["Counts"] == [2.0]
+
+    def test_flush_metrics_on_return_decorator(self):
+        """The handler decorator flushes even when the handler raises."""
+        client = MagicMock()
+
+        @metrics.flush_metrics_on_return
+        def handler(event, context):
+            metrics.put_metric("Documents", 1)
+            raise RuntimeError("failed")
+
+        with patch.object(metrics, "get_cloudwatch_client", return_value=client):
+            with pytest.raises(RuntimeError):
+                handler({}, None)
+
+        client.put_metric_data.assert_called_once()
+
+    def test_client_performance_metrics(self):
+        """Performance helper records latency and failure metrics."""
+        client = MagicMock()
+        with patch.object(metrics, "get_cloudwatch_client", return_value=client):
+            metrics.create_client_performance_metrics(
+                "S3Read", 12.5, is_success=False, error_type="NoSuchKey"
+            )
+            metrics.flush_metrics()
+
+        names = {
+            entry["MetricName"]
+            for entry in client.put_metric_data.call_args.kwargs["MetricData"]
+        }
+        assert names == {"S3ReadLatency", "S3ReadFailure", "S3ReadError.NoSuchKey"}
+
+    def test_mode_from_environment(self, monkeypatch):
+        """METRICS_MODE selects the publishing mode."""
+        monkeypatch.setenv("METRICS_MODE", "emf")
+
+        assert metrics.get_metrics_buffer().mode == "emf"
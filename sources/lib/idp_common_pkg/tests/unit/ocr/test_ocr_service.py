@@ -559,6 +559,159 @@ class TestOcrService:
         # Verify S3 writes (empty content)
         assert mock_write_content.call_count == 4  # image, raw, confidence, parsed
 
+    @patch("boto3.client")
+    @patch("idp_common.ocr.service.fitz.open")
+    def test_process_document_uploads_page_artifacts_in_background(
+        self, mock_fitz_open, mock_boto_client, mock_document, mock_pdf_content
+    ):
+        """Test that page artifacts go through the artifact writer and are flushed."""
+        mock_s3_client = MagicMock()
+        mock_s3_client.get_object.return_value = {"Body": BytesIO(mock_pdf_content)}
+        mock_boto_client.return_value = mock_s3_client
+
+        mock_pixmap = MagicMock()
+        mock_pixmap.tobytes.return_value = b"image_data"
+        mock_pdf_doc = MagicMock()
+        mock_pdf_doc.__len__.return_value = 3
+        mock_pdf_doc.is_pdf = True
+        mock_pdf_doc.load_page.return_value.get_pixmap.return_value = mock_pixmap
+        mock_fitz_open.return_value = mock_pdf_doc
+
+        service = OcrService(backend="none")
+        result = service.process_document(mock_document)
+
+        assert result.status != Status.FAILED
+        assert len(result.pages) == 3
+        # Four artifacts per page, written with the service's pooled S3 client
+        assert mock_s3_client.put_object.call_count == 12
+        assert service._artifact_writer is None
+
+    @patch("boto3.client")
+    @patch("idp_common.ocr.service.fitz.open")
+    def test_process_document_bounds_pages_in_flight(
+        self, mock_fitz_open, mock_boto_client, mock_document, mock_pdf_content
+    ):
+        """Test that rendering waits for OCR workers once the in-flight limit is hit."""
+        import threading
+        import time
+
+        mock_s3_client = MagicMock()
+        mock_s3_client.get_object.return_value = {"Body": BytesIO(mock_pdf_content)}
+        mock_boto_client.return_value = mock_s3_client
+
+        mock_pdf_doc = MagicMock()
+        mock_pdf_doc.__len__.return_value = 20
+        mock_pdf_doc.is_pdf = True
+        mock_fitz_open.return_value = mock_pdf_doc
+
+        lock = threading.Lock()
+        in_flight = {"current": 0, "max": 0}
+
+        def render(pdf_document, page_index):
+            with lock:
+                in_flight["current"] += 1
+                in_flight["max"] = max(in_flight["max"], in_flight["current"])
+            return b"page-%d" % page_index
+
+        def process(page_index, pdf_document, bucket, prefix, original, page_image):
+            assert page_image == b"page-%d" % page_index
+            time.sleep(0.005)
+            with lock:
+                in_flight["current"] -= 1
+            uri = f"s3://{bucket}/{page_index}"
+            return (
+                {
+                    "raw_text_uri": uri,
+                    "parsed_text_uri": uri,
+                    "text_confidence_uri": uri,
+                    "image_uri": uri,
+                },
+                {"OCR/textract/detect_document_text": {"pages": 1}},
+            )
+
+        service = OcrService(max_workers=4)
+        with (
+            patch.object(service, "_max_pages_in_flight", return_value=3),
+            patch.object(service, "_render_page", side_effect=render),
+            patch.object(service, "_process_single_page", side_effect=process),
+        ):
+            result = service.process_document(mock_document)
+
+        assert result.status != Status.FAILED
+        assert list(result.pages) == [str(i) for i in range(1, 21)]
+        assert result.metering["OCR/textract/detect_document_text"]["pages"] == 20
+        assert in_flight["max"] <= 3
+        mock_pdf_doc.close.assert_called_once()
+
+    @patch("boto3.client")
+    def test_process_document_removes_spool_file(
+        self, mock_boto_client, mock_document, mock_pdf_content, tmp_path
+    ):
+        """Test that the input is spooled to disk and the spool file is removed."""
+        mock_s3_client = MagicMock()
+        mock_s3_client.get_object.return_value = {"Body": BytesIO(mock_pdf_content)}
+        mock_boto_client.return_value = mock_s3_client
+
+        spooled = {}
+
+        def fake_open(path, filetype=None):
+            with open(path, "rb") as f:
+                spooled["content"] = f.read()
+            raise Exception("PDF error")
+
+        service = OcrService()
+        with (
+            patch.dict("os.environ", {"OCR_SPOOL_DIR": str(tmp_path)}),
+            patch("idp_common.ocr.service.fitz.open", side_effect=fake_open),
+        ):
+            result = service.process_document(mock_document)
+
+        assert spooled["content"] == mock_pdf_content
+        assert result.status == Status.FAILED
+        assert list(tmp_path.iterdir()) == []
+
+    def test_max_pages_in_flight_uses_lambda_memory(self):
+        """Test that the in-flight page limit follows the Lambda memory size."""
+        with patch("boto3.client"):
+            service = OcrService(
+                max_workers=20, config={"ocr": {"image": {"dpi": 150}}}
+            )
+        page_mb = service._estimated_page_memory_mb()
+
+        with patch.dict("os.environ", {}, clear=True):
+            assert service._max_pages_in_flight() == 40
+        with patch.dict("os.environ", {"AWS_LAMBDA_FUNCTION_MEMORY_SIZE": "512"}):
+            assert service._max_pages_in_flight() == int(256 // page_mb)
+        with patch.dict("os.environ", {"AWS_LAMBDA_FUNCTION_MEMORY_SIZE": "128"}):
+            assert service._max_pages_in_flight() >= 1
+        with patch.dict("os.environ", {"OCR_MAX_PAGES_IN_FLIGHT": "5"}):
+            assert service._max_pages_in_flight() == 5
+
+    @patch("boto3.client")
+    @patch("idp_common.ocr.service.fitz.open")
+    def test_process_document_fails_on_artifact_upload_error(
+        self, mock_fitz_open, mock_boto_client, mock_document, mock_pdf_content
+    ):
+        """Test that failed background uploads fail the document at the flush barrier."""
+        mock_s3_client = MagicMock()
+        mock_s3_client.get_object.return_value = {"Body": BytesIO(mock_pdf_content)}
+        mock_s3_client.put_object.side_effect = Exception("SlowDown")
+        mock_boto_client.return_value = mock_s3_client
+
+        mock_pixmap = MagicMock()
+        mock_pixmap.tobytes.return_value = b"image_data"
+        mock_pdf_doc = MagicMock()
+        mock_pdf_doc.__len__.return_value = 1
+        mock_pdf_doc.is_pdf = True
+        mock_pdf_doc.load_page.return_value.get_pixmap.return_value = mock_pixmap
+        mock_fitz_open.return_value = mock_pdf_doc
+
+        service = OcrService(backend="none")
+        result = service.process_document(mock_document)
+
+        assert result.status == Status.FAILED
+        assert any("Failed to write 4 S3 artifact(s)" in e for e in result.errors)
+
     @patch("fitz.Page")
     def test_extract_page_image_pdf(self, mock_page):
         """Test page image extraction from PDF."""
@@ -856,6 +1009,79 @@ class TestOcrService:
                 Document={"Bytes": b"preprocessed_image_data"}
             )
 
+    @patch("boto3.client")
+    def test_binarization_params_from_config(self, mock_boto_client):
+        """Test adaptive binarization parameters are read from the OCR image config."""
+        config = {
+            "ocr": {
+                "image": {
+                    "preprocessing": True,
+                    "binarization_block_size": "21",
+                    "binarization_c": 5,
+                }
+            }
+        }
+        service = OcrService(config=config)
+
+        assert service.preprocessing_config == {
+            "enabled": True,
+            "block_size": 21,
+            "c": 5,
+        }
+        assert service._binarization_params() == {"block_size": 21, "c": 5}
+
+        # Without explicit values the image module defaults apply
+        service = OcrService(config={"ocr": {"image": {"preprocessing": True}}})
+        assert service._binarization_params() == {}
+
+    @patch("boto3.client")
+    @patch("idp_common.s3.write_content")
+    @patch("idp_common.image.create_renditions")
+    def test_write_renditions_for_stage_image_sizes(
+        self, mock_create_renditions, mock_write_content, mock_boto_client
+    ):
+        """Test that renditions are stored for the downstream stage image sizes."""
+        config = {
+            "classification": {"image": {"target_width": 951, "target_height": 1268}},
+            "extraction": {"image": {"target_width": 951, "target_height": 1268}},
+            "assessment": {"image": {"target_width": "", "target_height": 500}},
+        }
+        service = OcrService(config=config, backend="none")
+        assert service.rendition_sizes == [(951, 1268), (951, 1268), (None, 500)]
+
+        mock_create_renditions.return_value = {
+            "951x1268": None,
+            "autox500": b"small_image",
+        }
+        renditions = service._write_renditions(
+            b"page_image", "output-bucket", "doc/pages/1/image.jpg", "image/jpeg"
+        )
+
+        mock_create_renditions.assert_called_once_with(
+            b"page_image", service.rendition_sizes
+        )
+        # The page image already fits 951x1268, so only one object is written
+        mock_write_content.assert_called_once_with(
+            b"small_image",
+            "output-bucket",
+            "doc/pages/1/image_autox500.jpg",
+            content_type="image/jpeg",
+        )
+        assert renditions == {
+            "951x1268": "s3://output-bucket/doc/pages/1/image.jpg",
+            "autox500": "s3://output-bucket/doc/pages/1/image_autox500.jpg",
+        }
+
+        # Without stage image sizes no renditions are created
+        mock_create_renditions.reset_mock()
+        assert (
+            OcrService(config={}, backend="none")._write_renditions(
+                b"page_image", "output-bucket", "doc/pages/1/image.jpg", "image/jpeg"
+            )
+            == {}
+        )
+        mock_create_renditions.assert_not_called()
+
     def test_process_single_page_dispatch_textract(self):
         """Test _process_single_page dispatches to Textract method."""
         with patch("boto3.client"):
@@ -0,0 +1,235 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Unit tests for buffered reporting writes (record sinks and ReportingBatchWriter).
+"""
+
+import datetime
+import os
+from unittest.mock import MagicMock, patch
+
+import boto3
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from idp_common.reporting import (
+    LocalSpoolRecordSink,
+    ReportingBatchWriter,
+    SaveReportingData,
+    SqsRecordSink,
+    drain_spool,
+)
+from idp_common.reporting.buffered_writer import encode_records
+from moto import mock_aws
+
+BUCKET = "reporting-bucket"
+DATABASE = "reporting-db"
+METERING_PARTITION = "metering/date=2025-01-31/"
+SECTIONS_PARTITION = "document_sections/invoice/date=2025-01-31/"
+
+METERING_SCHEMA = pa.schema(
+    [
+        ("document_id", pa.string()),
+        ("service_api", pa.string()),
+        ("value", pa.float64()),
+        ("timestamp", pa.timestamp("ms")),
+    ]
+)
+
+
+def _metering_records(document_id, rows=2):
+    return [
+        {
+            "document_id": document_id,
+            "service_api": f"api-{i}",
+            "value": float(i),
+            "timestamp": datetime.datetime(2025, 1, 31, 12, 0, i),
+        }
+        for i in range(rows)
+    ]
+
+
+def _metering_message(document_id, rows=2):
+    return encode_records(
+        f"{METERING_PARTITION}{document_id}_results.parquet",
+        _metering_records(document_id, rows),
+        METERING_SCHEMA,
+    )
+
+
+def _section_message(document_id, fields):
+    records = [{"document_id": document_id, "section_id": "1", **fields}]
+    schema = pa.schema([(name, pa.string()) for name in records[0]])
+    return encode_records(
+        f"{SECTIONS_PARTITION}{document_id}_section_1.parquet",
+        records,
+        schema,
+        section_type="invoice",
+    )
+
+
+def _keys(s3, prefix=""):
+    response = s3.list_objects_v2(Bucket=BUCKET, Prefix=prefix)
+    return sorted(obj["Key"] for obj in response.get("Contents", []))
+
+
+def _read(s3, key):
+    body = s3.get_object(Bucket=BUCKET, Key=key)["Body"].read()
+    return pq.read_table(pa.BufferReader(body))
+
+
+@pytest.mark.unit
+class TestBufferedWriter:
+    """Test cases for buffered reporting writes."""
+
+    @pytest.fixture
+    def aws(self):
+        with (
+            mock_aws(),
+            patch.dict(os.environ, {"AWS_DEFAULT_REGION": "us-east-1"}),
+        ):
+            s3 = boto3.client("s3", region_name="us-east-1")
+            s3.create_bucket(Bucket=BUCKET)
+            yield s3
+
+    @pytest.fixture
+    def glue(self):
+        """Glue client mock that keeps created and updated tables."""
+        tables = {}
+        glue = MagicMock()
+
+        def get_table(DatabaseName, Name):
+            if Name not in tables:
+                raise Exception("EntityNotFoundException: table not found")
+            return {"Table": tables[Name]}
+
+        def put_table(DatabaseName, TableInput):
+            tables[TableInput["Name"]] = TableInput
+
+        glue.get_table.side_effect = get_table
+        glue.create_table.side_effect = put_table
+        glue.update_table.side_effect = put_table
+        glue.tables = tables
+        return glue
+
+    @pytest.fixture
+    def spool(self, tmp_path):
+        return LocalSpoolRecordSink(str(tmp_path / "spool"))
+
+    def test_spooled_documents_are_written_as_one_sorted_file(self, aws, spool):
+        """Records of many documents end up in one file per partition."""
+        reporter = SaveReportingData(BUCKET, record_sink=spool)
+        for document_id in ["doc-c", "doc-a", "doc-b"]:
+            buffered = reporter._save_records_as_parquet(
+                _metering_records(document_id),
+                f"{METERING_PARTITION}{document_id}_results.parquet",
+                METERING_SCHEMA,
+            )
+            assert buffered
+        assert _keys(aws) == []
+
+        result = drain_spool(spool, ReportingBatchWriter(BUCKET), force=True)
+
+        assert _keys(aws) == result.files
+        assert len(result.files) == 1
+        assert result.files[0].startswith(f"{METERING_PARTITION}batch-")
+        table = _read(aws, result.files[0])
+        assert table.schema == METERING_SCHEMA
+        assert (
+            table["document_id"].to_pylist()
+            == ["doc-a"] * 2 + ["doc-b"] * 2 + ["doc-c"] * 2
+        )
+        assert list(spool.messages()) == []
+
+    def test_flushes_by_threshold_without_duplicates(self, aws, spool):
+        """Records below the thresholds stay buffered and are not added twice."""
+        writer = ReportingBatchWriter(BUCKET, max_records=4)
+        for document_id in ["doc-a", "doc-b", "doc-c"]:
+            spool.put(_metering_message(document_id))
+
+        first = drain_spool(spool, writer)
+        assert len(first.files) == 1
+        assert writer.buffered_records == 2
+        assert len(list(spool.messages())) == 1
+
+        # The remaining message is already buffered
+        drain_spool(spool, writer)
+        assert writer.buffered_records == 2
+
+        last = drain_spool(spool, writer, force=True)
+        assert len(last.files) == 1
+        rows = sum(_read(aws, key).num_rows for key in _keys(aws))
+        assert rows == 6
+        assert list(spool.messages()) == []
+
+    def test_glue_table_updated_only_when_columns_change(self, aws, glue):
+        """The Glue table is created once and updated for new columns only."""
+        writer = ReportingBatchWriter(BUCKET, database_name=DATABASE)
+        writer.reporter.glue_client = glue
+
+        writer.add(_section_message("doc-a", {"total": "10"}))
+        writer.add(_section_message("doc-b", {"total": "12"}))
+        writer.flush()
+        assert glue.create_table.call_count == 1
+        calls = glue.get_table.call_count
+
+        writer.add(_section_message("doc-c", {"total": "8"}))
+        writer.flush()
+        assert glue.get_table.call_count == calls
+
+        writer.add(_section_message("doc-d", {"tax": "2"}))
+        writer.flush()
+        assert glue.get_table.call_count == calls + 1
+        assert glue.update_table.call_count == 1
+
+        table = glue.tables["document_sections_invoice"]
+        columns = [column["Name"] for column in table["StorageDescriptor"]["Columns"]]
+        assert columns == ["document_id", "section_id", "total", "tax"]
+        assert len(_keys(aws, SECTIONS_PARTITION)) == 3
+
+    def test_oversized_records_are_written_directly(self, aws):
+        """Records too large for an SQS message bypass the queue."""
+        sqs = boto3.client("sqs", region_name="us-east-1")
+        queue_url = sqs.create_queue(QueueName="reporting-records")["QueueUrl"]
+        reporter = SaveReportingData(
+            BUCKET, record_sink=SqsRecordSink(queue_url, sqs_client=sqs)
+        )
+        large = [
+            {
+                "document_id": "doc-a",
+                "section_id": str(i),
+                "text": os.urandom(512).hex(),
+            }
+            for i in range(400)
+        ]
+        schema = pa.schema([(name, pa.string()) for name in large[0]])
+
+        assert reporter._save_records_as_parquet(
+            _metering_records("doc-b"),
+            f"{METERING_PARTITION}doc-b.parquet",
+            METERING_SCHEMA,
+        )
+        assert not reporter._save_records_as_parquet(
+            large, f"{SECTIONS_PARTITION}doc-a_section_1.parquet", schema
+        )
+
+        assert _keys(aws) == [f"{SECTIONS_PARTITION}doc-a_section_1.parquet"]
+        messages = sqs.receive_message(QueueUrl=queue_url, MaxNumberOfMessages=10)
+        assert len(messages["Messages"]) == 1
+
+    def test_failed_partition_reports_its_messages(self, aws):
+        """Messages of a partition that could not be written are reported as failed."""
+        s3_client = MagicMock()
+        s3_client.put_object.side_effect = [Exception("Access denied"), None]
+        writer = ReportingBatchWriter(BUCKET, s3_client=s3_client)
+        writer.add(_metering_message("doc-a"), message_id="m1")
+        writer.add(_metering_message("doc-b"), message_id="m2")
+        writer.add(_section_message("doc-a", {"total": "10"}), message_id="m3")
+
+        result = writer.flush()
+
+        assert sorted(result.message_ids) == ["m1", "m2", "m3"]
+        assert result.failed_message_ids == ["m1", "m2"]
+        assert len(result.files) == 1
+        assert writer.buffered_records == 0
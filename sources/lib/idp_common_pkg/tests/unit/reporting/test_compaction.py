@@ -0,0 +1,232 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Unit tests for the ParquetCompactor class.
+"""
+
+import io
+import json
+
+import boto3
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from idp_common.reporting import ParquetCompactor
+from moto import mock_aws
+
+BUCKET = "reporting-bucket"
+METERING_PARTITION = "metering/date=2025-01-31/"
+SECTIONS_PARTITION = "document_sections/invoice/date=2025-01-31/"
+
+METERING_SCHEMA = pa.schema(
+    [
+        ("document_id", pa.string()),
+        ("service_api", pa.string()),
+        ("value", pa.float64()),
+    ]
+)
+
+
+def _put_parquet(s3, key, records, schema=None):
+    buffer = io.BytesIO()
+    pq.write_table(pa.Table.from_pylist(records, schema=schema), buffer)
+    s3.put_object(Bucket=BUCKET, Key=key, Body=buffer.getvalue())
+
+
+def _put_metering(s3, document_id, rows=2):
+    _put_parquet(
+        s3,
+        f"{METERING_PARTITION}{document_id}_20250131_120000_000_results.parquet",
+        [
+            {"document_id": document_id, "service_api": f"api-{i}", "value": float(i)}
+            for i in range(rows)
+        ],
+        METERING_SCHEMA,
+    )
+
+
+def _keys(s3, prefix):
+    response = s3.list_objects_v2(Bucket=BUCKET, Prefix=prefix)
+    return sorted(obj["Key"] for obj in response.get("Contents", []))
+
+
+def _read(s3, key):
+    body = s3.get_object(Bucket=BUCKET, Key=key)["Body"].read()
+    return pq.ParquetFile(pa.BufferReader(body))
+
+
+@pytest.mark.unit
+class TestParquetCompactor:
+    """Test cases for reporting partition compaction."""
+
+    @pytest.fixture
+    def s3(self):
+        with mock_aws():
+            client = boto3.client("s3", region_name="us-east-1")
+            client.create_bucket(Bucket=BUCKET)
+            yield client
+
+    @pytest.fixture
+    def compactor(self, s3):
+        return ParquetCompactor(BUCKET, min_file_age_seconds=0, s3_client=s3)
+
+    def test_compacts_partition_sorted_with_statistics(self, s3, compactor):
+        """Small files are merged into one file sorted by document_id."""
+        for document_id in ["doc-c", "doc-a", "doc-d", "doc-b"]:
+            _put_metering(s3, document_id)
+        compactor.row_group_size = 3
+
+        result = compactor.compact_partition(METERING_PARTITION)
+
+        assert result.compacted
+        assert result.source_files == 4
+        assert result.rows == 8
+        assert _keys(s3, METERING_PARTITION) == result.output_files
+        parquet_file = _read(s3, result.output_files[0])
+        table = parquet_file.read()
+        assert table.schema == METERING_SCHEMA
+        assert table["document_id"].to_pylist() == sorted(
+            table["document_id"].to_pylist()
+        )
+        metadata = parquet_file.metadata
+        assert metadata.num_row_groups == 3
+        statistics = metadata.row_group(0).column(0).statistics
+        assert (statistics.min, statistics.max) == ("doc-a", "doc-b")
+
+        state = json.loads(
+            s3.get_object(
+                Bucket=BUCKET, Key=f"_compaction/{METERING_PARTITION}state.json"
+            )["Body"].read()
+        )
+        assert state == {"files": result.output_files, "pending_deletes": []}
+
+    def test_rerun_is_idempotent_and_merges_new_files(self, s3, compactor):
+        """A rerun without new files is a no-op; new files are merged with compacted ones."""
+        _put_metering(s3, "doc-a")
+        _put_metering(s3, "doc-b")
+        first = compactor.compact_partition(METERING_PARTITION)
+
+        rerun = compactor.compact_partition(METERING_PARTITION)
+        assert rerun.skipped_reason == "no new files"
+        assert _keys(s3, METERING_PARTITION) == first.output_files
+
+        _put_metering(s3, "doc-0", rows=1)
+        merged = compactor.compact_partition(METERING_PARTITION)
+
+        assert merged.source_files == 1
+        assert _keys(s3, METERING_PARTITION) == merged.output_files
+        table = _read(s3, merged.output_files[0]).read()
+        assert (
+            table["document_id"].to_pylist()
+            == ["doc-0"] + ["doc-a"] * 2 + ["doc-b"] * 2
+        )
+
+    def test_recovers_interrupted_runs(self, s3, compactor):
+        """Uncommitted compacted files are discarded and committed deletes are finished."""
+        _put_metering(s3, "doc-a")
+        _put_metering(s3, "doc-b")
+        # A run that wrote its output but crashed before committing
+        _put_parquet(
+            s3,
+            f"{METERING_PARTITION}compacted-crashed-0000.parquet",
+            [{"document_id": "doc-a", "service_api": "api-0", "value": 0.0}],
+            METERING_SCHEMA,
+        )
+
+        result = compactor.compact_partition(METERING_PARTITION)
+
+        assert _keys(s3, METERING_PARTITION) == result.output_files
+        assert result.rows == 4
+
+        # A run that committed but crashed before deleting its sources
+        stale = f"{METERING_PARTITION}doc-a_20250131_120000_000_results.parquet"
+        _put_metering(s3, "doc-a")
+        s3.put_object(
+            Bucket=BUCKET,
+            Key=f"_compaction/{METERING_PARTITION}state.json",
+            Body=json.dumps({"files": result.output_files, "pending_deletes": [stale]}),
+        )
+
+        rerun = compactor.compact_partition(METERING_PARTITION)
+
+        assert rerun.skipped_reason == "no new files"
+        assert _keys(s3, METERING_PARTITION) == result.output_files
+
+    def test_document_sections_replace_reprocessed_sections(self, s3, compactor):
+        """Rewritten section files replace their compacted rows; new columns are added."""
+        for document_id in ["doc-a", "doc-b"]:
+            _put_parquet(
+                s3,
+                f"{SECTIONS_PARTITION}{document_id}_section_1.parquet",
+                [{"document_id": document_id, "section_id": "1", "total": "10"}],
+            )
+        compactor.compact_partition(SECTIONS_PARTITION)
+
+        _put_parquet(
+            s3,
+            f"{SECTIONS_PARTITION}doc-a_section_1.parquet",
+            [{"document_id": "doc-a", "section_id": "1", "total": "12", "tax": "2"}],
+        )
+        result = compactor.compact_partition(SECTIONS_PARTITION)
+
+        rows = _read(s3, result.output_files[0]).read().to_pylist()
+        assert rows == [
+            {"document_id": "doc-a", "section_id": "1", "total": "12", "tax": "2"},
+            {"document_id": "doc-b", "section_id": "1", "total": "10", "tax": None},
+        ]
+
+    def test_skips_young_files_and_small_partitions(self, s3):
+        """Recently written files and single files are left in place."""
+        _put_metering(s3, "doc-a")
+        _put_metering(s3, "doc-b")
+
+        young = ParquetCompactor(BUCKET, s3_client=s3).compact_partition(
+            METERING_PARTITION
+        )
+        assert young.skipped_reason == "no new files"
+
+        single = ParquetCompactor(
+            BUCKET, min_file_age_seconds=0, min_files=3, s3_client=s3
+        ).compact_partition(METERING_PARTITION)
+        assert single.skipped_reason == "fewer than 3 files"
+        assert len(_keys(s3, METERING_PARTITION)) == 2
+
+    def test_incompatible_schemas_are_not_compacted(self, s3, compactor):
+        """Files whose column types disagree are left untouched."""
+        _put_metering(s3, "doc-a")
+        _put_parquet(
+            s3,
+            f"{METERING_PARTITION}doc-b_20250131_120000_000_results.parquet",
+            [{"document_id": "doc-b", "service_api": "api", "value": "1.0"}],
+        )
+
+        result = compactor.compact_partition(METERING_PARTITION)
+
+        assert result.skipped_reason.startswith("incompatible schemas")
+        assert len(_keys(s3, METERING_PARTITION)) == 2
+
+    def test_compact_date_splits_large_partitions(self, s3, compactor):
+        """Every table of a date is compacted and large partitions span several files."""
+        for document_id in ["doc-a", "doc-b", "doc-c"]:
+            _put_metering(s3, document_id)
+            _put_parquet(
+                s3,
+                f"{SECTIONS_PARTITION}{document_id}_section_1.parquet",
+                [{"document_id": document_id, "section_id": "1"}],
+            )
+        compactor.max_rows_per_file = 4
+
+        results = {
+            result.partition_prefix: result
+            for result in compactor.compact_date("2025-01-31")
+        }
+
+        assert len(results[METERING_PARTITION].output_files) == 2
+        assert len(results[SECTIONS_PARTITION].output_files) == 1
+        assert (
+            results[
+                "evaluation_metrics/document_metrics/date=2025-01-31/"
+            ].skipped_reason
+            == "no new files"
+        )
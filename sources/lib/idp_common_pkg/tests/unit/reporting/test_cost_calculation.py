@@ -76,6 +76,12 @@ def test_cost_calculation_pricing_lookup():
         "Textract detect document text cost should be greater than 0"
     )
 
+    # Batch inference without its own pricing entry costs half the on-demand price
+    batch_input_cost = reporter._get_unit_cost(
+        "bedrock-batch/us.amazon.nova-lite-v1:0", "inputTokens"
+    )
+    assert batch_input_cost == pytest.approx(nova_input_cost * 0.5)
+
 
 @pytest.mark.unit
 def test_cost_calculation_with_document():
@@ -0,0 +1,173 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Unit tests for the GlueSchemaRegistry class.
+"""
+
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import boto3
+import pyarrow as pa
+import pytest
+from idp_common.models import Document, Section
+from idp_common.reporting import GlueSchemaRegistry, SaveReportingData
+from idp_common.reporting.schema_registry import schema_fingerprint
+from moto import mock_aws
+
+REGISTRY_TABLE = "reporting-schema-registry"
+DATABASE = "reporting_db"
+
+COLUMNS = [
+    {"Name": "document_id", "Type": "string"},
+    {"Name": "section_id", "Type": "string"},
+    {"Name": "total", "Type": "double"},
+]
+
+
+@pytest.mark.unit
+class TestGlueSchemaRegistry:
+    """Test cases for the Glue schema registry."""
+
+    @pytest.fixture
+    def dynamodb(self):
+        with mock_aws():
+            resource = boto3.resource("dynamodb", region_name="us-east-1")
+            resource.create_table(
+                TableName=REGISTRY_TABLE,
+                KeySchema=[{"AttributeName": "TableKey", "KeyType": "HASH"}],
+                AttributeDefinitions=[
+                    {"AttributeName": "TableKey", "AttributeType": "S"}
+                ],
+                BillingMode="PAY_PER_REQUEST",
+            )
+            yield resource
+
+    def test_fingerprint_ignores_column_order(self):
+        """Schemas with the same columns in a different order share a fingerprint."""
+        assert schema_fingerprint(COLUMNS) == schema_fingerprint(COLUMNS[::-1])
+        assert schema_fingerprint(COLUMNS) != schema_fingerprint(
+            COLUMNS[:2] + [{"Name": "total", "Type": "string"}]
+        )
+
+    def test_registered_columns_cover_subsets_only(self):
+        """A schema is registered when the table has all of its columns."""
+        registry = GlueSchemaRegistry()
+        assert not registry.is_registered(DATABASE, "metering", COLUMNS)
+
+        registry.register(DATABASE, "metering", COLUMNS)
+
+        assert registry.is_registered(DATABASE, "metering", COLUMNS[:2])
+        assert not registry.is_registered(
+            DATABASE, "metering", COLUMNS + [{"Name": "tax", "Type": "double"}]
+        )
+        assert not registry.is_registered("other_db", "metering", COLUMNS)
+
+    def test_registry_is_shared_through_dynamodb(self, dynamodb):
+        """Registrations are visible to other registries until they expire."""
+        writer = GlueSchemaRegistry(REGISTRY_TABLE, dynamodb_resource=dynamodb)
+        writer.register(DATABASE, "document_sections_invoice", COLUMNS)
+
+        reader = GlueSchemaRegistry(REGISTRY_TABLE, dynamodb_resource=dynamodb)
+        assert reader.is_registered(DATABASE, "document_sections_invoice", COLUMNS)
+
+        # Registering fewer columns never replaces a registration with more
+        writer.register(DATABASE, "document_sections_invoice", COLUMNS[:1])
+        item = dynamodb.Table(REGISTRY_TABLE).get_item(
+            Key={"TableKey": f"{DATABASE}.document_sections_invoice"}
+        )["Item"]
+        assert item["ColumnCount"] == 3
+
+        expired = GlueSchemaRegistry(
+            REGISTRY_TABLE, ttl_seconds=-1, dynamodb_resource=dynamodb
+        )
+        expired.register(DATABASE, "metering", COLUMNS)
+        assert not GlueSchemaRegistry(
+            REGISTRY_TABLE, dynamodb_resource=dynamodb
+        ).is_registered(DATABASE, "metering", COLUMNS)
+
+    def test_registry_errors_fall_back_to_glue(self):
+        """An unavailable registry table only costs the Glue call it would save."""
+        dynamodb = MagicMock()
+        dynamodb.Table.return_value.get_item.side_effect = Exception("Throttled")
+        dynamodb.Table.return_value.put_item.side_effect = Exception("Throttled")
+        registry = GlueSchemaRegistry(REGISTRY_TABLE, dynamodb_resource=dynamodb)
+
+        assert not registry.is_registered(DATABASE, "metering", COLUMNS)
+        registry.register(DATABASE, "metering", COLUMNS)
+        assert registry.is_registered(DATABASE, "metering", COLUMNS)
+
+
+@pytest.mark.unit
+class TestSaveReportingDataSchemaRegistry:
+    """Test cases for Glue calls of SaveReportingData with a schema registry."""
+
+    @pytest.fixture
+    def glue(self):
+        with patch("boto3.client") as mock_client:
+            glue = MagicMock()
+            glue.get_table.side_effect = Exception("EntityNotFoundException")
+            mock_client.side_effect = lambda service_name, *args, **kwargs: (
+                glue if service_name == "glue" else MagicMock()
+            )
+            yield glue
+
+    def test_known_schema_skips_glue(self, glue):
+        """Only schemas with new columns reach Glue, across reporter instances."""
+        registry = GlueSchemaRegistry()
+        schema = pa.schema([("document_id", pa.string()), ("total", pa.float64())])
+
+        first = SaveReportingData("bucket", DATABASE, schema_registry=registry)
+        assert first._create_or_update_glue_table("invoice", schema)
+        second = SaveReportingData("bucket", DATABASE, schema_registry=registry)
+        assert not second._create_or_update_glue_table("invoice", schema)
+        assert not second._create_or_update_glue_table(
+            "invoice", pa.schema([("document_id", pa.string())])
+        )
+        assert glue.get_table.call_count == 1
+
+        glue.get_table.side_effect = None
+        glue.get_table.return_value = {
+            "Table": {
+                "StorageDescriptor": {
+                    "Columns": second._convert_schema_to_glue_columns(schema)
+                }
+            }
+        }
+        second._create_or_update_glue_table(
+            "invoice", schema.append(pa.field("tax", pa.float64()))
+        )
+        assert glue.get_table.call_count == 2
+        assert glue.update_table.call_count == 1
+
+    @patch("idp_common.reporting.save_reporting_data.get_json_content")
+    def test_sections_of_a_type_update_glue_once(self, mock_get_json, glue):
+        """Columns of all sections of a type are applied in one Glue call."""
+        mock_get_json.side_effect = [{"total": "10"}, {"tax": "2"}, {"name": "ACME"}]
+        document = Document(
+            id="doc",
+            input_key="doc.pdf",
+            initial_event_time=datetime.now().isoformat() + "Z",
+            sections=[
+                Section(
+                    section_id=str(i),
+                    classification=classification,
+                    page_ids=[str(i)],
+                    extraction_result_uri=f"s3://bucket/doc/sections/{i}/result.json",
+                )
+                for i, classification in enumerate(["invoice", "invoice", "letter"])
+            ],
+        )
+
+        SaveReportingData("bucket", DATABASE).save_document_sections(document)
+
+        created = {
+            call.kwargs["TableInput"]["Name"]: {
+                col["Name"]
+                for col in call.kwargs["TableInput"]["StorageDescriptor"]["Columns"]
+            }
+            for call in glue.create_table.call_args_list
+        }
+        assert set(created) == {"document_sections_invoice", "document_sections_letter"}
+        assert {"total", "tax"} <= created["document_sections_invoice"]
@@ -0,0 +1,137 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Unit tests for the document state codecs.
+"""
+
+import json
+import os
+from unittest.mock import patch
+
+import boto3
+import pytest
+from idp_common.document_codec import (
+    JSON_CODEC,
+    MSGPACK_ZSTD_CODEC,
+    get_codec,
+)
+from idp_common.document_state import DocumentStateStore
+from idp_common.models import Document, Page, Section, Status
+from moto import mock_aws
+
+BUCKET = "working-bucket"
+
+
+def _document(num_pages=20):
+    document = Document(
+        id="doc.pdf",
+        input_key="doc.pdf",
+        input_bucket="input-bucket",
+        output_bucket="output-bucket",
+        status=Status.EXTRACTING,
+        num_pages=num_pages,
+        metering={"ocr": {"pages": num_pages}},
+    )
+    for i in range(1, num_pages + 1):
+        document.pages[str(i)] = Page(
+            page_id=str(i),
+            image_uri=f"s3://output-bucket/doc.pdf/pages/{i}/image.jpg",
+            raw_text_uri=f"s3://output-bucket/doc.pdf/pages/{i}/rawText.json",
+            classification="invoice",
+            confidence=0.9,
+            tables=[{"rows": [["item", "qty"], ["bolt", i]]}],
+        )
+    document.sections.append(
+        Section(
+            section_id="1",
+            classification="invoice",
+            page_ids=list(document.pages),
+            attributes={"total": 12.5},
+        )
+    )
+    return document
+
+
+@pytest.mark.unit
+class TestDocumentCodec:
+    """Test cases for codec selection and backward compatibility."""
+
+    @pytest.fixture
+    def s3(self):
+        with mock_aws():
+            client = boto3.client("s3", region_name="us-east-1")
+            client.create_bucket(Bucket=BUCKET)
+            with patch("boto3.client", return_value=client):
+                yield client
+
+    @pytest.fixture
+    def binary_codec(self):
+        pytest.importorskip("msgpack")
+        pytest.importorskip("zstandard")
+        with patch.dict(os.environ, {"DOCUMENT_STATE_CODEC": MSGPACK_ZSTD_CODEC}):
+            yield get_codec()
+
+    def test_default_codec_is_json(self):
+        """Without DOCUMENT_STATE_CODEC documents are stored as JSON."""
+        with patch.dict(os.environ, {}, clear=True):
+            codec = get_codec()
+        assert codec.name == JSON_CODEC
+        assert json.loads(codec.encode({"a": [1, 2]})) == {"a": [1, 2]}
+
+        with pytest.raises(ValueError, match="Unknown document codec"):
+            get_codec("pickle")
+
+    def test_binary_codec_round_trip(self, binary_codec):
+        """The binary codec decodes to the same dict and is smaller than JSON."""
+        data = _document(100).to_dict()
+        encoded = binary_codec.encode(data)
+
+        assert binary_codec.decode(encoded) == data
+        assert len(encoded) < len(get_codec(JSON_CODEC).encode(data)) / 2
+
+    def test_compress_records_codec_in_wrapper(self, s3, binary_codec):
+        """compress() marks binary state in the wrapper, decompress() follows it."""
+        document = _document()
+        wrapper = document.compress(BUCKET, "extraction")
+
+        assert wrapper["codec"] == MSGPACK_ZSTD_CODEC
+        assert wrapper["s3_uri"].endswith("_extraction_state.msgpack.zst")
+        assert Document.decompress(BUCKET, wrapper).to_dict() == document.to_dict()
+        section = Document.load_section(BUCKET, wrapper, "1")
+        assert sorted(section.pages, key=int) == list(document.pages)
+
+    def test_json_state_stays_readable(self, s3, binary_codec):
+        """State written before the codec changed is still read as JSON."""
+        document = _document()
+        with patch.dict(os.environ, {"DOCUMENT_STATE_CODEC": JSON_CODEC}):
+            legacy = document.compress(BUCKET, "ocr")
+            store = DocumentStateStore(BUCKET)
+            state = store.save(document, "ocr")
+        assert "codec" not in legacy
+
+        # Reading JSON state does not depend on the configured codec
+        assert Document.decompress(BUCKET, legacy).to_dict() == document.to_dict()
+        assert store.load(state).to_dict() == document.to_dict()
+
+    def test_state_store_encodes_records(self, s3, binary_codec):
+        """Base snapshot records use the codec recorded in the index."""
+        document = _document()
+        store = DocumentStateStore(BUCKET)
+        wrapper = store.save(document, "classification")
+
+        index = store._get_json(wrapper["base"] + ".index.json")
+        assert index["codec"] == MSGPACK_ZSTD_CODEC
+        assert store.load(wrapper).to_dict() == document.to_dict()
+        assert store.load(wrapper, section_id="1").pages["7"].tables == [
+            {"rows": [["item", "qty"], ["bolt", 7]]}
+        ]
+
+    def test_page_and_section_use_slots(self):
+        """Pages and sections have no per-instance __dict__."""
+        page = Page(page_id="1")
+        section = Section(section_id="1", classification="invoice")
+        assert not hasattr(page, "__dict__")
+        assert not hasattr(section, "__dict__")
+        with pytest.raises(AttributeError):
+            page.unknown = True
@@ -0,0 +1,233 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Unit tests for delta-encoded document state (DocumentStateStore).
+"""
+
+import os
+from unittest.mock import patch
+
+import boto3
+import pytest
+from idp_common.document_state import MAX_DELTAS, DocumentStateStore
+from idp_common.models import Document, Page, Section, Status
+from moto import mock_aws
+
+BUCKET = "working-bucket"
+
+
+def _document(num_sections=3, pages_per_section=2):
+    document = Document(
+        id="doc.pdf",
+        input_key="doc.pdf",
+        input_bucket="input-bucket",
+        output_bucket="output-bucket",
+        status=Status.CLASSIFYING,
+        num_pages=num_sections * pages_per_section,
+        metering={"ocr": {"pages": num_sections * pages_per_section}},
+    )
+    for s in range(num_sections):
+        page_ids = [
+            str(s * pages_per_section + p + 1) for p in range(pages_per_section)
+        ]
+        for page_id in page_ids:
+            document.pages[page_id] = Page(
+                page_id=page_id,
+                image_uri=f"s3://output-bucket/doc.pdf/pages/{page_id}/image.jpg",
+                classification=f"class-{s}",
+                tables=[{"rows": [["x" * 200]]}],
+            )
+        document.sections.append(
+            Section(
+                section_id=str(s + 1), classification=f"class-{s}", page_ids=page_ids
+            )
+        )
+    return document
+
+
+@pytest.mark.unit
+class TestDocumentStateStore:
+    """Test cases for base snapshots, deltas and section-scoped loads."""
+
+    @pytest.fixture
+    def s3(self):
+        with mock_aws():
+            client = boto3.client("s3", region_name="us-east-1")
+            client.create_bucket(Bucket=BUCKET)
+            yield client
+
+    @pytest.fixture
+    def store(self, s3):
+        return DocumentStateStore(BUCKET, s3_client=s3)
+
+    def _keys(self, s3):
+        response = s3.list_objects_v2(Bucket=BUCKET)
+        return sorted(obj["Key"] for obj in response.get("Contents", []))
+
+    def test_base_snapshot_round_trip(self, s3, store):
+        """A new document is stored as a base snapshot and loads unchanged."""
+        document = _document()
+        wrapper = store.save(document, "classification")
+
+        assert wrapper["format"] == "delta"
+        assert wrapper["compressed"] is True
+        assert wrapper["version"] == 0
+        assert wrapper["sections"] == ["1", "2", "3"]
+        assert len(self._keys(s3)) == 2
+
+        loaded = store.load(wrapper)
+        assert loaded.to_dict() == document.to_dict()
+
+    def test_only_changes_are_written(self, s3, store):
+        """A step writes the fields and sections it changed as a delta."""
+        wrapper = store.save(_document(), "classification")
+
+        document = store.load(wrapper)
+        document.status = Status.EXTRACTING
+        document.sections[1].extraction_result_uri = "s3://output-bucket/2/result.json"
+        wrapper = store.save(document, "extraction")
+
+        assert wrapper["version"] == 1
+        delta = store._get_json(wrapper["deltas"][0])
+        assert delta["header"] == {"status": "EXTRACTING"}
+        assert list(delta["sections"]) == ["2"]
+        assert delta["pages"] == {}
+        assert "section_ids" not in delta
+
+        # Saving again without changes writes nothing
+        keys = self._keys(s3)
+        assert store.save(document, "noop")["version"] == 1
+        assert self._keys(s3) == keys
+
+        loaded = store.load(wrapper)
+        assert loaded.status == Status.EXTRACTING
+        assert (
+            loaded.sections[1].extraction_result_uri
+            == "s3://output-bucket/2/result.json"
+        )
+        assert loaded.to_dict() == document.to_dict()
+
+    def test_section_load_reads_only_the_section(self, s3, store):
+        """A section-scoped load fetches the section and its pages by byte range."""
+        wrapper = store.save(_document(num_sections=20), "classification")
+
+        with patch.object(s3, "get_object", wraps=s3.get_object) as get_object:
+            document = store.load(wrapper, section_id="5")
+
+        data_reads = [
+            call.kwargs
+            for call in get_object.call_args_list
+            if call.kwargs["Key"].endswith(".data")
+        ]
+        assert len(data_reads) == 1
+        assert "Range" in data_reads[0]
+        assert [section.section_id for section in document.sections] == ["5"]
+        assert sorted(document.pages) == ["10", "9"]
+        assert document.metering == {"ocr": {"pages": 40}}
+
+        with pytest.raises(ValueError, match="Section 99 not found"):
+            store.load(wrapper, section_id="99")
+
+    def test_section_document_keeps_only_its_section(self, s3, store):
+        """Saving a section-scoped document stores the per-section view."""
+        wrapper = store.save(_document(), "classification")
+
+        document = store.load(wrapper, section_id="2")
+        document.sections[0].extraction_result_uri = "s3://output-bucket/2/result.json"
+        section_wrapper = store.save(document, "extraction_2")
+
+        assert section_wrapper["sections"] == ["2"]
+        delta = store._get_json(section_wrapper["deltas"][0])
+        assert delta["section_ids"] == ["2"]
+        assert delta["page_ids"] == ["3", "4"]
+        assert list(delta["sections"]) == ["2"]
+
+        loaded = store.load(section_wrapper)
+        assert [section.section_id for section in loaded.sections] == ["2"]
+        assert sorted(loaded.pages) == ["3", "4"]
+        assert loaded.sections[0].extraction_result_uri.endswith("2/result.json")
+
+        # Other Map iterations are unaffected
+        assert len(store.load(wrapper).sections) == 3
+
+    def test_long_delta_chains_are_compacted(self, s3, store):
+        """A fully loaded document writes a new base after MAX_DELTAS deltas."""
+        wrapper = store.save(_document(), "classification")
+        for i in range(MAX_DELTAS):
+            document = store.load(wrapper)
+            document.errors.append(f"error {i}")
+            wrapper = store.save(document, f"step{i}")
+        assert wrapper["version"] == MAX_DELTAS
+
+        document = store.load(wrapper)
+        base = wrapper["base"]
+        wrapper = store.save(document, "compacted")
+
+        assert wrapper["version"] == 0
+        assert wrapper["base"] != base
+        assert store.load(wrapper).errors == [f"error {i}" for i in range(MAX_DELTAS)]
+
+    def test_document_helpers_use_state_store(self, s3):
+        """serialize_document and load_document use delta state by default."""
+        with patch("boto3.client", return_value=s3):
+            wrapper = _document().serialize_document(BUCKET, "classification")
+            assert DocumentStateStore.is_state_reference(wrapper)
+
+            document = Document.load_document(wrapper, BUCKET, section_id="3")
+            assert [section.section_id for section in document.sections] == ["3"]
+            assert len(Document.from_compressed_or_dict(wrapper, BUCKET).sections) == 3
+
+            with patch.dict(os.environ, {"DOCUMENT_STATE_FORMAT": "compressed"}):
+                legacy = _document().serialize_document(BUCKET, "classification")
+            assert "s3_uri" in legacy
+            document = Document.load_document(legacy, BUCKET, section_id="3")
+            assert [section.section_id for section in document.sections] == ["3"]
+            assert sorted(document.pages) == ["5", "6"]
+
+    def test_open_reads_records_on_demand(self, s3, store):
+        """Opening a view reads the index only; records are read when requested."""
+        wrapper = store.save(_document(num_sections=10), "classification")
+
+        with patch.object(s3, "get_object", wraps=s3.get_object) as get_object:
+            view = store.open(wrapper)
+            assert view.section_ids == [str(s + 1) for s in range(10)]
+            assert view.section_page_ids("4") == ["7", "8"]
+            assert not any(
+                call.kwargs["Key"].endswith(".data")
+                for call in get_object.call_args_list
+            )
+
+            assert view.section("4").classification == "class-3"
+            assert view.page("8").image_uri.endswith("/pages/8/image.jpg")
+            reads = len(get_object.call_args_list)
+            # Records already read are cached
+            assert view.section("4").page_ids == ["7", "8"]
+            assert len(get_object.call_args_list) == reads
+
+        with pytest.raises(ValueError, match="Section 11 not found"):
+            view.section("11")
+
+    def test_load_section_accepts_any_payload(self, s3):
+        """Document.load_section scopes delta state, compressed and plain payloads."""
+        document = _document()
+        with patch("boto3.client", return_value=s3):
+            wrapper = document.serialize_document(BUCKET, "classification")
+            with patch.dict(os.environ, {"DOCUMENT_STATE_FORMAT": "compressed"}):
+                legacy = document.serialize_document(BUCKET, "classification")
+
+            for payload in (wrapper, legacy, document.to_dict()):
+                section_document = Document.load_section(BUCKET, payload, "2")
+                assert [s.section_id for s in section_document.sections] == ["2"]
+                assert sorted(section_document.pages) == ["3", "4"]
+                assert section_document.metering == document.metering
+
+            # Only documents backed by the state store track changes
+            assert Document.load_section(BUCKET, wrapper, "2")._state is not None
+            assert (
+                getattr(Document.load_section(BUCKET, legacy, "2"), "_state", None)
+                is None
+            )
+
+        with pytest.raises(ValueError, match="Bucket required"):
+            Document.load_section(None, wrapper, "2")
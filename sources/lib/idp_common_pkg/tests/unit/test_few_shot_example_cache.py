@@ -0,0 +1,120 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Unit tests for the few-shot example asset cache.
+"""
+
+from unittest.mock import patch
+
+import pytest
+from idp_common.utils import few_shot_example_builder
+from idp_common.utils.few_shot_example_builder import (
+    build_few_shot_extraction_examples_content,
+)
+from idp_common.utils.few_shot_example_cache import FewShotExampleCache
+
+PREFIX = "s3://config-bucket/examples/invoice/"
+
+
+IMAGES = {f"{PREFIX}page1.png": b"png-1", f"{PREFIX}page2.png": b"png-2"}
+
+
+def _prepare_attachment(image_data):
+    if not image_data.startswith(b"png"):
+        raise ValueError("Unsupported image format")
+    return {"image": {"format": "png", "source": {"bytes": image_data}}}
+
+
+INVOICE_CLASS = {
+    "$id": "Invoice",
+    "x-aws-idp-examples": [
+        {
+            "name": "invoice-1",
+            "attributesPrompt": "invoice_number: INV-1",
+            "imagePath": PREFIX,
+        }
+    ],
+}
+
+
+@pytest.mark.unit
+class TestFewShotExampleCache:
+    """Test cases for caching of example listings and image blocks."""
+
+    @pytest.fixture
+    def s3(self):
+        with (
+            patch.object(
+                few_shot_example_builder, "_example_cache", FewShotExampleCache()
+            ),
+            patch.object(
+                few_shot_example_builder.s3,
+                "list_images_from_path",
+                return_value=list(IMAGES),
+            ),
+            patch.object(
+                few_shot_example_builder.s3,
+                "get_binary_content",
+                side_effect=IMAGES.__getitem__,
+            ) as get_binary_content,
+            patch.object(
+                few_shot_example_builder.image,
+                "prepare_bedrock_image_attachment",
+                side_effect=_prepare_attachment,
+            ),
+            patch("idp_common.metrics.put_metric"),
+            patch.object(few_shot_example_builder, "current_config_version") as version,
+        ):
+            version.return_value = "v1"
+            get_binary_content.version = version
+            yield get_binary_content
+
+    def test_warm_calls_do_not_read_s3(self, s3):
+        """Repeated builds reuse the listing and the image blocks."""
+        first = build_few_shot_extraction_examples_content(INVOICE_CLASS)
+        second = build_few_shot_extraction_examples_content(INVOICE_CLASS)
+
+        assert first == second
+        assert first[0] == {"text": "invoice_number: INV-1"}
+        assert [block["image"]["format"] for block in first[1:]] == ["png", "png"]
+        assert s3.call_count == 2
+
+        stats = few_shot_example_builder.get_example_cache_stats()
+        assert (stats["hits"], stats["misses"]) == (3, 3)
+        assert stats["hit_rate"] == 0.5
+
+    def test_configuration_version_change_reloads(self, s3):
+        """A new configuration version drops the cached examples."""
+        build_few_shot_extraction_examples_content(INVOICE_CLASS)
+        s3.version.return_value = "v2"
+        build_few_shot_extraction_examples_content(INVOICE_CLASS)
+
+        assert s3.call_count == 4
+
+    def test_failed_images_are_not_cached(self, s3):
+        """Images that fail to load are skipped and retried on the next build."""
+        s3.side_effect = [b"not an image", IMAGES[f"{PREFIX}page2.png"]]
+        content = build_few_shot_extraction_examples_content(INVOICE_CLASS)
+        assert len(content) == 2
+
+        s3.side_effect = IMAGES.__getitem__
+        content = build_few_shot_extraction_examples_content(INVOICE_CLASS)
+        assert len(content) == 3
+        assert s3.call_count == 3
+
+    def test_disk_cache_and_size_limit(self, tmp_path):
+        """Entries are read back from the cache directory and evicted by size."""
+        block = {"image": {"format": "png", "source": {"bytes": b"x" * 10}}}
+        with patch("idp_common.metrics.put_metric"):
+            cache = FewShotExampleCache(max_bytes=15, cache_dir=str(tmp_path))
+            cache.get_listing("v1", PREFIX, lambda: ["a.png", "b.png"])
+            cache.get_image("v1", "a.png", lambda: block)
+            cache.get_image("v1", "b.png", lambda: block)
+            assert cache.stats()["cached_images"] == 1
+
+            # A new process reads the entries written by the previous one
+            reloaded = FewShotExampleCache(cache_dir=str(tmp_path))
+            assert reloaded.get_listing("v1", PREFIX, list) == ["a.png", "b.png"]
+            assert reloaded.get_image("v1", "a.png", dict) == block
+            assert reloaded.stats()["misses"] == 0
@@ -5,7 +5,8 @@
 Unit tests for the granular assessment service.
 """
 
-from unittest.mock import patch
+import asyncio
+from unittest.mock import AsyncMock, patch
 
 import pytest
 from idp_common.assessment.granular_service import (
@@ -14,6 +15,7 @@ from idp_common.assessment.granular_service import (
     GranularAssessmentService,
     _safe_float_conversion,
 )
+from idp_common.bedrock import batch
 from idp_common.config.models import IDPConfig
 
 
@@ -434,6 +436,87 @@ class TestGranularAssessmentService:
         assert not result.success
         assert result.error_message == "Bedrock error"
 
+    @patch("idp_common.bedrock.invoke_model")
+    @patch("idp_common.bedrock.invoke_model_async", new_callable=AsyncMock)
+    def test_process_assessment_tasks_async(
+        self, mock_invoke_async, mock_invoke, sample_config
+    ):
+        """Test concurrent processing of assessment tasks with async Bedrock calls."""
+        in_flight = 0
+        max_in_flight = 0
+
+        async def invoke(**kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            if batch._batch_labels.get()["task_id"] == "task_2":
+                raise Exception("Bedrock error")
+            return {
+                "metering": {"model": {"input_tokens": 100}},
+                "response": {
+                    "output": {
+                        "message": {
+                            "content": [
+                                {
+                                    "text": '{"sender_name": {"confidence": 0.95, "confidence_reason": "Clear evidence"}}'
+                                }
+                            ]
+                        }
+                    }
+                },
+            }
+
+        mock_invoke_async.side_effect = invoke
+
+        idp_config = IDPConfig.model_validate(sample_config)
+        service = GranularAssessmentService(config=idp_config)
+        properties = service._get_class_schema("letter").get("properties", {})
+
+        tasks = [
+            AssessmentTask(
+                task_id=f"task_{i}",
+                task_type="simple_batch",
+                attributes=["sender_name"],
+                extraction_data={"sender_name": "John"},
+                confidence_thresholds={"sender_name": 0.9},
+            )
+            for i in range(6)
+        ]
+
+        results = asyncio.run(
+            service._process_assessment_tasks_async(
+                tasks,
+                [{"text": "Base prompt"}],
+                properties,
+                "test-model",
+                "system prompt",
+                0.0,
+                5,
+                0.1,
+                4096,
+            )
+        )
+
+        mock_invoke.assert_not_called()
+        assert mock_invoke_async.call_count == 6
+        # At most max_workers tasks are in flight at once
+        assert max_in_flight == service.max_workers == 4
+        assert [result.task_id for result in results] == [
+            task.task_id for task in tasks
+        ]
+        assert [result.success for result in results] == [
+            True,
+            True,
+            False,
+            True,
+            True,
+            True,
+        ]
+        assert results[2].error_message == "Bedrock error"
+        assert results[0].metering == {"model": {"input_tokens": 100}}
+
     def test_check_confidence_alerts_simple_batch(self, sample_config):
         """Test confidence alert checking for simple batch tasks."""
         idp_config = IDPConfig.model_validate(sample_config)
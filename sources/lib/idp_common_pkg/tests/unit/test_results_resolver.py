@@ -172,6 +172,64 @@ def test_get_document_costs_no_bucket():
     assert result == {}
 
 
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "file_name",
+    [
+        "compacted-20251009T020000-abcd1234-0000.parquet",
+        "batch-20251008T120500-abcd1234.parquet",
+    ],
+)
+def test_get_document_costs_from_compacted_partition(tmp_path, file_name):
+    """Test cost retrieval from compacted and batched metering files"""
+    import pyarrow as pa
+    import pyarrow.fs as pafs
+    import pyarrow.parquet as pq
+
+    key = f"metering/date=2025-10-08/{file_name}"
+    (tmp_path / "metering/date=2025-10-08").mkdir(parents=True)
+    pq.write_table(
+        pa.Table.from_pylist(
+            [
+                {
+                    "document_id": document_id,
+                    "context": "extraction",
+                    "service_api": "bedrock",
+                    "unit": "tokens",
+                    "value": value,
+                    "unit_cost": 0.001,
+                    "estimated_cost": value * 0.001,
+                }
+                for document_id, value in [
+                    ("other-doc", 5.0),
+                    ("test-doc", 100.0),
+                    ("test-doc", 50.0),
+                ]
+            ]
+        ),
+        str(tmp_path / key),
+    )
+
+    with (
+        patch.dict(os.environ, {"REPORTING_BUCKET": str(tmp_path)}),
+        patch("pyarrow.fs.S3FileSystem", return_value=pafs.LocalFileSystem()),
+    ):
+        result = index._get_document_costs_from_reporting_db(
+            "test-doc", "2025-10-08", partition_keys=[key]
+        )
+
+    assert result == {
+        "extraction": {
+            "bedrock_tokens": {
+                "unit": "tokens",
+                "value": 150.0,
+                "unit_cost": 0.001,
+                "estimated_cost": pytest.approx(0.15),
+            }
+        }
+    }
+
+
 @pytest.mark.unit
 def test_accuracy_breakdown_structure():
     """Test accuracy breakdown data structure"""
@@ -320,3 +378,363 @@ def test_handler_field_routing():
     event3 = {"info": {"fieldName": "unknownField"}, "arguments": {}}
     with pytest.raises(ValueError, match="Unknown field"):
         handler(event3, {})
+
+
+def _create_tracking_table():
+    import boto3
+
+    resource = boto3.resource("dynamodb", region_name="us-east-1")
+    table = resource.create_table(
+        TableName="tracking",
+        KeySchema=[
+            {"AttributeName": "PK", "KeyType": "HASH"},
+            {"AttributeName": "SK", "KeyType": "RANGE"},
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "PK", "AttributeType": "S"},
+            {"AttributeName": "SK", "AttributeType": "S"},
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    return resource, table
+
+
+@pytest.mark.unit
+@patch.dict(
+    os.environ,
+    {
+        "TRACKING_TABLE": "tracking",
+        "AWS_DEFAULT_REGION": "us-east-1",
+        "REPORTING_BUCKET": "",
+    },
+)
+def test_get_test_runs_queries_test_run_list():
+    """Test that test runs are listed from the test run list, backfilled once"""
+    from datetime import datetime, timedelta
+
+    from moto import mock_aws
+
+    with mock_aws():
+        resource, table = _create_tracking_table()
+        recent = (datetime.utcnow() - timedelta(minutes=30)).isoformat() + "Z"
+        old = (datetime.utcnow() - timedelta(days=3)).isoformat() + "Z"
+        for test_run_id, created_at in [("legacy-run", recent), ("old-run", old)]:
+            table.put_item(
+                Item={
+                    "PK": f"testrun#{test_run_id}",
+                    "SK": "metadata",
+                    "TestRunId": test_run_id,
+                    "Status": "COMPLETE",
+                    "CreatedAt": created_at,
+                    "CompletedAt": created_at,
+                }
+            )
+
+        with patch.object(index, "dynamodb", resource):
+            runs = index.get_test_runs(2)
+            assert [run["testRunId"] for run in runs] == ["legacy-run"]
+
+            # New test runs are listed by the test runner; the backfill does not run again
+            table.put_item(
+                Item={
+                    "PK": "testrun#new-run",
+                    "SK": "metadata",
+                    "TestRunId": "new-run",
+                    "Status": "COMPLETE",
+                    "CreatedAt": recent,
+                    "CompletedAt": recent,
+                }
+            )
+            table.put_item(Item=index._test_run_list_item("new-run", recent))
+            runs = index.get_test_runs(2)
+            assert sorted(run["testRunId"] for run in runs) == [
+                "legacy-run",
+                "new-run",
+            ]
+            assert len(index.get_test_runs(24 * 7)) == 3
+
+            marker = table.get_item(
+                Key={
+                    "PK": index.TEST_RUN_LIST_PK,
+                    "SK": index.TEST_RUN_LIST_BACKFILL_SK,
+                }
+            )
+            assert "Item" in marker
+
+
+@pytest.mark.unit
+@patch.dict(
+    os.environ,
+    {
+        "TRACKING_TABLE": "tracking",
+        "AWS_DEFAULT_REGION": "us-east-1",
+        "REPORTING_BUCKET": "",
+    },
+)
+def test_aggregate_test_run_metrics_from_result_rows():
+    """Test aggregation from result rows, falling back to evaluation reports"""
+    import json
+    from decimal import Decimal
+
+    import boto3
+    from moto import mock_aws
+
+    with mock_aws():
+        resource, table = _create_tracking_table()
+        table.put_item(
+            Item={
+                "PK": "testrun#run-1",
+                "SK": "metadata",
+                "TestRunId": "run-1",
+                "Files": ["a.pdf", "b.pdf", "c.pdf"],
+            }
+        )
+        # a.pdf completed after result rows existed
+        table.put_item(
+            Item={
+                "PK": "testrun#run-1",
+                "SK": "doc#a.pdf",
+                "ObjectStatus": "COMPLETED",
+                "EvaluationMetrics": {
+                    "accuracy": Decimal("0.8"),
+                    "weighted_overall_score": Decimal("0.75"),
+                    "precision": Decimal("0.9"),
+                    "recall": None,
+                    "f1_score": None,
+                    "false_alarm_rate": None,
+                    "false_discovery_rate": None,
+                    "average_confidence": Decimal("0.7"),
+                },
+            }
+        )
+        # b.pdf has only its tracking item and evaluation report
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket="output")
+        s3.put_object(
+            Bucket="output",
+            Key="run-1/b.pdf/evaluation/results.json",
+            Body=json.dumps(
+                {
+                    "overall_metrics": {
+                        "accuracy": 0.6,
+                        "weighted_overall_score": 0.5,
+                        "precision": 0.7,
+                    },
+                    "section_results": [
+                        {"attributes": [{"confidence": 0.9}, {"confidence": 0.5}]}
+                    ],
+                }
+            ),
+        )
+        table.put_item(
+            Item={
+                "PK": "doc#run-1/b.pdf",
+                "SK": "none",
+                "ObjectStatus": "COMPLETED",
+                "EvaluationReportUri": "s3://output/run-1/b.pdf/evaluation/report.md",
+            }
+        )
+        # c.pdf failed
+        table.put_item(
+            Item={"PK": "testrun#run-1", "SK": "doc#c.pdf", "ObjectStatus": "FAILED"}
+        )
+
+        with patch.object(index, "dynamodb", resource):
+            result = index._aggregate_test_run_metrics("run-1")
+
+    assert result["overall_accuracy"] == pytest.approx(0.7)
+    assert result["weighted_overall_scores"] == {
+        "run-1/a.pdf": 0.75,
+        "run-1/b.pdf": 0.5,
+    }
+    assert result["average_confidence"] == pytest.approx(0.7)
+    assert result["accuracy_breakdown"]["precision"] == pytest.approx(0.8)
+    assert result["accuracy_breakdown"]["recall"] is None
+    assert result["total_cost"] == 0
+
+
+def _load_lambda(name, path):
+    """Load a Lambda module from its source file with AWS clients mocked"""
+    with (
+        patch("boto3.resource", return_value=Mock()),
+        patch("boto3.client", return_value=Mock()),
+        patch("idp_common.docs_service.create_document_service", return_value=Mock()),
+    ):
+        lambda_spec = importlib.util.spec_from_file_location(
+            name, os.path.join(os.path.dirname(__file__), "../../../..", path)
+        )
+        module = importlib.util.module_from_spec(lambda_spec)
+        lambda_spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.unit
+@patch.dict(
+    os.environ,
+    {
+        "TRACKING_TABLE": "tracking",
+        "AWS_DEFAULT_REGION": "us-east-1",
+        "REPORTING_BUCKET": "",
+        "METRIC_NAMESPACE": "IDP",
+        "CONCURRENCY_TABLE": "concurrency",
+    },
+)
+def test_result_row_written_before_evaluation():
+    """Test a result row written before the evaluation, then completed by it"""
+    import json
+
+    import boto3
+    from idp_common.evaluation.models import (
+        AttributeEvaluationResult,
+        DocumentEvaluationResult,
+        SectionEvaluationResult,
+    )
+    from idp_common.models import Document, Status
+    from moto import mock_aws
+
+    tracker = _load_lambda("tracker_index", "src/lambda/workflow_tracker/index.py")
+    evaluation_function = _load_lambda(
+        "evaluation_index", "patterns/pattern-2/src/evaluation_function/index.py"
+    )
+
+    document = Document(
+        id="run-1/a.pdf",
+        input_key="run-1/a.pdf",
+        status=Status.COMPLETED,
+        completion_time="2025-01-01T00:00:00+00:00",
+    )
+
+    with mock_aws():
+        resource, table = _create_tracking_table()
+        table.put_item(
+            Item={
+                "PK": "testrun#run-1",
+                "SK": "metadata",
+                "TestRunId": "run-1",
+                "Files": ["a.pdf"],
+            }
+        )
+        table.put_item(
+            Item={
+                "PK": "doc#run-1/a.pdf",
+                "SK": "none",
+                "ObjectStatus": "COMPLETED",
+            }
+        )
+
+        # The workflow tracker records the completion before the evaluation ran
+        with (
+            patch.object(tracker, "TRACKING_TABLE", "tracking"),
+            patch.object(tracker, "dynamodb", resource),
+        ):
+            tracker.record_test_run_result(document)
+        row = table.get_item(Key={"PK": "testrun#run-1", "SK": "doc#a.pdf"})["Item"]
+        assert row["ObjectStatus"] == "COMPLETED"
+        assert "EvaluationMetrics" not in row
+
+        with patch.object(index, "dynamodb", resource):
+            # Rows without metrics fall back to the tracking item, which has no report yet
+            assert index._aggregate_test_run_metrics("run-1") == {}
+
+            # ...and to the evaluation report once the tracking item links it
+            s3 = boto3.client("s3", region_name="us-east-1")
+            s3.create_bucket(Bucket="output")
+            s3.put_object(
+                Bucket="output",
+                Key="run-1/a.pdf/evaluation/results.json",
+                Body=json.dumps({"overall_metrics": {"accuracy": 0.6}}),
+            )
+            table.update_item(
+                Key={"PK": "doc#run-1/a.pdf", "SK": "none"},
+                UpdateExpression="SET EvaluationReportUri = :uri",
+                ExpressionAttributeValues={
+                    ":uri": "s3://output/run-1/a.pdf/evaluation/report.md"
+                },
+            )
+            result = index._aggregate_test_run_metrics("run-1")
+            assert result["overall_accuracy"] == pytest.approx(0.6)
+
+            # The evaluation function adds its metrics to the row
+            document.evaluation_report_uri = (
+                "s3://output/run-1/a.pdf/evaluation/report.md"
+            )
+            document.evaluation_result = DocumentEvaluationResult(
+                document_id="run-1/a.pdf",
+                section_results=[
+                    SectionEvaluationResult(
+                        section_id="1",
+                        document_class="invoice",
+                        attributes=[
+                            AttributeEvaluationResult(
+                                name="total",
+                                expected="1",
+                                actual="1",
+                                matched=True,
+                                confidence=0.8,
+                            )
+                        ],
+                        metrics={},
+                    )
+                ],
+                overall_metrics={"accuracy": 0.9, "weighted_overall_score": 0.85},
+            )
+            with patch.object(evaluation_function, "TRACKING_TABLE", "tracking"):
+                evaluation_function.record_test_run_evaluation(document)
+
+            # Writing the row again does not drop the evaluation metrics
+            with (
+                patch.object(tracker, "TRACKING_TABLE", "tracking"),
+                patch.object(tracker, "dynamodb", resource),
+            ):
+                tracker.record_test_run_result(document)
+
+            result = index._aggregate_test_run_metrics("run-1")
+
+    assert result["overall_accuracy"] == pytest.approx(0.9)
+    assert result["weighted_overall_scores"] == {"run-1/a.pdf": 0.85}
+    assert result["average_confidence"] == pytest.approx(0.8)
+
+
+@pytest.mark.unit
+@patch.dict(
+    os.environ, {"TRACKING_TABLE": "tracking", "AWS_DEFAULT_REGION": "us-east-1"}
+)
+def test_get_test_run_status_batch_gets_documents():
+    """Test that document statuses are read with BatchGetItem"""
+    from moto import mock_aws
+
+    with mock_aws():
+        resource, table = _create_tracking_table()
+        files = [f"doc-{i}.pdf" for i in range(150)]
+        table.put_item(
+            Item={
+                "PK": "testrun#run-2",
+                "SK": "metadata",
+                "TestRunId": "run-2",
+                "Status": "RUNNING",
+                "Files": files,
+                "FilesCount": len(files),
+            }
+        )
+        for i, file_key in enumerate(files[:149]):
+            table.put_item(
+                Item={
+                    "PK": f"doc#run-2/{file_key}",
+                    "SK": "none",
+                    "ObjectStatus": "COMPLETED" if i % 2 == 0 else "RUNNING",
+                    "EvaluationStatus": "COMPLETED" if i % 2 == 0 else None,
+                }
+            )
+
+        with (
+            patch.object(index, "dynamodb", resource),
+            patch.object(
+                resource, "batch_get_item", wraps=resource.batch_get_item
+            ) as mock_batch_get,
+        ):
+            result = index.get_test_run_status("run-2")
+
+    assert mock_batch_get.call_count == 2
+    assert result["completedFiles"] == 75
+    assert result["filesCount"] == 150
+    assert result["status"] == "RUNNING"
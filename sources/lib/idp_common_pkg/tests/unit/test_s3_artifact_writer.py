@@ -0,0 +1,134 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import json
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import boto3
+import pytest
+from idp_common.s3 import ArtifactWriteError, S3ArtifactWriter
+from moto import mock_aws
+
+
+@pytest.mark.unit
+class TestS3ArtifactWriter:
+    """Test the background S3 artifact writer"""
+
+    @mock_aws
+    def test_writes_all_content_types(self):
+        """Test that queued objects are written with the write_content conventions"""
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket="bucket")
+
+        with S3ArtifactWriter(max_workers=4, s3_client=client) as writer:
+            writer.submit(b"\xff\xd8jpeg", "bucket", "pages/1/image.jpg", "image/jpeg")
+            writer.submit({"text": "hello"}, "bucket", "pages/1/result.json")
+            writer.submit("plain", "bucket", "pages/1/notes.txt")
+
+        image = client.get_object(Bucket="bucket", Key="pages/1/image.jpg")
+        assert image["Body"].read() == b"\xff\xd8jpeg"
+        assert image["ContentType"] == "image/jpeg"
+        result = client.get_object(Bucket="bucket", Key="pages/1/result.json")
+        assert json.loads(result["Body"].read()) == {"text": "hello"}
+        assert result["ContentType"] == "application/json"
+        notes = client.get_object(Bucket="bucket", Key="pages/1/notes.txt")
+        assert notes["ContentType"] == "text/plain"
+        assert writer.objects_written == 3
+
+    def test_submit_does_not_wait_for_upload(self):
+        """Test that submit returns while the upload is still in flight"""
+        release = threading.Event()
+        client = Mock()
+        client.put_object.side_effect = lambda **kwargs: release.wait(5)
+
+        writer = S3ArtifactWriter(max_workers=2, s3_client=client)
+        future = writer.submit("content", "bucket", "key")
+
+        assert not future.done()
+        release.set()
+        writer.flush()
+        assert future.done()
+        writer.shutdown()
+
+    def test_flush_reports_failures(self):
+        """Test that failed uploads are raised from the flush barrier"""
+        client = Mock()
+        client.put_object.side_effect = [None, Exception("AccessDenied")]
+
+        writer = S3ArtifactWriter(max_workers=1, s3_client=client)
+        writer.submit("ok", "bucket", "good")
+        writer.submit("bad", "bucket", "bad")
+
+        with pytest.raises(ArtifactWriteError) as exc_info:
+            writer.flush()
+
+        assert [uri for uri, _ in exc_info.value.failures] == ["s3://bucket/bad"]
+        assert "AccessDenied" in str(exc_info.value)
+        # Failures are reported once
+        writer.flush()
+        writer.shutdown()
+
+    def test_flush_timeout(self):
+        """Test that flush gives up on slow uploads after the timeout"""
+        release = threading.Event()
+        client = Mock()
+        client.put_object.side_effect = lambda **kwargs: release.wait(5)
+
+        writer = S3ArtifactWriter(max_workers=2, s3_client=client)
+        writer.submit("a", "bucket", "a")
+        writer.submit("b", "bucket", "b")
+
+        started = time.monotonic()
+        with pytest.raises(TimeoutError, match="2 S3 upload"):
+            writer.flush(timeout=0.2)
+        assert time.monotonic() - started < 2
+
+        # The uploads keep running and a later flush waits for them
+        release.set()
+        writer.flush(timeout=5)
+        assert writer.objects_written == 2
+        writer.shutdown()
+
+    def test_pending_uploads_are_bounded(self):
+        """Test that submit blocks once max_pending uploads are queued"""
+        release = threading.Event()
+        client = Mock()
+        client.put_object.side_effect = lambda **kwargs: release.wait(5)
+        writer = S3ArtifactWriter(max_workers=1, s3_client=client, max_pending=2)
+        writer.submit("a", "bucket", "a")
+        writer.submit("b", "bucket", "b")
+
+        submitted = threading.Event()
+
+        def submit_third():
+            writer.submit("c", "bucket", "c")
+            submitted.set()
+
+        thread = threading.Thread(target=submit_third)
+        thread.start()
+        assert not submitted.wait(0.2)
+
+        release.set()
+        thread.join(5)
+        assert submitted.is_set()
+        writer.flush()
+        writer.shutdown()
+        assert client.put_object.call_count == 3
+
+    def test_submit_after_shutdown_fails(self):
+        """Test that a closed writer rejects new uploads"""
+        writer = S3ArtifactWriter(max_workers=1, s3_client=Mock())
+        writer.shutdown()
+
+        with pytest.raises(RuntimeError):
+            writer.submit("a", "bucket", "a")
+
+    def test_default_client_pool_matches_workers(self):
+        """Test that the default client's connection pool is sized to the workers"""
+        with patch("idp_common.s3.artifact_writer.boto3.client") as mock_client:
+            S3ArtifactWriter(max_workers=16).shutdown()
+
+        config = mock_client.call_args.kwargs["config"]
+        assert config.max_pool_connections == 16
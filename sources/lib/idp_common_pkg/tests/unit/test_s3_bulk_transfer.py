@@ -0,0 +1,221 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import json
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+from idp_common.s3 import BulkTransferError, S3BulkTransfer
+from moto import mock_aws
+
+
+def _client_error(code, status=503):
+    return ClientError(
+        {"Error": {"Code": code}, "ResponseMetadata": {"HTTPStatusCode": status}},
+        "CopyObject",
+    )
+
+
+@pytest.mark.unit
+class TestS3BulkTransfer:
+    """Test the concurrent S3 copy, upload and read pool"""
+
+    @mock_aws
+    def test_copies_uploads_and_reads(self):
+        """Test that queued transfers complete with the requested content types"""
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket="source")
+        client.create_bucket(Bucket="output")
+        for i in range(10):
+            client.put_object(Bucket="source", Key=f"bda/{i}.json", Body=b"{}")
+
+        with S3BulkTransfer(max_workers=4, s3_client=client) as transfer:
+            for i in range(10):
+                transfer.copy(
+                    "source",
+                    f"bda/{i}.json",
+                    "output",
+                    f"doc/{i}.json",
+                    size=2,
+                    extra_args={
+                        "ContentType": "application/json",
+                        "MetadataDirective": "REPLACE",
+                    },
+                )
+            transfer.upload({"text": "hello"}, "output", "doc/parsed.json")
+            read = transfer.read("source", "bda/0.json")
+            transfer.flush()
+
+            assert read.result() == b"{}"
+            assert transfer.stats.copied == 10
+            assert transfer.stats.uploaded == 1
+            assert transfer.stats.read == 1
+
+        copied = client.get_object(Bucket="output", Key="doc/9.json")
+        assert copied["ContentType"] == "application/json"
+        parsed = client.get_object(Bucket="output", Key="doc/parsed.json")
+        assert json.loads(parsed["Body"].read()) == {"text": "hello"}
+
+    @mock_aws
+    def test_large_objects_use_multipart_copy(self):
+        """Test that objects above the threshold are copied in parts"""
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket="bucket")
+        body = b"x" * (12 * 1024 * 1024)
+        client.put_object(Bucket="bucket", Key="large.bin", Body=body)
+
+        with patch.object(client, "copy", wraps=client.copy) as managed_copy:
+            with S3BulkTransfer(
+                max_workers=2,
+                s3_client=client,
+                multipart_threshold=5 * 1024 * 1024,
+                multipart_chunksize=5 * 1024 * 1024,
+            ) as transfer:
+                transfer.copy(
+                    "bucket", "large.bin", "bucket", "copy.bin", size=len(body)
+                )
+                transfer.copy("bucket", "large.bin", "bucket", "single.bin")
+
+        assert managed_copy.call_count == 1
+        copied = client.get_object(Bucket="bucket", Key="copy.bin")
+        assert copied["ContentLength"] == len(body)
+        assert client.head_object(Bucket="bucket", Key="single.bin")[
+            "ContentLength"
+        ] == len(body)
+
+    @patch("idp_common.s3.bulk_transfer.time.sleep")
+    def test_retries_transient_errors(self, mock_sleep):
+        """Test that throttled copies are retried and counted"""
+        client = Mock()
+        client.copy_object.side_effect = [
+            _client_error("SlowDown"),
+            _client_error("InternalError", 500),
+            None,
+        ]
+
+        transfer = S3BulkTransfer(max_workers=1, s3_client=client)
+        transfer.copy("source", "a.json", "output", "a.json")
+        transfer.flush()
+
+        assert client.copy_object.call_count == 3
+        assert transfer.stats.retries == 2
+        assert transfer.stats.copied == 1
+        transfer.shutdown()
+
+    @patch("idp_common.s3.bulk_transfer.time.sleep")
+    def test_flush_reports_failures(self, mock_sleep):
+        """Test that permanent and exhausted failures are raised from flush"""
+        client = Mock()
+
+        def copy_object(**kwargs):
+            if kwargs["Key"] == "denied":
+                raise _client_error("AccessDenied", 403)
+            if kwargs["Key"] == "throttled":
+                raise _client_error("SlowDown")
+
+        client.copy_object.side_effect = copy_object
+
+        transfer = S3BulkTransfer(max_workers=2, s3_client=client, max_attempts=3)
+        for key in ["good", "denied", "throttled"]:
+            transfer.copy("source", key, "output", key)
+
+        with pytest.raises(BulkTransferError) as exc_info:
+            transfer.flush()
+
+        failed = sorted(uri for uri, _ in exc_info.value.failures)
+        assert failed == ["s3://output/denied", "s3://output/throttled"]
+        # One call for the permanent error, max_attempts for the throttled copy
+        assert client.copy_object.call_count == 1 + 1 + 3
+        assert transfer.stats.failed == 2
+        # Failures are reported once
+        transfer.flush()
+        transfer.shutdown()
+
+    def test_failed_read_with_fallback_copy_does_not_fail_flush(self):
+        """Test that a failed read is left to its caller and not reported by flush"""
+        client = Mock()
+        client.get_object.side_effect = _client_error("AccessDenied", 403)
+
+        transfer = S3BulkTransfer(max_workers=1, s3_client=client)
+        read = transfer.read("source", "result.json")
+        with pytest.raises(ClientError):
+            read.result()
+        transfer.copy("source", "result.json", "output", "result.json")
+        transfer.flush()
+
+        assert client.copy_object.call_count == 1
+        assert transfer.stats.copied == 1
+        assert transfer.stats.failed == 0
+        transfer.shutdown()
+
+    def test_pending_transfers_are_bounded(self):
+        """Test that producers block once max_pending transfers are queued"""
+        release = threading.Event()
+        client = Mock()
+        client.copy_object.side_effect = lambda **kwargs: release.wait(5)
+
+        transfer = S3BulkTransfer(max_workers=1, s3_client=client, max_pending=2)
+        transfer.copy("source", "a", "output", "a")
+        transfer.copy("source", "b", "output", "b")
+
+        producer = threading.Thread(
+            target=transfer.copy, args=("source", "c", "output", "c")
+        )
+        producer.start()
+        producer.join(0.2)
+        assert producer.is_alive()
+
+        release.set()
+        producer.join(5)
+        transfer.flush()
+        assert client.copy_object.call_count == 3
+        transfer.shutdown()
+
+    def test_flush_timeout(self):
+        """Test that flush gives up on slow transfers after the timeout"""
+        release = threading.Event()
+        client = Mock()
+        client.copy_object.side_effect = lambda **kwargs: release.wait(5)
+
+        transfer = S3BulkTransfer(max_workers=2, s3_client=client)
+        transfer.copy("source", "a", "output", "a")
+
+        started = time.monotonic()
+        with pytest.raises(TimeoutError, match="1 S3 transfer"):
+            transfer.flush(timeout=0.2)
+        assert time.monotonic() - started < 2
+
+        release.set()
+        transfer.flush(timeout=5)
+        assert transfer.stats.copied == 1
+        transfer.shutdown()
+
+    @patch("idp_common.metrics.put_metric")
+    def test_publish_metrics_resets_counters(self, mock_put_metric):
+        """Test that progress counters are published as metrics and reset"""
+        client = Mock()
+        client.get_object.return_value = {
+            "Body": Mock(read=Mock(return_value=b"12345"))
+        }
+
+        transfer = S3BulkTransfer(max_workers=2, s3_client=client)
+        transfer.read("bucket", "a")
+        transfer.read("bucket", "b")
+        transfer.flush()
+        stats = transfer.publish_metrics("BDAPageResults")
+
+        assert stats.read == 2
+        assert stats.bytes == 10
+        published = {
+            call.args[0]: call.args[1] for call in mock_put_metric.call_args_list
+        }
+        assert published["BDAPageResultsObjects"] == 2
+        assert published["BDAPageResultsBytes"] == 10
+        assert published["BDAPageResultsFailures"] == 0
+        assert "BDAPageResultsDuration" in published
+        assert transfer.stats.completed == 0
+        transfer.shutdown()
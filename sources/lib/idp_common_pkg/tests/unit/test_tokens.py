@@ -0,0 +1,160 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Unit tests for token counting and token-budgeted chunking.
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+from idp_common import tokens
+from idp_common.models import Document, Page
+from idp_common.tokens import (
+    TableTokenizer,
+    Tokenizer,
+    chunk_pages,
+    chunk_text,
+    context_window,
+    count_tokens,
+    get_tokenizer,
+    input_token_budget,
+    model_family,
+    page_token_count,
+    register_tokenizer,
+)
+
+CLAUDE = "us.anthropic.claude-3-7-sonnet-20250219-v1:0"
+NOVA = "us.amazon.nova-pro-v1:0"
+
+PARAGRAPHS = "\n\n".join(
+    f"Paragraph {i}: the insured party shall notify the carrier within 30 days "
+    f"of any claim, stating policy number 4471-{i:04d} and the amount of $1,250.00."
+    for i in range(40)
+)
+
+
+class WordTokenizer(Tokenizer):
+    """One token per whitespace-separated word."""
+
+    name = "words"
+
+    def count(self, text: str) -> int:
+        return len(text.split())
+
+
+@pytest.fixture
+def clean_registry():
+    yield
+    tokens.tokenizers._registered.clear()
+    tokens.tokenizers._loaded.clear()
+
+
+@pytest.mark.unit
+class TestTokenizers:
+    """Tests for the tokenizers per model family."""
+
+    def test_model_family(self):
+        assert model_family(CLAUDE) == "claude"
+        assert model_family(NOVA) == "nova"
+        assert model_family("meta.llama3-70b-instruct-v1:0") == "llama"
+        assert model_family("some-custom-model") == "default"
+        assert model_family(None) == "default"
+
+    def test_counts_differ_from_character_estimate(self):
+        """Numbers, symbols and CJK text cost more tokens than characters / 4."""
+        table = "| 2024-01-15 | 1,234.56 | 7,890.12 |\n" * 10
+        assert count_tokens(table, CLAUDE) > len(table) / 4
+
+        cjk = "請求書番号と支払期日を確認してください" * 5
+        assert count_tokens(cjk, NOVA) > 2 * len(cjk) / 4
+
+        # Plain English prose stays close to the usual estimate
+        prose = "The quarterly report describes revenue growth across regions. " * 20
+        assert len(prose) / 8 < count_tokens(prose, CLAUDE) < len(prose) / 2
+
+    def test_empty_text(self):
+        assert count_tokens("", CLAUDE) == 0
+        assert count_tokens("", None) == 0
+
+    def test_tokenizer_requires_count(self):
+        class NoCountTokenizer(Tokenizer):
+            name = "no-count"
+
+        with pytest.raises(TypeError):
+            NoCountTokenizer()
+
+    def test_register_tokenizer(self, clean_registry):
+        assert isinstance(get_tokenizer(CLAUDE), TableTokenizer)
+
+        register_tokenizer("claude", WordTokenizer())
+        assert count_tokens("three word text", CLAUDE) == 3
+        assert isinstance(get_tokenizer(NOVA), TableTokenizer)
+
+    def test_missing_tokenizer_file_uses_table(
+        self, clean_registry, tmp_path, monkeypatch
+    ):
+        monkeypatch.setenv("TOKENIZER_DIR", str(tmp_path))
+        assert isinstance(get_tokenizer(CLAUDE), TableTokenizer)
+
+    def test_context_window(self):
+        assert context_window(CLAUDE) == 200_000
+        assert context_window("us.amazon.nova-premier-v1:0") == 1_000_000
+        assert context_window("unknown") == 128_000
+        assert input_token_budget(CLAUDE, 4096) == int((200_000 - 4096) * 0.9)
+
+
+@pytest.mark.unit
+class TestChunking:
+    """Tests for token-budgeted chunking."""
+
+    def test_text_within_budget_is_one_chunk(self):
+        assert chunk_text("short text", 100, CLAUDE) == ["short text"]
+
+    def test_chunks_fit_budget_and_rejoin(self):
+        tokenizer = get_tokenizer(CLAUDE)
+        chunks = chunk_text(PARAGRAPHS, 200, CLAUDE)
+
+        assert len(chunks) > 1
+        assert "".join(chunks) == PARAGRAPHS
+        assert all(tokenizer.count(chunk) <= 200 for chunk in chunks)
+        # Chunks end at paragraph boundaries
+        assert all(chunk.endswith("\n\n") for chunk in chunks[:-1])
+
+    def test_oversized_paragraph_is_split_at_words(self):
+        text = "word " * 500
+        chunks = chunk_text(text, 50, tokenizer=WordTokenizer())
+
+        assert "".join(chunks) == text
+        assert all(len(chunk.split()) <= 50 for chunk in chunks)
+
+    def test_overlap(self):
+        text = "".join(f"line {i}\n" for i in range(100))
+        chunks = chunk_text(text, 30, tokenizer=WordTokenizer(), overlap_tokens=6)
+
+        for previous, chunk in zip(chunks, chunks[1:]):
+            # Each chunk starts with the last three lines of the previous one
+            overlap = "".join(chunk.splitlines(keepends=True)[:3])
+            assert previous.endswith(overlap)
+            assert len(chunk.split()) <= 30
+
+    def test_chunk_pages(self):
+        page_tokens = [("1", 400), ("2", 400), ("3", 900), ("4", 1500), ("5", 100)]
+
+        assert chunk_pages(page_tokens, 1000) == [["1", "2"], ["3"], ["4"], ["5"]]
+        assert chunk_pages(page_tokens, 10_000) == [["1", "2", "3", "4", "5"]]
+        assert chunk_pages([], 1000) == []
+
+    def test_page_token_count_is_cached(self):
+        page = Page(page_id="1")
+        tokenizer = MagicMock(wraps=WordTokenizer())
+        tokenizer.name = "words"
+
+        assert page_token_count(page, "four words of text", tokenizer) == 4
+        assert page_token_count(page, "four words of text", tokenizer) == 4
+        assert tokenizer.count.call_count == 1
+        assert page.token_counts == {"words": 4}
+
+        document = Document(id="doc.pdf", pages={"1": page})
+        restored = Document.from_dict(document.to_dict())
+        assert restored.pages["1"].token_counts == {"words": 4}
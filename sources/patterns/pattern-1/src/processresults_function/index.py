@@ -18,7 +18,7 @@ from idp_common import metrics
 from idp_common.docs_service import create_document_service
 from idp_common.config import get_config
 from idp_common.models import Document, HitlMetadata, Page, Section, Status
-from idp_common.s3 import get_s3_client, write_content
+from idp_common.s3 import BulkTransferError, S3BulkTransfer, get_s3_client, write_content
 from idp_common.utils import build_s3_uri
 
 logger = logging.getLogger()
@@ -28,13 +28,15 @@ logging.getLogger('idp_common.bedrock.client').setLevel(os.environ.get("BEDROCK_
 
 # Use the common S3 client
 s3_client = get_s3_client()
+# Concurrent copies, uploads and reads of BDA results, reused across warm invocations
+bulk_transfer = S3BulkTransfer(max_workers=int(os.environ.get('MAX_TRANSFER_WORKERS', '32')))
 ssm_client = boto3.client('ssm')
 bedrock_client = boto3.client('bedrock-data-automation')
 SAGEMAKER_A2I_REVIEW_PORTAL_URL = os.environ.get('SAGEMAKER_A2I_REVIEW_PORTAL_URL', '')
 enable_hitl = os.environ.get('ENABLE_HITL', 'false').lower()
 
 
-def create_metadata_file(file_uri, class_type, file_type=None):
+def create_metadata_file(file_uri, class_type, file_type=None, transfer=None):
     """
     Creates a metadata file alongside the given URI file with the same name plus '.metadata.json'
 
@@ -42,6 +44,8 @@ def create_metadata_file(file_uri, class_type, file_type=None):
         file_uri (str): The S3 URI of the file
         class_type (str): The class type to include in the metadata
         file_type (str, optional): Type of file ('section' or 'page')
+        transfer (S3BulkTransfer, optional): Queue the upload on this transfer pool
+            instead of writing it synchronously; the caller flushes the pool
     """
     try:
         # Parse the S3 URI to get bucket and key
@@ -68,6 +72,10 @@ def create_metadata_file(file_uri, class_type, file_type=None):
             }
         }
 
+        if transfer is not None:
+            transfer.upload(metadata_content, bucket, metadata_key, content_type='application/json')
+            return
+
         # Use the common library to write to S3
         write_content(
             metadata_content,
@@ -102,15 +110,19 @@ def copy_s3_objects(bda_result_bucket, bda_result_prefix, output_bucket, object_
                 bda_result_key = obj['Key']
                 relative_path = bda_result_key[len(bda_result_prefix):].lstrip('/')
                 dest_key = f"{object_key}/{relative_path}"
-                s3_client.copy_object(
-                    CopySource={'Bucket': bda_result_bucket, 'Key': bda_result_key},
-                    Bucket=output_bucket,
-                    Key=dest_key,
-                    ContentType='application/json',
-                    MetadataDirective='REPLACE'
+                bulk_transfer.copy(
+                    bda_result_bucket,
+                    bda_result_key,
+                    output_bucket,
+                    dest_key,
+                    size=obj.get('Size'),
+                    extra_args={'ContentType': 'application/json', 'MetadataDirective': 'REPLACE'}
                 )
                 copied_files += 1
 
+        # Wait for the concurrent copies; raises if any copy failed after retries
+        bulk_transfer.flush()
+        bulk_transfer.publish_metrics('BDAResultCopy')
         logger.info(f"Successfully copied {copied_files} files")
         return copied_files
 
@@ -135,18 +147,15 @@ def create_pdf_page_images(bda_result_bucket, output_bucket, object_key):
             # Render page to an image (pixmap)
             pix = pdf_document[page_num].get_pixmap()
 
-            # Save the image to a BytesIO object
+            # Encode the page image as JPEG
             img_bytes = pix.tobytes("jpeg")
 
-            # Upload the image to S3 using the common library
+            # Queue the upload and render the next page while it runs
             image_key = f"{object_key}/pages/{page_num}/image.jpg"
-            s3_client.upload_fileobj(
-                io.BytesIO(img_bytes),
-                output_bucket,
-                image_key,
-                ExtraArgs={'ContentType': 'image/jpeg'}
-            )
+            bulk_transfer.upload(img_bytes, output_bucket, image_key, content_type='image/jpeg')
 
+        bulk_transfer.flush()
+        bulk_transfer.publish_metrics('PageImageUpload')
         logger.info(f"Successfully created and uploaded {len(pdf_document)} images to S3")
         return len(pdf_document)
 
@@ -158,6 +167,9 @@ def process_bda_sections(bda_result_bucket, bda_result_prefix, output_bucket, ob
     """
     Process BDA sections and build sections for the Document object
 
+    Section files are copied and section result.json files are read concurrently
+    through the shared bulk transfer pool.
+
     Args:
         bda_result_bucket (str): The BDA result bucket
         bda_result_prefix (str): The BDA result prefix
@@ -182,7 +194,8 @@ def process_bda_sections(bda_result_bucket, bda_result_prefix, output_bucket, ob
             Delimiter='/'
         )
 
-        # Process each section folder
+        # Queue the copies of all section files and the reads of the section result.json files
+        section_results = []
         for prefix in response.get('CommonPrefixes', []):
             section_path = prefix.get('Prefix')
             if not section_path:
@@ -198,93 +211,96 @@ def process_bda_sections(bda_result_bucket, bda_result_prefix, output_bucket, ob
                 Prefix=section_path
             )
 
-            # Copy each file to the output bucket
+            result_read = None
             for file_obj in section_files.get('Contents', []):
                 src_key = file_obj['Key']
                 file_name = src_key.split('/')[-1]
                 target_key = f"{target_section_path}{file_name}"
 
-                # Special handling for result.json files to add confidence thresholds
                 if file_name == 'result.json':
-                    try:
-                        # Download the result.json file
-                        result_obj = s3_client.get_object(Bucket=bda_result_bucket, Key=src_key)
-                        result_data = json.loads(result_obj['Body'].read().decode('utf-8'))
-
-                        # Add confidence thresholds to explainability_info if present
-                        if 'explainability_info' in result_data:
-                            result_data['explainability_info'] = add_confidence_thresholds_to_explainability(
-                                result_data['explainability_info'], confidence_threshold
-                            )
-                            logger.info(f"Added confidence threshold {confidence_threshold} to explainability_info in section {section_id}")
-
-                        # Write the modified result.json to the target location
-                        write_content(
-                            result_data,
-                            output_bucket,
-                            target_key,
-                            content_type='application/json'
-                        )
-                        logger.info(f"Processed and copied {src_key} to {target_key}")
-
-                    except Exception as e:
-                        logger.error(f"Error processing result.json {src_key}: {str(e)}")
-                        # Fallback to regular copy if processing fails
-                        s3_client.copy_object(
-                            CopySource={'Bucket': bda_result_bucket, 'Key': src_key},
-                            Bucket=output_bucket,
-                            Key=target_key,
-                            ContentType='application/json',
-                            MetadataDirective='REPLACE'
-                        )
-                        logger.info(f"Fallback copied {src_key} to {target_key}")
+                    # result.json gets confidence thresholds added before it is written
+                    result_read = (src_key, bulk_transfer.read(bda_result_bucket, src_key))
                 else:
                     # Regular copy for non-result.json files
-                    s3_client.copy_object(
-                        CopySource={'Bucket': bda_result_bucket, 'Key': src_key},
-                        Bucket=output_bucket,
-                        Key=target_key,
-                        ContentType='application/json' if file_name.endswith('.json') else 'application/octet-stream',
-                        MetadataDirective='REPLACE'
+                    bulk_transfer.copy(
+                        bda_result_bucket,
+                        src_key,
+                        output_bucket,
+                        target_key,
+                        size=file_obj.get('Size'),
+                        extra_args={
+                            'ContentType': 'application/json' if file_name.endswith('.json') else 'application/octet-stream',
+                            'MetadataDirective': 'REPLACE'
+                        }
                     )
-                    logger.info(f"Copied {src_key} to {target_key}")
+            section_results.append((section_id, target_section_path, result_read))
 
-            # Get the result.json file
+        for section_id, target_section_path, result_read in section_results:
             result_path = f"{target_section_path}result.json"
+            if result_read is None:
+                logger.error(f"Failed to retrieve result.json for section {section_id}: not found")
+                continue
+            src_key, result_future = result_read
+
+            # Special handling for result.json files to add confidence thresholds
+            result_data = None
             try:
-                result_obj = s3_client.get_object(
-                    Bucket=output_bucket,
-                    Key=result_path
-                )
-                result_data = json.loads(result_obj['Body'].read().decode('utf-8'))
-
-                # Extract required fields
-                doc_class = result_data.get('document_class', {}).get('type', '')
-                page_indices = result_data.get('split_document', {}).get('page_indices', [])
-                page_ids = [str(idx) for idx in (page_indices or [])]
-
-                # Create the OutputJSONUri using the utility function
-                extraction_result_uri = build_s3_uri(output_bucket, result_path)
-
-                # Create Section object and add to document
-                section = Section(
-                    section_id=section_id,
-                    classification=doc_class,
-                    confidence=1.0,
-                    page_ids=page_ids,
-                    extraction_result_uri=extraction_result_uri
+                result_data = json.loads(result_future.result().decode('utf-8'))
+
+                # Add confidence thresholds to explainability_info if present
+                if 'explainability_info' in result_data:
+                    result_data['explainability_info'] = add_confidence_thresholds_to_explainability(
+                        result_data['explainability_info'], confidence_threshold
+                    )
+                    logger.info(f"Added confidence threshold {confidence_threshold} to explainability_info in section {section_id}")
+
+                # Write the modified result.json to the target location
+                bulk_transfer.upload(result_data, output_bucket, result_path, content_type='application/json')
+                logger.info(f"Processed and copied {src_key} to {result_path}")
+
+            except Exception as e:
+                logger.error(f"Error processing result.json {src_key}: {str(e)}")
+                # Fallback to regular copy if processing fails
+                bulk_transfer.copy(
+                    bda_result_bucket,
+                    src_key,
+                    output_bucket,
+                    result_path,
+                    extra_args={'ContentType': 'application/json', 'MetadataDirective': 'REPLACE'}
                 )
-                document.sections.append(section)
+                logger.info(f"Fallback copied {src_key} to {result_path}")
+                if not isinstance(result_data, dict):
+                    logger.error(f"Invalid JSON in result.json for section {section_id}: {e}")
+                    continue
 
-                # Create metadata file for the extraction result URI
-                create_metadata_file(extraction_result_uri, doc_class, 'section')
+            # Extract required fields
+            doc_class = result_data.get('document_class', {}).get('type', '')
+            page_indices = result_data.get('split_document', {}).get('page_indices', [])
+            page_ids = [str(idx) for idx in (page_indices or [])]
+
+            # Create the OutputJSONUri using the utility function
+            extraction_result_uri = build_s3_uri(output_bucket, result_path)
+
+            # Create Section object and add to document
+            section = Section(
+                section_id=section_id,
+                classification=doc_class,
+                confidence=1.0,
+                page_ids=page_ids,
+                extraction_result_uri=extraction_result_uri
+            )
+            document.sections.append(section)
 
-            except ClientError as e:
-                logger.error(f"Failed to retrieve result.json for section {section_id}: {e}")
-                continue
-            except json.JSONDecodeError as e:
-                logger.error(f"Invalid JSON in result.json for section {section_id}: {e}")
-                continue
+            # Create metadata file for the extraction result URI
+            create_metadata_file(extraction_result_uri, doc_class, 'section', transfer=bulk_transfer)
+
+        # Sections reference the copied files, so wait for every transfer before returning
+        try:
+            bulk_transfer.flush()
+        except BulkTransferError as e:
+            logger.error(f"Failed to copy section files: {e}")
+            document.errors.append(f"Failed to copy section files: {str(e)}")
+        bulk_transfer.publish_metrics('BDASectionCopy')
 
         logger.info(f"Processed {len(document.sections)} sections for document {object_key}")
         return document
@@ -294,6 +310,7 @@ def process_bda_sections(bda_result_bucket, bda_result_prefix, output_bucket, ob
         document.errors.append(f"Failed to list sections: {str(e)}")
         return document
 
+
 def extract_markdown_from_json(raw_json):
     """
     Extract markdown content from BDA result JSON
@@ -424,10 +441,37 @@ def extract_markdown_from_single_page_json(raw_json):
             return page["representation"]["markdown"]
     return ""
 
+def list_page_images(output_bucket, pages_output_prefix):
+    """
+    List the page image keys under a document's pages prefix
+
+    Args:
+        output_bucket (str): The output bucket
+        pages_output_prefix (str): The pages prefix, e.g. '<object_key>/pages/'
+
+    Returns:
+        set: The image.jpg keys, or None if the prefix could not be listed
+    """
+    try:
+        image_keys = set()
+        paginator = s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=output_bucket, Prefix=pages_output_prefix):
+            for obj in page.get('Contents', []):
+                if obj['Key'].endswith('/image.jpg'):
+                    image_keys.add(obj['Key'])
+        return image_keys
+    except ClientError as e:
+        logger.warning(f"Failed to list page images under {pages_output_prefix}: {e}")
+        return None
+
+
 def process_bda_pages(bda_result_bucket, bda_result_prefix, output_bucket, object_key, document, confidence_threshold=0.8):
     """
     Process BDA page outputs and build pages for the Document object
 
+    Result files are read and page files are written concurrently through the
+    shared bulk transfer pool.
+
     Args:
         bda_result_bucket (str): The BDA result bucket
         bda_result_prefix (str): The BDA result prefix
@@ -458,21 +502,20 @@ def process_bda_pages(bda_result_bucket, bda_result_prefix, output_bucket, objec
             Prefix=standard_output_prefix
         )
 
-        # Process all standard_output result.json files which may contain multiple pages
-        for obj in response.get('Contents', []):
-            obj_key = obj['Key']
+        # Read all standard_output result.json files concurrently
+        result_reads = [
+            (obj['Key'], bulk_transfer.read(bda_result_bucket, obj['Key']))
+            for obj in response.get('Contents', [])
+            if obj['Key'].endswith('result.json')
+        ]
 
-            # Only process result.json files
-            if not obj_key.endswith('result.json'):
-                continue
+        # One listing of the page images instead of a HEAD request per page
+        image_keys = list_page_images(output_bucket, pages_output_prefix)
 
+        # Process all standard_output result.json files which may contain multiple pages
+        for obj_key, result_future in result_reads:
             try:
-                # Get the raw JSON result from the BDA result bucket
-                result_obj = s3_client.get_object(
-                    Bucket=bda_result_bucket,
-                    Key=obj_key
-                )
-                raw_json = json.loads(result_obj['Body'].read().decode('utf-8'))
+                raw_json = json.loads(result_future.result().decode('utf-8'))
 
                 # Check if this contains pages
                 if 'pages' in raw_json and len(raw_json['pages']) > 0:
@@ -493,7 +536,7 @@ def process_bda_pages(bda_result_bucket, bda_result_prefix, output_bucket, objec
                         page_result_path = f"{page_path}result.json"
 
                         # Write the single page result.json to the page directory
-                        write_content(
+                        bulk_transfer.upload(
                             single_page_json,
                             output_bucket,
                             page_result_path,
@@ -507,10 +550,17 @@ def process_bda_pages(bda_result_bucket, bda_result_prefix, output_bucket, objec
                         image_path = f"{page_path}image.jpg"
 
                         # Check if image exists
-                        try:
-                            s3_client.head_object(Bucket=output_bucket, Key=image_path)
+                        if image_keys is not None:
+                            image_exists = image_path in image_keys
+                        else:
+                            try:
+                                s3_client.head_object(Bucket=output_bucket, Key=image_path)
+                                image_exists = True
+                            except ClientError:
+                                image_exists = False
+                        if image_exists:
                             image_uri = build_s3_uri(output_bucket, image_path)
-                        except ClientError:
+                        else:
                             image_uri = None
                             logger.warning(f"image.jpg not found for page {page_id}")
 
@@ -527,7 +577,7 @@ def process_bda_pages(bda_result_bucket, bda_result_prefix, output_bucket, objec
 
                         # Write parsedResult.json to S3
                         parsed_result_path = f"{page_path}parsedResult.json"
-                        write_content(
+                        bulk_transfer.upload(
                             parsed_result,
                             output_bucket,
                             parsed_result_path,
@@ -540,7 +590,7 @@ def process_bda_pages(bda_result_bucket, bda_result_prefix, output_bucket, objec
                         logger.info(f"Created parsedResult.json for page {page_id}")
 
                         # Create metadata file for the parsed result URI
-                        create_metadata_file(parsed_result_uri, doc_class, 'page')
+                        create_metadata_file(parsed_result_uri, doc_class, 'page', transfer=bulk_transfer)
 
                         # Create Page object and add to document
                         page = Page(
@@ -558,6 +608,14 @@ def process_bda_pages(bda_result_bucket, bda_result_prefix, output_bucket, objec
                 logger.error(f"Error processing result file {obj_key}: {str(e)}")
                 document.errors.append(f"Error processing result file {obj_key}: {str(e)}")
 
+        # Pages reference the written files, so wait for every transfer before returning
+        try:
+            bulk_transfer.flush()
+        except BulkTransferError as e:
+            logger.error(f"Failed to write page files: {e}")
+            document.errors.append(f"Failed to write page files: {str(e)}")
+        bulk_transfer.publish_metrics('BDAPageResults')
+
         # Update document page count
         document.num_pages = len(document.pages)
         logger.info(f"Processed {document.num_pages} pages for document {object_key}")
@@ -968,6 +1026,7 @@ def process_segments(
 
     return document, overall_hitl_triggered
 
+@metrics.flush_metrics_on_return
 def handler(event, context):
     """
     Process the BDA results and build a Document object with pages and sections.
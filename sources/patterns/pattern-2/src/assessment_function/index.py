@@ -6,7 +6,7 @@ import json
 import time
 import logging
 
-from idp_common import get_config, assessment
+from idp_common import get_config, assessment, metrics
 from idp_common.models import Document, Status
 from idp_common.docs_service import create_document_service
 from idp_common import s3
@@ -92,6 +92,7 @@ def check_document_for_throttling_errors(document):
     return False, None
 
 @xray_recorder.capture('assessment_function')
+@metrics.flush_metrics_on_return
 def handler(event, context):
     """
     Lambda handler for document assessment.
@@ -119,7 +120,8 @@ def handler(event, context):
 
     # Convert document data to Document object - handle compression
     working_bucket = os.environ.get('WORKING_BUCKET')
-    document = Document.load_document(document_data, working_bucket, logger)
+    # Only the section being assessed and its pages are loaded
+    document = Document.load_section(working_bucket, document_data, section_id)
     logger.info(f"Processing assessment for document {document.id}, section {section_id}")
 
     # X-Ray annotations
@@ -28,6 +28,7 @@ logger.setLevel(os.environ.get("LOG_LEVEL", "INFO"))
 logging.getLogger('idp_common.bedrock.client').setLevel(os.environ.get("BEDROCK_LOG_LEVEL", "INFO"))
 
 @xray_recorder.capture('classification_function')
+@metrics.flush_metrics_on_return
 def handler(event, context):
     """
     Lambda handler for document classification.
@@ -13,10 +13,11 @@ import os
 import logging
 import time
 import boto3
+from decimal import Decimal
 from enum import Enum
 from typing import Dict, Any, Optional
 
-from idp_common import get_config, evaluation
+from idp_common import get_config, evaluation, metrics
 from idp_common.models import Document, Status
 from idp_common.docs_service import create_document_service
 
@@ -24,6 +25,11 @@ from idp_common.docs_service import create_document_service
 BASELINE_BUCKET = os.environ.get('BASELINE_BUCKET')
 REPORTING_BUCKET = os.environ.get('REPORTING_BUCKET')
 SAVE_REPORTING_FUNCTION_NAME = os.environ.get('SAVE_REPORTING_FUNCTION_NAME', 'SaveReportingData')
+TRACKING_TABLE = os.environ.get('TRACKING_TABLE')
+
+# Overall metrics stored in test run result rows
+TEST_RUN_METRICS = ['accuracy', 'weighted_overall_score', 'precision', 'recall',
+                    'f1_score', 'false_alarm_rate', 'false_discovery_rate']
 
 # Set up logging
 logger = logging.getLogger()
@@ -122,6 +128,60 @@ def load_baseline_document(document_key: str) -> Optional[Document]:
         raise ValueError(f"Failed to load baseline document: {str(e)}")
 
 
+def _to_decimal(value: Optional[float]) -> Optional[Decimal]:
+    return Decimal(str(value)) if value is not None else None
+
+def record_test_run_evaluation(document: Document) -> None:
+    """
+    Store the evaluation metrics of a test run document in its test run result row
+
+    The workflow tracker writes the row (PK testrun#<test_run_id>, SK doc#<file>)
+    when the workflow succeeds, usually before the evaluation report exists. The
+    test results resolver aggregates a test run from these rows, so the metrics
+    are added here once the report is written.
+
+    Args:
+        document: The evaluated Document
+
+    Note: This function handles its own errors
+    """
+    if not TRACKING_TABLE or '/' not in (document.input_key or '') or not document.evaluation_result:
+        return
+
+    test_run_id, file_key = document.input_key.split('/', 1)
+    try:
+        table = boto3.resource('dynamodb').Table(TRACKING_TABLE)
+        response = table.get_item(
+            Key={'PK': f'testrun#{test_run_id}', 'SK': 'metadata'},
+            ProjectionExpression='PK'
+        )
+        if 'Item' not in response:
+            return
+
+        results = document.evaluation_result.to_dict()
+        overall_metrics = results.get('overall_metrics', {})
+        metrics = {name: _to_decimal(overall_metrics.get(name)) for name in TEST_RUN_METRICS}
+        confidences = [
+            float(attr['confidence'])
+            for section in results.get('section_results', [])
+            for attr in section.get('attributes', [])
+            if attr.get('confidence') is not None
+        ]
+        metrics['average_confidence'] = _to_decimal(sum(confidences) / len(confidences)) if confidences else None
+
+        table.update_item(
+            Key={'PK': f'testrun#{test_run_id}', 'SK': f'doc#{file_key}'},
+            UpdateExpression='SET EvaluationStatus = :status, EvaluationReportUri = :uri, EvaluationMetrics = :metrics',
+            ExpressionAttributeValues={
+                ':status': EvaluationStatus.COMPLETED.value,
+                ':uri': document.evaluation_report_uri,
+                ':metrics': metrics
+            }
+        )
+        logger.info(f"Recorded evaluation of {document.input_key} for test run {test_run_id}")
+    except Exception as e:
+        # The resolver falls back to the document's tracking item and evaluation report
+        logger.error(f"Failed to record test run evaluation for {document.input_key}: {e}", exc_info=True)
 
 def create_response(status_code: int, message: str, additional_data: Dict[str, Any] = None) -> Dict[str, Any]:
     """
@@ -144,6 +204,7 @@ def create_response(status_code: int, message: str, additional_data: Dict[str, A
     }
     return response
 
+@metrics.flush_metrics_on_return
 def handler(event, context):
     """
     Lambda function handler
@@ -236,6 +297,7 @@ def handler(event, context):
         # Update document evaluation status to COMPLETED
         # Note: We discard the return value to keep using evaluated_document with correct URIs
         update_document_evaluation_status(evaluated_document, EvaluationStatus.COMPLETED)
+        record_test_run_evaluation(evaluated_document)
         logger.info(f"Evaluation process completed successfully in {time.time() - start_time:.2f} seconds")
 
         # Return document in state machine format
@@ -21,6 +21,7 @@ logger.setLevel(os.environ.get("LOG_LEVEL", "INFO"))
 logging.getLogger('idp_common.bedrock.client').setLevel(os.environ.get("BEDROCK_LOG_LEVEL", "INFO"))
 
 
+@metrics.flush_metrics_on_return
 def handler(event, context):
     """
     Process a single section of a document for information extraction
@@ -35,14 +36,6 @@ def handler(event, context):
     # For Map state, we get just one section from the document
     # Extract the document and section from the event - handle both compressed and uncompressed
     working_bucket = os.environ.get('WORKING_BUCKET')
-    full_document = Document.load_document(event.get("document", {}), working_bucket, logger)
-
-    # Log loaded document for troubleshooting
-    logger.info(f"Loaded document - ID: {full_document.id}, input_key: {full_document.input_key}")
-    logger.info(f"Document buckets - input_bucket: {full_document.input_bucket}, output_bucket: {full_document.output_bucket}")
-    logger.info(f"Document status: {full_document.status}, num_pages: {full_document.num_pages}")
-    logger.info(f"Document pages count: {len(full_document.pages)}, sections count: {len(full_document.sections)}")
-    logger.info(f"Full document content: {json.dumps(full_document.to_dict(), default=str)}")
 
     # Get the section ID directly from the Map state input
     # Now using the simplified array of section IDs format
@@ -51,7 +44,18 @@ def handler(event, context):
     if not section_id:
         raise ValueError("No section_id found in event")
 
-    # Look up the full section from the decompressed document
+    # Only the section processed by this Map iteration and its pages are loaded
+    full_document = Document.load_section(working_bucket, event.get("document", {}), section_id)
+
+    # Log loaded document for troubleshooting
+    logger.info(f"Loaded document - ID: {full_document.id}, input_key: {full_document.input_key}")
+    logger.info(f"Document buckets - input_bucket: {full_document.input_bucket}, output_bucket: {full_document.output_bucket}")
+    logger.info(f"Document status: {full_document.status}, num_pages: {full_document.num_pages}")
+    logger.info(f"Document pages count: {len(full_document.pages)}, sections count: {len(full_document.sections)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Section document content: {json.dumps(full_document.to_dict(), default=str)}")
+
+    # Look up the section in the section-scoped document
     section = None
     for doc_section in full_document.sections:
         if doc_section.section_id == section_id:
@@ -12,6 +12,7 @@ import os
 import re
 from urllib.parse import urlparse
 from botocore.exceptions import ClientError
+from idp_common import metrics
 from idp_common.bedrock.client import BedrockClient
 
 # Set up logging
@@ -106,6 +107,7 @@ def get_summarization_model():
         logger.error(f"Error getting summarization model from config: {str(e)}")
         return 'us.amazon.nova-pro-v1:0'  # Fallback default
 
+@metrics.flush_metrics_on_return
 def handler(event, context):
     response_data = {}
 
@@ -6,6 +6,7 @@ import json
 import os
 import boto3
 import logging
+from boto3.dynamodb.conditions import Key
 from botocore.exceptions import ClientError
 
 # Configure logging
@@ -56,6 +57,9 @@ def lambda_handler(event, context):
                 if baseline_bucket:
                     _delete_baseline_files(baseline_bucket, test_run_id)
 
+                # Delete test run list entry and per-document result rows
+                _delete_test_run_items(tracking_table, test_run_id, item.get('CreatedAt'))
+
                 # Delete test run metadata
                 tracking_table.delete_item(
                     Key={'PK': f"testrun#{test_run_id}", 'SK': "metadata"}
@@ -112,3 +116,30 @@ def _delete_baseline_files(baseline_bucket, test_run_id):
     except Exception as e:
         logger.error(f"Failed to delete baseline files for test run {test_run_id}: {e}")
         # Don't raise - continue with other cleanup
+
+def _delete_test_run_items(tracking_table, test_run_id, created_at):
+    """Delete the test run list entry and the per-document result rows of the test run"""
+    try:
+        keys = []
+        if created_at:
+            keys.append({'PK': 'list#testruns', 'SK': f"ts#{created_at}#id#{test_run_id}"})
+
+        query_kwargs = {
+            'KeyConditionExpression': Key('PK').eq(f"testrun#{test_run_id}") & Key('SK').begins_with('doc#'),
+            'ProjectionExpression': 'PK, SK'
+        }
+        while True:
+            response = tracking_table.query(**query_kwargs)
+            keys.extend({'PK': row['PK'], 'SK': row['SK']} for row in response.get('Items', []))
+            if 'LastEvaluatedKey' not in response:
+                break
+            query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+        with tracking_table.batch_writer() as batch:
+            for key in keys:
+                batch.delete_item(Key=key)
+        logger.info(f"Deleted {len(keys)} list and result items for test run {test_run_id}")
+
+    except Exception as e:
+        logger.error(f"Failed to delete list and result items for test run {test_run_id}: {e}")
+        # Don't raise - continue with other cleanup
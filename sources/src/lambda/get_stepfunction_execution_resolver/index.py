@@ -4,7 +4,9 @@
 import boto3
 import json
 import logging
+import os
 import traceback
+from collections import OrderedDict
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 
@@ -15,6 +17,13 @@ logger.setLevel(logging.INFO)
 # Create boto3 client with logging
 stepfunctions = boto3.client('stepfunctions')
 
+TERMINAL_STATUSES = {'SUCCEEDED', 'FAILED', 'TIMED_OUT', 'ABORTED'}
+
+# Parsed history of recently viewed executions, kept across warm invocations so
+# that refreshing the document details view only fetches and parses new events
+MAX_CACHED_EXECUTIONS = int(os.environ.get('MAX_CACHED_EXECUTIONS', '20'))
+_execution_cache = OrderedDict()  # Execution ARN -> {'parser': ExecutionHistoryParser, 'complete': bool}
+
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     Lambda handler to get Step Functions execution details
@@ -47,72 +56,53 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         api_duration = (datetime.now() - start_time).total_seconds()
         logger.info(f"describe_execution API call took {api_duration:.2f} seconds")
         
-        # Get execution history with pagination to capture all events
-        all_events = []
-        next_token = None
-        page_count = 0
-        
-        logger.info(f"Starting to fetch execution history for {execution_arn}")
-        history_start_time = datetime.now()
+        # Reuse the parsed history of this execution from a previous invocation
+        cached = _execution_cache.pop(execution_arn, None)
+        if cached is None:
+            cached = {'parser': ExecutionHistoryParser(), 'complete': False}
+        parser = cached['parser']
         
-        while True:
-            page_count += 1
-            history_params = {
-                'executionArn': execution_arn,
-                'maxResults': 1000,  # Increased to capture more events
-                'reverseOrder': False
-            }
+        if cached['complete']:
+            logger.info(f"Execution history of {execution_arn} is complete, using cached steps")
+        else:
+            # Get only the events after the last parsed event
+            new_events = fetch_new_events(execution_arn, parser.last_event_id)
             
-            if next_token:
-                history_params['nextToken'] = next_token
+            # Log event types and counts for debugging
+            event_type_counts = {}
+            for event in new_events:
+                event_type = event['type']
+                event_type_counts[event_type] = event_type_counts.get(event_type, 0) + 1
             
-            page_start_time = datetime.now()
-            logger.info(f"Fetching execution history page {page_count} with params: {history_params}")
+            logger.info(f"Event type counts: {json.dumps(event_type_counts)}")
             
-            try:
-                history_response = stepfunctions.get_execution_history(**history_params)
-                page_events = history_response['events']
-                all_events.extend(page_events)
-                
-                page_duration = (datetime.now() - page_start_time).total_seconds()
-                logger.info(f"Retrieved page {page_count} with {len(page_events)} events in {page_duration:.2f} seconds")
-                
-                next_token = history_response.get('nextToken')
-                if not next_token:
-                    break
-            except Exception as history_error:
-                logger.error(f"Failed to fetch execution history page {page_count}: {str(history_error)}")
-                logger.error(f"Error details: {traceback.format_exc()}")
-                raise history_error
-        
-        history_duration = (datetime.now() - history_start_time).total_seconds()
-        logger.info(f"Retrieved {len(all_events)} total events in {page_count} pages, took {history_duration:.2f} seconds")
-        
-        # Log event types and counts for debugging
-        event_type_counts = {}
-        for event in all_events:
-            event_type = event['type']
-            event_type_counts[event_type] = event_type_counts.get(event_type, 0) + 1
-        
-        logger.info(f"Event type counts: {json.dumps(event_type_counts)}")
+            # Check for failure events specifically
+            failure_events = [e for e in new_events if 'Failed' in e['type'] or 'TimedOut' in e['type'] or 'Aborted' in e['type']]
+            if failure_events:
+                logger.info(f"Found {len(failure_events)} failure events")
+                for i, failure in enumerate(failure_events):
+                    logger.info(f"Failure event {i+1}: Type={failure['type']}, ID={failure['id']}")
+                    # Log detailed failure information
+                    if 'taskFailedEventDetails' in failure:
+                        details = failure['taskFailedEventDetails']
+                        logger.info(f"Task failure details: Error={details.get('error')}, Cause={details.get('cause')}")
+            
+            # Process execution details
+            parse_start_time = datetime.now()
+            logger.info(f"Starting to parse {len(new_events)} new execution history events")
+            parser.feed(new_events)
+            parse_duration = (datetime.now() - parse_start_time).total_seconds()
+            logger.info(f"Parsed execution history up to event {parser.last_event_id} in {parse_duration:.2f} seconds")
+            
+            # The history of an execution that had already stopped when it was fetched is final
+            cached['complete'] = execution_response['status'] in TERMINAL_STATUSES
         
-        # Check for failure events specifically
-        failure_events = [e for e in all_events if 'Failed' in e['type'] or 'TimedOut' in e['type'] or 'Aborted' in e['type']]
-        if failure_events:
-            logger.info(f"Found {len(failure_events)} failure events")
-            for i, failure in enumerate(failure_events):
-                logger.info(f"Failure event {i+1}: Type={failure['type']}, ID={failure['id']}")
-                # Log detailed failure information
-                if 'taskFailedEventDetails' in failure:
-                    details = failure['taskFailedEventDetails']
-                    logger.info(f"Task failure details: Error={details.get('error')}, Cause={details.get('cause')}")
+        _execution_cache[execution_arn] = cached
+        while len(_execution_cache) > MAX_CACHED_EXECUTIONS:
+            _execution_cache.popitem(last=False)
         
-        # Process execution details
-        parse_start_time = datetime.now()
-        logger.info("Starting to parse execution history")
-        steps = parse_execution_history(all_events)
-        parse_duration = (datetime.now() - parse_start_time).total_seconds()
-        logger.info(f"Parsed execution history into {len(steps)} steps in {parse_duration:.2f} seconds")
+        steps = parser.steps()
+        logger.info(f"Execution history has {len(steps)} steps")
         
         # Check for failed steps
         failed_steps = [s for s in steps if s['status'] == 'FAILED']
@@ -173,36 +163,132 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'steps': []
         }
 
-def parse_execution_history(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def fetch_new_events(execution_arn: str, last_event_id: int = 0) -> List[Dict[str, Any]]:
     """
-    Parse Step Functions execution history events into step details with enhanced Map state support
-    
+    Fetch the execution history events after the given event ID
+
+    History is read newest first, so only the pages with new events are fetched.
+
     Args:
-        events: List of execution history events
-        
+        execution_arn: ARN of the Step Functions execution
+        last_event_id: ID of the last event that was already parsed, 0 for the full history
+
     Returns:
-        List of step details including Map state iterations
+        New events in history order
     """
-    steps = []
-    step_map = {}
-    event_id_to_step = {}  # Map event IDs to step names for correlation
-    map_iterations = {}  # Track Map state iterations
+    new_events = []
+    next_token = None
+    page_count = 0
+    
+    logger.info(f"Fetching execution history of {execution_arn} after event {last_event_id}")
+    history_start_time = datetime.now()
     
-    # First pass: identify all states and their basic information
-    for event in events:
+    while True:
+        page_count += 1
+        history_params = {
+            'executionArn': execution_arn,
+            'maxResults': 1000,
+            'reverseOrder': True
+        }
+        
+        if next_token:
+            history_params['nextToken'] = next_token
+        
+        page_start_time = datetime.now()
+        logger.info(f"Fetching execution history page {page_count} with params: {history_params}")
+        
+        try:
+            history_response = stepfunctions.get_execution_history(**history_params)
+        except Exception as history_error:
+            logger.error(f"Failed to fetch execution history page {page_count}: {str(history_error)}")
+            logger.error(f"Error details: {traceback.format_exc()}")
+            raise history_error
+        
+        page_events = [e for e in history_response['events'] if e['id'] > last_event_id]
+        new_events.extend(page_events)
+        
+        page_duration = (datetime.now() - page_start_time).total_seconds()
+        logger.info(f"Retrieved page {page_count} with {len(page_events)} new events in {page_duration:.2f} seconds")
+        
+        next_token = history_response.get('nextToken')
+        # Stop at the end of the history or at the first page that reaches parsed events
+        if not next_token or len(page_events) < len(history_response['events']):
+            break
+    
+    history_duration = (datetime.now() - history_start_time).total_seconds()
+    logger.info(f"Retrieved {len(new_events)} new events in {page_count} pages, took {history_duration:.2f} seconds")
+    
+    new_events.reverse()
+    return new_events
+
+STATE_ENTERED_EVENTS = {'TaskStateEntered', 'ChoiceStateEntered', 'PassStateEntered', 'WaitStateEntered', 'ParallelStateEntered', 'MapStateEntered'}
+STATE_EXITED_EVENTS = {'TaskStateExited', 'ChoiceStateExited', 'PassStateExited', 'WaitStateExited', 'ParallelStateExited', 'MapStateExited'}
+TASK_FAILURE_EVENTS = {'TaskFailed', 'TaskTimedOut', 'TaskAborted', 'LambdaFunctionFailed'}
+
+# Internal fields of parsed steps that are not returned to the UI
+INTERNAL_STEP_FIELDS = ('eventId', 'isMapState', 'isMapIteration', 'iterationIndex', 'parentMapName', 'isExecutionFailure')
+
+
+class ExecutionHistoryParser:
+    """
+    Incremental parser of Step Functions execution history events into step details
+
+    Every event is handled in constant time: running steps are indexed by state name
+    and Map iterations by (map name, iteration index), and the step an event belongs
+    to is found through its previousEventId chain instead of scanning all steps.
+    Events can be fed in several batches, in history order, as new history pages
+    are fetched.
+    """
+
+    def __init__(self):
+        self.step_map = {}  # Step key -> step details, in the order the steps started
+        self.open_steps = {}  # State name -> running step keys, oldest first
+        self.open_iterations = {}  # (map name, iteration index) -> running iteration keys
+        self.map_iterations = {}  # Map name -> iteration keys
+        self.event_owner = {}  # Event ID -> key of the step the event belongs to
+        self.last_task_entered = None  # Key of the most recently entered Task state
+        self.last_event_id = 0
+        self._snapshot = None
+        self._snapshot_event_id = None
+
+    def feed(self, events: List[Dict[str, Any]]) -> None:
+        """
+        Parse events that follow the events parsed so far
+
+        Args:
+            events: Execution history events in history order
+        """
+        for event in events:
+            if event['id'] <= self.last_event_id:
+                continue
+            self._handle(event)
+            self.last_event_id = event['id']
+
+    def steps(self) -> List[Dict[str, Any]]:
+        """
+        Step details including Map state iterations, sorted by start time
+
+        The list is rebuilt only when new events were parsed since the last call.
+        """
+        if self._snapshot is None or self._snapshot_event_id != self.last_event_id:
+            self._snapshot = self._build_steps()
+            self._snapshot_event_id = self.last_event_id
+        return self._snapshot
+
+    def _handle(self, event: Dict[str, Any]) -> None:
         event_type = event['type']
         event_id = event['id']
         timestamp = event['timestamp'].isoformat()
-        
+
         # Handle state entered events
-        if event_type in ['TaskStateEntered', 'ChoiceStateEntered', 'PassStateEntered', 'WaitStateEntered', 'ParallelStateEntered', 'MapStateEntered']:
+        if event_type in STATE_ENTERED_EVENTS:
             step_name = event['stateEnteredEventDetails']['name']
             step_type = event_type.replace('StateEntered', '')
-            
+
             # Create unique key for this step instance
             step_key = f"{step_name}_{event_id}"
-            
-            step_map[step_key] = {
+
+            self.step_map[step_key] = {
                 'name': step_name,
                 'type': step_type,
                 'status': 'RUNNING',
@@ -214,30 +300,33 @@ def parse_execution_history(events: List[Dict[str, Any]]) -> List[Dict[str, Any]
                 'eventId': event_id,
                 'isMapState': step_type == 'Map'
             }
-            event_id_to_step[event_id] = step_key
-            
+            self.open_steps.setdefault(step_name, {})[step_key] = None
+            self.event_owner[event_id] = step_key
+            if step_type == 'Task':
+                self.last_task_entered = step_key
+
         # Handle state exited events (successful completion)
-        elif event_type in ['TaskStateExited', 'ChoiceStateExited', 'PassStateExited', 'WaitStateExited', 'ParallelStateExited', 'MapStateExited']:
+        elif event_type in STATE_EXITED_EVENTS:
             step_name = event['stateExitedEventDetails']['name']
-            
-            # Find the corresponding step by name and update it
-            for step_key, step_data in step_map.items():
-                if step_data['name'] == step_name and step_data['status'] == 'RUNNING':
-                    step_data['status'] = 'SUCCEEDED'
-                    step_data['stopDate'] = timestamp
-                    step_data['output'] = event['stateExitedEventDetails'].get('output')
-                    break
-                    
+            step_key = self._running_step(event, step_name)
+            if step_key:
+                step_data = self.step_map[step_key]
+                step_data['status'] = 'SUCCEEDED'
+                step_data['stopDate'] = timestamp
+                step_data['output'] = event['stateExitedEventDetails'].get('output')
+                self._close_step(step_key)
+                self.event_owner[event_id] = step_key
+
         # Handle Map iteration events
         elif event_type == 'MapIterationStarted':
             iteration_details = event.get('mapIterationStartedEventDetails', {})
             map_name = iteration_details.get('name', 'Unknown')
             iteration_index = iteration_details.get('index', 0)
-            
+
             # Create a unique key for this iteration
             iteration_key = f"{map_name}_iteration_{iteration_index}_{event_id}"
-            
-            step_map[iteration_key] = {
+
+            self.step_map[iteration_key] = {
                 'name': f"{map_name} (Iteration {iteration_index + 1})",
                 'type': 'MapIteration',
                 'status': 'RUNNING',
@@ -251,213 +340,52 @@ def parse_execution_history(events: List[Dict[str, Any]]) -> List[Dict[str, Any]
                 'iterationIndex': iteration_index,
                 'parentMapName': map_name
             }
-            
+            self.open_iterations.setdefault((map_name, iteration_index), {})[iteration_key] = None
+
             # Track iterations for the parent Map state
-            if map_name not in map_iterations:
-                map_iterations[map_name] = []
-            map_iterations[map_name].append(iteration_key)
-            
+            self.map_iterations.setdefault(map_name, []).append(iteration_key)
+
         elif event_type == 'MapIterationSucceeded':
             iteration_details = event.get('mapIterationSucceededEventDetails', {})
-            map_name = iteration_details.get('name', 'Unknown')
-            iteration_index = iteration_details.get('index', 0)
-            
-            # Find and update the corresponding iteration
-            for step_key, step_data in step_map.items():
-                if (step_data.get('parentMapName') == map_name and 
-                    step_data.get('iterationIndex') == iteration_index and 
-                    step_data['status'] == 'RUNNING'):
-                    step_data['status'] = 'SUCCEEDED'
-                    step_data['stopDate'] = timestamp
-                    step_data['output'] = iteration_details.get('output')
-                    break
-                    
+            iteration_key = self._close_iteration(iteration_details)
+            if iteration_key:
+                step_data = self.step_map[iteration_key]
+                step_data['status'] = 'SUCCEEDED'
+                step_data['stopDate'] = timestamp
+                step_data['output'] = iteration_details.get('output')
+
         elif event_type == 'MapIterationFailed':
             iteration_details = event.get('mapIterationFailedEventDetails', {})
-            map_name = iteration_details.get('name', 'Unknown')
-            iteration_index = iteration_details.get('index', 0)
-            error = iteration_details.get('error', 'Map iteration failed')
-            cause = iteration_details.get('cause', '')
-            
-            # Format error message with cause if available
-            error_message = error
-            if cause:
-                try:
-                    # Try to parse cause as JSON for better formatting
-                    cause_json = json.loads(cause)
-                    if isinstance(cause_json, dict):
-                        if 'errorMessage' in cause_json:
-                            error_message = f"{error}: {cause_json['errorMessage']}"
-                        elif 'message' in cause_json:
-                            error_message = f"{error}: {cause_json['message']}"
-                        else:
-                            error_message = f"{error}: {json.dumps(cause_json)}"
-                except (json.JSONDecodeError, TypeError):
-                    # If cause is not JSON, append it as-is
-                    error_message = f"{error}: {cause}"
-            
-            # Find and update the corresponding iteration
-            for step_key, step_data in step_map.items():
-                if (step_data.get('parentMapName') == map_name and 
-                    step_data.get('iterationIndex') == iteration_index and 
-                    step_data['status'] == 'RUNNING'):
-                    step_data['status'] = 'FAILED'
-                    step_data['stopDate'] = timestamp
-                    step_data['error'] = error_message
-                    break
-                    
-        # Handle task failure events
-        elif event_type == 'TaskFailed':
-            # Log basic failure info without full event serialization
-            logger.debug(f"Processing TaskFailed event ID: {event.get('id')}")
-            
-            step_name = find_step_name_for_failure_event(event, events, event_id_to_step)
-            step_key = None
-            
-            # Find the corresponding step
-            if step_name:
-                for key, data in step_map.items():
-                    if data['name'] == step_name and data['status'] == 'RUNNING':
-                        step_key = key
-                        break
-            
-            if step_key:
-                step_map[step_key]['status'] = 'FAILED'
-                step_map[step_key]['stopDate'] = timestamp
-                
-                # Extract error details
-                task_failed_details = event.get('taskFailedEventDetails', {})
-                error_message = task_failed_details.get('error', 'Unknown error')
-                cause = task_failed_details.get('cause', '')
-                
-                # Enhanced error message formatting
-                if cause:
-                    try:
-                        # Try to parse cause as JSON for better formatting
-                        cause_json = json.loads(cause)
-                        if isinstance(cause_json, dict):
-                            # Format Lambda errors nicely
-                            if 'errorType' in cause_json and 'errorMessage' in cause_json:
-                                error_message = f"{cause_json['errorType']}: {cause_json['errorMessage']}"
-                                
-                                # Include stack trace if available
-                                if 'stackTrace' in cause_json and isinstance(cause_json['stackTrace'], list):
-                                    stack_trace = '\n'.join([str(line) for line in cause_json['stackTrace']])
-                                    error_message = f"{error_message}\n\nStack trace:\n{stack_trace}"
-                            # Handle other error formats
-                            elif 'message' in cause_json:
-                                error_message = cause_json['message']
-                            else:
-                                # Just use the whole JSON as the message
-                                error_message = json.dumps(cause_json, indent=2)
-                    except (json.JSONDecodeError, TypeError):
-                        # If cause is not JSON, append it as-is
-                        error_message = f"{error_message}: {cause}"
-                
-                step_map[step_key]['error'] = error_message
-                logger.info(f"Processed failure for step '{step_name}': {error_message}")
-            else:
-                logger.warning(f"Could not find step for TaskFailed event: {event['id']}")
-                
-        # Handle other failure events
-        elif event_type in ['TaskTimedOut', 'TaskAborted']:
-            step_name = find_step_name_for_failure_event(event, events, event_id_to_step)
-            step_key = None
-            
-            # Find the corresponding step
-            if step_name:
-                for key, data in step_map.items():
-                    if data['name'] == step_name and data['status'] == 'RUNNING':
-                        step_key = key
-                        break
-            
-            if step_key:
-                step_map[step_key]['status'] = 'FAILED'
-                step_map[step_key]['stopDate'] = timestamp
-                
-                if event_type == 'TaskTimedOut':
-                    timeout_details = event.get('taskTimedOutEventDetails', {})
-                    error_message = f"Task timed out: {timeout_details.get('error', 'Timeout occurred')}"
-                    cause = timeout_details.get('cause', '')
-                    if cause:
-                        try:
-                            cause_json = json.loads(cause)
-                            error_message = f"{error_message} - {json.dumps(cause_json, indent=2)}"
-                        except (json.JSONDecodeError, TypeError):
-                            error_message = f"{error_message} - {cause}"
-                elif event_type == 'TaskAborted':
-                    error_message = "Task was aborted"
-                    
-                step_map[step_key]['error'] = error_message
-                logger.info(f"Processed {event_type} for step '{step_name}': {error_message}")
-            else:
-                logger.warning(f"Could not find step for {event_type} event: {event['id']}")
-                
-        # Handle Lambda function failure events
-        elif event_type == 'LambdaFunctionFailed':
-            step_name = find_step_name_for_failure_event(event, events, event_id_to_step)
-            step_key = None
-            
-            # Find the corresponding step
-            if step_name:
-                for key, data in step_map.items():
-                    if data['name'] == step_name and data['status'] == 'RUNNING':
-                        step_key = key
-                        break
-            
+            iteration_key = self._close_iteration(iteration_details)
+            if iteration_key:
+                step_data = self.step_map[iteration_key]
+                step_data['status'] = 'FAILED'
+                step_data['stopDate'] = timestamp
+                step_data['error'] = format_map_iteration_error(iteration_details)
+
+        # Handle task, Lambda function, timeout and abort failure events
+        elif event_type in TASK_FAILURE_EVENTS:
+            logger.debug(f"Processing {event_type} event ID: {event_id}")
+            step_key = self._failed_step(event)
+
             if step_key:
-                step_map[step_key]['status'] = 'FAILED'
-                step_map[step_key]['stopDate'] = timestamp
-                
-                lambda_failed_details = event.get('lambdaFunctionFailedEventDetails', {})
-                error_message = lambda_failed_details.get('error', 'Lambda function failed')
-                cause = lambda_failed_details.get('cause', '')
-                
-                # Enhanced Lambda error formatting
-                if cause:
-                    try:
-                        cause_json = json.loads(cause)
-                        if isinstance(cause_json, dict):
-                            if 'errorMessage' in cause_json:
-                                error_type = cause_json.get('errorType', 'Error')
-                                error_message = f"{error_type}: {cause_json['errorMessage']}"
-                                
-                                # Include stack trace if available
-                                if 'stackTrace' in cause_json and isinstance(cause_json['stackTrace'], list):
-                                    stack_trace = '\n'.join([str(line) for line in cause_json['stackTrace']])
-                                    error_message = f"{error_message}\n\nStack trace:\n{stack_trace}"
-                            else:
-                                error_message = json.dumps(cause_json, indent=2)
-                    except (json.JSONDecodeError, TypeError):
-                        error_message = f"{error_message}: {cause}"
-                    
-                step_map[step_key]['error'] = error_message
-                logger.info(f"Processed Lambda failure for step '{step_name}': {error_message}")
+                step_data = self.step_map[step_key]
+                step_data['status'] = 'FAILED'
+                step_data['stopDate'] = timestamp
+                step_data['error'] = format_task_failure_error(event)
+                self._close_step(step_key)
+                self.event_owner[event_id] = step_key
+                logger.info(f"Processed {event_type} for step '{step_data['name']}': {step_data['error']}")
             else:
-                logger.warning(f"Could not find step for LambdaFunctionFailed event: {event['id']}")
-                
+                logger.warning(f"Could not find step for {event_type} event: {event_id}")
+
         # Handle execution failed event
         elif event_type == 'ExecutionFailed':
-            execution_failed_details = event.get('executionFailedEventDetails', {})
-            error = execution_failed_details.get('error', 'Execution failed')
-            cause = execution_failed_details.get('cause', '')
-            
-            # Format error message
-            error_message = error
-            if cause:
-                try:
-                    cause_json = json.loads(cause)
-                    if isinstance(cause_json, dict):
-                        if 'errorMessage' in cause_json:
-                            error_message = f"{error}: {cause_json['errorMessage']}"
-                        else:
-                            error_message = f"{error}: {json.dumps(cause_json, indent=2)}"
-                except (json.JSONDecodeError, TypeError):
-                    error_message = f"{error}: {cause}"
-            
+            error_message = format_execution_failed_error(event.get('executionFailedEventDetails', {}))
+
             # Store execution failure in a special step
             execution_failed_key = f"ExecutionFailed_{event_id}"
-            step_map[execution_failed_key] = {
+            self.step_map[execution_failed_key] = {
                 'name': 'Execution',
                 'type': 'Execution',
                 'status': 'FAILED',
@@ -470,37 +398,203 @@ def parse_execution_history(events: List[Dict[str, Any]]) -> List[Dict[str, Any]
                 'isExecutionFailure': True
             }
             logger.info(f"Processed ExecutionFailed event: {error_message}")
-    
-    # Second pass: enhance Map states with iteration information
-    for step_key, step_data in step_map.items():
-        if step_data.get('isMapState') and step_data['name'] in map_iterations:
-            iterations = map_iterations[step_data['name']]
-            step_data['mapIterations'] = len(iterations)
-            step_data['mapIterationDetails'] = [step_map[iter_key] for iter_key in iterations if iter_key in step_map]
-            
-            # If any iteration failed, mark the Map state as failed
-            if any(step_map[iter_key]['status'] == 'FAILED' for iter_key in iterations if iter_key in step_map):
-                step_data['status'] = 'FAILED'
-                # Collect errors from failed iterations
-                failed_iterations = [step_map[iter_key] for iter_key in iterations 
-                                    if iter_key in step_map and step_map[iter_key]['status'] == 'FAILED']
+
+        # Other events (TaskScheduled, TaskStarted, TaskSucceeded, ...) belong to the step of their previous event
+        elif event.get('previousEventId') in self.event_owner:
+            self.event_owner[event_id] = self.event_owner[event['previousEventId']]
+
+    def _running_step(self, event: Dict[str, Any], step_name: str) -> Optional[str]:
+        """Running step with this name that the event belongs to, else the oldest one"""
+        running = self.open_steps.get(step_name)
+        if not running:
+            return None
+        owner = self.event_owner.get(event.get('previousEventId'))
+        if owner in running:
+            return owner
+        return next(iter(running))
+
+    def _failed_step(self, event: Dict[str, Any]) -> Optional[str]:
+        """Running step a failure event belongs to"""
+        for event_id in (event.get('previousEventId'), event.get('taskFailedEventDetails', {}).get('scheduledEventId')):
+            owner = self.event_owner.get(event_id)
+            if owner and self.step_map[owner]['status'] == 'RUNNING':
+                return owner
+
+        # Fall back to the most recently entered Task state
+        if self.last_task_entered:
+            return self._running_step(event, self.step_map[self.last_task_entered]['name'])
+        return None
+
+    def _close_step(self, step_key: str) -> None:
+        running = self.open_steps.get(self.step_map[step_key]['name'])
+        if running is not None:
+            running.pop(step_key, None)
+
+    def _close_iteration(self, iteration_details: Dict[str, Any]) -> Optional[str]:
+        """Remove and return the oldest running iteration with the event's map name and index"""
+        key = (iteration_details.get('name', 'Unknown'), iteration_details.get('index', 0))
+        running = self.open_iterations.get(key)
+        if not running:
+            return None
+        iteration_key = next(iter(running))
+        del running[iteration_key]
+        return iteration_key
+
+    def _build_steps(self) -> List[Dict[str, Any]]:
+        """Copy the parsed steps for the response, adding Map state iteration details"""
+        public_steps = {
+            key: {field: value for field, value in data.items() if field not in INTERNAL_STEP_FIELDS}
+            for key, data in self.step_map.items()
+        }
+
+        # Enhance Map states with iteration information
+        for step_key, step_data in self.step_map.items():
+            if step_data.get('isMapState') and step_data['name'] in self.map_iterations:
+                iterations = self.map_iterations[step_data['name']]
+                step = public_steps[step_key]
+                step['mapIterations'] = len(iterations)
+                step['mapIterationDetails'] = [public_steps[iter_key] for iter_key in iterations]
+
+                # If any iteration failed, mark the Map state as failed
+                failed_iterations = [iter_key for iter_key in iterations if self.step_map[iter_key]['status'] == 'FAILED']
                 if failed_iterations:
-                    step_data['error'] = f"Map state failed: {len(failed_iterations)} of {len(iterations)} iterations failed"
-    
-    # Convert to list and sort by start time
-    steps = list(step_map.values())
-    steps.sort(key=lambda x: x['startDate'] if x['startDate'] else '')
-    
-    # Clean up internal fields that shouldn't be exposed
-    for step in steps:
-        step.pop('eventId', None)
-        step.pop('isMapState', None)
-        step.pop('isMapIteration', None)
-        step.pop('iterationIndex', None)
-        step.pop('parentMapName', None)
-        step.pop('isExecutionFailure', None)
-    
-    return steps
+                    step['status'] = 'FAILED'
+                    step['error'] = f"Map state failed: {len(failed_iterations)} of {len(iterations)} iterations failed"
+
+        # Convert to list and sort by start time
+        steps = list(public_steps.values())
+        steps.sort(key=lambda x: x['startDate'] if x['startDate'] else '')
+        return steps
+
+def parse_execution_history(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Parse Step Functions execution history events into step details with enhanced Map state support
+
+    Args:
+        events: List of execution history events
+
+    Returns:
+        List of step details including Map state iterations
+    """
+    parser = ExecutionHistoryParser()
+    parser.feed(events)
+    return parser.steps()
+
+def format_map_iteration_error(iteration_details: Dict[str, Any]) -> str:
+    """Format the error of a MapIterationFailed event"""
+    error = iteration_details.get('error', 'Map iteration failed')
+    cause = iteration_details.get('cause', '')
+
+    # Format error message with cause if available
+    error_message = error
+    if cause:
+        try:
+            # Try to parse cause as JSON for better formatting
+            cause_json = json.loads(cause)
+            if isinstance(cause_json, dict):
+                if 'errorMessage' in cause_json:
+                    error_message = f"{error}: {cause_json['errorMessage']}"
+                elif 'message' in cause_json:
+                    error_message = f"{error}: {cause_json['message']}"
+                else:
+                    error_message = f"{error}: {json.dumps(cause_json)}"
+        except (json.JSONDecodeError, TypeError):
+            # If cause is not JSON, append it as-is
+            error_message = f"{error}: {cause}"
+    return error_message
+
+def format_task_failure_error(event: Dict[str, Any]) -> str:
+    """Format the error of a TaskFailed, TaskTimedOut, TaskAborted or LambdaFunctionFailed event"""
+    event_type = event['type']
+
+    if event_type == 'TaskFailed':
+        # Extract error details
+        task_failed_details = event.get('taskFailedEventDetails', {})
+        error_message = task_failed_details.get('error', 'Unknown error')
+        cause = task_failed_details.get('cause', '')
+
+        # Enhanced error message formatting
+        if cause:
+            try:
+                # Try to parse cause as JSON for better formatting
+                cause_json = json.loads(cause)
+                if isinstance(cause_json, dict):
+                    # Format Lambda errors nicely
+                    if 'errorType' in cause_json and 'errorMessage' in cause_json:
+                        error_message = f"{cause_json['errorType']}: {cause_json['errorMessage']}"
+
+                        # Include stack trace if available
+                        if 'stackTrace' in cause_json and isinstance(cause_json['stackTrace'], list):
+                            stack_trace = '\n'.join([str(line) for line in cause_json['stackTrace']])
+                            error_message = f"{error_message}\n\nStack trace:\n{stack_trace}"
+                    # Handle other error formats
+                    elif 'message' in cause_json:
+                        error_message = cause_json['message']
+                    else:
+                        # Just use the whole JSON as the message
+                        error_message = json.dumps(cause_json, indent=2)
+            except (json.JSONDecodeError, TypeError):
+                # If cause is not JSON, append it as-is
+                error_message = f"{error_message}: {cause}"
+        return error_message
+
+    if event_type == 'TaskTimedOut':
+        timeout_details = event.get('taskTimedOutEventDetails', {})
+        error_message = f"Task timed out: {timeout_details.get('error', 'Timeout occurred')}"
+        cause = timeout_details.get('cause', '')
+        if cause:
+            try:
+                cause_json = json.loads(cause)
+                error_message = f"{error_message} - {json.dumps(cause_json, indent=2)}"
+            except (json.JSONDecodeError, TypeError):
+                error_message = f"{error_message} - {cause}"
+        return error_message
+
+    if event_type == 'TaskAborted':
+        return "Task was aborted"
+
+    # LambdaFunctionFailed
+    lambda_failed_details = event.get('lambdaFunctionFailedEventDetails', {})
+    error_message = lambda_failed_details.get('error', 'Lambda function failed')
+    cause = lambda_failed_details.get('cause', '')
+
+    # Enhanced Lambda error formatting
+    if cause:
+        try:
+            cause_json = json.loads(cause)
+            if isinstance(cause_json, dict):
+                if 'errorMessage' in cause_json:
+                    error_type = cause_json.get('errorType', 'Error')
+                    error_message = f"{error_type}: {cause_json['errorMessage']}"
+
+                    # Include stack trace if available
+                    if 'stackTrace' in cause_json and isinstance(cause_json['stackTrace'], list):
+                        stack_trace = '\n'.join([str(line) for line in cause_json['stackTrace']])
+                        error_message = f"{error_message}\n\nStack trace:\n{stack_trace}"
+                else:
+                    error_message = json.dumps(cause_json, indent=2)
+        except (json.JSONDecodeError, TypeError):
+            error_message = f"{error_message}: {cause}"
+    return error_message
+
+def format_execution_failed_error(execution_failed_details: Dict[str, Any]) -> str:
+    """Format the error of an ExecutionFailed event"""
+    error = execution_failed_details.get('error', 'Execution failed')
+    cause = execution_failed_details.get('cause', '')
+
+    # Format error message
+    error_message = error
+    if cause:
+        try:
+            cause_json = json.loads(cause)
+            if isinstance(cause_json, dict):
+                if 'errorMessage' in cause_json:
+                    error_message = f"{error}: {cause_json['errorMessage']}"
+                else:
+                    error_message = f"{error}: {json.dumps(cause_json, indent=2)}"
+        except (json.JSONDecodeError, TypeError):
+            error_message = f"{error}: {cause}"
+    return error_message
 
 def find_step_name_for_failure_event(failure_event: Dict[str, Any], all_events: List[Dict[str, Any]], event_id_to_step: Dict[int, str]) -> Optional[str]:
     """
@@ -3,9 +3,10 @@
 
 import pytest
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 from unittest.mock import Mock, patch
-from index import parse_execution_history, find_step_name_for_failure_event
+import index
+from index import ExecutionHistoryParser, parse_execution_history, find_step_name_for_failure_event
 
 @pytest.mark.unit
 def test_parse_execution_history_with_failure():
@@ -246,3 +247,114 @@ def test_parse_execution_history_multiple_steps():
     assert classification_step['name'] == 'ClassificationStep'
     assert classification_step['status'] == 'FAILED'
     assert classification_step['error'] == 'ValidationException: Invalid document format'
+
+
+def _map_execution_events():
+    """Events of an execution with a failing task inside a two-iteration Map state"""
+    start = datetime(2024, 1, 1, 10, 0, 0)
+    events = []
+
+    def add(event_type, previous_event_id=None, **details):
+        event_id = len(events) + 1
+        events.append({
+            'id': event_id,
+            'type': event_type,
+            'timestamp': start + timedelta(seconds=event_id),
+            'previousEventId': event_id - 1 if previous_event_id is None else previous_event_id,
+            **details
+        })
+        return event_id
+
+    add('ExecutionStarted', executionStartedEventDetails={})
+    add('MapStateEntered', stateEnteredEventDetails={'name': 'ProcessSections', 'input': '{}'})
+    first = add('MapIterationStarted', mapIterationStartedEventDetails={'name': 'ProcessSections', 'index': 0})
+    second = add('MapIterationStarted', mapIterationStartedEventDetails={'name': 'ProcessSections', 'index': 1})
+    first_task = add('TaskStateEntered', first, stateEnteredEventDetails={'name': 'ExtractionStep', 'input': '{"section": 1}'})
+    second_task = add('TaskStateEntered', second, stateEnteredEventDetails={'name': 'ExtractionStep', 'input': '{"section": 2}'})
+    first_scheduled = add('TaskScheduled', first_task)
+    add('TaskScheduled', second_task)
+    # The second iteration's task exits first, the first iteration's task fails
+    add('TaskStateExited', stateExitedEventDetails={'name': 'ExtractionStep', 'output': '{"section": 2}'})
+    add('MapIterationSucceeded', mapIterationSucceededEventDetails={'name': 'ProcessSections', 'index': 1})
+    add('TaskFailed', first_scheduled, taskFailedEventDetails={'error': 'States.TaskFailed', 'cause': 'Throttled'})
+    add('MapIterationFailed', mapIterationFailedEventDetails={'name': 'ProcessSections', 'index': 0, 'error': 'States.TaskFailed'})
+    add('MapStateExited', stateExitedEventDetails={'name': 'ProcessSections', 'output': '{}'})
+    return events
+
+@pytest.mark.unit
+def test_parse_execution_history_matches_events_to_their_step():
+    """Test that exit and failure events are matched through their previous events"""
+    steps = parse_execution_history(_map_execution_events())
+
+    extraction_steps = {step['input']: step for step in steps if step['name'] == 'ExtractionStep'}
+    assert extraction_steps['{"section": 1}']['status'] == 'FAILED'
+    assert extraction_steps['{"section": 1}']['error'] == 'States.TaskFailed: Throttled'
+    assert extraction_steps['{"section": 2}']['status'] == 'SUCCEEDED'
+    assert extraction_steps['{"section": 2}']['output'] == '{"section": 2}'
+
+    map_step = next(step for step in steps if step['type'] == 'Map')
+    assert map_step['mapIterations'] == 2
+    assert [i['status'] for i in map_step['mapIterationDetails']] == ['FAILED', 'SUCCEEDED']
+    assert map_step['status'] == 'FAILED'
+    assert map_step['error'] == 'Map state failed: 1 of 2 iterations failed'
+    assert 'eventId' not in map_step
+
+@pytest.mark.unit
+def test_execution_history_parser_incremental_feed():
+    """Test that feeding events in batches gives the same steps as parsing them at once"""
+    events = _map_execution_events()
+    parser = ExecutionHistoryParser()
+    for batch_start in range(0, len(events), 4):
+        parser.feed(events[batch_start:batch_start + 4])
+        steps = parser.steps()
+        assert parser.steps() is steps
+
+    # Events that were already parsed are ignored
+    parser.feed(events[:5])
+    assert parser.last_event_id == len(events)
+    assert parser.steps() == parse_execution_history(events)
+
+@pytest.mark.unit
+def test_lambda_handler_fetches_only_new_events():
+    """Test that warm invocations fetch only history pages with new events"""
+    events = _map_execution_events()
+    execution_arn = 'arn:aws:states:us-east-1:123456789012:execution:sm:doc'
+    history = events[:6]
+    status = {'value': 'RUNNING'}
+
+    def get_execution_history(executionArn, maxResults, reverseOrder, nextToken=None):
+        assert reverseOrder
+        newest_first = list(reversed(history))
+        page_start = int(nextToken or 0)
+        page_end = page_start + 4
+        response = {'events': newest_first[page_start:page_end]}
+        if page_end < len(newest_first):
+            response['nextToken'] = str(page_end)
+        return response
+
+    client = Mock()
+    client.describe_execution.side_effect = lambda executionArn: {
+        'executionArn': executionArn,
+        'status': status['value'],
+        'startDate': datetime(2024, 1, 1, 10, 0, 0)
+    }
+    client.get_execution_history.side_effect = get_execution_history
+    request = {'arguments': {'executionArn': execution_arn}}
+
+    with patch.object(index, 'stepfunctions', client), patch.dict(index._execution_cache, clear=True):
+        assert len(index.lambda_handler(request, None)['steps']) == 5
+        assert client.get_execution_history.call_count == 2
+
+        # Six new events are on the first two pages
+        history = events
+        status['value'] = 'FAILED'
+        client.get_execution_history.reset_mock()
+        response = index.lambda_handler(request, None)
+        assert client.get_execution_history.call_count == 2
+        assert response['steps'] == parse_execution_history(events)
+        assert response['error'] == 'Map state failed: 1 of 2 iterations failed'
+
+        # The history of a stopped execution is not fetched again
+        client.get_execution_history.reset_mock()
+        assert index.lambda_handler(request, None)['steps'] == response['steps']
+        client.get_execution_history.assert_not_called()
@@ -0,0 +1,73 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+"""
+Lambda function that writes buffered reporting records in batches.
+
+Consumes the reporting queue that the save_reporting_data function sends records
+to in buffered mode, and writes one Parquet file per table partition for all
+documents in the batch. The event source mapping batch size and batching window
+are the size and time thresholds of a flush. See
+idp_common.reporting.buffered_writer for details.
+"""
+
+import logging
+import os
+
+from idp_common.reporting import GlueSchemaRegistry, ReportingBatchWriter
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(os.environ.get("LOG_LEVEL", "INFO"))
+
+# Reused across warm invocations so the schema registry cache survives
+_writer = None
+
+
+def _get_writer():
+    global _writer
+    if _writer is None:
+        stack_name = os.environ.get('STACK_NAME', '').lower()
+        _writer = ReportingBatchWriter(
+            os.environ['REPORTING_BUCKET'],
+            database_name=f"{stack_name}-reporting-db" if stack_name else None,
+            max_records=int(os.environ.get('MAX_BUFFERED_RECORDS', '200000')),
+            max_bytes=int(os.environ.get('MAX_BUFFERED_BYTES', str(64 * 1024 * 1024))),
+            schema_registry=GlueSchemaRegistry(os.environ.get('SCHEMA_REGISTRY_TABLE')),
+        )
+    return _writer
+
+
+def handler(event, context):
+    """
+    Lambda handler for SQS batches of buffered reporting records.
+
+    Args:
+        event: SQS event with reporting record messages
+        context: Lambda context
+
+    Returns:
+        Partial batch response listing the messages that could not be written
+    """
+    records = event.get('Records', [])
+    logger.info(f"Writing {len(records)} buffered reporting messages")
+
+    writer = _get_writer()
+    failed = []
+    for record in records:
+        try:
+            writer.add(record['body'], message_id=record['messageId'])
+        except Exception as e:
+            logger.error(f"Could not decode reporting message {record.get('messageId')}: {e}")
+            failed.append(record['messageId'])
+            continue
+        if writer.should_flush():
+            failed.extend(writer.flush().failed_message_ids)
+
+    # Nothing stays buffered between invocations; SQS deletes the batch once we return
+    result = writer.flush()
+    failed.extend(result.failed_message_ids)
+    logger.info(f"Wrote {len(result.files)} files, {len(failed)} messages failed")
+
+    return {
+        'batchItemFailures': [{'itemIdentifier': message_id} for message_id in failed]
+    }
@@ -0,0 +1,92 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+"""
+Lambda function that compacts the per-document Parquet files of the reporting bucket.
+
+Runs on a schedule and merges the date partitions of the last days of every
+reporting table (metering, evaluation metrics and document sections) into a few
+files sorted by document_id. See idp_common.reporting.compaction for details.
+"""
+
+import json
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+
+from idp_common.reporting import ParquetCompactor
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(os.environ.get("LOG_LEVEL", "INFO"))
+
+# Stop starting new partitions when less time than this is left in the invocation
+MIN_REMAINING_TIME_MS = 120_000
+
+
+def _partition_dates(event):
+    """Dates to compact: event 'dates', or the days before today within the lookback window"""
+    if event.get('dates'):
+        return event['dates']
+    lookback_days = int(event.get('lookback_days') or os.environ.get('COMPACTION_LOOKBACK_DAYS', '7'))
+    today = datetime.now(timezone.utc).date()
+    return [(today - timedelta(days=days)).isoformat() for days in range(1, lookback_days + 1)]
+
+
+def handler(event, context):
+    """
+    Lambda handler for compacting reporting partitions.
+
+    Args:
+        event: Scheduled event, optionally with 'dates' (YYYY-MM-DD list),
+            'lookback_days' and 'reporting_bucket' overrides
+        context: Lambda context
+
+    Returns:
+        Dict with status and a summary of the compacted partitions
+    """
+    logger.info(f"Starting reporting compaction with event: {json.dumps(event)}")
+
+    reporting_bucket = event.get('reporting_bucket') or os.environ.get('REPORTING_BUCKET')
+    if not reporting_bucket:
+        error_msg = "No reporting bucket specified in the event or environment"
+        logger.error(error_msg)
+        return {
+            'statusCode': 400,
+            'body': error_msg
+        }
+
+    compactor = ParquetCompactor(
+        reporting_bucket,
+        min_file_age_seconds=int(os.environ.get('COMPACTION_MIN_FILE_AGE_SECONDS', '3600')),
+        max_source_files=int(os.environ.get('COMPACTION_MAX_SOURCE_FILES', '50000')),
+    )
+
+    results = []
+    incomplete = False
+    table_prefixes = compactor.list_table_prefixes()
+    for date in _partition_dates(event):
+        for table_prefix in table_prefixes:
+            if context and context.get_remaining_time_in_millis() < MIN_REMAINING_TIME_MS:
+                # The remaining partitions are picked up by the next scheduled run
+                incomplete = True
+                break
+            results.append(compactor.compact_partition(f"{table_prefix}date={date}/"))
+        if incomplete:
+            logger.warning("Stopping early, not enough time left for the remaining partitions")
+            break
+
+    compacted = [result for result in results if result.compacted]
+    errors = [result for result in results if result.error]
+    summary = {
+        'partitions_compacted': len(compacted),
+        'files_merged': sum(result.source_files for result in compacted),
+        'files_written': sum(len(result.output_files) for result in compacted),
+        'incomplete': incomplete,
+        'errors': [result.to_dict() for result in errors],
+    }
+    logger.info(f"Compaction summary: {json.dumps(summary)}")
+
+    return {
+        'statusCode': 500 if errors else 200,
+        'body': json.dumps(summary)
+    }
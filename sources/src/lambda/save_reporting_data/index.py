@@ -10,14 +10,19 @@ import os
 import traceback
 from typing import Dict, Any, List
 
+from idp_common import metrics
 from idp_common.config import get_config
 from idp_common.models import Document
-from idp_common.reporting import SaveReportingData
+from idp_common.reporting import GlueSchemaRegistry, SaveReportingData, SqsRecordSink
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# Known Glue table columns, shared across warm invocations and (through DynamoDB) across functions
+schema_registry = GlueSchemaRegistry(os.environ.get('SCHEMA_REGISTRY_TABLE'))
+
+@metrics.flush_metrics_on_return
 def handler(event, context):
     """
     Lambda handler for saving document evaluation data to the reporting bucket.
@@ -91,7 +96,15 @@ def handler(event, context):
         # Use the SaveReportingData class to save the data
         # Pass database_name to enable automatic Glue table creation
         # Pass config dictionary to enable dynamic pricing from configuration
-        reporter = SaveReportingData(reporting_bucket, database_name, config)
+        reporting_queue_url = os.environ.get('REPORTING_QUEUE_URL')
+        if reporting_queue_url:
+            # Buffered mode: records are queued and written in batches by the reporting batch writer
+            reporter = SaveReportingData(reporting_bucket, database_name, config,
+                                         record_sink=SqsRecordSink(reporting_queue_url),
+                                         schema_registry=schema_registry)
+        else:
+            reporter = SaveReportingData(reporting_bucket, database_name, config,
+                                         schema_registry=schema_registry)
         results = reporter.save(document, data_to_save)
 
         # If no data was processed, return a warning
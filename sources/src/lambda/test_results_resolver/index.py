@@ -4,14 +4,32 @@
 import json
 import logging
 import os
+import time
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from decimal import Decimal
 
 import boto3
+from boto3.dynamodb.conditions import Key
 
 sqs = boto3.client('sqs')
 
+# Item collection listing test runs by creation time (written by test_runner)
+TEST_RUN_LIST_PK = 'list#testruns'
+# Marker item recording that test runs created before the list existed were added to it
+TEST_RUN_LIST_BACKFILL_SK = 'backfill'
+# Per-document result rows in the test run partition (written by workflow_tracker)
+TEST_RUN_DOCUMENT_SK_PREFIX = 'doc#'
+# DynamoDB BatchGetItem limit
+BATCH_GET_SIZE = 100
+# Concurrent S3 reads of evaluation reports and metering files
+MAX_FETCH_WORKERS = int(os.environ.get('TEST_RESULTS_MAX_WORKERS', '16'))
+# Per-document evaluation metrics that are averaged over the test run
+ACCURACY_METRICS = ['precision', 'recall', 'f1_score', 'false_alarm_rate', 'false_discovery_rate']
+# File name prefixes of multi-document metering files, written by the reporting
+# compaction job and by the reporting batch writer (buffered writes)
+MULTI_DOCUMENT_FILE_PREFIXES = ('compacted-', 'batch-')
+
 
 # Custom JSON encoder to handle Decimal objects from DynamoDB
 class DecimalEncoder(json.JSONEncoder):
@@ -279,30 +297,33 @@ def get_test_runs(time_period_hours=2):
     logger.info(f"Current UTC time: {datetime.utcnow().isoformat()}Z")
     logger.info(f"Time period hours: {time_period_hours}")
 
-    # Handle pagination for DynamoDB scan
-    items = []
-    scan_kwargs = {
-        'FilterExpression': 'begins_with(PK, :pk) AND SK = :sk AND CreatedAt >= :cutoff',
-        'ExpressionAttributeValues': {
-            ':pk': 'testrun#',
-            ':sk': 'metadata',
-            ':cutoff': cutoff_iso
-        }
+    # Test runs created before the test run list existed are added to it once
+    _backfill_test_run_list(table)
+
+    # Query the test run list for runs created after the cutoff
+    test_run_ids = []
+    query_kwargs = {
+        'KeyConditionExpression': Key('PK').eq(TEST_RUN_LIST_PK) & Key('SK').gte(f'ts#{cutoff_iso}'),
+        'ProjectionExpression': 'TestRunId'
     }
 
     while True:
-        response = table.scan(**scan_kwargs)
-        items.extend(response.get('Items', []))
+        response = table.query(**query_kwargs)
+        test_run_ids.extend(item['TestRunId'] for item in response.get('Items', []))
 
         if 'LastEvaluatedKey' not in response:
             break
-        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
 
-    logger.info(f"DynamoDB scan completed. Items found: {len(items)}")
+    items = _batch_get_items(
+        [{'PK': f'testrun#{test_run_id}', 'SK': 'metadata'} for test_run_id in test_run_ids]
+    )
+
+    logger.info(f"Test run list query completed. Items found: {len(items)}")
     if items:
         logger.info(f"Sample item CreatedAt: {items[0].get('CreatedAt')}")
     else:
-        logger.info("No items found in scan")
+        logger.info("No test runs found in time period")
 
     test_runs = []
     for item in items:
@@ -342,21 +363,80 @@ def get_test_runs(time_period_hours=2):
 
     return test_runs
 
-def _calculate_completed_at(test_run_id, files, table):
+def _test_run_list_item(test_run_id, created_at):
+    """Build the test run list entry for a test run"""
+    return {
+        'PK': TEST_RUN_LIST_PK,
+        'SK': f'ts#{created_at}#id#{test_run_id}',
+        'TestRunId': test_run_id
+    }
+
+def _backfill_test_run_list(table):
+    """Add existing test runs to the test run list, once per table"""
+    marker_key = {'PK': TEST_RUN_LIST_PK, 'SK': TEST_RUN_LIST_BACKFILL_SK}
+    if 'Item' in table.get_item(Key=marker_key):
+        return
+
+    logger.info("Backfilling test run list from test run metadata")
+    scan_kwargs = {
+        'FilterExpression': 'begins_with(PK, :pk) AND SK = :sk',
+        'ExpressionAttributeValues': {
+            ':pk': 'testrun#',
+            ':sk': 'metadata'
+        },
+        'ProjectionExpression': 'TestRunId, CreatedAt'
+    }
+
+    backfilled = 0
+    with table.batch_writer() as batch:
+        while True:
+            response = table.scan(**scan_kwargs)
+            for item in response.get('Items', []):
+                if item.get('TestRunId') and item.get('CreatedAt'):
+                    batch.put_item(Item=_test_run_list_item(item['TestRunId'], item['CreatedAt']))
+                    backfilled += 1
+
+            if 'LastEvaluatedKey' not in response:
+                break
+            scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    table.put_item(Item={**marker_key, 'CreatedAt': datetime.utcnow().isoformat() + 'Z'})
+    logger.info(f"Added {backfilled} test runs to the test run list")
+
+def _batch_get_items(keys):
+    """Get tracking table items by key with BatchGetItem, retrying unprocessed keys"""
+    table_name = os.environ['TRACKING_TABLE']
+    items = []
+
+    for i in range(0, len(keys), BATCH_GET_SIZE):
+        request_items = {table_name: {'Keys': keys[i:i + BATCH_GET_SIZE]}}
+        attempt = 0
+        while request_items:
+            response = dynamodb.batch_get_item(RequestItems=request_items)
+            items.extend(response.get('Responses', {}).get(table_name, []))
+            request_items = response.get('UnprocessedKeys')
+            if request_items:
+                attempt += 1
+                time.sleep(min(0.05 * 2 ** attempt, 1.0))
+
+    return items
+
+def _get_document_items(test_run_id, files):
+    """Get the tracking items of the test run documents, keyed by file"""
+    keys = [{'PK': f'doc#{test_run_id}/{file_key}', 'SK': 'none'} for file_key in dict.fromkeys(files)]
+    prefix_length = len(f'doc#{test_run_id}/')
+    return {item['PK'][prefix_length:]: item for item in _batch_get_items(keys)}
+
+def _calculate_completed_at(doc_items):
     """Calculate completedAt timestamp from document CompletionTime"""
     latest_completion_time = None
 
-    for file_key in files:
-        doc_response = table.get_item(
-            Key={'PK': f'doc#{test_run_id}/{file_key}', 'SK': 'none'}
-        )
-        if 'Item' in doc_response:
-            doc_item = doc_response['Item']
-            completion_time = doc_item.get('CompletionTime')
-            if completion_time:
-                completion_time = completion_time.replace('+00:00', 'Z')
-                if not latest_completion_time or completion_time > latest_completion_time:
-                    latest_completion_time = completion_time
+    for doc_item in doc_items.values():
+        completion_time = doc_item.get('CompletionTime')
+        if completion_time:
+            completion_time = completion_time.replace('+00:00', 'Z')
+            if not latest_completion_time or completion_time > latest_completion_time:
+                latest_completion_time = completion_time
 
     return latest_completion_time
 
@@ -387,14 +467,13 @@ def get_test_run_status(test_run_id):
         evaluating_files = 0
         queued_files = 0
 
+        doc_items = _get_document_items(test_run_id, files)
+
         for file_key in files:
             logger.info(f"Checking file: {file_key} for test run: {test_run_id}")
-            doc_response = table.get_item(
-                Key={'PK': f'doc#{test_run_id}/{file_key}', 'SK': 'none'}
-            )
-            if 'Item' in doc_response:
-                doc_status = doc_response['Item'].get('ObjectStatus', 'QUEUED')
-                eval_status = doc_response['Item'].get('EvaluationStatus')
+            if file_key in doc_items:
+                doc_status = doc_items[file_key].get('ObjectStatus', 'QUEUED')
+                eval_status = doc_items[file_key].get('EvaluationStatus')
                 logger.info(f"File {file_key}: ObjectStatus={doc_status}, EvaluationStatus={eval_status}")
 
                 if doc_status == 'COMPLETED':
@@ -460,7 +539,7 @@ def get_test_run_status(test_run_id):
             # Calculate completedAt from document completion times if status is complete
             calculated_completed_at = item.get('CompletedAt')
             if overall_status in ['COMPLETE', 'PARTIAL_COMPLETE'] and not calculated_completed_at:
-                calculated_completed_at = _calculate_completed_at(test_run_id, files, table)
+                calculated_completed_at = _calculate_completed_at(doc_items)
 
             logger.info(f"Auto-updating test run {test_run_id} status from {stored_status} to {overall_status}")
             try:
@@ -520,29 +599,114 @@ def _parse_s3_uri(uri):
             return parts[0], parts[1]
     return None, None
 
-def _aggregate_test_run_metrics(test_run_id):
-    """Aggregate metrics from evaluation reports for all documents in test run"""
-    table = dynamodb.Table(os.environ['TRACKING_TABLE'])  # type: ignore[attr-defined]
-
-    # Get all documents for this test run that completed successfully
-    items = []
-    scan_kwargs = {
-        'FilterExpression': 'begins_with(PK, :pk) AND SK = :sk AND ObjectStatus = :status',
-        'ExpressionAttributeValues': {
-            ':pk': f'doc#{test_run_id}/',
-            ':sk': 'none',
-            ':status': 'COMPLETED'
-        }
-    }
+def _query_test_run_partition(table, test_run_id):
+    """Query the test run metadata and its per-document result rows in one pass"""
+    metadata = None
+    result_rows = []
+    query_kwargs = {'KeyConditionExpression': Key('PK').eq(f'testrun#{test_run_id}')}
 
     while True:
-        response = table.scan(**scan_kwargs)
-        items.extend(response.get('Items', []))
+        response = table.query(**query_kwargs)
+        for item in response.get('Items', []):
+            if item['SK'] == 'metadata':
+                metadata = item
+            elif item['SK'].startswith(TEST_RUN_DOCUMENT_SK_PREFIX):
+                result_rows.append(item)
+
         if 'LastEvaluatedKey' not in response:
             break
-        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    return metadata, result_rows
+
+def _document_metrics(data):
+    """Extract the per-document metrics from an evaluation results.json"""
+    overall_metrics = data.get('overall_metrics', {})
+    metrics = {name: overall_metrics.get(name) for name in ['accuracy', 'weighted_overall_score'] + ACCURACY_METRICS}
+
+    # Average attribute confidence from section results
+    confidences = []
+    for section in data.get('section_results', []):
+        for attr in section.get('attributes', []):
+            if attr.get('confidence') is not None:
+                confidences.append(float(attr['confidence']))
+    metrics['average_confidence'] = sum(confidences) / len(confidences) if confidences else None
+
+    return metrics
 
-    if not items:
+def _load_document_metrics(s3, document_id, evaluation_uri):
+    """Read the evaluation results.json of a document; None if it cannot be read"""
+    try:
+        json_uri = evaluation_uri.replace('report.md', 'results.json')
+        bucket, key = _parse_s3_uri(json_uri)
+        if not (bucket and key):
+            return None
+        obj = s3.get_object(Bucket=bucket, Key=key)
+        return _document_metrics(json.loads(obj['Body'].read()))
+    except Exception as e:
+        logger.warning(f"Failed to process evaluation report for doc#{document_id}: {e}")
+        return None
+
+def _list_metering_partition(completion_date):
+    """List the metering Parquet files of one date partition"""
+    reporting_bucket = os.environ.get('REPORTING_BUCKET')
+    if not reporting_bucket:
+        return []
+
+    s3 = boto3.client('s3')
+    paginator = s3.get_paginator('list_objects_v2')
+    keys = []
+    for page in paginator.paginate(Bucket=reporting_bucket, Prefix=f"metering/date={completion_date}/"):
+        keys.extend(obj['Key'] for obj in page.get('Contents', []))
+    return keys
+
+def _to_float(value):
+    return float(value) if isinstance(value, Decimal) else value
+
+def _aggregate_test_run_metrics(test_run_id):
+    """Aggregate metrics from evaluation reports for all documents in test run"""
+    table = dynamodb.Table(os.environ['TRACKING_TABLE'])  # type: ignore[attr-defined]
+
+    # Test run metadata and the result rows the workflow tracker wrote as documents completed
+    metadata, result_rows = _query_test_run_partition(table, test_run_id)
+    if metadata is None:
+        return {}
+    files = metadata.get('Files', [])
+
+    # document_id -> (metrics, completion time) for documents that completed successfully
+    documents = {}
+    rows_by_file = {row['SK'][len(TEST_RUN_DOCUMENT_SK_PREFIX):]: row for row in result_rows}
+    for file_key, row in rows_by_file.items():
+        if row.get('ObjectStatus') == 'COMPLETED' and row.get('EvaluationMetrics') is not None:
+            metrics = {name: _to_float(value) for name, value in row['EvaluationMetrics'].items()}
+            documents[f'{test_run_id}/{file_key}'] = (metrics, row.get('CompletionTime'))
+
+    # Documents without evaluation metrics in their result row (completed before result
+    # rows were recorded, or not evaluated yet when the row was written) are read from
+    # their tracking items and evaluation reports
+    missing_files = [
+        file_key for file_key in files
+        if rows_by_file.get(file_key, {}).get('EvaluationMetrics') is None
+    ]
+    if missing_files:
+        logger.info(f"Reading {len(missing_files)} evaluation reports for test run {test_run_id}")
+        doc_items = _get_document_items(test_run_id, missing_files)
+        completed = [
+            (f'{test_run_id}/{file_key}', item)
+            for file_key, item in doc_items.items()
+            if item.get('ObjectStatus') == 'COMPLETED' and item.get('EvaluationReportUri')
+        ]
+        s3 = boto3.client('s3')
+        with ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as executor:
+            loaded = executor.map(
+                lambda doc: _load_document_metrics(s3, doc[0], doc[1]['EvaluationReportUri']),
+                completed
+            )
+            for (document_id, item), metrics in zip(completed, loaded):
+                if metrics is not None:
+                    documents[document_id] = (metrics, item.get('CompletionTime'))
+
+    if not documents:
         return {}
 
     # Aggregate metrics from evaluation reports
@@ -553,121 +717,84 @@ def _aggregate_test_run_metrics(test_run_id):
     confidence_count = 0
     weighted_overall_scores = {}  # Dict to collect document ID -> score mapping
     cost_breakdown = {}
+    metric_totals = {name: 0 for name in ACCURACY_METRICS}
+    metric_counts = {name: 0 for name in ACCURACY_METRICS}
+
+    for document_id, (metrics, _) in documents.items():
+        if metrics.get('accuracy'):
+            total_accuracy += metrics['accuracy']
+            accuracy_count += 1
+
+        if metrics.get('weighted_overall_score') is not None:
+            weighted_overall_scores[document_id] = metrics['weighted_overall_score']
+
+        for name in ACCURACY_METRICS:
+            if metrics.get(name):
+                metric_totals[name] += metrics[name]
+                metric_counts[name] += 1
+
+        if metrics.get('average_confidence') is not None:
+            total_confidence += metrics['average_confidence']
+            confidence_count += 1
+
+    # Get costs from the metering partition of each completion date, listing each partition once
+    cost_lookups = [
+        (document_id, datetime.fromisoformat(completion_time).strftime('%Y-%m-%d'))
+        for document_id, (_, completion_time) in documents.items()
+        if completion_time
+    ]
+    if cost_lookups:
+        with ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as executor:
+            completion_dates = sorted({completion_date for _, completion_date in cost_lookups})
+            partitions = dict(zip(completion_dates, executor.map(_list_metering_partition, completion_dates)))
+            all_doc_costs = executor.map(
+                lambda lookup: _get_document_costs_from_reporting_db(
+                    lookup[0], lookup[1], partition_keys=partitions[lookup[1]]
+                ),
+                cost_lookups
+            )
 
-    # Accuracy metrics aggregation
-    total_precision = 0
-    total_recall = 0
-    total_f1_score = 0
-    total_false_alarm_rate = 0
-    total_false_discovery_rate = 0
-    precision_count = 0
-    recall_count = 0
-    f1_count = 0
-    far_count = 0
-    fdr_count = 0
-
-    s3 = boto3.client('s3')
-
-    for item in items:
-        evaluation_uri = item.get('EvaluationReportUri')
-        if not evaluation_uri:
-            continue
-
-        try:
-            # Get evaluation report data
-            json_uri = evaluation_uri.replace('report.md', 'results.json')
-            bucket, key = _parse_s3_uri(json_uri)
-            if bucket and key:
-                obj = s3.get_object(Bucket=bucket, Key=key)
-                data = json.loads(obj['Body'].read())
-
-                # Extract accuracy from overall_metrics
-                overall_metrics = data.get('overall_metrics', {})
-                if overall_metrics.get('accuracy'):
-                    total_accuracy += overall_metrics['accuracy']
-                    accuracy_count += 1
-
-                # Extract weighted overall score
-                if overall_metrics.get('weighted_overall_score') is not None:
-                    # Extract document ID from the item PK (format: doc#{test_run_id}/{file_key})
-                    document_id = item['PK'].replace('doc#', '', 1)
-                    weighted_overall_scores[document_id] = overall_metrics['weighted_overall_score']
-
-                # Extract additional accuracy metrics
-                if overall_metrics.get('precision'):
-                    total_precision += overall_metrics['precision']
-                    precision_count += 1
-                if overall_metrics.get('recall'):
-                    total_recall += overall_metrics['recall']
-                    recall_count += 1
-                if overall_metrics.get('f1_score'):
-                    total_f1_score += overall_metrics['f1_score']
-                    f1_count += 1
-                if overall_metrics.get('false_alarm_rate'):
-                    total_false_alarm_rate += overall_metrics['false_alarm_rate']
-                    far_count += 1
-                if overall_metrics.get('false_discovery_rate'):
-                    total_false_discovery_rate += overall_metrics['false_discovery_rate']
-                    fdr_count += 1
-
-                # Extract confidence from section results
-                confidences = []
-                for section in data.get('section_results', []):
-                    for attr in section.get('attributes', []):
-                        if attr.get('confidence') is not None:
-                            confidences.append(float(attr['confidence']))
-
-                if confidences:
-                    avg_confidence = sum(confidences) / len(confidences)
-                    total_confidence += avg_confidence
-                    confidence_count += 1
-
-        except Exception as e:
-            logger.warning(f"Failed to process evaluation report for {item['PK']}: {e}")
-            continue
-
-        # Get cost from completion date if available
-        if item.get('CompletionTime'):
-            completion_date = datetime.fromisoformat(item['CompletionTime']).strftime('%Y-%m-%d')
-            doc_key = item['PK'].replace('doc#', '')
-            doc_costs = _get_document_costs_from_reporting_db(doc_key, completion_date)
-
-            for context, services in doc_costs.items():
-                if context not in cost_breakdown:
-                    cost_breakdown[context] = {}
-
-                for service_unit, details in services.items():
-                    if service_unit not in cost_breakdown[context]:
-                        cost_breakdown[context][service_unit] = {
-                            'unit': details['unit'],
-                            'value': 0,
-                            'unit_cost': details['unit_cost'],
-                            'estimated_cost': 0
-                        }
-
-                    cost_breakdown[context][service_unit]['value'] += details['value']
-                    cost_breakdown[context][service_unit]['estimated_cost'] += details['estimated_cost']
-                    total_cost += details['estimated_cost']
+            for doc_costs in all_doc_costs:
+                for context, services in doc_costs.items():
+                    if context not in cost_breakdown:
+                        cost_breakdown[context] = {}
+
+                    for service_unit, details in services.items():
+                        if service_unit not in cost_breakdown[context]:
+                            cost_breakdown[context][service_unit] = {
+                                'unit': details['unit'],
+                                'value': 0,
+                                'unit_cost': details['unit_cost'],
+                                'estimated_cost': 0
+                            }
+
+                        cost_breakdown[context][service_unit]['value'] += details['value']
+                        cost_breakdown[context][service_unit]['estimated_cost'] += details['estimated_cost']
+                        total_cost += details['estimated_cost']
+
+    accuracy_breakdown = {
+        name: metric_totals[name] / metric_counts[name] if metric_counts[name] > 0 else None
+        for name in ACCURACY_METRICS
+    }
 
     return {
         'overall_accuracy': total_accuracy / accuracy_count if accuracy_count > 0 else None,
         'weighted_overall_scores': weighted_overall_scores if weighted_overall_scores else {},
         'average_confidence': total_confidence / confidence_count if confidence_count > 0 else None,
-        'accuracy_breakdown': {
-            'precision': total_precision / precision_count if precision_count > 0 else None,
-            'recall': total_recall / recall_count if recall_count > 0 else None,
-            'f1_score': total_f1_score / f1_count if f1_count > 0 else None,
-            'false_alarm_rate': total_false_alarm_rate / far_count if far_count > 0 else None,
-            'false_discovery_rate': total_false_discovery_rate / fdr_count if fdr_count > 0 else None
-        },
+        'accuracy_breakdown': accuracy_breakdown,
         'total_cost': total_cost,
         'cost_breakdown': cost_breakdown
     }
 
 
 
-def _get_document_costs_from_reporting_db(document_id, completion_date):
-    """Get detailed costs from S3 Parquet files using provided completion date"""
+def _get_document_costs_from_reporting_db(document_id, completion_date, partition_keys=None):
+    """
+    Get detailed costs from S3 Parquet files using provided completion date.
+
+    partition_keys is the already listed content of the date partition; without
+    it the partition is listed for this document.
+    """
     try:
         import pyarrow.compute as pc
         import pyarrow.fs as fs
@@ -681,25 +808,27 @@ def _get_document_costs_from_reporting_db(document_id, completion_date):
         logger.info(f"Using completion date {completion_date} for document {document_id}")
 
         # List files in the specific date partition
-        s3 = boto3.client('s3')
-        partition_prefix = f"metering/date={completion_date}/"
+        if partition_keys is None:
+            s3 = boto3.client('s3')
+            partition_prefix = f"metering/date={completion_date}/"
 
-        response = s3.list_objects_v2(Bucket=reporting_bucket, Prefix=partition_prefix)
+            response = s3.list_objects_v2(Bucket=reporting_bucket, Prefix=partition_prefix)
+            partition_keys = [obj['Key'] for obj in response.get('Contents', [])]
 
-        if 'Contents' not in response:
+        if not partition_keys:
             logger.warning(f"No files found in partition {completion_date}")
             return {}
 
         # Find the parquet file for this document
         document_pattern = document_id.replace('/', '_')
+        s3_fs = fs.S3FileSystem()
 
-        for obj in response['Contents']:
-            if obj['Key'].endswith('_results.parquet') and document_pattern in obj['Key']:
-                logger.info(f"Reading parquet file: {obj['Key']}")
+        for object_key in partition_keys:
+            if object_key.endswith('_results.parquet') and document_pattern in object_key:
+                logger.info(f"Reading parquet file: {object_key}")
 
                 # Read parquet file using pyarrow
-                s3_fs = fs.S3FileSystem()
-                parquet_file = f"{reporting_bucket}/{obj['Key']}"
+                parquet_file = f"{reporting_bucket}/{object_key}"
 
                 table_data = pq.read_table(parquet_file, filesystem=s3_fs)
 
@@ -711,34 +840,25 @@ def _get_document_costs_from_reporting_db(document_id, completion_date):
                 if table_data.num_rows == 0:
                     return {}
 
-                # Convert to Python dict for processing
-                data = table_data.to_pydict()
-
-                # Group detailed cost information
-                cost_details = {}
-                for i in range(len(data['context'])):
-                    context = data['context'][i]
-                    service_api = data['service_api'][i]
-                    unit = data['unit'][i]
-                    value = float(data['value'][i])
-                    unit_cost = float(data['unit_cost'][i])
-                    estimated_cost = float(data['estimated_cost'][i])
-
-                    if context not in cost_details:
-                        cost_details[context] = {}
-
-                    key = f"{service_api}_{unit}"
-                    if key not in cost_details[context]:
-                        cost_details[context][key] = {
-                            'unit': unit,
-                            'value': 0,
-                            'unit_cost': unit_cost,
-                            'estimated_cost': 0
-                        }
-
-                    cost_details[context][key]['value'] += value
-                    cost_details[context][key]['estimated_cost'] += estimated_cost
-
+                return _group_cost_details(table_data.to_pydict())
+
+        # Compacted and batched files hold many documents sorted by document_id; the
+        # filter is evaluated against row group statistics so only matching row groups are read
+        compacted_keys = [
+            object_key for object_key in partition_keys
+            if object_key.rsplit('/', 1)[-1].startswith(MULTI_DOCUMENT_FILE_PREFIXES)
+        ]
+        if compacted_keys:
+            cost_details = {}
+            for object_key in compacted_keys:
+                table_data = pq.read_table(
+                    f"{reporting_bucket}/{object_key}",
+                    filesystem=s3_fs,
+                    filters=[('document_id', '==', document_id)]
+                )
+                if table_data.num_rows:
+                    _group_cost_details(table_data.to_pydict(), cost_details)
+            if cost_details:
                 return cost_details
 
         logger.warning(f"No parquet file found for {document_id} in {completion_date}")
@@ -749,6 +869,35 @@ def _get_document_costs_from_reporting_db(document_id, completion_date):
         return {}
 
 
+def _group_cost_details(data, cost_details=None):
+    """Group metering rows into context -> service_unit -> cost details"""
+    cost_details = {} if cost_details is None else cost_details
+    for i in range(len(data['context'])):
+        context = data['context'][i]
+        service_api = data['service_api'][i]
+        unit = data['unit'][i]
+        value = float(data['value'][i])
+        unit_cost = float(data['unit_cost'][i])
+        estimated_cost = float(data['estimated_cost'][i])
+
+        if context not in cost_details:
+            cost_details[context] = {}
+
+        key = f"{service_api}_{unit}"
+        if key not in cost_details[context]:
+            cost_details[context][key] = {
+                'unit': unit,
+                'value': 0,
+                'unit_cost': unit_cost,
+                'estimated_cost': 0
+            }
+
+        cost_details[context][key]['value'] += value
+        cost_details[context][key]['estimated_cost'] += estimated_cost
+
+    return cost_details
+
+
 def _get_test_run_config(test_run_id):
     """Get test run configuration from metadata record"""
     table = dynamodb.Table(os.environ['TRACKING_TABLE'])  # type: ignore[attr-defined]
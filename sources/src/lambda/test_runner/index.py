@@ -123,6 +123,13 @@ def _store_test_run_metadata(tracking_table, test_run_id, test_set_id, test_set_
             item['Context'] = context
 
         table.put_item(Item=item)
+
+        # List the test run by creation time so it can be found without scanning the table
+        table.put_item(Item={
+            'PK': 'list#testruns',
+            'SK': f"ts#{item['CreatedAt']}#id#{test_run_id}",
+            'TestRunId': test_run_id
+        })
         logger.info(f"Stored test run metadata for {test_run_id}")
     except Exception as e:
         logger.error(f"Failed to store test run metadata: {e}")
@@ -5,6 +5,7 @@ import boto3
 import json
 import os
 from datetime import datetime, timezone
+from decimal import Decimal
 import logging
 from idp_common.models import Document, Status, Page, Section
 from idp_common.docs_service import create_document_service
@@ -19,6 +20,7 @@ logging.getLogger('idp_common.bedrock.client').setLevel(os.environ.get("BEDROCK_
 METRIC_NAMESPACE = os.environ['METRIC_NAMESPACE']
 REPORTING_BUCKET = os.environ.get('REPORTING_BUCKET')
 SAVE_REPORTING_FUNCTION_NAME = os.environ.get('SAVE_REPORTING_FUNCTION_NAME')
+TRACKING_TABLE = os.environ.get('TRACKING_TABLE')
 
 dynamodb = boto3.resource('dynamodb')
 cloudwatch = boto3.client('cloudwatch')
@@ -103,6 +105,9 @@ def update_document_completion(object_key: str, workflow_status: str, output_dat
                 f"and {len(document.sections)} sections")
     updated_doc = document_service.update_document(document)
 
+    # Record the result in the test run partition if this is a test run document
+    record_test_run_result(document)
+
     # Save reporting data to reporting bucket if available
     if REPORTING_BUCKET and SAVE_REPORTING_FUNCTION_NAME:
         # Determine what data to save based on what's available in the document
@@ -146,6 +151,93 @@ def update_document_completion(object_key: str, workflow_status: str, output_dat
     return updated_doc
 
 
+def _to_decimal(value: Optional[float]) -> Optional[Decimal]:
+    return Decimal(str(value)) if value is not None else None
+
+
+def load_evaluation_metrics(evaluation_report_uri: str) -> Dict[str, Optional[Decimal]]:
+    """
+    Read the per-document metrics from the evaluation results.json next to the report
+
+    Args:
+        evaluation_report_uri: S3 URI of the evaluation report.md
+
+    Returns:
+        Overall metrics and average attribute confidence of the document
+    """
+    json_uri = evaluation_report_uri.replace('report.md', 'results.json')
+    bucket, key = json_uri[len('s3://'):].split('/', 1)
+    data = json.loads(s3.get_object(Bucket=bucket, Key=key)['Body'].read())
+
+    overall_metrics = data.get('overall_metrics', {})
+    metrics = {
+        name: _to_decimal(overall_metrics.get(name))
+        for name in ['accuracy', 'weighted_overall_score', 'precision', 'recall',
+                     'f1_score', 'false_alarm_rate', 'false_discovery_rate']
+    }
+
+    confidences = [
+        float(attr['confidence'])
+        for section in data.get('section_results', [])
+        for attr in section.get('attributes', [])
+        if attr.get('confidence') is not None
+    ]
+    metrics['average_confidence'] = _to_decimal(sum(confidences) / len(confidences)) if confidences else None
+    return metrics
+
+
+def record_test_run_result(document: Document) -> None:
+    """
+    Store the outcome of a test run document in its test run partition
+
+    Test run documents are processed under "<test_run_id>/<file>". Writing a
+    row per document (PK testrun#<test_run_id>, SK doc#<file>) as documents
+    complete lets the test results resolver aggregate a test run with a
+    single query. Reprocessing a document overwrites its row.
+
+    The evaluation function usually runs after this and adds the evaluation
+    metrics to the row itself, so only the attributes known here are set.
+
+    Args:
+        document: The completed Document
+
+    Note: This function handles its own errors
+    """
+    if not TRACKING_TABLE or '/' not in (document.input_key or ''):
+        return
+
+    test_run_id, file_key = document.input_key.split('/', 1)
+    try:
+        table = dynamodb.Table(TRACKING_TABLE)
+        response = table.get_item(
+            Key={'PK': f'testrun#{test_run_id}', 'SK': 'metadata'},
+            ProjectionExpression='PK'
+        )
+        if 'Item' not in response:
+            return
+
+        attributes = {
+            'ObjectStatus': document.status.value,
+            'CompletionTime': document.completion_time
+        }
+        if document.evaluation_status:
+            attributes['EvaluationStatus'] = document.evaluation_status
+        if document.evaluation_report_uri:
+            attributes['EvaluationReportUri'] = document.evaluation_report_uri
+            attributes['EvaluationMetrics'] = load_evaluation_metrics(document.evaluation_report_uri)
+
+        table.update_item(
+            Key={'PK': f'testrun#{test_run_id}', 'SK': f'doc#{file_key}'},
+            UpdateExpression='SET ' + ', '.join(f'#{name} = :{name}' for name in attributes),
+            ExpressionAttributeNames={f'#{name}': name for name in attributes},
+            ExpressionAttributeValues={f':{name}': value for name, value in attributes.items()}
+        )
+        logger.info(f"Recorded result of {document.input_key} for test run {test_run_id}")
+    except Exception as e:
+        # The resolver falls back to the document's tracking item and evaluation report
+        logger.error(f"Failed to record test run result for {document.input_key}: {e}", exc_info=True)
+
+
 def put_latency_metrics(document: Document) -> None:
     """
     Publish latency metrics to CloudWatch
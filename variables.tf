@@ -265,6 +265,9 @@ variable "reporting" {
     database_name               = optional(string)
     crawler_schedule            = optional(string, "daily")
     enable_partition_projection = optional(bool, true)
+    enable_compaction           = optional(bool, true)
+    compaction_schedule         = optional(string, "cron(0 3 * * ? *)")
+    enable_buffered_writes      = optional(bool, false)
   })
   default = {
     enabled                     = false